@@ -8,9 +8,11 @@ import aiosqlite
 import json
 import os
 import asyncio
+import time
 import discord
 from shadowverse_handler import (
     record_match,
+    record_matches_bulk,
     update_dashboard_message,
     get_sv_channel_id,
     remove_match_by_id,
@@ -18,6 +20,9 @@ from shadowverse_handler import (
     CRAFTS
 )
 from global_config import DEV_SERVER_ID, OWNER_USER_ID
+from notification_handler import (
+    wake_notification_scheduler, get_notification_scheduler_status, get_notification_history,
+)
 import event_manager
 import logging
 
@@ -705,27 +710,8 @@ async def handle_log_batch(request):
                 'opponent_group': opponent_group
             })
 
-        # All matches validated, now record them
-        match_ids = []
-        for match_data in validated_matches:
-            match_id = await record_match(
-                user_id, server_id,
-                match_data['played_craft'],
-                match_data['opponent_craft'],
-                match_data['win'],
-                match_data['brick'],
-                source="api",
-                timestamp=match_data['timestamp'],
-                player_points=match_data['player_points'],
-                player_point_type=match_data['player_point_type'],
-                player_rank=match_data['player_rank'],
-                player_group=match_data['player_group'],
-                opponent_points=match_data['opponent_points'],
-                opponent_point_type=match_data['opponent_point_type'],
-                opponent_rank=match_data['opponent_rank'],
-                opponent_group=match_data['opponent_group']
-            )
-            match_ids.append(match_id)
+        # All matches validated, now record them in one transaction
+        match_ids = await record_matches_bulk(user_id, server_id, validated_matches, source="api")
 
         # Get guild, channel, and member for dashboard update
         if not bot_instance:
@@ -1224,6 +1210,7 @@ async def handle_remove_notification(request):
     notif_id = request.match_info["notif_id"]
     try:
         await event_manager.remove_pending_notification(int(notif_id))
+        wake_notification_scheduler()
         return web.json_response({"success": True, "message": "Notification removed"})
     except Exception as e:
         api_logger.error(f"Error removing notification: {e}")
@@ -1241,15 +1228,48 @@ async def handle_update_notification(request):
         return web.json_response({"success": False, "error": "Invalid JSON body"}, status=400)
 
     try:
+        if "message_template" in data:
+            await event_manager.update_notification_template(int(notif_id), data["message_template"] or None)
         if "custom_message" in data:
             await event_manager.update_notification_message(int(notif_id), data["custom_message"] or None)
+        wake_notification_scheduler()
         return web.json_response({"success": True, "message": "Notification updated"})
+    except ValueError as e:
+        return web.json_response({"success": False, "error": str(e)}, status=400)
     except Exception as e:
         api_logger.error(f"Error updating notification: {e}")
         return web.json_response({"success": False, "error": str(e)}, status=500)
 
+async def handle_notification_scheduler_status(request):
+    """GET /api/notifications/scheduler — heap size and next fire time of the in-bot scheduler."""
+    is_valid, error_msg, _ = validate_api_key(request)
+    if not is_valid:
+        return web.json_response({"success": False, "error": error_msg}, status=401)
+
+    return web.json_response({"success": True, "scheduler": get_notification_scheduler_status()})
+
+async def handle_notification_history(request):
+    """GET /api/notifications/history?profile=UMA&limit=50&before_id=123 — delivered notifications, newest first."""
+    is_valid, error_msg, _ = validate_api_key(request)
+    if not is_valid:
+        return web.json_response({"success": False, "error": error_msg}, status=401)
+
+    try:
+        limit = int(request.query.get("limit", 50))
+        before_id = request.query.get("before_id")
+        before_id = int(before_id) if before_id else None
+    except ValueError:
+        return web.json_response({"success": False, "error": "limit and before_id must be integers"}, status=400)
+
+    try:
+        page = await get_notification_history(request.query.get("profile"), limit, before_id)
+        return web.json_response({"success": True, **page})
+    except Exception as e:
+        api_logger.error(f"Error listing notification history: {e}")
+        return web.json_response({"success": False, "error": str(e)}, status=500)
+
 async def handle_fire_notification(request):
-    """POST /api/notifications/{notif_id}/fire — send immediately and mark sent=1."""
+    """POST /api/notifications/{notif_id}/fire — send immediately and move the row to history."""
     is_admin, err = require_admin(request)
     if not is_admin:
         return err
@@ -1259,6 +1279,7 @@ async def handle_fire_notification(request):
         "id", "profile", "title", "category", "timing_type",
         "notify_unix", "event_time_unix", "region",
         "message_template", "custom_message", "phase", "character_name",
+        "rendered_message",
     ]
     async with aiosqlite.connect(event_manager.NOTIF_DB_PATH) as conn:
         async with conn.execute(
@@ -1270,13 +1291,14 @@ async def handle_fire_notification(request):
             return web.json_response({"success": False, "error": "Notification not found"}, status=404)
 
         row = dict(zip(cols, raw))
-        from notification_handler import send_notification_webhook
+        from notification_handler import send_notification_webhook, archive_notifications
         loop = asyncio.get_event_loop()
         success = await loop.run_in_executor(None, send_notification_webhook, row)
 
         if success:
-            await conn.execute("UPDATE pending_notifications SET sent=1 WHERE id=?", (notif_id,))
+            await archive_notifications(conn, [(notif_id, time.time())], "manual")
             await conn.commit()
+            wake_notification_scheduler()
             return web.json_response({"success": True})
         else:
             return web.json_response({"success": False, "error": "Webhook POST failed — check logs"}, status=500)
@@ -1614,6 +1636,8 @@ def create_app():
     app.router.add_delete('/api/events/{profile}/{event_id}', handle_remove_event)
     
     app.router.add_get('/api/events/{profile}/{event_id}/notifications', handle_list_notifications)
+    app.router.add_get('/api/notifications/scheduler', handle_notification_scheduler_status)
+    app.router.add_get('/api/notifications/history', handle_notification_history)
     app.router.add_delete('/api/notifications/{notif_id}', handle_remove_notification)
     app.router.add_patch('/api/notifications/{notif_id}', handle_update_notification)
     app.router.add_post('/api/notifications/{notif_id}/fire', handle_fire_notification)
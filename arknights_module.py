@@ -9,6 +9,11 @@ from bot import bot
 from datetime import datetime, timezone, timedelta
 from global_config import ONGOING_EVENTS_CHANNELS, UPCOMING_EVENTS_CHANNELS, OWNER_USER_ID, MAIN_SERVER_ID, DEV_SERVER_ID
 from ml_handler import run_llm_inference  # Uses the LLM as in ml_handler.py
+from src.core.repositories.event_db_registry import register_event_database
+from src.core.repositories.migrations import migrate_event_time_columns
+from src.core.services.rest_scheduler import discord_rest, RestPriority
+from src.core.services.timer_wheel import timer_wheel
+from src.core.services.refresh_coordinator import RefreshCoordinator
 import dateparser
 import logging
 import logging.handlers
@@ -55,6 +60,7 @@ def ak_date_string_to_unix(date_str):
 
 # Path to Arknights-specific database
 AK_DB_PATH = os.path.join("data", "arknights_data.db")
+register_event_database("AK", AK_DB_PATH)
 
 # Ensure the database and tables exist
 async def init_ak_db():
@@ -64,8 +70,8 @@ async def init_ak_db():
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 user_id TEXT,
                 title TEXT,
-                start_date TEXT,
-                end_date TEXT,
+                start_date INTEGER,
+                end_date INTEGER,
                 image TEXT,
                 category TEXT,
                 profile TEXT
@@ -90,42 +96,29 @@ async def init_ak_db():
             CREATE UNIQUE INDEX IF NOT EXISTS idx_update_time ON scheduled_update_tasks (update_unix)
         ''')
         await conn.commit()
+    # Older databases declared the time columns TEXT; rebuild them once as INTEGER
+    await asyncio.to_thread(migrate_event_time_columns, AK_DB_PATH, "events", default_profile="AK")
 
-SCHEDULED_UPDATE_TASKS = {}  # { update_unix: asyncio.Task }
+async def refresh_ak_dashboard(_arg=None):
+    """Timer wheel handler: refreshes the AK dashboard in the main server."""
+    guild = bot.get_guild(MAIN_SERVER_ID)
+    if guild:
+        await arknights_update_timers(guild)
+    else:
+        ak_logger.error(f"[refresh_ak_dashboard] Could not find main guild {MAIN_SERVER_ID}")
+
+timer_wheel.register("AK", refresh_ak_dashboard)
 
 async def schedule_update_task(update_unix):
     """
-    Schedules arknights_update_timers at update_unix.
-    Avoids scheduling if a task exists within ±15 minutes.
+    Schedules arknights_update_timers at update_unix on the shared timer wheel.
+    Deadlines in the same wheel slot share one dashboard refresh.
     """
-    ak_logger.info(f"[schedule_update_task] Attempting to schedule update for unix {update_unix}")
-    async with aiosqlite.connect(AK_DB_PATH) as conn:
-        min_time = update_unix - 900
-        max_time = update_unix + 900
-        async with conn.execute(
-            "SELECT 1 FROM scheduled_update_tasks WHERE update_unix BETWEEN ? AND ?",
-            (min_time, max_time)
-        ) as cursor:
-            if await cursor.fetchone():
-                ak_logger.info(f"[schedule_update_task] Task already exists within ±15min window for {update_unix}")
-                return  # Task already scheduled in this window
-        await conn.execute(
-            "INSERT OR IGNORE INTO scheduled_update_tasks (update_unix) VALUES (?)",
-            (update_unix,)
-        )
-        await conn.commit()
-        ak_logger.info(f"[schedule_update_task] Inserted task into DB for unix {update_unix}")
-
-    delay = update_unix - int(datetime.now(timezone.utc).timestamp())
-    ak_logger.info(f"[schedule_update_task] Calculated delay: {delay}s for unix {update_unix}")
-    if delay > 0:
-        if update_unix in SCHEDULED_UPDATE_TASKS:
-            ak_logger.info(f"[schedule_update_task] Task already scheduled in memory for {update_unix}")
-            return  # Already scheduled in memory
-        SCHEDULED_UPDATE_TASKS[update_unix] = asyncio.create_task(run_update_after_delay(update_unix, delay))
-        ak_logger.info(f"[schedule_update_task] Created asyncio task for unix {update_unix} with delay {delay}s")
+    slot = await timer_wheel.schedule("AK", update_unix)
+    if slot is None:
+        ak_logger.info(f"[schedule_update_task] {update_unix} is in the past, not scheduling")
     else:
-        ak_logger.info(f"[schedule_update_task] Delay is negative ({delay}s), not scheduling for unix {update_unix}")
+        ak_logger.info(f"[schedule_update_task] Dashboard refresh for unix {update_unix} scheduled in slot {slot}")
 
 async def periodic_ak_cleanup():
     # Periodically clean up old scheduled update tasks
@@ -133,67 +126,23 @@ async def periodic_ak_cleanup():
         await cleanup_old_update_tasks()
         await asyncio.sleep(86400)  # Run once every 24 hours
 
-async def run_update_after_delay(update_unix, delay):
-    ak_logger.info(f"[run_update_after_delay] Task scheduled for {delay}s (at unix {update_unix})")
-    await asyncio.sleep(delay)
-    ak_logger.info(f"[run_update_after_delay] Executing scheduled update for unix {update_unix}")
-    # Always use the main server for dashboard updates
-    from global_config import MAIN_SERVER_ID
-    guild = bot.get_guild(MAIN_SERVER_ID)
-    if guild:
-        await arknights_update_timers(guild)
-        ak_logger.info(f"[run_update_after_delay] Completed dashboard update for unix {update_unix}")
-    else:
-        ak_logger.error(f"[run_update_after_delay] Could not find main guild {MAIN_SERVER_ID}")
-    # Mark as done in DB
-    async with aiosqlite.connect(AK_DB_PATH) as conn:
-        await conn.execute(
-            "UPDATE scheduled_update_tasks SET status='done' WHERE update_unix=?",
-            (update_unix,)
-        )
-        await conn.commit()
-    ak_logger.info(f"[run_update_after_delay] Marked task as done in DB for unix {update_unix}")
-
 async def load_scheduled_ak_update_tasks():
     """
-    Loads all pending scheduled update tasks from the DB and schedules them in memory.
-    Executes ONE update on startup to refresh the dashboard, then marks all overdue tasks as done.
+    Moves pending rows of the old scheduled_update_tasks table onto the timer wheel and starts it.
+    Overdue rows are kept, so the wheel runs ONE catch-up update for all of them.
     """
     async with aiosqlite.connect(AK_DB_PATH) as conn:
-        now = int(datetime.now(timezone.utc).timestamp())
         async with conn.execute(
-            "SELECT update_unix FROM scheduled_update_tasks WHERE status='pending'",
-            ()
+            "SELECT update_unix FROM scheduled_update_tasks WHERE status='pending'"
         ) as cursor:
             tasks = [row[0] async for row in cursor]
-        
-        # Check if there are any overdue tasks
-        overdue_tasks = [t for t in tasks if t <= now]
-        future_tasks = [t for t in tasks if t > now]
-        
-        if overdue_tasks:
-            # Execute ONE update to refresh the dashboard
-            ak_logger.info(f"Found {len(overdue_tasks)} overdue tasks. Executing one update to refresh dashboard...")
-            main_guild = bot.get_guild(MAIN_SERVER_ID)
-            if main_guild:
-                await arknights_update_timers(main_guild)
-            
-            # Mark all overdue tasks as done (without executing each individually)
-            for update_unix in overdue_tasks:
-                await conn.execute(
-                    "UPDATE scheduled_update_tasks SET status='done' WHERE update_unix=?",
-                    (update_unix,)
-                )
+        if tasks:
+            await timer_wheel.schedule_many("AK", [(t, None) for t in tasks], catch_up=True)
+            await conn.execute("UPDATE scheduled_update_tasks SET status='done' WHERE status='pending'")
             await conn.commit()
-            ak_logger.info(f"Marked {len(overdue_tasks)} overdue tasks as done.")
-        
-        # Schedule future tasks
-        for update_unix in future_tasks:
-            delay = update_unix - now
-            if update_unix not in SCHEDULED_UPDATE_TASKS:
-                ak_logger.info(f"Scheduling future update task for {update_unix} (<t:{update_unix}:F>), delay={delay}s")
-                SCHEDULED_UPDATE_TASKS[update_unix] = asyncio.create_task(run_update_after_delay(update_unix, delay))
-                
+            ak_logger.info(f"Moved {len(tasks)} pending update tasks onto the timer wheel.")
+    timer_wheel.start()
+
 async def cleanup_old_update_tasks():
     """
     Deletes scheduled_update_tasks that are marked as 'done' and are older than 1 day.
@@ -226,7 +175,7 @@ async def post_event_embed(channel, event):
     )
     if event.get("image") and event["image"].startswith("http"):
         embed.set_image(url=event["image"])
-    return await channel.send(embed=embed)
+    return await discord_rest.send(channel, embed=embed, priority=RestPriority.DASHBOARD)
 
 # --- Event Deletion Helper ---
 async def delete_event_message(guild, channel_id, event_id):
@@ -241,8 +190,7 @@ async def delete_event_message(guild, channel_id, event_id):
             channel = guild.get_channel(int(channel_id))
             if channel:
                 try:
-                    msg = await channel.fetch_message(int(row[0]))
-                    await msg.delete()
+                    await discord_rest.delete(channel, row[0])
                 except Exception:
                     pass
         await conn.execute(
@@ -282,12 +230,11 @@ async def upsert_event_message(guild, channel, event, event_id):
         msg = None
         if row and row[0]:
             try:
-                msg = await channel.fetch_message(int(row[0]))
-                await msg.edit(embed=embed)
+                msg = await discord_rest.edit(channel, row[0], embed=embed)
                 return
             except Exception:
                 pass  # If message not found, fall through to send new
-        msg = await channel.send(embed=embed)
+        msg = await discord_rest.send(channel, embed=embed, priority=RestPriority.DASHBOARD)
         await conn.execute(
             "REPLACE INTO event_messages (event_id, channel_id, message_id) VALUES (?, ?, ?)",
             (event_id, str(channel.id), str(msg.id))
@@ -301,7 +248,12 @@ async def arknights_update_timers(_guild=None):
     - Deletes ended events and their messages.
     - Ensures no overlapping events with the same name.
     Always operates on the main server's event channels.
+    Concurrent calls are merged into one refresh; returns once a refresh
+    that started after this call has finished.
     """
+    await ak_dashboard_refresh.request()
+
+async def _arknights_update_timers_impl(force=False):
     # Always use the main server for dashboard updates
     main_guild = bot.get_guild(MAIN_SERVER_ID)
     if not main_guild:
@@ -355,6 +307,9 @@ async def arknights_update_timers(_guild=None):
                     await upsert_event_message(main_guild, upcoming_channel, event, event["id"])
                 # Remove from ongoing channel if exists (shouldn't be, but for safety)
                 await delete_event_message(main_guild, ONGOING_EVENTS_CHANNELS["AK"], event["id"])
+
+# Merges overlapping AK dashboard refresh requests into one run
+ak_dashboard_refresh = RefreshCoordinator(_arknights_update_timers_impl, name="AK dashboard")
     
 # --- Parsing Helpers (unchanged) ---
 def parse_title_ak(text):
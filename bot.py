@@ -2,9 +2,10 @@ from modules import *
 from discord.ext import commands
 import discord
 import logging
-import sys
 import os
 from dotenv import load_dotenv
+from src.utils.log_pipeline import get_log_pipeline
+from src.core.services.rest_scheduler import discord_rest, rate_limit_trace_config
 
 bot_version = "3.0.0"
 assigned_channels = {}
@@ -12,27 +13,26 @@ assigned_channels = {}
 load_dotenv()
 token = os.getenv('DISCORD_TOKEN')
 
-handler = logging.FileHandler(filename='discord.log', encoding='utf-8', mode='w')
+# discord.py records propagate to the root logger below; passing no handler to
+# bot.run keeps it from opening discord.log a second time
+handler = None
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 intents.presences = True  # Required to see user online/offline/idle/dnd status
 
-bot = commands.Bot(command_prefix='Kanami ', intents=intents, help_command=None)
+# Every REST response is reported to the shared outbound scheduler so it can
+# pace sends/edits/deletes from Discord's rate-limit headers
+bot = commands.Bot(command_prefix='Kanami ', intents=intents, help_command=None,
+                   http_trace=rate_limit_trace_config(discord_rest))
 
 # Create a logger
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# File handler (keeps discord.log)
-file_handler = logging.FileHandler("discord.log", mode="a")
-file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
-logger.addHandler(file_handler)
-
-# Stream handler (prints to stdout, visible in journalctl)
-stream_handler = logging.StreamHandler(sys.stdout)
-stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
-logger.addHandler(stream_handler)
+# discord.log (size-rotated) + stdout for journalctl, written by a background
+# thread so logging never blocks the event loop
+get_log_pipeline("discord.log").attach(logger)
 
 # Silence discord.py internal debug logs
 logging.getLogger("discord.http").setLevel(logging.WARNING)
@@ -3,6 +3,11 @@ from discord import app_commands
 from discord.ext import commands
 from modules import *
 from bot import bot
+from src.utils.embed_hash import embed_content_hash
+from src.core.services.rest_scheduler import discord_rest, RestPriority
+from src.core.services.orphan_sweep import orphan_sweeper, load_tracked_message_ids
+from src.core.services.refresh_coordinator import RefreshCoordinator
+from src.core.repositories.migrations import migrate_event_time_columns
 import asyncio
 import logging
 import dateparser
@@ -22,17 +27,17 @@ def init_db():
                     user_id TEXT,
                     server_id TEXT,
                     title TEXT,
-                    start_date TEXT,
-                    end_date TEXT,
+                    start_date INTEGER,
+                    end_date INTEGER,
                     image TEXT,
                     category TEXT,
                     is_hyv INTEGER DEFAULT 0,
-                    asia_start TEXT,
-                    asia_end TEXT,
-                    america_start TEXT,
-                    america_end TEXT,
-                    europe_start TEXT,
-                    europe_end TEXT,
+                    asia_start INTEGER,
+                    asia_end INTEGER,
+                    america_start INTEGER,
+                    america_end INTEGER,
+                    europe_start INTEGER,
+                    europe_end INTEGER,
                     profile TEXT
                 )''')
     # Event messages IDs
@@ -41,8 +46,14 @@ def init_db():
                     server_id TEXT,
                     channel_id TEXT,
                     message_id TEXT,
+                    content_hash TEXT,
                     PRIMARY KEY (event_id, channel_id)
                 )''')
+    # Hash of the last embed sent for the event, so unchanged events are never re-edited
+    try:
+        c.execute('ALTER TABLE event_messages ADD COLUMN content_hash TEXT')
+    except sqlite3.OperationalError:
+        pass  # Column already exists
     # Timer channel config
     c.execute('''CREATE TABLE IF NOT EXISTS config (
                     server_id TEXT,
@@ -103,6 +114,18 @@ def init_db():
                 )''')
     conn.commit()
     conn.close()
+    # Older databases declared the time columns TEXT; rebuild them once as INTEGER.
+    # user_data is shared by every guild, so its range indexes lead with server_id.
+    migrate_event_time_columns('kanami_data.db', 'user_data', scope=("server_id", "profile"))
+    # Give the planner statistics for the range indexes, so the per-server
+    # end_date sweeps pick (server_id, profile, end_date) over a table scan
+    conn = sqlite3.connect('kanami_data.db')
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name='sqlite_stat1'").fetchone() is None:
+        conn.execute("ANALYZE")
+    else:
+        conn.execute("PRAGMA optimize")
+    conn.commit()
+    conn.close()
 
 init_db()
 
@@ -120,16 +143,16 @@ async def mark_ended_events(guild):
     now = int(datetime.now().timestamp())
     async with aiosqlite.connect('kanami_data.db') as conn:
         await conn.execute(
-            "UPDATE user_data SET category='Ended' WHERE server_id=? AND category != 'Ended' AND end_date != '' AND CAST(end_date AS INTEGER) < ?",
+            "UPDATE user_data SET category='Ended' WHERE server_id=? "
+            "AND end_date < ? AND category != 'Ended'",
             (str(guild.id), now)
         )
         await conn.commit()
 
-async def upsert_event_message(guild, channel, event_row, event_id):
+def build_event_embed(event_row):
     """
-    Edits the event message in the channel if it exists, otherwise sends a new one.
+    Renders the timer-channel embed for an event.
     event_row: (title, start_date, end_date, image, category, is_hyv, asia_start, asia_end, america_start, america_end, europe_start, europe_end, profile)
-    event_id: the id of the event in user_data
     """
     title, start_unix, end_unix, image, category, is_hyv, asia_start, asia_end, america_start, america_end, europe_start, europe_end, profile = event_row
 
@@ -162,30 +185,78 @@ async def upsert_event_message(guild, channel, event_row, event_id):
         embed.description = f"**Start:** <t:{start_unix}:F> or <t:{start_unix}:R>\n**End:** <t:{end_unix}:F> or <t:{end_unix}:R>"
     if image and (image.startswith("http://") or image.startswith("https://")):
         embed.set_image(url=image)
+    return embed
 
-    # Check if message exists and edit if possible
-    async with aiosqlite.connect('kanami_data.db') as conn:
-        async with conn.execute("SELECT message_id FROM event_messages WHERE event_id=? AND channel_id=?", (event_id, str(channel.id))) as cursor:
-            row = await cursor.fetchone()
-        msg = None
-        if row and row[0]:
-            try:
-                msg = await channel.fetch_message(int(row[0]))
-                await msg.edit(embed=embed)
-                return
-            except Exception:
-                pass  # If message not found, fall through to send new
+async def upsert_event_message(guild, channel, event_row, event_id, existing=None, conn=None):
+    """
+    Edits the event message in the channel if it exists, otherwise sends a new one.
+    Nothing is sent when the rendered embed's hash matches the stored content_hash.
+    event_row: (title, start_date, end_date, image, category, is_hyv, asia_start, asia_end, america_start, america_end, europe_start, europe_end, profile)
+    event_id: the id of the event in user_data
+    existing: (message_id, content_hash) already read by the caller; looked up when None
+    conn: open aiosqlite connection to write through (the caller commits); a new one is opened when None
+    Returns True if a message was edited or sent.
+    """
+    if conn is None:
+        async with aiosqlite.connect('kanami_data.db') as conn:
+            changed = await upsert_event_message(guild, channel, event_row, event_id, existing, conn)
+            await conn.commit()
+            return changed
+
+    embed = build_event_embed(event_row)
+    content_hash = embed_content_hash(embed)
+
+    if existing is None:
+        async with conn.execute(
+            "SELECT message_id, content_hash FROM event_messages WHERE event_id=? AND channel_id=?",
+            (event_id, str(channel.id))
+        ) as cursor:
+            existing = await cursor.fetchone() or (None, None)
+    message_id, stored_hash = existing
+
+    if message_id:
+        if stored_hash == content_hash:
+            return False
+        try:
+            # Edit by ID; no fetch_message round-trip
+            await discord_rest.edit(channel, message_id, embed=embed)
+            await conn.execute(
+                "UPDATE event_messages SET content_hash=? WHERE event_id=? AND channel_id=?",
+                (content_hash, event_id, str(channel.id))
+            )
+            return True
+        except discord.NotFound:
+            pass  # Message was deleted, fall through to send new
+
+    # Send new message and update DB
+    msg = await discord_rest.send(channel, embed=embed, priority=RestPriority.DASHBOARD)
+    await conn.execute(
+        "REPLACE INTO event_messages (event_id, server_id, channel_id, message_id, content_hash) VALUES (?, ?, ?, ?, ?)",
+        (event_id, str(guild.id), str(channel.id), str(msg.id), content_hash)
+    )
+    return True
 
-        # Send new message and update DB
-        msg = await channel.send(embed=embed)
-        await conn.execute(
-            "REPLACE INTO event_messages (event_id, server_id, channel_id, message_id) VALUES (?, ?, ?, ?)",
-            (event_id, str(guild.id), str(channel.id), str(msg.id))
-        )
-        await conn.commit()
+TIMER_CHANNEL_REFRESHES = {}  # { (server_id, profile): RefreshCoordinator }
 
 # Function to update the timer channel with the latest events for a given profile
-async def update_timer_channel(guild, bot, profile="ALL"):
+async def update_timer_channel(guild, bot, profile="ALL", force_sweep=False):
+    """
+    Brings the timer channel for `profile` in line with user_data.
+    Orphaned bot messages are found from the tracked message IDs; the channel
+    history is only read when the orphan sweep is due (or force_sweep is set).
+    Calls for the same server and profile made while a refresh is queued or
+    running are merged into one refresh, which sweeps if any caller asked to.
+    """
+    key = (guild.id, profile)
+    coordinator = TIMER_CHANNEL_REFRESHES.get(key)
+    if coordinator is None:
+        async def refresh(force, guild=guild, bot=bot, profile=profile):
+            await _update_timer_channel_impl(guild, bot, profile=profile, force_sweep=force)
+        coordinator = RefreshCoordinator(refresh, name=f"timer channel {profile} ({guild.id})")
+        TIMER_CHANNEL_REFRESHES[key] = coordinator
+    await coordinator.request(force=force_sweep)
+
+async def _update_timer_channel_impl(guild, bot, profile="ALL", force_sweep=False):
     timer_logger.info(f"[update_timer_channel] Updating timer channel for guild {guild.id}, profile {profile}")
 
     await mark_ended_events(guild)
@@ -221,9 +292,10 @@ async def update_timer_channel(guild, bot, profile="ALL"):
             timer_logger.warning(f"[update_timer_channel] Channel {channel_id} not found in guild {guild.id}")
             return
 
-        # Get all event_ids currently in the channel
-        async with conn.execute("SELECT event_id, message_id FROM event_messages WHERE server_id=? AND channel_id=?", (str(guild.id), str(channel.id))) as cursor:
-            existing_msgs = {row[0]: row[1] async for row in cursor}
+        # Get all event_ids currently in the channel, with the hash of what each message shows
+        async with conn.execute("SELECT event_id, message_id, content_hash FROM event_messages WHERE server_id=? AND channel_id=?", (str(guild.id), str(channel.id))) as cursor:
+            existing = {row[0]: (row[1], row[2]) async for row in cursor}
+        existing_msgs = {event_id: message_id for event_id, (message_id, _) in existing.items()}
 
         # Build a set of current event_ids
         current_event_ids = set(row[0] for row in rows)
@@ -237,12 +309,17 @@ async def update_timer_channel(guild, bot, profile="ALL"):
         # Delete messages for events that are either not in the DB anymore or are marked as Ended
         for event_id in set(existing_msgs.keys()) | ended_event_ids:
             if event_id not in current_event_ids or event_id in ended_event_ids:
-                try:
-                    msg = await channel.fetch_message(int(existing_msgs.get(event_id)))
-                    await msg.delete()
-                    timer_logger.info(f"[update_timer_channel] Deleted message for event_id {event_id} (profile {profile})")
-                except Exception as e:
-                    timer_logger.warning(f"[update_timer_channel] Failed to delete message for event_id {event_id} (profile {profile}): {e}")
+                message_id = existing_msgs.get(event_id)
+                if message_id:
+                    try:
+                        await discord_rest.delete(channel, message_id)
+                        timer_logger.info(f"[update_timer_channel] Deleted message for event_id {event_id} (profile {profile})")
+                    except discord.NotFound:
+                        pass
+                    except Exception as e:
+                        timer_logger.warning(f"[update_timer_channel] Failed to delete message for event_id {event_id} (profile {profile}): {e}")
+                        # Untracked from here on; let the next sweep pick it up
+                        await orphan_sweeper.rewind(conn, channel.id, message_id)
                 await conn.execute("DELETE FROM event_messages WHERE event_id=? AND channel_id=?", (event_id, str(channel.id)))
                 await conn.commit()
             if event_id in ended_event_ids:
@@ -250,92 +327,48 @@ async def update_timer_channel(guild, bot, profile="ALL"):
                 await conn.commit()
                 timer_logger.info(f"[update_timer_channel] Deleted ended event_id {event_id} from user_data (profile {profile})")
 
-        # Upsert (edit or create) messages for current events
+        # Upsert (edit or create) messages for current events; unchanged embeds are skipped by hash
+        changed = unchanged = 0
         for row in rows:
             event_id = row[0]
-            title = row[1]
-            start_date = row[2]
-            end_date = row[3]
-            image = row[4]
             category = row[5]
-            is_hyv = int(row[6])
-            asia_start = row[7]
-            asia_end = row[8]
-            america_start = row[9]
-            america_end = row[10]
-            europe_start = row[11]
-            europe_end = row[12]
-            event_profile = row[13]
-
             if category == "Ended":
                 continue  # Skip ended events
 
-            # Compare with previous message data
-            msg_id = existing_msgs.get(event_id)
-            needs_update = True
-
-            if msg_id:
-                # Fetch previous event data from DB for comparison
-                async with conn.execute(
-                    "SELECT title, start_date, end_date, asia_start, asia_end, america_start, america_end, europe_start, europe_end FROM user_data WHERE id=?",
-                    (event_id,)
-                ) as cursor:
-                    prev = await cursor.fetchone()
-                if prev:
-                    prev_title, prev_start, prev_end, prev_asia_start, prev_asia_end, prev_america_start, prev_america_end, prev_europe_start, prev_europe_end = prev
-                    # For HYV events, compare all region times
-                    if is_hyv:
-                        if (
-                            title == prev_title and
-                            asia_start == prev_asia_start and
-                            asia_end == prev_asia_end and
-                            america_start == prev_america_start and
-                            america_end == prev_america_end and
-                            europe_start == prev_europe_start and
-                            europe_end == prev_europe_end
-                        ):
-                            needs_update = False
-                    else:
-                        if (
-                            title == prev_title and
-                            start_date == prev_start and
-                            end_date == prev_end
-                        ):
-                            needs_update = False
-
-            if not needs_update:
-                timer_logger.info(f"[update_timer_channel] No update needed for event_id {event_id} (profile {profile})")
-                continue
-
             event_row = row[1:]  # skip id
             try:
-                await upsert_event_message(guild, channel, event_row, event_id)
-                timer_logger.info(f"[update_timer_channel] Upserted event_id {event_id} (profile {profile})")
+                if await upsert_event_message(guild, channel, event_row, event_id,
+                                              existing.get(event_id, (None, None)), conn):
+                    changed += 1
+                    timer_logger.info(f"[update_timer_channel] Upserted event_id {event_id} (profile {profile})")
+                else:
+                    unchanged += 1
             except Exception as e:
                 timer_logger.warning(f"[update_timer_channel] Failed to upsert event_id {event_id} (profile {profile}): {e}")
-            await asyncio.sleep(1)  # Avoid rate limits
+        await conn.commit()
+        timer_logger.info(f"[update_timer_channel] {changed} event message(s) updated, {unchanged} unchanged (profile {profile})")
 
-        # Orphaned message cleanup: remove messages in the channel not tracked in the DB
+        # Orphaned message cleanup: bot messages in the channel not tracked in the DB.
+        # Only reads channel history when a sweep is due (slow schedule or reset DB)
+        db_msg_ids = await load_tracked_message_ids(conn, channel.id)
         try:
-            messages = [msg async for msg in channel.history(limit=500)]
+            orphans = await orphan_sweeper.find_orphans(
+                conn, channel, db_msg_ids, lambda msg: msg.author == guild.me, force=force_sweep
+            )
         except Exception as e:
-            timer_logger.warning(f"[update_timer_channel] Failed to fetch history for channel {channel_id}: {e}")
-            messages = []
+            timer_logger.warning(f"[update_timer_channel] Failed to sweep channel {channel_id}: {e}")
+            orphans = []
 
-        async with aiosqlite.connect('kanami_data.db') as conn:
-            async with conn.execute("SELECT message_id FROM event_messages WHERE server_id=? AND channel_id=?", (str(guild.id), str(channel.id))) as cursor:
-                db_msg_ids = {str(row[0]) async for row in cursor}
-
-        for msg in messages:
-            if str(msg.id) not in db_msg_ids and msg.author == guild.me:
-                for attempt in range(3):
-                    try:
-                        await msg.delete()
-                        timer_logger.info(f"[update_timer_channel] Deleted orphaned message {msg.id} in channel {channel_id} (profile {profile})")
-                        break
-                    except Exception as e:
-                        timer_logger.warning(f"[update_timer_channel] Attempt {attempt+1}: Failed to delete orphaned message {msg.id} in channel {channel_id}: {e}")
-                        await asyncio.sleep(2 ** attempt)  # Exponential backoff
+        # Deletes are queued behind notifications and dashboard edits and paced by the scheduler
+        for msg in orphans:
+            try:
+                await discord_rest.delete(channel, msg.id)
+                timer_logger.info(f"[update_timer_channel] Deleted orphaned message {msg.id} in channel {channel_id} (profile {profile})")
+            except discord.NotFound:
+                pass
+            except Exception as e:
+                timer_logger.warning(f"[update_timer_channel] Failed to delete orphaned message {msg.id} in channel {channel_id}: {e}")
+                await orphan_sweeper.rewind(conn, channel.id, msg.id)
 
     timer_logger.info(f"[update_timer_channel] Finished updating for guild {guild.id}, profile {profile}")
     
@@ -574,7 +607,6 @@ async def add(ctx, *, args: str):
         'end_date': str(end_unix)
     }
     from notification_handler import schedule_notifications_for_event, remove_duplicate_pending_notifications
-    import asyncio
     asyncio.create_task(schedule_notifications_for_event(event))
     remove_duplicate_pending_notifications()
 
@@ -605,10 +637,13 @@ async def remove(ctx, *, title: str):
             channel = ctx.guild.get_channel(int(channel_id))
             if channel:
                 try:
-                    msg = await channel.fetch_message(int(message_id))
-                    await msg.delete()
-                except Exception:
+                    await discord_rest.delete(channel, message_id)
+                except discord.NotFound:
                     pass
+                except Exception as e:
+                    logging.warning(f"Failed to delete message {message_id} in channel {channel_id}: {e}")
+                    # Untracked from here on; let the next sweep pick it up
+                    await orphan_sweeper.rewind(conn, channel.id, message_id)
         # Remove from DB
         await conn.execute("DELETE FROM event_messages WHERE event_id=?", (event_id,))
         await conn.commit()
@@ -788,7 +823,10 @@ async def refresh_all(ctx):
 
     async with aiosqlite.connect('kanami_data.db') as conn:
         # 1. Delete expired events and their notifications/messages
-        async with conn.execute("SELECT id, title FROM user_data WHERE server_id=? AND end_date != '' AND CAST(end_date AS INTEGER) < ?", (server_id, now)) as cursor:
+        async with conn.execute(
+            "SELECT id, title FROM user_data WHERE server_id=? AND end_date < ?",
+            (server_id, now)
+        ) as cursor:
             expired = await cursor.fetchall()
         expired_titles = [row[1] for row in expired]
         for event_id, title in expired:
@@ -800,10 +838,13 @@ async def refresh_all(ctx):
                 channel = ctx.guild.get_channel(int(channel_id))
                 if channel:
                     try:
-                        msg = await channel.fetch_message(int(message_id))
-                        await msg.delete()
+                        await discord_rest.delete(channel, message_id)
+                    except discord.NotFound:
+                        pass
                     except Exception as e:
                         logging.warning(f"Failed to delete message {message_id} in channel {channel_id}: {e}")
+                        # Untracked from here on; let the sweep below pick it up
+                        await orphan_sweeper.rewind(conn, channel.id, message_id)
             await conn.execute("DELETE FROM event_messages WHERE event_id=?", (event_id,))
         await conn.commit()
 
@@ -811,32 +852,9 @@ async def refresh_all(ctx):
         async with conn.execute("SELECT profile, timer_channel_id FROM config WHERE server_id=?", (server_id,)) as cursor:
             profile_channel_map = {row[0]: int(row[1]) for row in await cursor.fetchall()}
 
+        # A manual refresh also sweeps each timer channel for orphaned messages
         for profile, channel_id in profile_channel_map.items():
-            await update_timer_channel(ctx.guild, bot, profile=profile)
-
-            # --- Orphaned message cleanup for this timer channel ---
-            channel = ctx.guild.get_channel(channel_id)
-            if not channel:
-                continue
-
-            try:
-                messages = [msg async for msg in channel.history(limit=500)]
-            except Exception as e:
-                logging.warning(f"Failed to fetch history for channel {channel_id}: {e}")
-                continue
-
-            async with conn.execute("SELECT message_id FROM event_messages WHERE server_id=? AND channel_id=?", (str(ctx.guild.id), str(channel_id))) as cursor:
-                db_msg_ids = {str(row[0]) async for row in cursor}
-
-            for msg in messages:
-                if str(msg.id) not in db_msg_ids and msg.author == ctx.guild.me:
-                    for attempt in range(3):
-                        try:
-                            await msg.delete()
-                            break
-                        except Exception as e:
-                            logging.warning(f"Attempt {attempt+1}: Failed to delete orphaned message {msg.id} in channel {channel_id}: {e}")
-                            await asyncio.sleep(2 ** attempt)  # Exponential backoff
+            await update_timer_channel(ctx.guild, bot, profile=profile, force_sweep=True)
 
         # Send completion message to announcement channel
         async with conn.execute("SELECT announce_channel_id FROM announce_config WHERE server_id=?", (server_id,)) as cursor:
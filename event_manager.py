@@ -10,7 +10,10 @@ from global_config import MAIN_SERVER_ID, ONGOING_EVENTS_CHANNELS, UPCOMING_EVEN
 # Profile-specific imports
 from arknights_module import AK_DB_PATH, add_ak_event, delete_event_message as ak_delete_event_message, arknights_update_timers, AK_TIMEZONE
 from uma_module import UMA_DB_PATH, add_uma_event, delete_event_message as uma_delete_event_message, uma_update_timers
-from notification_handler import NOTIF_DB_PATH, delete_notifications_for_event, schedule_notifications_for_event
+from notification_handler import (
+    NOTIF_DB_PATH, MESSAGE_TEMPLATES, delete_notifications_for_event, schedule_notifications_for_event,
+    rerender_notifications,
+)
 
 # Bot instance placeholder (injected via set_bot)
 _bot = None
@@ -42,7 +45,8 @@ async def get_events(profile):
     db_path = PROFILE_CONFIG[profile]["DB_PATH"]
     async with aiosqlite.connect(db_path) as conn:
         async with conn.execute(
-            "SELECT id, title, category, start_date, end_date, image FROM events ORDER BY start_date ASC"
+            "SELECT id, title, category, start_date, end_date, image FROM events WHERE profile=? ORDER BY start_date ASC",
+            (profile,)
         ) as cursor:
             return [dict(id=row[0], title=row[1], category=row[2], start=row[3], end=row[4], image=row[5]) async for row in cursor]
 
@@ -151,12 +155,25 @@ async def get_all_pending_notifications(profile=None):
                 return [dict(row) async for row in cursor]
 
 async def update_notification_message(notif_id, custom_message):
-    """Set custom_message on a pending notification row."""
+    """Set custom_message on a pending notification row and re-render its text."""
     async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
         await conn.execute(
             "UPDATE pending_notifications SET custom_message=? WHERE id=?",
             (custom_message, notif_id)
         )
+        await rerender_notifications(conn, [notif_id])
+        await conn.commit()
+
+async def update_notification_template(notif_id, message_template):
+    """Set message_template on a pending notification row and re-render its text."""
+    if message_template is not None and message_template not in MESSAGE_TEMPLATES:
+        raise ValueError(f"Unknown message template: {message_template}")
+    async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
+        await conn.execute(
+            "UPDATE pending_notifications SET message_template=? WHERE id=?",
+            (message_template, notif_id)
+        )
+        await rerender_notifications(conn, [notif_id])
         await conn.commit()
 
 async def refresh_pending_notifications_for_event(profile, event_id):
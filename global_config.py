@@ -68,6 +68,11 @@ CONTROL_PANEL_CHANNELS = {
     "UMA": 1420821685334184056,
 }
 
+# Pending Notifications channels (main server only, by profile)
+# Format: {profile: channel_id}; profiles without a channel get no pending-notifications embed
+PENDING_NOTIFICATIONS_CHANNELS = {
+}
+
 # Role IDs (by profile)
 # Format: {profile: role_id}
 ROLE_IDS = {
@@ -8,6 +8,11 @@ from bot import bot
 from datetime import datetime, timezone, timedelta
 from global_config import ONGOING_EVENTS_CHANNELS, UPCOMING_EVENTS_CHANNELS, OWNER_USER_ID, MAIN_SERVER_ID
 from hoyo_module import *
+from src.core.repositories.event_db_registry import register_event_database
+from src.core.repositories.migrations import migrate_event_time_columns
+from src.core.services.rest_scheduler import discord_rest, RestPriority
+from src.core.services.timer_wheel import timer_wheel
+from src.core.services.refresh_coordinator import RefreshCoordinator
 import logging
 
 # Create a custom logger for HSR
@@ -35,6 +40,7 @@ hsr_logger.propagate = True
 
 # Path to HSR-specific database
 HSR_DB_PATH = os.path.join("data", "hsr_data.db")
+register_event_database("HSR", HSR_DB_PATH)
 
 # Ensure the database and tables exist
 async def init_hsr_db():
@@ -44,17 +50,17 @@ async def init_hsr_db():
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 user_id TEXT,
                 title TEXT,
-                start_date TEXT,
-                end_date TEXT,
+                start_date INTEGER,
+                end_date INTEGER,
                 image TEXT,
                 category TEXT,
                 profile TEXT,
-                asia_start TEXT,
-                asia_end TEXT,
-                america_start TEXT,
-                america_end TEXT,
-                europe_start TEXT,
-                europe_end TEXT
+                asia_start INTEGER,
+                asia_end INTEGER,
+                america_start INTEGER,
+                america_end INTEGER,
+                europe_start INTEGER,
+                europe_end INTEGER
             )
         ''')
         await conn.execute('''
@@ -85,94 +91,47 @@ async def init_hsr_db():
             )
         ''')
         await conn.commit()
+    # Older databases declared the time columns TEXT; rebuild them once as INTEGER
+    await asyncio.to_thread(migrate_event_time_columns, HSR_DB_PATH, "events", default_profile="HSR")
 
-SCHEDULED_UPDATE_TASKS = {}  # { (update_unix, region): asyncio.Task }
+async def refresh_hsr_dashboard(region):
+    """Timer wheel handler: refreshes one region's HSR dashboard in the main server."""
+    guild = bot.get_guild(MAIN_SERVER_ID)
+    if guild:
+        await hsr_update_timers(guild, region)
+    else:
+        hsr_logger.error(f"[refresh_hsr_dashboard] Could not find main guild {MAIN_SERVER_ID}")
+
+timer_wheel.register("HSR", refresh_hsr_dashboard)
 
 async def schedule_update_task(update_unix, region):
     """
-    Schedules hsr_update_timers at update_unix for the given region.
-    Avoids scheduling if a task exists within ±15 minutes for the same region.
+    Schedules hsr_update_timers at update_unix for the given region on the shared timer wheel.
+    Deadlines in the same wheel slot share one refresh per region.
     """
-    async with aiosqlite.connect(HSR_DB_PATH) as conn:
-        min_time = update_unix - 900
-        max_time = update_unix + 900
-        async with conn.execute(
-            "SELECT 1 FROM scheduled_update_tasks WHERE update_unix BETWEEN ? AND ? AND region=?",
-            (min_time, max_time, region)
-        ) as cursor:
-            if await cursor.fetchone():
-                return
-        await conn.execute(
-            "INSERT OR IGNORE INTO scheduled_update_tasks (update_unix, region) VALUES (?, ?)",
-            (update_unix, region)
-        )
-        await conn.commit()
-
-    delay = update_unix - int(datetime.now(timezone.utc).timestamp())
-    if delay > 0:
-        task_key = (update_unix, region)
-        if task_key in SCHEDULED_UPDATE_TASKS:
-            return
-        SCHEDULED_UPDATE_TASKS[task_key] = asyncio.create_task(run_update_after_delay(update_unix, region, delay))
+    await timer_wheel.schedule("HSR", update_unix, region)
 
 async def periodic_hsr_cleanup():
     while True:
         await cleanup_old_update_tasks()
         await asyncio.sleep(86400)
 
-async def run_update_after_delay(update_unix, region, delay):
-    await asyncio.sleep(delay)
-    guild = bot.get_guild(MAIN_SERVER_ID)
-    if guild:
-        await hsr_update_timers(guild, region)
-    async with aiosqlite.connect(HSR_DB_PATH) as conn:
-        await conn.execute(
-            "UPDATE scheduled_update_tasks SET status='done' WHERE update_unix=? AND region=?",
-            (update_unix, region)
-        )
-        await conn.commit()
-
 async def load_scheduled_hsr_update_tasks():
     """
-    Loads all pending scheduled update tasks from the DB and schedules them in memory.
-    Executes ONE update per region on startup to refresh dashboards, then marks overdue tasks as done.
+    Moves pending rows of the old scheduled_update_tasks table onto the timer wheel and starts it.
+    Overdue rows are kept, so the wheel runs ONE catch-up update per region.
     """
     async with aiosqlite.connect(HSR_DB_PATH) as conn:
-        now = int(datetime.now(timezone.utc).timestamp())
         async with conn.execute(
-            "SELECT update_unix, region FROM scheduled_update_tasks WHERE status='pending'",
-            ()
+            "SELECT update_unix, region FROM scheduled_update_tasks WHERE status='pending'"
         ) as cursor:
             tasks = [(row[0], row[1]) async for row in cursor]
-        
-        # Group by region
-        regions = set(region for _, region in tasks)
-        
-        for region in regions:
-            region_tasks = [(unix, reg) for unix, reg in tasks if reg == region]
-            overdue = [t for t in region_tasks if t[0] <= now]
-            future = [t for t in region_tasks if t[0] > now]
-            
-            if overdue:
-                hsr_logger.info(f"Found {len(overdue)} overdue tasks for region {region}. Executing one update...")
-                main_guild = bot.get_guild(MAIN_SERVER_ID)
-                if main_guild:
-                    await hsr_update_timers(main_guild, region)
-                
-                for update_unix, reg in overdue:
-                    await conn.execute(
-                        "UPDATE scheduled_update_tasks SET status='done' WHERE update_unix=? AND region=?",
-                        (update_unix, reg)
-                    )
-                await conn.commit()
-                hsr_logger.info(f"Marked {len(overdue)} overdue tasks as done for region {region}.")
-            
-            for update_unix, reg in future:
-                delay = update_unix - now
-                task_key = (update_unix, reg)
-                if task_key not in SCHEDULED_UPDATE_TASKS:
-                    hsr_logger.info(f"Scheduling future update task for {update_unix} (<t:{update_unix}:F>) in region {reg}, delay={delay}s")
-                    SCHEDULED_UPDATE_TASKS[task_key] = asyncio.create_task(run_update_after_delay(update_unix, reg, delay))
+        if tasks:
+            await timer_wheel.schedule_many("HSR", tasks, catch_up=True)
+            await conn.execute("UPDATE scheduled_update_tasks SET status='done' WHERE status='pending'")
+            await conn.commit()
+            hsr_logger.info(f"Moved {len(tasks)} pending update tasks onto the timer wheel.")
+    timer_wheel.start()
 
 async def cleanup_old_update_tasks():
     cutoff = int(datetime.now(timezone.utc).timestamp()) - 86400
@@ -207,7 +166,7 @@ async def post_event_embed(channel, event, region):
     )
     if event.get("image") and event["image"].startswith("http"):
         embed.set_image(url=event["image"])
-    return await channel.send(embed=embed)
+    return await discord_rest.send(channel, embed=embed, priority=RestPriority.DASHBOARD)
 
 # --- Event Deletion Helper ---
 async def delete_event_message(guild, channel_id, event_id, region):
@@ -222,8 +181,7 @@ async def delete_event_message(guild, channel_id, event_id, region):
             channel = guild.get_channel(int(channel_id))
             if channel:
                 try:
-                    msg = await channel.fetch_message(int(row[0]))
-                    await msg.delete()
+                    await discord_rest.delete(channel, row[0])
                 except Exception:
                     pass
         await conn.execute(
@@ -266,24 +224,40 @@ async def upsert_event_message(guild, channel, event, event_id, region):
         msg = None
         if row and row[0]:
             try:
-                msg = await channel.fetch_message(int(row[0]))
-                await msg.edit(embed=embed)
+                msg = await discord_rest.edit(channel, row[0], embed=embed)
                 return
             except Exception:
                 pass
-        msg = await channel.send(embed=embed)
+        msg = await discord_rest.send(channel, embed=embed, priority=RestPriority.DASHBOARD)
         await conn.execute(
             "REPLACE INTO event_messages (event_id, channel_id, message_id, region) VALUES (?, ?, ?, ?)",
             (event_id, str(channel.id), str(msg.id), region)
         )
         await conn.commit()
 
+_hsr_requested_regions = set()  # Regions asked for since the last refresh started; None = all
+
 async def hsr_update_timers(_guild=None, region=None):
     """
     Updates HSR event dashboards for the specified region (or all regions if None).
     Groups regions with identical times into single embeds.
     Always operates on the main server's event channels.
+    Every region shares the same channels, so all calls go through one
+    coordinator: calls made while a refresh is queued or running are merged
+    into one refresh covering every region they asked for. Returns once a
+    refresh that started after this call has finished.
     """
+    _hsr_requested_regions.add(region)
+    await hsr_dashboard_refresh.request()
+
+async def _run_hsr_dashboard_refresh(force):
+    regions = set(_hsr_requested_regions)
+    _hsr_requested_regions.clear()
+    await _hsr_update_timers_impl(None if None in regions else regions)
+
+hsr_dashboard_refresh = RefreshCoordinator(_run_hsr_dashboard_refresh, name="HSR dashboard")
+
+async def _hsr_update_timers_impl(regions=None):
     main_guild = bot.get_guild(MAIN_SERVER_ID)
     if not main_guild:
         return
@@ -292,7 +266,7 @@ async def hsr_update_timers(_guild=None, region=None):
     ongoing_channel = main_guild.get_channel(ONGOING_EVENTS_CHANNELS.get("HSR"))
     upcoming_channel = main_guild.get_channel(UPCOMING_EVENTS_CHANNELS.get("HSR"))
     
-    regions_to_update = [region] if region else ["ASIA", "NA", "EU"]
+    regions_to_update = sorted(regions) if regions else ["ASIA", "NA", "EU"]
 
     async with aiosqlite.connect(HSR_DB_PATH) as conn:
         async with conn.execute(
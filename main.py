@@ -35,6 +35,10 @@ API_ENABLED = os.getenv('API_ENABLED', 'true').lower() == 'true'
 API_HOST = os.getenv('API_HOST', '0.0.0.0')
 API_PORT = int(os.getenv('API_PORT', '8080'))
 
+# In-bot notification scheduler (exact-time delivery via channel.send).
+# Leave disabled while the cron webhook notifier (notification_handler.run) is in use.
+NOTIFICATION_SCHEDULER_ENABLED = os.getenv('NOTIFICATION_SCHEDULER_ENABLED', 'false').lower() == 'true'
+
 # Store API server runner globally
 # Store API server runner globally
 api_runner = None
@@ -419,10 +423,17 @@ async def on_ready():
     await notification_handler.validate_event_notifications()
     print("[DEBUG] Notification maintenance completed.")
 
+    if NOTIFICATION_SCHEDULER_ENABLED:
+        notification_handler.start_notification_scheduler()
+        print("[DEBUG] Notification scheduler started.")
+    if not hasattr(bot, "_notif_compaction_task"):
+        bot._notif_compaction_task = asyncio.create_task(notification_handler.periodic_notification_compaction())
+        print("[DEBUG] Notification DB compaction task created.")
+
     # Initialize AK DB and tasks
     print("[DEBUG] Creating init_ak_db task...")
     asyncio.create_task(init_ak_db())
-    print("[DEBUG] Loading scheduled AK update tasks...")
+    print("[DEBUG] Moving scheduled AK updates onto the timer wheel...")
     await load_scheduled_ak_update_tasks()
     print("[DEBUG] Running periodic AK cleanup as background task...")
     asyncio.create_task(periodic_ak_cleanup())
@@ -746,6 +757,13 @@ async def shutdown_and_exit():
         print("[Shutdown] Uma Musume tasks stopped.")
     except Exception as e:
         print(f"[Shutdown] Error stopping Uma tasks: {e}")
+
+    # Stop the dashboard timer wheel (pending refreshes stay in its database)
+    try:
+        from src.core.services.timer_wheel import timer_wheel
+        await timer_wheel.stop()
+    except Exception as e:
+        print(f"[Shutdown] Error stopping timer wheel: {e}")
     
     # Stop API server if running
     if api_runner:
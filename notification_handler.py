@@ -3,15 +3,29 @@ from modules import *
 from collections import deque
 import asyncio
 import datetime
+import functools
+import logging
+import string
 import time
 import aiosqlite
 import os
 
 from global_config import *
+from src.core.services.deadline_scheduler import DeadlineScheduler
+from src.core.services.notification_dispatcher import NotificationDispatcher, OutgoingNotification
+from src.core.services.rest_scheduler import discord_rest, RestPriority
+from src.core.repositories.event_db_registry import event_databases
+from src.core.repositories.notification_repository import NOTIFICATION_HISTORY_COLUMNS, NOTIFICATION_HISTORY_SCHEMA
+from src.utils.log_pipeline import get_pipeline_logger
+from src.utils.embed_hash import embed_content_hash
 
 # --- Ensure notification DB and tables exist ---
 NOTIF_DB_PATH = os.path.join("data", "notification_data.db")
 
+# What makes two pending rows duplicates: idx_unique_pending_notif and every
+# dedupe pass use this key
+_PENDING_UNIQUE_KEY = "category, profile, title, timing_type, notify_unix, COALESCE(region, '')"
+
 async def init_notification_db():
     async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
         # Pending notifications (persistent scheduling)
@@ -58,22 +72,96 @@ async def init_notification_db():
         except:
             pass  # Column already exists
         
-        # UNIQUE index to prevent duplicates (including region for HYV)
-        await conn.execute('''
+        try:
+            # Set while a cron notifier run holds the row (sent=2)
+            await conn.execute('ALTER TABLE pending_notifications ADD COLUMN claimed_unix INTEGER')
+        except:
+            pass  # Column already exists
+
+        try:
+            # Final message text, rendered at schedule time so firing is pure I/O
+            await conn.execute('ALTER TABLE pending_notifications ADD COLUMN rendered_message TEXT')
+        except:
+            pass  # Column already exists
+        
+        # UNIQUE index to prevent duplicates (including region for HYV).
+        # region is NULL for non-HYV rows and NULLs never collide in a plain UNIQUE
+        # index, so the index is built on COALESCE(region, '') to let the bulk
+        # INSERT ... ON CONFLICT DO NOTHING path catch every duplicate.
+        async with conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type='index' AND name='idx_unique_pending_notif'"
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row and 'COALESCE' not in (row[0] or '').upper():
+            await conn.execute(f'''
+                DELETE FROM pending_notifications
+                WHERE id NOT IN (
+                    SELECT MIN(id) FROM pending_notifications
+                    GROUP BY {_PENDING_UNIQUE_KEY}
+                )
+            ''')
+            await conn.execute('DROP INDEX idx_unique_pending_notif')
+        await conn.execute(f'''
             CREATE UNIQUE INDEX IF NOT EXISTS idx_unique_pending_notif
-            ON pending_notifications (category, profile, title, timing_type, notify_unix, region)
+            ON pending_notifications ({_PENDING_UNIQUE_KEY})
+        ''')
+        # Due-time lookups for the notification scheduler
+        await conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_pending_notif_due
+            ON pending_notifications (sent, notify_unix)
+        ''')
+        # Per-event lookups for the ghost-notification anti-join
+        await conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_pending_notif_event
+            ON pending_notifications (profile, title, category)
         ''')
         await conn.execute('''CREATE TABLE IF NOT EXISTS pending_notifications_messages (
             profile TEXT,
             message_id TEXT,
+            page INTEGER,
+            content_hash TEXT,
             PRIMARY KEY (profile, message_id)
         )''')
+        # Page order + rendered-content hash so unchanged pages are never re-edited
+        for column in ("page INTEGER", "content_hash TEXT"):
+            try:
+                await conn.execute(f'ALTER TABLE pending_notifications_messages ADD COLUMN {column}')
+            except:
+                pass  # Column already exists
         await conn.execute('''CREATE TABLE IF NOT EXISTS role_reaction_messages (
             type TEXT PRIMARY KEY,
             message_id TEXT
         )''')
+        # Backfill rows scheduled before rendered_message existed
+        async with conn.execute(
+            "SELECT id FROM pending_notifications WHERE rendered_message IS NULL AND sent=0"
+        ) as cursor:
+            unrendered = [row[0] async for row in cursor]
+        await rerender_notifications(conn, unrendered)
+
+        # Delivered notifications live here; pending_notifications only holds
+        # future (sent=0) and in-flight (sent=2) rows
+        for statement in NOTIFICATION_HISTORY_SCHEMA:
+            await conn.execute(statement)
+        # Move rows delivered before the history table existed
+        history_columns = ', '.join(column for column, _ in NOTIFICATION_HISTORY_COLUMNS)
+        await conn.execute(f'''
+            INSERT INTO notification_history
+                (notification_id, {history_columns}, status, delivery, sent_unix, lateness, archived_unix)
+            SELECT id, {history_columns}, 'sent', NULL, notify_unix, NULL, CAST(strftime('%s', 'now') AS INTEGER)
+            FROM pending_notifications WHERE sent=1
+        ''')
+        await conn.execute("DELETE FROM pending_notifications WHERE sent=1")
         await conn.commit()
 
+        # Incremental vacuum needs auto_vacuum set before the file is laid out;
+        # existing databases are rebuilt once
+        async with conn.execute("PRAGMA auto_vacuum") as cursor:
+            auto_vacuum = (await cursor.fetchone())[0]
+        if auto_vacuum != 2:
+            await conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            await conn.execute("VACUUM")
+
 PROFILE_EMOJIS = {
     "HSR": "<:Game_HSR:1384176219385237588>",
     "ZZZ": "<:Game_ZZZ:1384176233159589919>",
@@ -222,29 +310,167 @@ def get_message_template_key(profile, category, timing_type, phase=None, charact
     # Fall back to default
     return "default"
 
+# --- Compiled notification renderer ---
+# The bot send path and the cron webhook path both render through
+# render_notification_message(). Templates are parsed once, rows store their
+# final text in rendered_message at schedule time, and delivery only sends it.
+HYV_NOTIFICATION_PROFILES = {"HSR", "ZZZ", "WUWA"}
+RENDER_COLUMNS = (
+    "profile", "title", "category", "timing_type", "event_time_unix",
+    "region", "message_template", "custom_message", "phase", "character_name",
+)
+_template_formatter = string.Formatter()
+
+@functools.lru_cache(maxsize=512)
+def compile_message_template(template):
+    """
+    Parses a template once and returns its field names as a frozenset,
+    or None if it is malformed (unbalanced braces, positional/attribute fields).
+    """
+    fields = set()
+    try:
+        for _, field_name, _, _ in _template_formatter.parse(template):
+            if field_name is None:
+                continue
+            if not field_name.isidentifier():
+                return None
+            fields.add(field_name)
+    except ValueError:
+        return None
+    return frozenset(fields)
+
+def _validate_message_templates():
+    invalid = [key for key, template in MESSAGE_TEMPLATES.items() if compile_message_template(template) is None]
+    if invalid:
+        raise ValueError(f"Malformed notification template(s): {', '.join(invalid)}")
+
+_validate_message_templates()
+
+def _format_template(template, kwargs):
+    """Formats a compiled template, or returns None if it needs a field kwargs doesn't have."""
+    fields = compile_message_template(template)
+    if fields is None or not fields <= kwargs.keys():
+        return None
+    try:
+        return template.format_map(kwargs)
+    except ValueError:
+        return None  # Bad format spec
+
+# Event regions as stored on rows -> region names in COMBINED_REGIONAL_ROLE_IDS
+COMBINED_ROLE_REGIONS = {"NA": "AMERICA", "EU": "EUROPE"}
+
+def resolve_role_mention(profile, region=None):
+    """
+    Raw role mention for a profile (combined regional role for HYV games).
+    Returns "" when no role is configured.
+    """
+    profile = profile.upper()
+    if profile in HYV_NOTIFICATION_PROFILES:
+        region = (region or "").upper()
+        role_id = COMBINED_REGIONAL_ROLE_IDS.get((profile, COMBINED_ROLE_REGIONS.get(region, region)))
+        if not role_id:
+            send_log(MAIN_SERVER_ID, f"No combined role ID found for {profile} {region or '(no region)'}",
+                     level=logging.WARNING)
+    else:
+        role_id = ROLE_IDS.get(profile)
+    return f"<@&{role_id}>" if role_id else ""
+
+def render_notification_message(row, role_mention=None):
+    """
+    Renders the final text for a pending_notifications row.
+    Priority: custom_message > message_template > default.
+
+    row: mapping with the RENDER_COLUMNS keys (missing keys are treated as NULL)
+    """
+    if role_mention is None:
+        role_mention = resolve_role_mention(row["profile"], row.get("region"))
+    unix_time = row.get("event_time_unix")
+    time_str = "starting" if row.get("timing_type") == "start" else "ending"
+
+    kwargs = {
+        "role":     role_mention,
+        "name":     row["title"],
+        "category": row["category"],
+        "action":   time_str,
+        "time":     f"<t:{unix_time}:R>" if unix_time else "",
+    }
+    if row.get("phase"):
+        kwargs["phase"] = row["phase"]
+    if row.get("character_name"):
+        kwargs["character"] = row["character_name"]
+
+    custom_message = row.get("custom_message")
+    if custom_message:
+        message = _format_template(custom_message, kwargs)
+        if message is None:
+            message = custom_message  # send raw if the template is malformed
+        if not custom_message.lstrip().startswith('{role}'):
+            message = f"{role_mention}, {message}"
+        return message
+
+    template = MESSAGE_TEMPLATES.get(row.get("message_template") or "")
+    if template:
+        message = _format_template(template, kwargs)
+        if message:
+            return message
+
+    time_ref = f"<t:{unix_time}:R>" if unix_time else "soon"
+    return f"{role_mention}, the **{row['category']}** event **{row['title']}** is {time_str} {time_ref}!"
+
+async def rerender_notifications(conn, notif_ids):
+    """
+    Recomputes rendered_message for the given rows on an open aiosqlite connection
+    (after custom_message/message_template edits). The caller commits.
+    """
+    if not notif_ids:
+        return 0
+    updates = []
+    for start in range(0, len(notif_ids), 500):
+        chunk = list(notif_ids[start:start + 500])
+        async with conn.execute(
+            f"SELECT id, {', '.join(RENDER_COLUMNS)} FROM pending_notifications "
+            f"WHERE id IN ({', '.join('?' for _ in chunk)})",
+            chunk
+        ) as cursor:
+            async for raw in cursor:
+                row = dict(zip(RENDER_COLUMNS, raw[1:]))
+                updates.append((render_notification_message(row), raw[0]))
+    await conn.executemany("UPDATE pending_notifications SET rendered_message=? WHERE id=?", updates)
+    return len(updates)
+
+# Console + discord.log and the refresh debug log go through the queue-based
+# pipeline: callers only enqueue, a writer thread formats, batches and rotates.
+notification_logger = get_pipeline_logger(
+    "kanami.notifications", "discord.log",
+    level=logging.getLevelName(os.getenv("NOTIFICATION_LOG_LEVEL", "INFO").upper()),
+)
+debug_logger = get_pipeline_logger(
+    "kanami.debug", DEBUG_LOG_PATH,
+    level=logging.getLevelName(os.getenv("DEBUG_LOG_LEVEL", "DEBUG").upper()),
+    console=False, fmt="[%(asctime)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S",
+)
+
 # Function to log messages to both console and a file
-def send_log(*args):
+def send_log(*args, level=logging.INFO):
     """Logs a message to both the console and the discord.log file. Accepts any arguments and joins them as a string."""
+    if not notification_logger.isEnabledFor(level):
+        return
     # If the first argument looks like a server ID, skip it
     if len(args) > 1 and (str(args[0]).isdigit() or args[0] in ("N/A", MAIN_SERVER_ID)):
         args = args[1:]
-    message = " ".join(str(arg) for arg in args if arg is not None)
-    print(message)
-    try:
-        with open("discord.log", "a", encoding="utf-8") as f:
-            f.write(message + "\n")
-    except Exception as e:
-        print(f"Failed to write to log file: {e}")
+    args = tuple(arg for arg in args if arg is not None)
+    # Joined lazily on the writer thread
+    notification_logger.log(level, " ".join(["%s"] * len(args)), *args)
 
 # Function to remove duplicate pending notifications
 async def remove_duplicate_pending_notifications():
     async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
-        await conn.execute("""
+        await conn.execute(f"""
             DELETE FROM pending_notifications
             WHERE id NOT IN (
                 SELECT MIN(id)
                 FROM pending_notifications
-                GROUP BY category, profile, title, timing_type, notify_unix, region
+                GROUP BY {_PENDING_UNIQUE_KEY}
             )
         """)
         await conn.commit()
@@ -282,261 +508,192 @@ def get_notification_timings(category, profile=None):
             timings.append((timing_type, minutes))
     return timings
 
-async def schedule_champions_meeting_notifications(event):
+# Columns written by the scheduling core, in row-tuple order
+_PENDING_INSERT_COLUMNS = (
+    "category", "profile", "title", "timing_type", "notify_unix", "event_time_unix",
+    "region", "message_template", "phase", "character_name", "rendered_message",
+)
+
+CHAMPIONS_MEETING_PHASE_TEMPLATES = {
+    "League Selection": "uma_champions_meeting_registration_start",
+    "Round 1": "uma_champions_meeting_round1_start",
+    "Round 2": "uma_champions_meeting_round2_start",
+    "Final Registration": "uma_champions_meeting_final_registration_start",
+    "Finals": "uma_champions_meeting_finals_start",
+}
+
+def _notification_row(event, timing_type, notify_unix, event_time_unix,
+                      region=None, message_template=None, phase=None, character_name=None):
+    rendered_message = render_notification_message({
+        "profile": event['profile'], "title": event['title'], "category": event['category'],
+        "timing_type": timing_type, "event_time_unix": int(event_time_unix), "region": region,
+        "message_template": message_template, "phase": phase, "character_name": character_name,
+    })
+    return (event['category'], event['profile'], event['title'], timing_type, int(notify_unix),
+            int(event_time_unix), region, message_template, phase, character_name, rendered_message)
+
+def _champions_meeting_rows(event, now):
     """
-    Schedule notifications for Champions Meeting event.
-    Creates 7 notifications: 1 reminder + 5 phases + 1 end
+    Rows for a Champions Meeting: 1 reminder + 5 phases + 1 end.
+    Returns None when the phases can't be parsed (caller falls back to generic timings).
     """
     from uma_handler import parse_champions_meeting_phases
 
-    send_log(MAIN_SERVER_ID, f"[Champions Meeting] Scheduling notifications for: {event['title']}")
-    
-    # Parse phases from description
     description = event.get('description', '')
     if not description:
         send_log(MAIN_SERVER_ID, f"[Champions Meeting] No description found, falling back to generic notifications")
-        return False
-    
+        return None
+
     phases = parse_champions_meeting_phases(description, int(event['start_date']), int(event['end_date']))
     if not phases:
         send_log(MAIN_SERVER_ID, f"[Champions Meeting] Failed to parse phases, falling back to generic notifications")
-        return False
-    
-    send_log(MAIN_SERVER_ID, f"[Champions Meeting] Parsed {len(phases)} phases")
-    
-    async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
-        now = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
-
-        # 1. Reminder: 1 day before event starts
-        reminder_time = int(event['start_date']) - 86400
-        if reminder_time > now:
-            async with conn.execute(
-                "SELECT 1 FROM pending_notifications WHERE category=? AND profile=? AND title=? AND timing_type=? AND notify_unix=?",
-                (event['category'], event['profile'], event['title'], 'reminder', reminder_time)
-            ) as _cur:
-                if not await _cur.fetchone():
-                    await conn.execute("""
-                        INSERT INTO pending_notifications
-                        (category, profile, title, timing_type, notify_unix, event_time_unix, sent, message_template)
-                        VALUES (?, ?, ?, ?, ?, ?, 0, ?)
-                    """, (event['category'], event['profile'], event['title'], 'reminder',
-                          reminder_time, int(event['start_date']), 'uma_champions_meeting_reminder'))
-                    send_log(MAIN_SERVER_ID, f"[Champions Meeting] Scheduled reminder at <t:{reminder_time}:F>")
-
-        # 2-6. Phase start notifications (all 5 phases)
-        phase_template_map = {
-            "League Selection": "uma_champions_meeting_registration_start",
-            "Round 1": "uma_champions_meeting_round1_start",
-            "Round 2": "uma_champions_meeting_round2_start",
-            "Final Registration": "uma_champions_meeting_final_registration_start",
-            "Finals": "uma_champions_meeting_finals_start"
-        }
-
-        for phase in phases:
-            template_key = phase_template_map.get(phase['name'])
-            if template_key and phase['start_time'] > now:
-                async with conn.execute(
-                    "SELECT 1 FROM pending_notifications WHERE category=? AND profile=? AND title=? AND timing_type=? AND notify_unix=? AND phase=?",
-                    (event['category'], event['profile'], event['title'], 'phase_start', phase['start_time'], phase['name'])
-                ) as _cur:
-                    if not await _cur.fetchone():
-                        await conn.execute("""
-                            INSERT INTO pending_notifications
-                            (category, profile, title, timing_type, notify_unix, event_time_unix, sent,
-                             message_template, phase)
-                            VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?)
-                        """, (event['category'], event['profile'], event['title'], 'phase_start',
-                              phase['start_time'], phase['start_time'], template_key, phase['name']))
-                        send_log(MAIN_SERVER_ID, f"[Champions Meeting] Scheduled {phase['name']} at <t:{phase['start_time']}:F>")
-
-        # 7. Event end notification
-        end_time = int(event['end_date'])
-        if end_time > now:
-            async with conn.execute(
-                "SELECT 1 FROM pending_notifications WHERE category=? AND profile=? AND title=? AND timing_type=? AND notify_unix=?",
-                (event['category'], event['profile'], event['title'], 'end', end_time)
-            ) as _cur:
-                if not await _cur.fetchone():
-                    await conn.execute("""
-                        INSERT INTO pending_notifications
-                        (category, profile, title, timing_type, notify_unix, event_time_unix, sent, message_template)
-                        VALUES (?, ?, ?, ?, ?, ?, 0, ?)
-                    """, (event['category'], event['profile'], event['title'], 'end',
-                          end_time, end_time, 'uma_champions_meeting_end'))
-                    send_log(MAIN_SERVER_ID, f"[Champions Meeting] Scheduled end notification at <t:{end_time}:F>")
-        
-        await conn.commit()
-    
-    send_log(MAIN_SERVER_ID, f"[Champions Meeting] Successfully scheduled all notifications")
-    return True
+        return None
 
-async def schedule_legend_race_notifications(event):
+    send_log(MAIN_SERVER_ID, f"[Champions Meeting] Parsed {len(phases)} phases")
+    rows = [_notification_row(event, 'reminder', int(event['start_date']) - 86400, event['start_date'],
+                              message_template='uma_champions_meeting_reminder')]
+    for phase in phases:
+        template_key = CHAMPIONS_MEETING_PHASE_TEMPLATES.get(phase['name'])
+        if template_key:
+            rows.append(_notification_row(event, 'phase_start', phase['start_time'], phase['start_time'],
+                                          message_template=template_key, phase=phase['name']))
+    rows.append(_notification_row(event, 'end', event['end_date'], event['end_date'],
+                                  message_template='uma_champions_meeting_end'))
+    return [row for row in rows if row[4] > now]
+
+def _legend_race_rows(event, now):
     """
-    Schedule notifications for Legend Race event.
-    Creates N+2 notifications: 1 reminder + N characters + 1 end
+    Rows for a Legend Race: 1 reminder + N characters + 1 end.
+    Returns None when the characters can't be parsed (caller falls back to generic timings).
     """
     from uma_handler import parse_legend_race_characters
 
-    send_log(MAIN_SERVER_ID, f"[Legend Race] Scheduling notifications for: {event['title']}")
-    
-    # Parse characters from description
     description = event.get('description', '')
     if not description:
         send_log(MAIN_SERVER_ID, f"[Legend Race] No description found, falling back to generic notifications")
-        return False
-    
+        return None
+
     characters = parse_legend_race_characters(description, int(event['start_date']), int(event['end_date']))
     if not characters:
         send_log(MAIN_SERVER_ID, f"[Legend Race] Failed to parse characters, falling back to generic notifications")
-        return False
-    
-    send_log(MAIN_SERVER_ID, f"[Legend Race] Parsed {len(characters)} characters")
-    
-    async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
-        now = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+        return None
 
-        # 1. Reminder: 1 day before event starts
-        reminder_time = int(event['start_date']) - 86400
-        if reminder_time > now:
-            async with conn.execute(
-                "SELECT 1 FROM pending_notifications WHERE category=? AND profile=? AND title=? AND timing_type=? AND notify_unix=?",
-                (event['category'], event['profile'], event['title'], 'reminder', reminder_time)
-            ) as _cur:
-                if not await _cur.fetchone():
-                    await conn.execute("""
-                        INSERT INTO pending_notifications
-                        (category, profile, title, timing_type, notify_unix, event_time_unix, sent, message_template)
-                        VALUES (?, ?, ?, ?, ?, ?, 0, ?)
-                    """, (event['category'], event['profile'], event['title'], 'reminder',
-                          reminder_time, int(event['start_date']), 'uma_legend_race_reminder'))
-                    send_log(MAIN_SERVER_ID, f"[Legend Race] Scheduled reminder at <t:{reminder_time}:F>")
-
-        # 2-(N+1). Character start notifications
-        for char in characters:
-            if char['start_time'] > now:
-                async with conn.execute(
-                    "SELECT 1 FROM pending_notifications WHERE category=? AND profile=? AND title=? AND timing_type=? AND notify_unix=? AND character_name=?",
-                    (event['category'], event['profile'], event['title'], 'character_start', char['start_time'], char['name'])
-                ) as _cur:
-                    if not await _cur.fetchone():
-                        await conn.execute("""
-                            INSERT INTO pending_notifications
-                            (category, profile, title, timing_type, notify_unix, event_time_unix, sent,
-                             message_template, character_name)
-                            VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?)
-                        """, (event['category'], event['profile'], event['title'], 'character_start',
-                              char['start_time'], char['start_time'], 'uma_legend_race_character_start', char['name']))
-                        send_log(MAIN_SERVER_ID, f"[Legend Race] Scheduled {char['name']} at <t:{char['start_time']}:F>")
-
-        # (N+2). Event end notification
-        end_time = int(event['end_date'])
-        if end_time > now:
-            async with conn.execute(
-                "SELECT 1 FROM pending_notifications WHERE category=? AND profile=? AND title=? AND timing_type=? AND notify_unix=?",
-                (event['category'], event['profile'], event['title'], 'end', end_time)
-            ) as _cur:
-                if not await _cur.fetchone():
-                    await conn.execute("""
-                        INSERT INTO pending_notifications
-                        (category, profile, title, timing_type, notify_unix, event_time_unix, sent, message_template)
-                        VALUES (?, ?, ?, ?, ?, ?, 0, ?)
-                    """, (event['category'], event['profile'], event['title'], 'end',
-                          end_time, end_time, 'uma_legend_race_end'))
-                    send_log(MAIN_SERVER_ID, f"[Legend Race] Scheduled end notification at <t:{end_time}:F>")
-        
-        await conn.commit()
-    
-    send_log(MAIN_SERVER_ID, f"[Legend Race] Successfully scheduled all notifications")
-    return True
+    send_log(MAIN_SERVER_ID, f"[Legend Race] Parsed {len(characters)} characters")
+    rows = [_notification_row(event, 'reminder', int(event['start_date']) - 86400, event['start_date'],
+                              message_template='uma_legend_race_reminder')]
+    for char in characters:
+        rows.append(_notification_row(event, 'character_start', char['start_time'], char['start_time'],
+                                      message_template='uma_legend_race_character_start',
+                                      character_name=char['name']))
+    rows.append(_notification_row(event, 'end', event['end_date'], event['end_date'],
+                                  message_template='uma_legend_race_end'))
+    return [row for row in rows if row[4] > now]
+
+def _generic_rows(event, now):
+    """Rows for profile/category timings, one set per region for HYV games."""
+    timings = get_notification_timings(event['category'], event.get('profile'))
+    rows = []
+    HYV_PROFILES = {"HSR", "ZZZ"}
+    if event['profile'].upper() in HYV_PROFILES:
+        region_keys = {"NA": "america", "EU": "europe", "ASIA": "asia"}
+        for region, prefix in region_keys.items():
+            for timing_type, timing_minutes in timings:
+                if timing_type == "start":
+                    event_time_unix = safe_int(event.get(f'{prefix}_start'), event.get('start_date'))
+                else:
+                    event_time_unix = safe_int(event.get(f'{prefix}_end'), event.get('end_date'))
+                rows.append(_notification_row(event, timing_type, event_time_unix - timing_minutes * 60,
+                                              event_time_unix, region=region))
+    else:
+        for timing_type, timing_minutes in timings:
+            event_time_unix = int(event['start_date']) if timing_type == "start" else int(event['end_date'])
+            rows.append(_notification_row(event, timing_type, event_time_unix - timing_minutes * 60,
+                                          event_time_unix))
+    return [row for row in rows if row[4] > now]
 
-async def schedule_notifications_for_event(event):
+def build_notification_rows(event, now=None):
     """
-    Schedules notifications for an event using profile-based timings.
-    Now supports Champions Meeting and Legend Race special scheduling.
+    Computes every future pending_notifications row for an event, in memory.
+    Champions Meeting / Legend Race use their special schedules and fall back
+    to generic timings when the description can't be parsed.
     """
-    from bot import bot
-    send_log(MAIN_SERVER_ID, f"schedule_notifications_for_event called for event: `{event['title']}` ({event['category']}) [{event['profile']}]")
-    
-    # Special handling for Champions Meeting (detect by title pattern)
+    if now is None:
+        now = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+
     title_lower = event.get('title', '').lower()
     if 'champions meeting' in title_lower or event.get('category') == 'Champions Meeting':
-        success = await schedule_champions_meeting_notifications(event)
-        if success:
-            # Update control panel after scheduling
-            guild = bot.get_guild(MAIN_SERVER_ID)
-            await update_pending_notifications_embed_for_profile(guild, event['profile'])
-            return
-        # If special scheduling fails, fall through to generic scheduling
+        rows = _champions_meeting_rows(event, now)
+        if rows is not None:
+            return rows
         send_log(MAIN_SERVER_ID, "[Champions Meeting] Using generic scheduling as fallback")
-    
-    # Special handling for Legend Race (detect by title pattern)
+
     if 'legend race' in title_lower or event.get('category') == 'Legend Race':
-        success = await schedule_legend_race_notifications(event)
-        if success:
-            # Update control panel after scheduling
-            guild = bot.get_guild(MAIN_SERVER_ID)
-            await update_pending_notifications_embed_for_profile(guild, event['profile'])
-            return
-        # If special scheduling fails, fall through to generic scheduling
+        rows = _legend_race_rows(event, now)
+        if rows is not None:
+            return rows
         send_log(MAIN_SERVER_ID, "[Legend Race] Using generic scheduling as fallback")
-    
-    # Generic notification scheduling for all other events
-    timings = get_notification_timings(event['category'], event.get('profile'))
-    send_log(MAIN_SERVER_ID, f"Using timings for event: {timings}")
 
-    async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
-        HYV_PROFILES = {"HSR", "ZZZ"}
-        if event['profile'].upper() in HYV_PROFILES:
-            regions = ["NA", "EU", "ASIA"]
-            for region in regions:
-                for timing_type, timing_minutes in timings:
-                    if region == "NA":
-                        event_time_unix = safe_int(event.get('america_start'), event.get('start_date')) if timing_type == "start" else safe_int(event.get('america_end'), event.get('end_date'))
-                    elif region == "EU":
-                        event_time_unix = safe_int(event.get('europe_start'), event.get('start_date')) if timing_type == "start" else safe_int(event.get('europe_end'), event.get('end_date'))
-                    elif region == "ASIA":
-                        event_time_unix = safe_int(event.get('asia_start'), event.get('start_date')) if timing_type == "start" else safe_int(event.get('asia_end'), event.get('end_date'))
-                    else:
-                        event_time_unix = int(event['start_date']) if timing_type == "start" else int(event['end_date'])
-                    notify_unix = event_time_unix - timing_minutes * 60
-                    if notify_unix > int(datetime.datetime.now(datetime.timezone.utc).timestamp()):
-                        async with conn.execute(
-                            "SELECT 1 FROM pending_notifications WHERE category=? AND profile=? AND title=? AND timing_type=? AND notify_unix=? AND region=?",
-                            (event['category'], event['profile'], event['title'], timing_type, notify_unix, region)
-                        ) as check_cursor:
-                            exists = await check_cursor.fetchone()
-                        if not exists:
-                            await conn.execute(
-                                "INSERT INTO pending_notifications (category, profile, title, timing_type, notify_unix, event_time_unix, sent, region) VALUES (?, ?, ?, ?, ?, ?, 0, ?)",
-                                (event['category'], event['profile'], event['title'], timing_type, notify_unix, event_time_unix, region)
-                            )
-        else:
-            for timing_type, timing_minutes in timings:
-                event_time_unix = int(event['start_date']) if timing_type == "start" else int(event['end_date'])
-                notify_unix = event_time_unix - timing_minutes * 60
-                if notify_unix > int(datetime.datetime.now(datetime.timezone.utc).timestamp()):
-                    async with conn.execute(
-                        "SELECT 1 FROM pending_notifications WHERE category=? AND profile=? AND title=? AND timing_type=? AND notify_unix=?",
-                        (event['category'], event['profile'], event['title'], timing_type, notify_unix)
-                    ) as check_cursor:
-                        exists = await check_cursor.fetchone()
-                    if not exists:
-                        await conn.execute(
-                            "INSERT INTO pending_notifications (category, profile, title, timing_type, notify_unix, event_time_unix, sent) VALUES (?, ?, ?, ?, ?, ?, 0)",
-                            (event['category'], event['profile'], event['title'], timing_type, notify_unix, event_time_unix)
-                        )
-                        send_log(
-                            MAIN_SERVER_ID,
-                            f"Scheduled notification for `{event['title']}` at <t:{notify_unix}:F> / <t:{notify_unix}:R> (timing_type: {timing_type})"
-                        )
-                else:
-                    send_log(
-                        MAIN_SERVER_ID,
-                        f"Skipped scheduling notification for `{event['title']}` (notify_unix <t:{notify_unix}:F> / <t:{notify_unix}:R> is in the past)"
-                    )
-        await conn.commit()
+    return _generic_rows(event, now)
+
+# Parameters are numbered by position in _PENDING_INSERT_COLUMNS, so the
+# history check can reuse the row's own values
+_INSERT_PENDING_SQL = f"""
+    INSERT INTO pending_notifications ({', '.join(_PENDING_INSERT_COLUMNS)}, sent)
+    SELECT {', '.join(f'?{i}' for i in range(1, len(_PENDING_INSERT_COLUMNS) + 1))}, 0
+    WHERE NOT EXISTS (
+        SELECT 1 FROM notification_history
+        WHERE profile=?2 AND title=?3 AND notify_unix=?5 AND category=?1
+          AND timing_type=?4 AND COALESCE(region, '')=COALESCE(?7, '')
+    )
+    ON CONFLICT DO NOTHING
+"""
+
+async def insert_notification_rows(rows, conn=None):
+    """
+    Writes rows with a single executemany. Duplicates of pending rows are skipped
+    by idx_unique_pending_notif, and rows already sent (moved to
+    notification_history, e.g. fired early) are not scheduled again.
+    Returns (inserted, skipped).
+    """
+    if not rows:
+        return 0, 0
+    if conn is None:
+        async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
+            return await insert_notification_rows(rows, conn)
+
+    cursor = await conn.executemany(_INSERT_PENDING_SQL, rows)
+    inserted = max(cursor.rowcount, 0)
+    await cursor.close()
+    await conn.commit()
+    wake_notification_scheduler()
+    return inserted, len(rows) - inserted
+
+async def schedule_event_notifications_core(event):
+    """
+    Shared scheduling core: builds all rows for the event and bulk-inserts them.
+    Makes no Discord calls. Returns (inserted, skipped).
+    """
+    rows = build_notification_rows(event)
+    inserted, skipped = await insert_notification_rows(rows)
+    send_log(
+        MAIN_SERVER_ID,
+        f"Scheduled {inserted} notification(s) for `{event['title']}` ({event['category']}) "
+        f"[{event['profile']}], {skipped} already pending"
+    )
+    return inserted, skipped
+
+async def schedule_notifications_for_event(event):
+    """
+    Schedules notifications for an event using profile-based timings,
+    then refreshes the pending-notifications embed for the profile.
+    Returns (inserted, skipped).
+    """
+    from bot import bot
+    send_log(MAIN_SERVER_ID, f"schedule_notifications_for_event called for event: `{event['title']}` ({event['category']}) [{event['profile']}]")
+    result = await schedule_event_notifications_core(event)
     guild = bot.get_guild(MAIN_SERVER_ID)
-    await update_pending_notifications_embed_for_profile(guild, event['profile'])
+    request_pending_notifications_embed_refresh(guild, event['profile'])
+    return result
 
 async def schedule_notifications_db_only(event):
     """
@@ -544,66 +701,9 @@ async def schedule_notifications_db_only(event):
     Safe to call from standalone scripts (uma_scraper.py) that have no
     connected bot instance.  The pending-notifications embed is NOT updated
     here; the bot will refresh it on its next notification_loop cycle.
+    Returns (inserted, skipped).
     """
-    title_lower = event.get('title', '').lower()
-
-    if 'champions meeting' in title_lower or event.get('category') == 'Champions Meeting':
-        success = await schedule_champions_meeting_notifications(event)
-        if success:
-            return
-        send_log(MAIN_SERVER_ID, "[Champions Meeting] Using generic scheduling as fallback")
-
-    if 'legend race' in title_lower or event.get('category') == 'Legend Race':
-        success = await schedule_legend_race_notifications(event)
-        if success:
-            return
-        send_log(MAIN_SERVER_ID, "[Legend Race] Using generic scheduling as fallback")
-
-    timings = get_notification_timings(event['category'], event.get('profile'))
-    send_log(MAIN_SERVER_ID, f"[DB-only] Using timings for event: {timings}")
-
-    async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
-        HYV_PROFILES = {"HSR", "ZZZ"}
-        if event['profile'].upper() in HYV_PROFILES:
-            regions = ["NA", "EU", "ASIA"]
-            for region in regions:
-                for timing_type, timing_minutes in timings:
-                    if region == "NA":
-                        event_time_unix = safe_int(event.get('america_start'), event.get('start_date')) if timing_type == "start" else safe_int(event.get('america_end'), event.get('end_date'))
-                    elif region == "EU":
-                        event_time_unix = safe_int(event.get('europe_start'), event.get('start_date')) if timing_type == "start" else safe_int(event.get('europe_end'), event.get('end_date'))
-                    elif region == "ASIA":
-                        event_time_unix = safe_int(event.get('asia_start'), event.get('start_date')) if timing_type == "start" else safe_int(event.get('asia_end'), event.get('end_date'))
-                    else:
-                        event_time_unix = int(event['start_date']) if timing_type == "start" else int(event['end_date'])
-                    notify_unix = event_time_unix - timing_minutes * 60
-                    if notify_unix > int(datetime.datetime.now(datetime.timezone.utc).timestamp()):
-                        async with conn.execute(
-                            "SELECT 1 FROM pending_notifications WHERE category=? AND profile=? AND title=? AND timing_type=? AND notify_unix=? AND region=?",
-                            (event['category'], event['profile'], event['title'], timing_type, notify_unix, region)
-                        ) as check_cursor:
-                            exists = await check_cursor.fetchone()
-                        if not exists:
-                            await conn.execute(
-                                "INSERT INTO pending_notifications (category, profile, title, timing_type, notify_unix, event_time_unix, sent, region) VALUES (?, ?, ?, ?, ?, ?, 0, ?)",
-                                (event['category'], event['profile'], event['title'], timing_type, notify_unix, event_time_unix, region)
-                            )
-        else:
-            for timing_type, timing_minutes in timings:
-                event_time_unix = int(event['start_date']) if timing_type == "start" else int(event['end_date'])
-                notify_unix = event_time_unix - timing_minutes * 60
-                if notify_unix > int(datetime.datetime.now(datetime.timezone.utc).timestamp()):
-                    async with conn.execute(
-                        "SELECT 1 FROM pending_notifications WHERE category=? AND profile=? AND title=? AND timing_type=? AND notify_unix=?",
-                        (event['category'], event['profile'], event['title'], timing_type, notify_unix)
-                    ) as check_cursor:
-                        exists = await check_cursor.fetchone()
-                    if not exists:
-                        await conn.execute(
-                            "INSERT INTO pending_notifications (category, profile, title, timing_type, notify_unix, event_time_unix, sent) VALUES (?, ?, ?, ?, ?, ?, 0)",
-                            (event['category'], event['profile'], event['title'], timing_type, notify_unix, event_time_unix)
-                        )
-        await conn.commit()
+    return await schedule_event_notifications_core(event)
 
 async def delete_notifications_for_event(title, category, profile, event_start=None, event_end=None):
     """
@@ -634,70 +734,75 @@ async def delete_notifications_for_event(title, category, profile, event_start=N
                 (title, category, profile)
             )
         await conn.commit()
+        wake_notification_scheduler()
 
 async def cleanup_ghost_notifications():
     """
     Removes pending notifications for events that no longer exist in any profile database.
+    Every registered event database is ATTACHed to the notification connection and
+    orphans are found and deleted with one NOT EXISTS anti-join in a single transaction.
     This should be called periodically or on bot startup.
     """
-    from arknights_module import AK_DB_PATH
-    # Add HSR_DB_PATH, ZZZ_DB_PATH etc as you add more modules
-    
-    print("[NotificationHandler] Cleaning up ghost notifications...")
-    
-    # Collect all valid events from all profile databases
-    valid_events = set()  # (profile, title, category)
-    
-    # Check AK database
-    try:
-        async with aiosqlite.connect(AK_DB_PATH) as conn:
-            async with conn.execute("SELECT profile, title, category FROM events") as cursor:
-                async for row in cursor:
-                    valid_events.add((row[0], row[1], row[2]))
-    except Exception as e:
-        print(f"[NotificationHandler] Error reading AK database: {e}")
-    
-    # Check UMA database
-    try:
-        from uma_module import UMA_DB_PATH as _UMA_DB_PATH
-        async with aiosqlite.connect(_UMA_DB_PATH) as conn:
-            async with conn.execute("SELECT profile, title, category FROM events") as cursor:
-                async for row in cursor:
-                    valid_events.add((row[0], row[1], row[2]))
-    except Exception as e:
-        print(f"[NotificationHandler] Error reading UMA database: {e}")
+    # Importing the game modules registers their event databases
+    import arknights_module  # noqa: F401
+    import uma_module  # noqa: F401
 
-    # TODO: Add other profile databases here as they're implemented (HSR, ZZZ, etc.)
+    print("[NotificationHandler] Cleaning up ghost notifications...")
+    start = time.perf_counter()
 
-    # Remove notifications that don't match any valid event
     async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
-        async with conn.execute("SELECT DISTINCT profile, title, category FROM pending_notifications") as cursor:
-            pending_events = [row async for row in cursor]
-        
-        removed_count = 0
-        for profile, title, category in pending_events:
-            if (profile, title, category) not in valid_events:
-                await conn.execute(
-                    "DELETE FROM pending_notifications WHERE profile=? AND title=? AND category=?",
-                    (profile, title, category)
-                )
-                removed_count += 1
-                print(f"[NotificationHandler] Removed ghost notifications for: {title} ({category}) [{profile}]")
-        
-        await conn.commit()
-    
-    print(f"[NotificationHandler] Ghost notification cleanup complete. Removed {removed_count} ghost events.")
+        async with event_databases.attached(conn) as schemas:
+            if not schemas:
+                # Without any event database every notification would look orphaned
+                print("[NotificationHandler] No event databases available, skipping ghost cleanup.")
+                return 0
+
+            orphan_clause = " AND ".join(
+                f"NOT EXISTS (SELECT 1 FROM {schema}.events e "
+                f"WHERE e.profile=p.profile AND e.title=p.title AND e.category=p.category)"
+                for schema in schemas.values()
+            )
+
+            await conn.execute("BEGIN IMMEDIATE")
+            try:
+                async with conn.execute(
+                    f"SELECT DISTINCT profile, title, category FROM pending_notifications p WHERE {orphan_clause}"
+                ) as cursor:
+                    ghosts = await cursor.fetchall()
+                if ghosts:
+                    await conn.execute(
+                        f"DELETE FROM pending_notifications AS p WHERE {orphan_clause}"
+                    )
+                await conn.commit()
+            except Exception:
+                await conn.rollback()
+                raise
+
+    for profile, title, category in ghosts:
+        print(f"[NotificationHandler] Removed ghost notifications for: {title} ({category}) [{profile}]")
+    removed_count = len(ghosts)
+    if removed_count:
+        wake_notification_scheduler()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"[NotificationHandler] Ghost notification cleanup complete. Removed {removed_count} ghost events "
+        f"across {len(schemas)} event database(s) in {elapsed:.3f}s."
+    )
     return removed_count
 
 async def validate_event_notifications():
     """
     Ensures all events have proper pending notifications scheduled.
-    Re-schedules missing notifications for existing events.
+    Coverage for every event is read with one aggregate query, the expected rows
+    are computed in memory, and all missing rows are repaired in one bulk insert.
+    The pending-notifications embed is refreshed once per affected profile.
     """
     from arknights_module import AK_DB_PATH
     # Add HSR_DB_PATH, ZZZ_DB_PATH etc as you add more modules
     
     print("[NotificationHandler] Validating event notifications...")
+    started = time.perf_counter()
     
     # Collect all events from all profile databases
     all_events = []
@@ -738,239 +843,389 @@ async def validate_event_notifications():
 
     # TODO: Add other profile databases here as they're implemented (HSR, ZZZ, etc.)
 
-    # For each event, check if it has all expected notifications
+    # One aggregate query for the coverage of every event; rows already sent
+    # live in notification_history and count as covered
+    async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
+        async with conn.execute("""
+            SELECT profile, title, category, timing_type FROM pending_notifications
+            UNION
+            SELECT profile, title, category, timing_type FROM notification_history
+        """) as cursor:
+            covered = set(await cursor.fetchall())
+
+    # Expected coverage computed in memory; only future rows can be repaired
+    now = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+    missing_rows = []
+    affected_profiles = set()
     fixed_count = 0
     for event in all_events:
-        expected_timings = get_notification_timings(event['category'], event.get('profile'))
-        
-        # Check what notifications exist for this event
-        async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
-            async with conn.execute("""
-                SELECT timing_type, COUNT(*) 
-                FROM pending_notifications 
-                WHERE profile=? AND title=? AND category=?
-                GROUP BY timing_type
-            """, (event['profile'], event['title'], event['category'])) as cursor:
-                existing = {row[0]: row[1] async for row in cursor}
-        
-        # Check if all expected timings are present
-        missing = False
-        for timing_type, timing_minutes in expected_timings:
-            if timing_type not in existing:
-                missing = True
-                break
-        
+        try:
+            expected_rows = build_notification_rows(event, now)
+        except (TypeError, ValueError) as e:
+            print(f"[NotificationHandler] Skipping '{event['title']}' with invalid dates: {e}")
+            continue
+        missing = [
+            row for row in expected_rows
+            if (event['profile'], event['title'], event['category'], row[3]) not in covered
+        ]
         if missing:
             print(f"[NotificationHandler] Event '{event['title']}' missing notifications. Re-scheduling...")
-            await schedule_notifications_for_event(event)
+            missing_rows.extend(missing)
+            affected_profiles.add(event['profile'])
             fixed_count += 1
-    
-    print(f"[NotificationHandler] Notification validation complete. Fixed {fixed_count} events.")
+
+    inserted, _ = await insert_notification_rows(missing_rows)
+
+    if affected_profiles:
+        from bot import bot
+        guild = bot.get_guild(MAIN_SERVER_ID)
+        for profile in sorted(affected_profiles):
+            await update_pending_notifications_embed_for_profile(guild, profile)
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"[NotificationHandler] Notification validation complete. Checked {len(all_events)} events "
+        f"in {elapsed:.2f}s. Fixed {fixed_count} events ({inserted} notification(s) added)."
+    )
     return fixed_count
 
-async def send_notification(event, timing_type):
+def build_notification(event, timing_type):
     """
-    Sends a notification to the correct profile-specific channel, using global_config.py for channel lookup.
+    Resolves the target channel, role mention and message text for a notification
+    without sending it, using global_config.py for channel lookup.
     For HYV games, uses combined regional roles from COMBINED_REGIONAL_ROLE_IDS.
+    The text is event['rendered_message'] when present, otherwise it is rendered
+    with render_notification_message().
+    Returns (channel, role_mention, message), or None if it can't be delivered.
     """
     from bot import bot
-    from global_config import NOTIFICATION_CHANNELS, MAIN_SERVER_ID, COMBINED_REGIONAL_ROLE_IDS
+    from global_config import NOTIFICATION_CHANNELS, MAIN_SERVER_ID
 
     profile = event['profile'].upper()
     channel_id = NOTIFICATION_CHANNELS.get(profile)
     if not channel_id:
         send_log(event.get('server_id', 'N/A'), f"No notification channel set for profile {profile}")
-        return
+        return None
 
     guild = bot.get_guild(MAIN_SERVER_ID)
     channel = guild.get_channel(channel_id)
     if not channel:
         send_log(event.get('server_id', 'N/A'), f"No notification channel found for profile {profile}")
+        return None
+
+    if profile in HYV_NOTIFICATION_PROFILES and not event.get('region'):
+        send_log(event.get('server_id', 'N/A'), f"No region found for notification: {event['title']}")
+        return None
+
+    role_mention = resolve_role_mention(profile, event.get('region'))
+    if profile in HYV_NOTIFICATION_PROFILES and not role_mention:
+        return None  # No combined role for the region; resolve_role_mention logged it
+    message = event.get('rendered_message')
+    if not message:
+        row = dict(event, timing_type=timing_type)
+        row.setdefault('event_time_unix', event.get('start_date') or event.get('end_date'))
+        message = render_notification_message(row, role_mention)
+    return channel, role_mention, message
+
+async def send_notification(event, timing_type):
+    """Sends a single notification immediately (no coalescing)."""
+    built = build_notification(event, timing_type)
+    if not built:
         return
+    channel, _, message = built
+    try:
+        await discord_rest.send(channel, content=message)
+        send_log(event.get('server_id', 'N/A'), f"Notification sent to channel {channel.id} for event {event['title']}")
+    except Exception as e:
+        send_log(event.get('server_id', 'N/A'), f"Failed to send notification for {event['profile']}: {e}")
 
-    HYV_PROFILES = {"HSR", "ZZZ", "WUWA"}
-    if profile in HYV_PROFILES:
-        region = event.get('region')
-        if not region:
-            send_log(event.get('server_id', 'N/A'), f"No region found for notification: {event['title']}")
-            return
+async def _send_to_channel(channel_id, content):
+    from bot import bot
+    channel = bot.get_channel(channel_id)
+    if channel is None:
+        raise LookupError(f"Channel {channel_id} not found")
+    await discord_rest.send(channel, content=content)
 
-        # Use combined role ID from global_config
-        combined_role_id = COMBINED_REGIONAL_ROLE_IDS.get((profile, region.upper()))
-        if not combined_role_id:
-            send_log(event.get('server_id', 'N/A'), f"No combined role ID found for {profile} {region}")
-            return
-        
-        role = guild.get_role(combined_role_id)
-        if not role:
-            send_log(event.get('server_id', 'N/A'), f"Combined role ID {combined_role_id} not found in guild for {profile} {region}")
-            return
-        
-        role_mention = role.mention
-        send_log(event.get('server_id', 'N/A'), f"Found combined role for {profile} {region}: {role_mention}")
-
-        # Get the correct time based on region
-        unix_time = None
-        if region.upper() == "NA":
-            unix_time = event.get('america_start') if timing_type == "start" else event.get('america_end')
-        elif region.upper() == "EU":
-            unix_time = event.get('europe_start') if timing_type == "start" else event.get('europe_end')
-        elif region.upper() == "ASIA":
-            unix_time = event.get('asia_start') if timing_type == "start" else event.get('asia_end')
-
-        # Fallback: use start_date if available, otherwise end_date
-        if not unix_time:
-            unix_time = event.get('start_date') or event.get('end_date')
-
-        # Validation: Log warning if unix_time is still None
-        if unix_time is None:
-            send_log(event.get('server_id', 'N/A'),
-                    f"WARNING: unix_time is None for event '{event.get('title')}' (profile: {profile}, region: {region}, timing_type: {timing_type})")
-
-        # Build message: Priority 1 = custom_message, Priority 2 = template, Priority 3 = default
-        message = None
-        time_str = "starting" if timing_type == "start" else "ending"
-        kwargs = {
-            'role': role_mention,
-            'name': event['title'],
-            'category': event['category'],
-            'action': time_str,
-            'time': f"<t:{unix_time}:R>"
-        }
-        if event.get('phase'):
-            kwargs['phase'] = event['phase']
-        if event.get('character'):
-            kwargs['character'] = event['character_name']
-        if event.get('custom_message'):
-            try:
-                message = event['custom_message'].format(**kwargs)
-            except (KeyError, IndexError):
-                message = event['custom_message']
-            if not event['custom_message'].lstrip().startswith('{role}'):
-                message = f"{role_mention}, {message}"
-        elif event.get('message_template') and event.get('message_template') in MESSAGE_TEMPLATES:
-            template = MESSAGE_TEMPLATES[event['message_template']]
-            try:
-                message = template.format(**kwargs)
-            except KeyError:
-                pass  # Fall through to default
+# Shared across batches so per-channel rate limits hold between scheduler wake-ups
+notification_dispatcher = NotificationDispatcher(_send_to_channel)
 
-        if not message:
-            message = f"{role_mention}, the **{event['category']}** **{event['title']}** is {time_str} <t:{unix_time}:R>!"
+async def _release_stale_claims(conn, now):
+    """
+    Puts rows claimed (sent=2) longer than NOTIFIER_CLAIM_TIMEOUT ago back to sent=0,
+    so a sender that crashed between claim and archive doesn't strand them.
+    """
+    await conn.execute(
+        "UPDATE pending_notifications SET sent=0, claimed_unix=NULL WHERE sent=2 AND claimed_unix < ?",
+        (now - NOTIFIER_CLAIM_TIMEOUT,)
+    )
 
+async def load_and_schedule_pending_notifications(bot, lookahead=60):
+    """
+    Sends every unsent notification due within `lookahead` seconds.
+    Driven by the notification scheduler (lookahead=0) at each exact deadline.
+    Rows are claimed (sent=2) before delivery, grouped per channel, coalesced
+    per role and sent concurrently through notification_dispatcher, then moved
+    to notification_history with their actual send time.
+    Only rows this call claimed are sent; rows taken by a concurrent
+    claim_due_notifications (cron notifier) are left to it.
+    """
+    async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
+        now = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+        # The write lock is taken before the SELECT, so a concurrent
+        # claim_due_notifications can't claim the same rows in between
+        # (UPDATE ... RETURNING would need SQLite 3.35+)
+        await conn.execute("BEGIN IMMEDIATE")
         try:
-            await channel.send(message)
-            send_log(event.get('server_id', 'N/A'), f"Notification sent to channel {channel_id} for event {event['title']} ({profile} {region})")
-        except Exception as e:
-            send_log(event.get('server_id', 'N/A'), f"Failed to send notification for {profile} {region}: {e}")
-    else:
-        # Non-HYV profiles (AK, STRI, UMA, etc.)
-        emoji = PROFILE_EMOJIS.get(profile)
-        role_mention = ""
-        if emoji:
-            role_id = ROLE_IDS.get(profile)
-            if role_id:
-                role = guild.get_role(role_id)
-                if role:
-                    role_mention = role.mention
-                    send_log(event.get('server_id', 'N/A'), f"Found role for profile {profile}: {role_mention}")
-                else:
-                    send_log(event.get('server_id', 'N/A'), f"Role ID {role_id} not found in guild for profile {profile}")
-            else:
-                send_log(event.get('server_id', 'N/A'), f"No role_id found for profile {profile}")
-        else:
-            send_log(event.get('server_id', 'N/A'), f"No emoji found for profile {profile}")
-
-        # Get the appropriate timestamp - use start_date if available, otherwise end_date
-        unix_time = event.get('start_date') or event.get('end_date')
-
-        # Validation: Log warning if unix_time is still None
-        if unix_time is None:
-            send_log(event.get('server_id', 'N/A'),
-                    f"WARNING: unix_time is None for event '{event.get('title')}' (profile: {profile}, timing_type: {timing_type})")
-
-        # Build message: Priority 1 = custom_message, Priority 2 = template, Priority 3 = default
-        message = None
-        time_str = "starting" if timing_type == "start" else "ending"
-        kwargs = {
-            'role': role_mention,
-            'name': event['title'],
-            'category': event['category'],
-            'action': time_str,
-            'time': f"<t:{unix_time}:R>"
-        }
-        if event.get('phase'):
-            kwargs['phase'] = event['phase']
-        if event.get('character_name'):
-            kwargs['character'] = event['character_name']
-        if event.get('custom_message'):
-            try:
-                message = event['custom_message'].format(**kwargs)
-            except (KeyError, IndexError):
-                message = event['custom_message']
-            if not event['custom_message'].lstrip().startswith('{role}'):
-                message = f"{role_mention}, {message}"
-        elif event.get('message_template') and event.get('message_template') in MESSAGE_TEMPLATES:
-            template = MESSAGE_TEMPLATES[event['message_template']]
-            try:
-                message = template.format(**kwargs)
-            except KeyError:
-                pass  # Fall through to default
+            await _release_stale_claims(conn, now)
+            async with conn.execute(f"""
+                SELECT id, notify_unix, rendered_message, {', '.join(RENDER_COLUMNS)}
+                FROM pending_notifications
+                WHERE sent=0 AND notify_unix <= ?
+                ORDER BY notify_unix ASC, id ASC
+            """, (now + lookahead,)) as cursor:
+                rows = await cursor.fetchall()
+            await conn.executemany(
+                "UPDATE pending_notifications SET sent=2, claimed_unix=? WHERE id=?",
+                [(now, row[0]) for row in rows]
+            )
+            await conn.commit()
+        except BaseException:
+            await conn.rollback()
+            raise
+        if not rows:
+            return None
+
+    # Messages were rendered at schedule time; only rows written before
+    # rendered_message existed (or by other writers) are rendered here
+    outgoing = []
+    for notif_id, notify_unix, rendered_message, *fields in rows:
+        row = dict(zip(RENDER_COLUMNS, fields))
+        profile = row['profile'].upper()
+        channel_id = NOTIFICATION_CHANNELS.get(profile)
+        if not channel_id:
+            send_log(MAIN_SERVER_ID, f"No notification channel set for profile {profile}")
+            continue
+        role_mention = resolve_role_mention(profile, row['region'])
+        if profile in HYV_NOTIFICATION_PROFILES and not role_mention:
+            continue  # No combined role for the region; archived as failed below
+        outgoing.append(OutgoingNotification(
+            channel_key=channel_id,
+            role_mention=role_mention,
+            content=rendered_message or render_notification_message(row, role_mention),
+            notify_unix=notify_unix,
+            ref=notif_id,
+        ))
+
+    result = await notification_dispatcher.dispatch(outgoing)
+
+    # Undeliverable rows are archived as failed rather than retried
+    async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
+        await archive_notifications(conn, [(row[0], result.sent_at.get(row[0])) for row in rows], "bot")
+        await conn.commit()
 
-        if not message:
-            message = f"{role_mention}, the **{event['category']}** event **{event['title']}** is {time_str} <t:{unix_time}:R>!"
-        
-        try:
-            await channel.send(message)
-            send_log(event.get('server_id', 'N/A'), f"Notification sent to channel {channel_id} for event {event['title']}")
-        except Exception as e:
-            send_log(event.get('server_id', 'N/A'), f"Failed to send notification: {e}")
+    send_log(
+        MAIN_SERVER_ID,
+        f"Dispatched {result.notifications} notification(s) in {result.messages_sent} message(s), "
+        f"{result.failures} failed; lateness avg {result.avg_lateness:.2f}s / max {result.max_lateness:.2f}s"
+    )
+    return result
+
+# --- Notification history ---
+# Delivered (or given-up) rows are moved out of pending_notifications into
+# notification_history together with the actual send time and lateness.
+# History older than NOTIFICATION_HISTORY_RETENTION_DAYS is purged by
+# compact_notification_db(), which also reclaims pages and refreshes planner stats.
+NOTIFICATION_HISTORY_RETENTION_DAYS = int(os.getenv("NOTIFICATION_HISTORY_RETENTION_DAYS", "180"))
+NOTIFICATION_COMPACTION_INTERVAL = 86400
+
+_ARCHIVE_SQL = f"""
+    INSERT INTO notification_history
+        (notification_id, {', '.join(column for column, _ in NOTIFICATION_HISTORY_COLUMNS)},
+         status, delivery, sent_unix, lateness, archived_unix)
+    SELECT id, {', '.join(column for column, _ in NOTIFICATION_HISTORY_COLUMNS)},
+           ?, ?, ?, ? - notify_unix, ?
+    FROM pending_notifications WHERE id=?
+"""
+
+def _archive_params(entries, delivery, now):
+    """entries: (notif_id, sent_at) pairs; sent_at is None for failed deliveries."""
+    params = []
+    for notif_id, sent_at in entries:
+        status = "sent" if sent_at is not None else "failed"
+        sent_unix = int(sent_at) if sent_at is not None else None
+        params.append((status, delivery, sent_unix, sent_at, now, notif_id))
+    return params
+
+async def archive_notifications(conn, entries, delivery):
+    """
+    Moves rows into notification_history on an open aiosqlite connection.
+    entries: (notif_id, sent_at) pairs, sent_at None when delivery failed.
+    The caller commits.
+    """
+    if not entries:
+        return 0
+    now = int(time.time())
+    await conn.executemany(_ARCHIVE_SQL, _archive_params(entries, delivery, now))
+    await conn.executemany("DELETE FROM pending_notifications WHERE id=?", [(i,) for i, _ in entries])
+    return len(entries)
+
+def archive_notifications_sync(conn, entries, delivery):
+    """sqlite3 counterpart of archive_notifications for the cron notifier."""
+    if not entries:
+        return 0
+    now = int(time.time())
+    conn.executemany(_ARCHIVE_SQL, _archive_params(entries, delivery, now))
+    conn.executemany("DELETE FROM pending_notifications WHERE id=?", [(i,) for i, _ in entries])
+    return len(entries)
+
+async def get_notification_history(profile=None, limit=50, before_id=None):
+    """
+    Returns one page of notification_history, newest first.
+    Pass the returned next_before_id as before_id to fetch the next page.
+    """
+    limit = max(1, min(int(limit), 200))
+    clauses, params = [], []
+    if profile:
+        clauses.append("profile=?")
+        params.append(profile.upper())
+    if before_id is not None:
+        clauses.append("id<?")
+        params.append(int(before_id))
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
+        conn.row_factory = aiosqlite.Row
+        async with conn.execute(
+            f"SELECT * FROM notification_history {where} ORDER BY id DESC LIMIT ?",
+            (*params, limit + 1)
+        ) as cursor:
+            rows = [dict(row) async for row in cursor]
 
-async def load_and_schedule_pending_notifications(bot):
+    next_before_id = rows[limit - 1]["id"] if len(rows) > limit else None
+    return {"history": rows[:limit], "next_before_id": next_before_id}
+
+async def compact_notification_db(retention_days=None):
     """
-    Batch notification loop: checks for due notifications and sends them immediately.
-    Should be called in a background loop every 30-60 seconds.
+    Purges history past the retention window, runs an incremental vacuum and
+    refreshes query planner statistics (ANALYZE once, PRAGMA optimize after).
+    Returns a stats dict.
     """
+    if retention_days is None:
+        retention_days = NOTIFICATION_HISTORY_RETENTION_DAYS
+    start = time.perf_counter()
+    cutoff = int(time.time()) - int(retention_days) * 86400
+
     async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
-        now = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
-        async with conn.execute("""
-            SELECT id, category, profile, title, timing_type, notify_unix, event_time_unix, region,
-                   custom_message, message_template, phase, character_name
-            FROM pending_notifications
-            WHERE sent=0 AND notify_unix <= ?
-        """, (now + 60,)) as cursor:
-            rows = await cursor.fetchall()
+        cursor = await conn.execute("DELETE FROM notification_history WHERE archived_unix < ?", (cutoff,))
+        purged = max(cursor.rowcount, 0)
+        await cursor.close()
+        await conn.commit()
 
-        for row in rows:
-            notif_id, category, profile, title, timing_type, notify_unix, event_time_unix, region, \
-            custom_message, message_template, phase, character_name = row
-
-            # Map event_time_unix to start_date or end_date based on timing_type
-            # For "end" timing, use end_date. For all others (start, reminder, phase_start, etc.), use start_date
-            start_date = None
-            end_date = None
-            if timing_type == "end":
-                end_date = event_time_unix
-            else:
-                # For start, reminder, phase_start, character_start - all refer to a start time
-                start_date = event_time_unix
-
-            event = {
-                'category': category,
-                'profile': profile,
-                'title': title,
-                'start_date': start_date,
-                'end_date': end_date,
-                'region': region,
-                'custom_message': custom_message,
-                'message_template': message_template,
-                'phase': phase,
-                'character_name': character_name
-            }
-            await conn.execute("UPDATE pending_notifications SET sent=1 WHERE id=?", (notif_id,))
-            await send_notification(event, timing_type)
+        async with conn.execute("PRAGMA freelist_count") as cursor:
+            free_before = (await cursor.fetchone())[0]
+        # Each step of incremental_vacuum frees one page, so drain the cursor
+        async with conn.execute("PRAGMA incremental_vacuum") as cursor:
+            await cursor.fetchall()
+        async with conn.execute("PRAGMA freelist_count") as cursor:
+            free_after = (await cursor.fetchone())[0]
+
+        async with conn.execute("SELECT 1 FROM sqlite_master WHERE name='sqlite_stat1'") as cursor:
+            analyzed = await cursor.fetchone() is not None
+        await conn.execute("PRAGMA optimize" if analyzed else "ANALYZE")
         await conn.commit()
 
+    stats = {
+        "purged": purged,
+        "pages_freed": free_before - free_after,
+        "analyzed": not analyzed,
+        "elapsed": time.perf_counter() - start,
+    }
+    send_log(
+        MAIN_SERVER_ID,
+        f"[NotificationHandler] Compacted notification DB: purged {purged} history row(s) older than "
+        f"{retention_days}d, freed {stats['pages_freed']} page(s) in {stats['elapsed']:.3f}s"
+    )
+    return stats
+
+async def periodic_notification_compaction():
+    # Daily history retention + vacuum + planner stats
+    while True:
+        try:
+            await compact_notification_db()
+        except Exception as e:
+            send_log(MAIN_SERVER_ID, f"[NotificationHandler] Notification DB compaction failed: {e}")
+        await asyncio.sleep(NOTIFICATION_COMPACTION_INTERVAL)
+
+# --- Exact-time notification scheduler ---
+# Holds unsent rows in a min-heap keyed on notify_unix and sleeps until the next
+# one is due. Anything that changes pending_notifications calls
+# wake_notification_scheduler() so the heap is rebuilt before the next sleep.
+NOTIF_SCHEDULER_RESYNC_SECONDS = 900  # Catch rows written by other processes (uma_scraper, cron)
+
+async def _load_pending_deadlines():
+    async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
+        # The bot deployment doesn't run the cron notifier, which otherwise
+        # releases claims stranded by a crash or cancellation mid-send
+        await _release_stale_claims(conn, int(time.time()))
+        await conn.commit()
+        async with conn.execute(
+            "SELECT notify_unix, id FROM pending_notifications WHERE sent=0 AND notify_unix IS NOT NULL"
+        ) as cursor:
+            return await cursor.fetchall()
+
+async def _fire_due_notifications(notif_ids):
+    from bot import bot
+    await load_and_schedule_pending_notifications(bot, lookahead=0)
+
+notification_scheduler = DeadlineScheduler(
+    _load_pending_deadlines,
+    _fire_due_notifications,
+    resync_interval=NOTIF_SCHEDULER_RESYNC_SECONDS,
+    name="notification_scheduler",
+)
+
+def start_notification_scheduler():
+    """Starts the in-process notification scheduler (call once from on_ready)."""
+    notification_scheduler.start()
+
+def wake_notification_scheduler():
+    """Tells the scheduler that pending_notifications changed. No-op when it isn't running."""
+    notification_scheduler.wake()
+
+def get_notification_scheduler_status():
+    """Returns heap size, next fire time and run state of the notification scheduler."""
+    return notification_scheduler.status()
+
+# Bursts of scheduling calls (validation, scraper runs) collapse into one refresh per profile
+PENDING_EMBED_DEBOUNCE_SECONDS = 2.0
+_pending_embed_refresh_tasks = {}
+
+def request_pending_notifications_embed_refresh(guild, profile):
+    """
+    Debounced refresh of a profile's pending-notifications embed.
+    Calls arriving while a refresh is waiting are folded into it; the refresh
+    reads the table after the debounce window so it sees every change.
+    Profiles without a PENDING_NOTIFICATIONS_CHANNELS entry have no embed.
+    """
+    if guild is None or not PENDING_NOTIFICATIONS_CHANNELS.get(profile):
+        return None
+    task = _pending_embed_refresh_tasks.get(profile)
+    if task and not task.done():
+        return task
+
+    async def _delayed_refresh():
+        await asyncio.sleep(PENDING_EMBED_DEBOUNCE_SECONDS)
+        # Unregister before refreshing so changes made during the refresh schedule a new one
+        _pending_embed_refresh_tasks.pop(profile, None)
+        try:
+            await update_pending_notifications_embed_for_profile(guild, profile)
+        except Exception as e:
+            send_log(MAIN_SERVER_ID, f"Failed to refresh pending notifications embed for {profile}: {e}")
+
+    task = asyncio.create_task(_delayed_refresh())
+    _pending_embed_refresh_tasks[profile] = task
+    return task
+
 async def update_all_pending_notifications_embeds(guild):
     """Update all game embeds in the pending notifications channel."""
     # Always show all supported profiles, even if they have no notifications
@@ -983,10 +1238,8 @@ async def update_pending_notifications_embed_for_profile(guild, profile):
 
     async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
         # Get the channel for pending notifications for this profile from global_config
-        # from global_config import PENDING_NOTIFICATIONS_CHANNELS
-        # channel_id = PENDING_NOTIFICATIONS_CHANNELS.get(profile)
-        channel_id = None
-        if not channel_id:
+        channel_id = PENDING_NOTIFICATIONS_CHANNELS.get(profile)
+        if not channel_id or guild is None:
             return
         channel = guild.get_channel(int(channel_id))
         if not channel:
@@ -1081,14 +1334,15 @@ async def update_pending_notifications_embed_for_profile(guild, profile):
         # Split fields into chunks of 25 for Discord embed limit
         chunks = [fields[i:i+MAX_FIELDS] for i in range(0, max(1, len(fields)), MAX_FIELDS)]
 
-        # Fetch all existing dashboard messages for this profile
+        # Existing pages for this profile with the hash of what they currently show
         async with conn.execute(
-            "SELECT message_id FROM pending_notifications_messages WHERE profile=? ORDER BY message_id ASC",
+            """SELECT message_id, content_hash FROM pending_notifications_messages
+               WHERE profile=? ORDER BY COALESCE(page, 0) ASC, message_id ASC""",
             (profile,)
         ) as cursor:
-            old_msgs = [msg_id async for (msg_id,) in cursor]
+            old_pages = await cursor.fetchall()
 
-        new_msg_ids = []
+        page_updates = []  # (page, message_id, content_hash, replaced_message_id)
         for idx, chunk in enumerate(chunks):
             embed = discord.Embed(
                 title=f"Pending Notifications: {profile}" + (f" (Page {idx+1})" if len(chunks) > 1 else ""),
@@ -1100,37 +1354,61 @@ async def update_pending_notifications_embed_for_profile(guild, profile):
             else:
                 for field in chunk:
                     embed.add_field(name=field["name"], value=field["value"], inline=False)
-            # Edit existing message or send new one
-            msg_id = old_msgs[idx] if idx < len(old_msgs) else None
-            msg = None
+            content_hash = embed_content_hash(embed)
+
+            msg_id, old_hash = old_pages[idx] if idx < len(old_pages) else (None, None)
+            if msg_id and old_hash == content_hash:
+                continue  # Page unchanged, no API call
+
+            new_id = msg_id
+            if msg_id:
+                try:
+                    # Edit through a partial message: no fetch round-trip
+                    await discord_rest.edit(channel, msg_id, embed=embed)
+                except discord.NotFound:
+                    new_id = None
+                except Exception as e:
+                    # Replace the page, removing the old one first so it isn't left as a duplicate
+                    send_log(MAIN_SERVER_ID, f"Failed to edit pending notifications page {msg_id} for {profile}: {e}",
+                             level=logging.WARNING)
+                    try:
+                        await discord_rest.delete(channel, msg_id)
+                    except discord.NotFound:
+                        pass
+                    except Exception:
+                        continue  # Old page still there; the next refresh retries
+                    new_id = None
+            if new_id is None:
+                new_id = str((await discord_rest.send(channel, embed=embed, priority=RestPriority.DASHBOARD)).id)
+            page_updates.append((idx, new_id, content_hash, msg_id))
+
+        # Remove any extra old messages if the number of embeds decreased; pages
+        # that fail to delete stay tracked so the next refresh retries them
+        removed_ids = []
+        for msg_id, _ in old_pages[len(chunks):]:
             try:
-                if msg_id:
-                    msg = await channel.fetch_message(int(msg_id))
-                    await msg.edit(embed=embed)
-                else:
-                    msg = await channel.send(embed=embed)
+                await discord_rest.delete(channel, msg_id)
+            except discord.NotFound:
+                pass
             except Exception:
-                msg = await channel.send(embed=embed)
-            new_msg_ids.append(str(msg.id))
+                continue
+            removed_ids.append(msg_id)
 
-        # Remove any extra old messages if the number of embeds decreased
-        for msg_id in old_msgs[len(chunks):]:
-            try:
-                msg = await channel.fetch_message(int(msg_id))
-                await msg.delete()
-            except Exception:
-                pass
+        if not page_updates and not removed_ids:
+            return
 
-        # Update the DB with the new set of message IDs
-        await conn.execute(
-            "DELETE FROM pending_notifications_messages WHERE profile=?",
-            (profile,)
+        # Only touch rows for pages that changed
+        stale_ids = removed_ids + [old for _, new, _, old in page_updates if old and old != new]
+        await conn.executemany(
+            "DELETE FROM pending_notifications_messages WHERE profile=? AND message_id=?",
+            [(profile, msg_id) for msg_id in stale_ids]
+        )
+        await conn.executemany(
+            """INSERT INTO pending_notifications_messages (profile, message_id, page, content_hash)
+               VALUES (?, ?, ?, ?)
+               ON CONFLICT(profile, message_id) DO UPDATE SET page=excluded.page, content_hash=excluded.content_hash""",
+            [(profile, new, page, content_hash) for page, new, content_hash, _ in page_updates]
         )
-        for msg_id in new_msg_ids:
-            await conn.execute(
-                "INSERT INTO pending_notifications_messages (profile, message_id) VALUES (?, ?)",
-                (profile, msg_id)
-            )
         await conn.commit()
 
 async def update_combined_roles(member):
@@ -1302,6 +1580,7 @@ if __name__ != "__main__":
         async with aiosqlite.connect(NOTIF_DB_PATH) as conn:
             await conn.execute("DELETE FROM pending_notifications")
             await conn.commit()
+            wake_notification_scheduler()
         await ctx.send("Cleared all pending notifications.")
         await update_all_pending_notifications_embeds(ctx.guild)
 
@@ -1319,77 +1598,37 @@ if __name__ != "__main__":
         )
         await update_all_pending_notifications_embeds(ctx.guild)
 
+def build_webhook_message(row):
+    """
+    Builds the webhook URL and message text for a pending_notifications row.
+    Returns (url, message); url is "" when no webhook is configured for the profile.
+
+    row: dict with keys matching pending_notifications columns:
+        id, profile, title, category, timing_type, event_time_unix,
+        region, message_template, custom_message, phase, character_name,
+        rendered_message (used as-is when set)
+    """
+    message = row.get("rendered_message") or render_notification_message(row)
+    return webhook_url_for(row["profile"]), message
+
+def webhook_url_for(profile):
+    """Webhook URL configured for a profile ("" when there is none)."""
+    from global_config import NOTIFICATION_WEBHOOK_URLS
+
+    profile = (profile or "").upper()
+    return os.getenv(f"WEBHOOK_{profile}", "") or NOTIFICATION_WEBHOOK_URLS.get(profile, "")
+
 def send_notification_webhook(row):
     """
     Synchronous webhook sender for standalone cron use.
     Posts a notification to the Discord webhook for the event's profile.
     Returns True on success (HTTP 200/204), False otherwise.
-
-    row: dict with keys matching pending_notifications columns:
-        id, profile, title, category, timing_type, event_time_unix,
-        region, message_template, custom_message, phase, character_name
     """
     import urllib.request
     import json as _json
-    from global_config import (
-        ROLE_IDS, COMBINED_REGIONAL_ROLE_IDS, NOTIFICATION_WEBHOOK_URLS
-    )
 
     profile = row["profile"].upper()
-
-    # Build role mention string (no discord.py — just raw ID string)
-    HYV_PROFILES = {"HSR", "ZZZ", "WUWA"}
-    if profile in HYV_PROFILES:
-        region = (row.get("region") or "").upper()
-        role_id = COMBINED_REGIONAL_ROLE_IDS.get((profile, region))
-    else:
-        role_id = ROLE_IDS.get(profile)
-    role_mention = f"<@&{role_id}>" if role_id else ""
-
-    # Map event_time_unix → start_date/end_date for message formatting
-    timing_type = row.get("timing_type", "start")
-    event_time_unix = row.get("event_time_unix")
-    if timing_type == "end":
-        unix_time = event_time_unix
-        time_str = "ending"
-    else:
-        unix_time = event_time_unix
-        time_str = "starting"
-
-    # Build message: custom_message > template > default
-    kwargs = {
-        "role":     role_mention,
-        "name":     row["title"],
-        "category": row["category"],
-        "action":   time_str,
-        "time":     f"<t:{unix_time}:R>" if unix_time else "",
-    }
-    if row.get("phase"):
-        kwargs["phase"] = row["phase"]
-    if row.get("character_name"):
-        kwargs["character"] = row["character_name"]
-
-    message = None
-    if row.get("custom_message"):
-        try:
-            message = row["custom_message"].format(**kwargs)
-        except (KeyError, IndexError):
-            message = row["custom_message"]  # send raw if the template is malformed
-        if not row["custom_message"].lstrip().startswith('{role}'):
-            message = f"{role_mention}, {message}"
-    elif row.get("message_template") and row["message_template"] in MESSAGE_TEMPLATES:
-        template = MESSAGE_TEMPLATES[row["message_template"]]
-        try:
-            message = template.format(**kwargs)
-        except KeyError:
-            pass
-
-    if not message:
-        time_ref = f"<t:{unix_time}:R>" if unix_time else "soon"
-        message = f"{role_mention}, the **{row['category']}** event **{row['title']}** is {time_str} {time_ref}!"
-
-    # POST to webhook
-    url = os.getenv(f"WEBHOOK_{profile}", "") or NOTIFICATION_WEBHOOK_URLS.get(profile, "")
+    url, message = build_webhook_message(row)
     if not url:
         print(f"[NOTIFIER] No webhook URL configured for profile {profile}, skipping")
         return False
@@ -1412,13 +1651,156 @@ def send_notification_webhook(row):
             print(f"[NOTIFIER] Discord error body: {e.read().decode('utf-8', errors='replace')}")
         return False
 
+# --- Cron notifier row claiming ---
+# sent=0 pending, sent=2 claimed by a notifier run (in-flight); delivered rows
+# are moved to notification_history.
+# Claims are taken under BEGIN IMMEDIATE so overlapping cron runs never pick up
+# the same row; claims older than NOTIFIER_CLAIM_TIMEOUT (crashed run) are released.
+NOTIFIER_CLAIM_TIMEOUT = 15 * 60
+NOTIFIER_COLUMNS = [
+    "id", "profile", "title", "category", "timing_type",
+    "notify_unix", "event_time_unix", "region",
+    "message_template", "custom_message", "phase", "character_name",
+    "rendered_message",
+]
+
+def claim_due_notifications(conn, now):
+    """
+    Atomically claims every due row (sent=0 -> sent=2) on a sqlite3 connection.
+    Rows whose profile has no webhook URL are left unclaimed: the cron run
+    can't deliver them, and releasing them would retry them every minute.
+    Returns the claimed rows as dicts.
+    """
+    import sqlite3
+    for column in ("claimed_unix INTEGER", "rendered_message TEXT"):
+        try:
+            conn.execute(f"ALTER TABLE pending_notifications ADD COLUMN {column}")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+    for statement in NOTIFICATION_HISTORY_SCHEMA:
+        conn.execute(statement)
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "UPDATE pending_notifications SET sent=0, claimed_unix=NULL WHERE sent=2 AND claimed_unix < ?",
+            (now - NOTIFIER_CLAIM_TIMEOUT,),
+        )
+        rows = conn.execute(
+            f"SELECT {','.join(NOTIFIER_COLUMNS)} FROM pending_notifications "
+            "WHERE sent=0 AND notify_unix <= ? ORDER BY notify_unix ASC",
+            (now,),
+        ).fetchall()
+        deliverable = [raw for raw in rows if webhook_url_for(raw[1])]
+        if len(deliverable) < len(rows):
+            skipped = sorted({raw[1] for raw in rows if not webhook_url_for(raw[1])}, key=str)
+            print(f"[NOTIFIER] No webhook URL configured for {', '.join(map(str, skipped))}; "
+                  f"leaving {len(rows) - len(deliverable)} row(s) unclaimed")
+        rows = deliverable
+        conn.executemany(
+            "UPDATE pending_notifications SET sent=2, claimed_unix=? WHERE id=? AND sent=0",
+            [(now, raw[0]) for raw in rows],
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return [dict(zip(NOTIFIER_COLUMNS, raw)) for raw in rows]
+
+def finish_claimed_notifications(conn, sent, failed_ids):
+    """
+    Moves delivered claims to notification_history and releases failed ones back to sent=0.
+    sent: (notif_id, sent_at) pairs.
+    """
+    archive_notifications_sync(conn, sent, "webhook")
+    conn.executemany(
+        "UPDATE pending_notifications SET sent=0, claimed_unix=NULL WHERE id=? AND sent=2",
+        [(i,) for i in failed_ids],
+    )
+    conn.commit()
+
+async def run_async(per_url_concurrency=2):
+    """
+    Asyncio notifier: claims due rows, POSTs them concurrently through one pooled
+    session (bounded per webhook URL, honouring Discord 429 retry_after), then
+    marks results and prints a latency/throughput summary.
+    Returns the sender summary dict.
+    """
+    import sqlite3
+    from src.integrations.web.webhook_sender import WebhookSender
+
+    now = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+    conn = sqlite3.connect(NOTIF_DB_PATH, isolation_level=None)
+    try:
+        rows = claim_due_notifications(conn, now)
+        sent, failed_ids = [], []
+        lateness = []
+
+        async with WebhookSender(per_url_concurrency=per_url_concurrency) as sender:
+            async def deliver(row):
+                url, message = build_webhook_message(row)
+                if not url:
+                    print(f"[NOTIFIER] No webhook URL configured for profile {row['profile']}, skipping")
+                    failed_ids.append(row["id"])
+                    return
+                result = await sender.post(url, {"content": message})
+                if result.ok:
+                    sent_at = time.time()
+                    sent.append((row["id"], sent_at))
+                    lateness.append(sent_at - row["notify_unix"])
+                    print(f"[NOTIFIER] Sent: {row['profile']} — {row['title']} ({row['timing_type']})")
+                else:
+                    failed_ids.append(row["id"])
+                    print(f"[NOTIFIER] FAILED: {row['profile']} — {row['title']} ({row['timing_type']}): {result.error}")
+
+            await asyncio.gather(*(deliver(row) for row in rows))
+            summary = sender.summary()
+
+        conn.execute("BEGIN")
+        finish_claimed_notifications(conn, sent, failed_ids)
+    finally:
+        conn.close()
+
+    summary["claimed"] = len(rows)
+    summary["max_lateness"] = max(lateness) if lateness else 0.0
+    print(
+        f"[NOTIFIER] {len(rows)} due: {summary['sent']} sent, {len(failed_ids)} failed "
+        f"in {summary['elapsed']:.2f}s ({summary['throughput']:.1f} msg/s); "
+        f"POST latency p50 {summary['latency_p50'] * 1000:.0f}ms / p95 {summary['latency_p95'] * 1000:.0f}ms / "
+        f"max {summary['latency_max'] * 1000:.0f}ms; {summary['rate_limited']} rate-limited, "
+        f"{summary['retries']} retries; max lateness {summary['max_lateness']:.1f}s"
+    )
+    return summary
+
+def run_sync():
+    """Legacy one-by-one urllib notifier, kept for hosts without aiohttp."""
+    import sqlite3
 
-def run():
+    now = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+    conn = sqlite3.connect(NOTIF_DB_PATH, isolation_level=None)
+    try:
+        rows = claim_due_notifications(conn, now)
+        sent, failed_ids = [], []
+        for row in rows:
+            if send_notification_webhook(row):
+                sent.append((row["id"], time.time()))
+                print(f"[NOTIFIER] Sent: {row['profile']} — {row['title']} ({row['timing_type']})")
+            else:
+                failed_ids.append(row["id"])
+                print(f"[NOTIFIER] FAILED: {row['profile']} — {row['title']} ({row['timing_type']})")
+        conn.execute("BEGIN")
+        finish_claimed_notifications(conn, sent, failed_ids)
+    finally:
+        conn.close()
+
+def run(argv=None):
     """
     Standalone entry point: query due notifications and send via Discord webhooks.
-    Marks sent=1 only after a successful webhook POST.
-    Safe to run as a cron job every minute.
+    Rows are claimed (sent=2) before sending and moved to notification_history
+    only after a successful webhook POST, so overlapping runs never double-send.
+    Safe to run as a cron job every minute. Pass --sync for the legacy urllib path.
     """
+    import sys
     # Load .env so WEBHOOK_* vars are available when running standalone (not via bot.py)
     try:
         from dotenv import load_dotenv as _load_dotenv
@@ -1426,35 +1808,11 @@ def run():
     except ImportError:
         pass
 
-    import sqlite3
-    import datetime as _dt
-
-    now = int(_dt.datetime.now(_dt.timezone.utc).timestamp())
-    cols = [
-        "id", "profile", "title", "category", "timing_type",
-        "notify_unix", "event_time_unix", "region",
-        "message_template", "custom_message", "phase", "character_name",
-    ]
-    conn = sqlite3.connect(NOTIF_DB_PATH)
-    rows = conn.execute(
-        f"SELECT {','.join(cols)} FROM pending_notifications "
-        "WHERE sent=0 AND notify_unix <= ?",
-        (now,),
-    ).fetchall()
-
-    for raw in rows:
-        row = dict(zip(cols, raw))
-        if send_notification_webhook(row):
-            conn.execute(
-                "UPDATE pending_notifications SET sent=1 WHERE id=?",
-                (row["id"],),
-            )
-            print(f"[NOTIFIER] Sent: {row['profile']} — {row['title']} ({row['timing_type']})")
-        else:
-            print(f"[NOTIFIER] FAILED: {row['profile']} — {row['title']} ({row['timing_type']})")
-
-    conn.commit()
-    conn.close()
+    argv = sys.argv[1:] if argv is None else argv
+    if "--sync" in argv:
+        run_sync()
+    else:
+        asyncio.run(run_async())
 
 
 if __name__ == "__main__":
@@ -1462,16 +1820,11 @@ if __name__ == "__main__":
 
 
 async def debug_log(message, bot=None, important=False):
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_entry = f"[{timestamp}] {message}"
-    # Write to file
-    try:
-        with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-            f.write(log_entry + "\n")
-    except Exception as e:
-        print(f"Failed to write debug log: {e}")
+    # Important messages are logged at WARNING so DEBUG_LOG_LEVEL can drop the rest
+    debug_logger.log(logging.WARNING if important else logging.DEBUG, message)
     # Optionally send DM for important messages
     if important and bot is not None:
+        log_entry = f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}"
         try:
             user = await bot.fetch_user(IMPORTANT_DM_USER_ID)
             await user.send(f"[Kanami Debug]\n{log_entry}")
@@ -0,0 +1,116 @@
+"""
+Benchmark: Shadowverse dashboard renders per second.
+
+Renders the same set of dashboards (random stats, every played craft)
+through:
+
+- from scratch   a new DashboardRenderer with an empty font cache for every
+                 render: gradient, border, four font loads and eight stroked
+                 icons each time, i.e. what generate_dashboard_image did per
+                 call before the static layer was pre-composited
+- template       the process-wide renderer: copy the template, draw the name,
+                 title, bars and numbers
+
+Both are timed with and without a PNG encode, and the images are checked
+to be pixel-identical. The encoders generate_dashboard_image can be
+configured with (SV_DASHBOARD_FORMAT and friends) are then compared on
+encode time and upload size.
+
+Absolute numbers depend heavily on the CPU; run it on the host that serves
+the bot (e.g. the Raspberry Pi) for figures that mean anything there.
+
+Usage:
+    python scripts/benchmarks/bench_dashboard_render.py
+    python scripts/benchmarks/bench_dashboard_render.py --renders 50 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+
+
+def make_dashboards(count, crafts, seed=11):
+    rng = random.Random(seed)
+    return [
+        (
+            f"Player {i}",
+            crafts[i % len(crafts)],
+            {
+                craft: {"wins": rng.randrange(300), "losses": rng.randrange(300), "bricks": rng.randrange(30)}
+                for craft in crafts if rng.random() < 0.85
+            },
+        )
+        for i in range(count)
+    ]
+
+
+def time_path(label, render, dashboards, repeat, encode):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for dashboard in dashboards:
+            img = render(*dashboard)
+            if encode:
+                img.save(BytesIO(), "PNG")
+        best = min(best, time.perf_counter() - start)
+    rate = len(dashboards) / best
+    print(f"{label:<24} {rate:>8.1f} renders/s   ({best * 1000 / len(dashboards):7.2f} ms/render)")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=30, help="dashboards per timed pass")
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes per path (best is reported)")
+    args = parser.parse_args()
+
+    # bot.py opens discord.log in the working directory on import
+    os.chdir(tempfile.mkdtemp())
+    import shadowverse_handler as sv
+
+    if not sv.PIL_AVAILABLE:
+        sys.exit("Pillow is not installed")
+
+    def from_scratch(user_name, played_craft, winrate_dict):
+        sv._font_cache.clear()
+        return sv.DashboardRenderer().render(user_name, played_craft, winrate_dict)
+
+    renderer = sv.DashboardRenderer()
+    dashboards = make_dashboards(args.renders, sv.CRAFTS)
+    for dashboard in dashboards[:len(sv.CRAFTS)]:
+        assert from_scratch(*dashboard).tobytes() == renderer.render(*dashboard).tobytes(), "renders differ"
+
+    print(f"{args.renders} dashboards, best of {args.repeat}")
+    for encode in (False, True):
+        suffix = " + PNG" if encode else ""
+        before = time_path(f"from scratch{suffix}", from_scratch, dashboards, args.repeat, encode)
+        after = time_path(f"template{suffix}", renderer.render, dashboards, args.repeat, encode)
+        print(f"{'':<24} template is {after / before:.1f}x the from-scratch rate{suffix}")
+
+    images = [renderer.render(*dashboard) for dashboard in dashboards]
+    encoders = [(f"png level {level}", "PNG", {"compress_level": level}) for level in (1, 6, 9)]
+    if sv.features.check("webp"):
+        encoders += [(f"webp lossless m{method}", "WEBP", {"lossless": True, "method": method}) for method in (0, 4)]
+    print("encoder                  ms/image     KiB/image")
+    for label, image_format, options in encoders:
+        best, size = float("inf"), 0
+        for _ in range(args.repeat):
+            size = 0
+            start = time.perf_counter()
+            for img in images:
+                buffer = BytesIO()
+                img.save(buffer, image_format, **options)
+                size += buffer.tell()
+            best = min(best, time.perf_counter() - start)
+        print(f"{label:<24} {best * 1000 / len(images):8.2f}   {size / 1024 / len(images):10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: per-call cost of send_log / debug_log on the event loop.
+
+Compares the old implementation (print + open/append/close of discord.log on
+every call) with the queue-based log pipeline, where the caller only enqueues
+a record and a writer thread formats, batches and writes it. Also measures a
+disabled debug line, which should cost no more than a level check.
+
+Stdout is redirected to /dev/null so terminal speed doesn't skew results.
+
+Usage:
+    python scripts/benchmarks/bench_log_pipeline.py
+    python scripts/benchmarks/bench_log_pipeline.py --calls 50000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+
+
+def legacy_send_log(*args):
+    # The pre-pipeline send_log, verbatim apart from the server-ID check
+    message = " ".join(str(arg) for arg in args if arg is not None)
+    print(message)
+    try:
+        with open("discord.log", "a", encoding="utf-8") as f:
+            f.write(message + "\n")
+    except Exception as e:
+        print(f"Failed to write to log file: {e}")
+
+
+async def per_call(label, func, calls):
+    """Times every call individually; yields to the loop between calls like real callers do."""
+    samples = []
+    for i in range(calls):
+        start = time.perf_counter_ns()
+        func("Scheduled", i, "notification(s) for `Event` (Banner) [UMA], 0 already pending")
+        samples.append(time.perf_counter_ns() - start)
+        if i % 64 == 0:
+            await asyncio.sleep(0)
+    samples.sort()
+    median = samples[len(samples) // 2] / 1000
+    p99 = samples[int(len(samples) * 0.99)] / 1000
+    print(f"{label:<24} median {median:7.2f} us   p99 {p99:8.2f} us   (on the loop)", file=sys.__stdout__)
+    return median
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000, help="log calls per variant")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    sys.stdout = open(os.devnull, "w")
+
+    from src.utils.log_pipeline import get_log_pipeline, get_pipeline_logger
+
+    print(f"{args.calls} calls per variant", file=sys.__stdout__)
+    before = await per_call("legacy send_log", legacy_send_log, args.calls)
+
+    logger = get_pipeline_logger("bench.send_log", "discord.log")
+
+    def pipeline_send_log(*call_args):
+        call_args = tuple(arg for arg in call_args if arg is not None)
+        logger.info(" ".join(["%s"] * len(call_args)), *call_args)
+
+    after = await per_call("pipeline send_log", pipeline_send_log, args.calls)
+
+    drain_start = time.perf_counter()
+    get_log_pipeline("discord.log").stop()
+    drain = time.perf_counter() - drain_start
+    print(f"{'writer thread drain':<24} {drain * 1e6 / args.calls:7.2f} us/record still queued at stop (off the loop)",
+          file=sys.__stdout__)
+
+    debug = get_pipeline_logger("bench.debug", "debug.log", level=logging.INFO, console=False)
+    await per_call("disabled debug line", lambda *a: debug.debug("refresh %s %s %s", *a), args.calls)
+
+    print(f"pipeline send_log median is {before / after:.1f}x cheaper on the event loop", file=sys.__stdout__)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
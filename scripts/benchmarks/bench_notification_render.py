@@ -0,0 +1,103 @@
+"""
+Benchmark: how many notification messages per second each send path can render.
+
+Builds a realistic mix of pending_notifications rows (HYV regional rows,
+Uma Champions Meeting / Legend Race templates, custom messages, defaults)
+and times:
+
+- fire-time      rendering the text when the row fires (role lookup, template
+                 selection, str.format with fallbacks), as both send paths did
+- pre-rendered   reading rendered_message, as both send paths do now
+- webhook path   build_webhook_message end to end (includes the webhook URL
+                 lookup), without and with stored text
+- schedule time  the one-off cost of rendering while building the row
+
+Usage:
+    python scripts/benchmarks/bench_notification_render.py
+    python scripts/benchmarks/bench_notification_render.py --rows 20000 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+
+
+def make_rows(count, base_unix):
+    shapes = [
+        dict(profile="HSR", category="Banner", timing_type="start", region="NA"),
+        dict(profile="ZZZ", category="Event", timing_type="end", region="ASIA"),
+        dict(profile="AK", category="Event", timing_type="start"),
+        dict(profile="UMA", category="Champions Meeting", timing_type="phase_start",
+             message_template="uma_champions_meeting_round1_start", phase="Round 1"),
+        dict(profile="UMA", category="Legend Race", timing_type="character_start",
+             message_template="uma_legend_race_character_start", character_name="Oguri Cap"),
+        dict(profile="STRI", category="Banner", timing_type="end",
+             custom_message="{name} closes {time}, last call!"),
+    ]
+    rows = []
+    for i in range(count):
+        row = dict(shapes[i % len(shapes)])
+        row.update(id=i, title=f"Event {i}", notify_unix=base_unix + i, event_time_unix=base_unix + 3600 + i)
+        for key in ("region", "message_template", "custom_message", "phase", "character_name"):
+            row.setdefault(key, None)
+        rows.append(row)
+    return rows
+
+
+def timed(label, func, rows, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for row in rows:
+            func(row)
+        best = min(best, time.perf_counter() - start)
+    rate = len(rows) / best
+    print(f"{label:<14} {rate:>12,.0f} msg/s   ({best * 1e6 / len(rows):6.2f} us/msg)")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="rows rendered per pass")
+    parser.add_argument("--repeat", type=int, default=3, help="passes per path (best is reported)")
+    args = parser.parse_args()
+
+    # bot.py opens discord.log in the working directory on import
+    os.chdir(tempfile.mkdtemp())
+    import notification_handler as nh
+
+    rows = make_rows(args.rows, int(time.time()))
+    for row in rows:
+        row["rendered_message"] = None
+
+    def fire_time(row):
+        role_mention = nh.resolve_role_mention(row["profile"], row["region"])
+        return nh.render_notification_message(row, role_mention)
+
+    def stored(row):
+        return row["rendered_message"] or nh.render_notification_message(row)
+
+    def schedule_time(row):
+        event = {"category": row["category"], "profile": row["profile"], "title": row["title"]}
+        return nh._notification_row(event, row["timing_type"], row["notify_unix"], row["event_time_unix"],
+                                    region=row["region"], message_template=row["message_template"],
+                                    phase=row["phase"], character_name=row["character_name"])
+
+    print(f"{args.rows} rows, best of {args.repeat}")
+    pre_rendered = [dict(row, rendered_message=nh.render_notification_message(row)) for row in rows]
+
+    fire_rate = timed("fire-time", fire_time, rows, args.repeat)
+    pre_rate = timed("pre-rendered", stored, pre_rendered, args.repeat)
+    timed("webhook (fire)", nh.build_webhook_message, rows, args.repeat)
+    timed("webhook (pre)", nh.build_webhook_message, pre_rendered, args.repeat)
+    timed("schedule time", schedule_time, rows, args.repeat)
+    print(f"pre-rendered text is {pre_rate / fire_rate:.1f}x the fire-time render rate")
+
+
+if __name__ == "__main__":
+    main()
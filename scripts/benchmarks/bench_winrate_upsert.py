@@ -0,0 +1,176 @@
+"""
+Benchmark: cost of keeping the Shadowverse winrate aggregates up to date.
+
+Records the same synthetic matches (random crafts, ~50% wins, ~10% bricks,
+alternating discord/api sources) into fresh databases through:
+
+- ensure+update  the previous per-match path: INSERT OR IGNORE into
+                 combined_winrates plus one UPDATE for win/loss and one for
+                 bricks, then the same again for the legacy winrates table
+- upsert         _update_winrates: one INSERT ... ON CONFLICT DO UPDATE per
+                 table
+- bulk upsert    record_matches_bulk in batches of 100 (log_batch sized)
+
+The per-match paths also insert the match rows and commit after every
+match, like record_match. Statements are counted with the SQLite trace
+callback (executemany counts one per row).
+
+Usage:
+    python scripts/benchmarks/bench_winrate_upsert.py
+    python scripts/benchmarks/bench_winrate_upsert.py --matches 50000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+
+
+def make_matches(count, crafts, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "played_craft": rng.choice(crafts),
+            "opponent_craft": rng.choice(crafts),
+            "win": rng.random() < 0.5,
+            "brick": rng.random() < 0.1,
+            "source": "discord" if i % 2 else "api",
+        }
+        for i in range(count)
+    ]
+
+
+async def ensure_and_update(conn, user_id, server_id, played_craft, opponent_craft, win, brick, source):
+    """The aggregate statements record_match used to run for every match."""
+    key = (user_id, server_id, played_craft, opponent_craft)
+    await conn.execute('''
+        INSERT OR IGNORE INTO combined_winrates (
+            user_id, server_id, played_craft, opponent_craft,
+            discord_wins, discord_losses, discord_bricks,
+            api_wins, api_losses, api_bricks,
+            total_wins, total_losses, total_bricks
+        ) VALUES (?, ?, ?, ?, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+    ''', key)
+    column = f"{source}_wins" if win else f"{source}_losses"
+    total = "total_wins" if win else "total_losses"
+    await conn.execute(f'''
+        UPDATE combined_winrates SET {column} = MAX(0, {column} + 1), {total} = MAX(0, {total} + 1)
+        WHERE user_id=? AND server_id=? AND played_craft=? AND opponent_craft=?
+    ''', key)
+    if brick:
+        await conn.execute(f'''
+            UPDATE combined_winrates SET {source}_bricks = MAX(0, {source}_bricks + 1),
+                                         total_bricks = MAX(0, total_bricks + 1)
+            WHERE user_id=? AND server_id=? AND played_craft=? AND opponent_craft=?
+        ''', key)
+
+    await conn.execute('''
+        INSERT OR IGNORE INTO winrates (user_id, server_id, played_craft, opponent_craft, wins, losses, bricks)
+        VALUES (?, ?, ?, ?, 0, 0, 0)
+    ''', key)
+    await conn.execute(f'''
+        UPDATE winrates SET {"wins = wins" if win else "losses = losses"} + 1
+        WHERE user_id=? AND server_id=? AND played_craft=? AND opponent_craft=?
+    ''', key)
+    if brick:
+        await conn.execute('''
+            UPDATE winrates SET bricks = bricks + 1
+            WHERE user_id=? AND server_id=? AND played_craft=? AND opponent_craft=?
+        ''', key)
+
+
+async def insert_match_rows(conn, user_id, server_id, match):
+    values = (user_id, server_id, match["played_craft"], match["opponent_craft"],
+              int(match["win"]), int(match["brick"]))
+    await conn.execute(
+        f"INSERT INTO {match['source']}_matches (user_id, server_id, played_craft, opponent_craft, win, brick) "
+        "VALUES (?, ?, ?, ?, ?, ?)", values
+    )
+    await conn.execute(
+        "INSERT INTO matches (user_id, server_id, played_craft, opponent_craft, win, brick) "
+        "VALUES (?, ?, ?, ?, ?, ?)", values
+    )
+
+
+async def run_per_match(aiosqlite, matches, aggregate):
+    async with aiosqlite.connect("shadowverse_data.db") as conn:
+        statements = []
+        await conn.set_trace_callback(statements.append)
+        start = time.perf_counter()
+        for match in matches:
+            await insert_match_rows(conn, "1", "9", match)
+            await aggregate(conn, "1", "9", match["played_craft"], match["opponent_craft"],
+                            match["win"], match["brick"], match["source"])
+            await conn.commit()
+        elapsed = time.perf_counter() - start
+    return elapsed, len(statements)
+
+
+async def run_bulk(sv, matches, batch_size=100):
+    start = time.perf_counter()
+    for source in ("discord", "api"):
+        subset = [m for m in matches if m["source"] == source]
+        for offset in range(0, len(subset), batch_size):
+            await sv.record_matches_bulk("1", "9", subset[offset:offset + batch_size], source=source)
+    return time.perf_counter() - start
+
+
+async def snapshot(aiosqlite):
+    async with aiosqlite.connect("shadowverse_data.db") as conn:
+        tables = {}
+        for table in ("combined_winrates", "winrates"):
+            async with conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2, 3, 4") as cursor:
+                tables[table] = await cursor.fetchall()
+    return tables
+
+
+async def fresh_db(sv):
+    if os.path.exists("shadowverse_data.db"):
+        os.remove("shadowverse_data.db")
+    await sv.init_sv_db()
+
+
+async def main_async(args):
+    # bot.py opens discord.log in the working directory on import
+    os.chdir(tempfile.mkdtemp())
+    import aiosqlite
+    import shadowverse_handler as sv
+
+    matches = make_matches(args.matches, sv.CRAFTS)
+    print(f"{args.matches} matches, {len({(m['played_craft'], m['opponent_craft']) for m in matches})} matchups")
+
+    async def upsert(conn, user_id, server_id, played, opponent, win, brick, source):
+        await sv._update_winrates(conn, user_id, server_id, played, opponent, win, brick, source)
+
+    results = {}
+    for label, aggregate in (("ensure+update", ensure_and_update), ("upsert", upsert)):
+        await fresh_db(sv)
+        elapsed, statements = await run_per_match(aiosqlite, matches, aggregate)
+        results[label] = (elapsed, statements, await snapshot(aiosqlite))
+        print(f"{label:<14} {elapsed:8.2f} s  {args.matches / elapsed:>9,.0f} matches/s  "
+              f"{statements / args.matches:5.2f} statements/match (incl. row inserts + COMMIT)")
+
+    await fresh_db(sv)
+    elapsed = await run_bulk(sv, matches)
+    bulk_snapshot = await snapshot(aiosqlite)
+    print(f"{'bulk upsert':<14} {elapsed:8.2f} s  {args.matches / elapsed:>9,.0f} matches/s  (batches of 100)")
+
+    old, new = results["ensure+update"], results["upsert"]
+    assert old[2] == new[2] == bulk_snapshot, "aggregates differ between paths"
+    print(f"upsert: {old[1] / new[1]:.2f}x fewer statements, {old[0] / new[0]:.2f}x the speed; aggregates identical")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matches", type=int, default=10000, help="synthetic matches per path")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,16 +3,21 @@ import asyncio
 from discord.ext import commands
 from discord import ui, ButtonStyle, Embed, Interaction
 from bot import bot
+from src.core.services.rest_scheduler import discord_rest, RestPriority
+from global_config import OWNER_USER_ID
 import json
 import discord
+import hashlib
 import io
 import logging
 import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 
 # Try to import PIL for image generation
 try:
-    from PIL import Image, ImageDraw, ImageFont
+    from PIL import Image, ImageDraw, ImageFont, features
     PIL_AVAILABLE = True
 except ImportError:
     PIL_AVAILABLE = False
@@ -65,6 +70,12 @@ DASHBOARD_COLORS = {
 # Global icon cache for image generation
 _icon_cache = None
 
+# Loaded fonts by (size, bold); each truetype() call opens and parses the font file
+_font_cache = {}
+
+# Global dashboard renderer (holds the pre-composited template)
+_dashboard_renderer = None
+
 class IconCache:
     """Cache for loaded and resized icons to improve performance."""
 
@@ -90,6 +101,13 @@ class IconCache:
 
         return self.cache[key]
 
+    def get_stroked_class_icon(self, craft_name, size=(50, 56)):
+        """Class icon with the dashboard stroke applied; returns (image, padding)."""
+        key = f"stroked_{craft_name}_{size}"
+        if key not in self.cache:
+            self.cache[key] = stroke_icon(self.get_class_icon(craft_name, size=size))
+        return self.cache[key]
+
     def get_brick_icon(self, size=(24, 24)):
         """Load and resize the brick icon."""
         key = f"brick_{size}"
@@ -109,10 +127,17 @@ class IconCache:
 
 
 def load_dashboard_font(size, bold=False):
-    """Load Noto Sans font with fallback to system fonts."""
+    """Load Noto Sans font with fallback to system fonts (cached per size and weight)."""
     if not PIL_AVAILABLE:
         return None
 
+    key = (size, bold)
+    if key not in _font_cache:
+        _font_cache[key] = _load_dashboard_font(size, bold)
+    return _font_cache[key]
+
+
+def _load_dashboard_font(size, bold):
     font_name = "NotoSans-VariableFont_wdth,wght.ttf"
     font_path = os.path.join("fonts", font_name)
 
@@ -170,8 +195,13 @@ def draw_octagonal_border(draw, width, height, inset, corner_cut, color, thickne
         draw.line([start, end], fill=color, width=thickness)
 
 
-def add_stroked_icon(base_img, icon, x, y, outer_black=3, gold=3, inner_black=3):
-    """Add a class icon with a triple-layer stroke/outline effect following the icon's shape."""
+def stroke_icon(icon, outer_black=3, gold=3, inner_black=3):
+    """
+    Give a class icon a triple-layer stroke/outline effect following the icon's shape.
+
+    Returns (stroked, padding): the stroked RGBA image and how far it extends past
+    the icon on each side.
+    """
     icon_w, icon_h = icon.size
 
     total_stroke = outer_black + gold + inner_black
@@ -190,29 +220,23 @@ def add_stroked_icon(base_img, icon, x, y, outer_black=3, gold=3, inner_black=3)
         return offsets
 
     alpha = icon.split()[3]
+    black_icon = Image.new('RGBA', (icon_w, icon_h), (0, 0, 0, 255))
+    black_icon.putalpha(alpha)
+    gold_icon = Image.new('RGBA', (icon_w, icon_h), DASHBOARD_COLORS["gold"] + (255,))
+    gold_icon.putalpha(alpha)
 
-    # Layer 1: Outer black stroke
-    outer_offsets = get_offsets(total_stroke)
-    for dx, dy in outer_offsets:
-        black_icon = Image.new('RGBA', (icon_w, icon_h), (0, 0, 0, 255))
-        black_icon.putalpha(alpha)
-        stroked.paste(black_icon, (padding + dx, padding + dy), black_icon)
-
-    # Layer 2: Gold stroke
-    gold_offsets = get_offsets(gold + inner_black)
-    for dx, dy in gold_offsets:
-        gold_icon = Image.new('RGBA', (icon_w, icon_h), DASHBOARD_COLORS["gold"] + (255,))
-        gold_icon.putalpha(alpha)
-        stroked.paste(gold_icon, (padding + dx, padding + dy), gold_icon)
-
-    # Layer 3: Inner black stroke
-    inner_offsets = get_offsets(inner_black)
-    for dx, dy in inner_offsets:
-        black_icon = Image.new('RGBA', (icon_w, icon_h), (0, 0, 0, 255))
-        black_icon.putalpha(alpha)
-        stroked.paste(black_icon, (padding + dx, padding + dy), black_icon)
+    # Layer 1: Outer black stroke, Layer 2: Gold stroke, Layer 3: Inner black stroke
+    for layer, radius in ((black_icon, total_stroke), (gold_icon, gold + inner_black), (black_icon, inner_black)):
+        for dx, dy in get_offsets(radius):
+            stroked.paste(layer, (padding + dx, padding + dy), layer)
 
     stroked.paste(icon, (padding, padding), icon)
+    return stroked, padding
+
+
+def add_stroked_icon(base_img, icon, x, y, outer_black=3, gold=3, inner_black=3):
+    """Add a class icon with a triple-layer stroke/outline effect following the icon's shape."""
+    stroked, padding = stroke_icon(icon, outer_black, gold, inner_black)
     base_img.paste(stroked, (x - padding, y - padding), stroked)
 
 
@@ -231,193 +255,276 @@ def draw_winrate_bar(draw, x, y, width, height, winrate):
         draw.rectangle([x, y, x + fill_width, y + height], fill=color)
 
 
-def generate_dashboard_image(user_name, played_craft, winrate_dict):
+class DashboardRenderer:
     """
-    Generate a Shadowverse win rate dashboard image.
+    Shadowverse win rate dashboard renderer with a pre-composited static layer.
 
-    Returns BytesIO object containing PNG image, or None if PIL is not available.
+    Everything that doesn't depend on the user or their stats (gradient, border,
+    dividers, stroked matchup icons, craft names, brick header, total label) is
+    drawn once into a template. Each render copies the template and draws only
+    the name, title, bars and numbers.
     """
-    if not PIL_AVAILABLE:
-        return None
-
-    global _icon_cache
-    if _icon_cache is None:
-        _icon_cache = IconCache()
 
     width, height = 1600, 900
-
-    # Create gradient background
-    img = create_gradient(width, height, DASHBOARD_COLORS["bg_top"], DASHBOARD_COLORS["bg_bottom"])
-    draw = ImageDraw.Draw(img)
-
-    # Draw octagonal border
-    draw_octagonal_border(draw, width, height, inset=10, corner_cut=30, color=DASHBOARD_COLORS["gold"], thickness=3)
-
-    # Load fonts
-    font_header = load_dashboard_font(56, bold=True)
-    font_title = load_dashboard_font(48, bold=True)
-    font_normal = load_dashboard_font(36, bold=False)
-    font_stats = load_dashboard_font(32, bold=False)
-
-    # Calculate totals
-    total_wins = sum(v["wins"] for v in winrate_dict.values())
-    total_losses = sum(v["losses"] for v in winrate_dict.values())
-    total_bricks = sum(v["bricks"] for v in winrate_dict.values())
-    total_games = total_wins + total_losses
-    total_winrate = (total_wins / total_games * 100) if total_games > 0 else 0
-
-    # Layout constants
     content_x = 60
-    y = 30
-
-    # Draw header: User Name
-    draw.text((content_x, y - 5), user_name, fill=DASHBOARD_COLORS["white"], font=font_header)
-    y += 80
-
-    # Draw title: [icon] Craft Name Win Rate
-    class_icon = _icon_cache.get_class_icon(played_craft, size=(60, 67))
-    title_icon_height = 67
-    add_stroked_icon(img, class_icon, content_x, y)
-
-    title_text = f"{played_craft} Win Rate"
-    title_center = y + title_icon_height // 2
-    bbox = draw.textbbox((0, 0), title_text, font=font_title)
-    text_height = bbox[3] - bbox[1]
-    title_y = title_center - text_height // 2 - 10
-    draw.text((content_x + 80, title_y), title_text, fill=DASHBOARD_COLORS["white"], font=font_title)
-    y += 85
-
-    # Draw first divider
-    divider_left = content_x
-    divider_right = width - 60
-    draw.line([(divider_left, y), (divider_right, y)], fill=DASHBOARD_COLORS["gold"], width=3)
-    y += 30
-
-    # Draw matchup rows
+    title_y = 110           # Title row (icon top)
+    divider_y = 195         # Divider under the title
+    rows_y = 225            # First matchup row (icon top)
+    row_height = 78
     bar_width = 650
     bar_height = 28
-    row_height = 78
 
-    # Draw brick icon header
-    brick_icon = _icon_cache.get_brick_icon(size=(48, 48))
-    brick_column_x = width - 180
-    img.paste(brick_icon, (brick_column_x + 5, y - 90), brick_icon)
+    def __init__(self, icons=None):
+        """
+        :param icons: IconCache to load icons from (default: a new one)
+        """
+        self.icons = icons or IconCache()
+        self.brick_column_x = self.width - 180
+        self.total_y = self.rows_y + self.row_height * len(CRAFTS) + 10 + 30
+        self._template = None
+
+    @property
+    def template(self):
+        """The static layer, composited on first use."""
+        if self._template is None:
+            self._template = self._build_template()
+        return self._template
+
+    def _fonts(self):
+        return (
+            load_dashboard_font(56, bold=True),
+            load_dashboard_font(48, bold=True),
+            load_dashboard_font(36, bold=False),
+            load_dashboard_font(32, bold=False),
+        )
 
-    for craft in CRAFTS:
-        stats = winrate_dict.get(craft, {"wins": 0, "losses": 0, "bricks": 0})
-        wins = stats["wins"]
-        losses = stats["losses"]
-        bricks = stats["bricks"]
-        games = wins + losses
-        winrate = (wins / games * 100) if games > 0 else 0
-
-        # Draw class icon with stroke
-        craft_icon = _icon_cache.get_class_icon(craft, size=(50, 56))
-        icon_height = 56
-        add_stroked_icon(img, craft_icon, content_x, y)
-
-        # Calculate vertical center of the row
-        row_center = y + icon_height // 2 - 10
-
-        # Draw craft name
-        craft_x = content_x + 70
-        bbox = draw.textbbox((0, 0), craft, font=font_normal)
+    def _build_template(self):
+        _, _, font_normal, _ = self._fonts()
+        img = create_gradient(self.width, self.height, DASHBOARD_COLORS["bg_top"], DASHBOARD_COLORS["bg_bottom"])
+        draw = ImageDraw.Draw(img)
+        draw_octagonal_border(draw, self.width, self.height, inset=10, corner_cut=30,
+                              color=DASHBOARD_COLORS["gold"], thickness=3)
+
+        # Dividers under the title and above the total row
+        for y in (self.divider_y, self.total_y - 30):
+            draw.line([(self.content_x, y), (self.width - 60, y)], fill=DASHBOARD_COLORS["gold"], width=3)
+
+        # Brick icon header
+        brick_icon = self.icons.get_brick_icon(size=(48, 48))
+        img.paste(brick_icon, (self.brick_column_x + 5, self.rows_y - 90), brick_icon)
+
+        # Matchup icons and craft names
+        for i, craft in enumerate(CRAFTS):
+            y = self.rows_y + i * self.row_height
+            stroked, padding = self.icons.get_stroked_class_icon(craft, size=(50, 56))
+            img.paste(stroked, (self.content_x - padding, y - padding), stroked)
+
+            row_center = y + 56 // 2 - 10
+            bbox = draw.textbbox((0, 0), craft, font=font_normal)
+            text_height = bbox[3] - bbox[1]
+            draw.text((self.content_x + 70, row_center - text_height // 2), craft,
+                      fill=DASHBOARD_COLORS["white"], font=font_normal)
+
+        # Total label
+        total_row_center = self.total_y + 56 // 2 - 10
+        total_label = "Total Win Rate"
+        bbox = draw.textbbox((0, 0), total_label, font=font_normal)
         text_height = bbox[3] - bbox[1]
-        craft_y = row_center - text_height // 2
-        draw.text((craft_x, craft_y), craft, fill=DASHBOARD_COLORS["white"], font=font_normal)
+        draw.text((self.content_x, total_row_center - text_height // 2), total_label,
+                  fill=DASHBOARD_COLORS["white"], font=font_normal)
+        return img
 
-        # Draw win rate bar
-        bar_x = craft_x + 320
-        bar_y = row_center - bar_height // 2 + 12
-        draw_winrate_bar(draw, bar_x, bar_y, bar_width, bar_height, winrate)
-
-        # Draw percentage
-        percent_x = bar_x + bar_width + 20
+    def _draw_stats(self, draw, font, x, row_center, winrate, wins, losses, bricks):
+        """Percentage, W/L counts and brick count of one row, starting at the percentage column."""
         percent_text = f"{winrate:.1f}%"
-        bbox = draw.textbbox((0, 0), percent_text, font=font_stats)
+        bbox = draw.textbbox((0, 0), percent_text, font=font)
         text_height = bbox[3] - bbox[1]
-        percent_y = row_center - text_height // 2
-        draw.text((percent_x, percent_y), percent_text, fill=DASHBOARD_COLORS["white"], font=font_stats)
+        draw.text((x, row_center - text_height // 2), percent_text, fill=DASHBOARD_COLORS["white"], font=font)
 
-        # Draw win/loss counts
-        wl_x = percent_x + 140
+        wl_x = x + 140
         win_text = f"{wins}W"
-        loss_text = f"{losses}L"
-        bbox = draw.textbbox((0, 0), win_text, font=font_stats)
+        bbox = draw.textbbox((0, 0), win_text, font=font)
         text_height = bbox[3] - bbox[1]
         wl_y = row_center - text_height // 2
-        draw.text((wl_x, wl_y), win_text, fill=DASHBOARD_COLORS["green"], font=font_stats)
-        draw.text((wl_x + 85, wl_y), "/", fill=DASHBOARD_COLORS["white"], font=font_stats)
-        draw.text((wl_x + 105, wl_y), loss_text, fill=DASHBOARD_COLORS["red"], font=font_stats)
+        draw.text((wl_x, wl_y), win_text, fill=DASHBOARD_COLORS["green"], font=font)
+        draw.text((wl_x + 85, wl_y), "/", fill=DASHBOARD_COLORS["white"], font=font)
+        draw.text((wl_x + 105, wl_y), f"{losses}L", fill=DASHBOARD_COLORS["red"], font=font)
 
-        # Draw brick count
         brick_text = str(bricks)
-        bbox = draw.textbbox((0, 0), brick_text, font=font_stats)
+        bbox = draw.textbbox((0, 0), brick_text, font=font)
+        text_height = bbox[3] - bbox[1]
+        draw.text((self.brick_column_x + 20, row_center - text_height // 2), brick_text,
+                  fill=DASHBOARD_COLORS["white"], font=font)
+
+    def render(self, user_name, played_craft, winrate_dict):
+        """
+        Render a dashboard onto a copy of the template.
+
+        :param user_name: Display name for the header
+        :param played_craft: Craft the stats are for
+        :param winrate_dict: {opponent_craft: {"wins", "losses", "bricks"}}
+        :return: PIL Image
+        """
+        font_header, font_title, _, font_stats = self._fonts()
+        img = self.template.copy()
+        draw = ImageDraw.Draw(img)
+
+        # Header: User Name
+        draw.text((self.content_x, 25), user_name, fill=DASHBOARD_COLORS["white"], font=font_header)
+
+        # Title: [icon] Craft Name Win Rate
+        stroked, padding = self.icons.get_stroked_class_icon(played_craft, size=(60, 67))
+        img.paste(stroked, (self.content_x - padding, self.title_y - padding), stroked)
+        title_text = f"{played_craft} Win Rate"
+        bbox = draw.textbbox((0, 0), title_text, font=font_title)
         text_height = bbox[3] - bbox[1]
-        brick_y = row_center - text_height // 2
-        draw.text((brick_column_x + 20, brick_y), brick_text, fill=DASHBOARD_COLORS["white"], font=font_stats)
-
-        y += row_height
-
-    # Draw second divider
-    y += 10
-    draw.line([(divider_left, y), (divider_right, y)], fill=DASHBOARD_COLORS["gold"], width=3)
-    y += 30
-
-    # Draw total row
-    total_row_center = y + 56 // 2 - 10
-
-    # Draw total label
-    total_label = "Total Win Rate"
-    bbox = draw.textbbox((0, 0), total_label, font=font_normal)
-    text_height = bbox[3] - bbox[1]
-    total_label_y = total_row_center - text_height // 2
-    draw.text((content_x, total_label_y), total_label, fill=DASHBOARD_COLORS["white"], font=font_normal)
-
-    # Draw total win rate bar
-    total_bar_x = content_x + 390
-    total_bar_y = total_row_center - bar_height // 2 + 10
-    draw_winrate_bar(draw, total_bar_x, total_bar_y, bar_width, bar_height, total_winrate)
-
-    # Draw total percentage
-    total_percent_x = total_bar_x + bar_width + 20
-    total_percent_text = f"{total_winrate:.1f}%"
-    bbox = draw.textbbox((0, 0), total_percent_text, font=font_stats)
-    text_height = bbox[3] - bbox[1]
-    total_percent_y = total_row_center - text_height // 2
-    draw.text((total_percent_x, total_percent_y), total_percent_text, fill=DASHBOARD_COLORS["white"], font=font_stats)
-
-    # Draw total win/loss counts
-    total_wl_x = total_percent_x + 140
-    total_win_text = f"{total_wins}W"
-    total_loss_text = f"{total_losses}L"
-    bbox = draw.textbbox((0, 0), total_win_text, font=font_stats)
-    text_height = bbox[3] - bbox[1]
-    total_wl_y = total_row_center - text_height // 2
-    draw.text((total_wl_x, total_wl_y), total_win_text, fill=DASHBOARD_COLORS["green"], font=font_stats)
-    draw.text((total_wl_x + 85, total_wl_y), "/", fill=DASHBOARD_COLORS["white"], font=font_stats)
-    draw.text((total_wl_x + 105, total_wl_y), total_loss_text, fill=DASHBOARD_COLORS["red"], font=font_stats)
-
-    # Draw total brick count
-    total_brick_text = str(total_bricks)
-    bbox = draw.textbbox((0, 0), total_brick_text, font=font_stats)
-    text_height = bbox[3] - bbox[1]
-    total_brick_y = total_row_center - text_height // 2
-    draw.text((brick_column_x + 20, total_brick_y), total_brick_text, fill=DASHBOARD_COLORS["white"], font=font_stats)
+        title_y = self.title_y + 67 // 2 - text_height // 2 - 10
+        draw.text((self.content_x + 80, title_y), title_text, fill=DASHBOARD_COLORS["white"], font=font_title)
+
+        bar_x = self.content_x + 70 + 320
+        for i, craft in enumerate(CRAFTS):
+            stats = winrate_dict.get(craft, {"wins": 0, "losses": 0, "bricks": 0})
+            wins, losses, bricks = stats["wins"], stats["losses"], stats["bricks"]
+            games = wins + losses
+            winrate = (wins / games * 100) if games > 0 else 0
+
+            row_center = self.rows_y + i * self.row_height + 56 // 2 - 10
+            draw_winrate_bar(draw, bar_x, row_center - self.bar_height // 2 + 12,
+                             self.bar_width, self.bar_height, winrate)
+            self._draw_stats(draw, font_stats, bar_x + self.bar_width + 20, row_center,
+                             winrate, wins, losses, bricks)
+
+        # Total row
+        total_wins = sum(v["wins"] for v in winrate_dict.values())
+        total_losses = sum(v["losses"] for v in winrate_dict.values())
+        total_bricks = sum(v["bricks"] for v in winrate_dict.values())
+        total_games = total_wins + total_losses
+        total_winrate = (total_wins / total_games * 100) if total_games > 0 else 0
+
+        total_row_center = self.total_y + 56 // 2 - 10
+        total_bar_x = self.content_x + 390
+        draw_winrate_bar(draw, total_bar_x, total_row_center - self.bar_height // 2 + 10,
+                         self.bar_width, self.bar_height, total_winrate)
+        self._draw_stats(draw, font_stats, total_bar_x + self.bar_width + 20, total_row_center,
+                         total_winrate, total_wins, total_losses, total_bricks)
+        return img
+
+
+# Dashboard image encoding: 'webp' (lossless; falls back to PNG if Pillow lacks WebP) or 'png'
+SV_DASHBOARD_FORMAT = os.getenv('SV_DASHBOARD_FORMAT', 'webp').lower()
+# zlib level 0-9 for PNG; WebP method 0-6 (0 = fastest encode)
+SV_DASHBOARD_PNG_COMPRESS_LEVEL = int(os.getenv('SV_DASHBOARD_PNG_COMPRESS_LEVEL', '6'))
+SV_DASHBOARD_WEBP_METHOD = int(os.getenv('SV_DASHBOARD_WEBP_METHOD', '0'))
+
+# Encoded dashboards kept in memory, by content digest
+DASHBOARD_IMAGE_CACHE_SIZE = 64
+_dashboard_image_cache = OrderedDict()
+
+# Rendering runs on one dedicated thread: keeps PIL off the event loop and
+# serializes access to the shared renderer and font objects
+_dashboard_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sv-dashboard")
+
+def _dashboard_encoding():
+    """Returns (PIL format, save options, file extension) for dashboard images."""
+    if SV_DASHBOARD_FORMAT == 'webp' and features.check('webp'):
+        return 'WEBP', {'lossless': True, 'method': SV_DASHBOARD_WEBP_METHOD}, 'webp'
+    return 'PNG', {'compress_level': SV_DASHBOARD_PNG_COMPRESS_LEVEL}, 'png'
+
+def generate_dashboard_image(user_name, played_craft, winrate_dict):
+    """
+    Generate a Shadowverse win rate dashboard image.
+
+    Blocking; async code should use render_dashboard_image.
+
+    Returns BytesIO object containing the encoded image (see SV_DASHBOARD_FORMAT),
+    or None if PIL is not available.
+    """
+    if not PIL_AVAILABLE:
+        return None
+
+    global _icon_cache, _dashboard_renderer
+    if _icon_cache is None:
+        _icon_cache = IconCache()
+    if _dashboard_renderer is None:
+        _dashboard_renderer = DashboardRenderer(_icon_cache)
+
+    img = _dashboard_renderer.render(user_name, played_craft, winrate_dict)
 
     # Return BytesIO
+    image_format, options, _ = _dashboard_encoding()
     buffer = BytesIO()
-    img.save(buffer, 'PNG')
+    img.save(buffer, image_format, **options)
     buffer.seek(0)
     return buffer
 
+def dashboard_image_digest(user_name, played_craft, winrate_dict, season=None):
+    """
+    SHA-256 identifying a dashboard image by everything that goes into it.
+
+    :param user_name: Name drawn in the header
+    :param played_craft: Craft the stats are for
+    :param winrate_dict: Stats per opponent craft
+    :param season: Season the stats belong to
+    :return: Hex digest
+    """
+    payload = json.dumps([user_name, played_craft, winrate_dict, season, _dashboard_encoding()],
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+async def render_dashboard_image(user_name, played_craft, winrate_dict, season=None):
+    """
+    Renders a dashboard image on the dashboard worker thread.
+
+    Identical inputs reuse the encoded image of a recent render.
+
+    :return: Tuple (image_bytes, digest, filename), or None if PIL is not available
+    """
+    if not PIL_AVAILABLE:
+        return None
+
+    digest = dashboard_image_digest(user_name, played_craft, winrate_dict, season)
+    data = _dashboard_image_cache.get(digest)
+    if data is None:
+        loop = asyncio.get_running_loop()
+        buffer = await loop.run_in_executor(
+            _dashboard_executor, generate_dashboard_image, user_name, played_craft, winrate_dict
+        )
+        data = buffer.getvalue()
+        _dashboard_image_cache[digest] = data
+        while len(_dashboard_image_cache) > DASHBOARD_IMAGE_CACHE_SIZE:
+            _dashboard_image_cache.popitem(last=False)
+    else:
+        _dashboard_image_cache.move_to_end(digest)
+    return data, digest, f"dashboard.{_dashboard_encoding()[2]}"
+
+
+# LEGACY dual-write: also keep the pre-3-table `winrates` and `matches` tables up to date.
+# Set SV_LEGACY_DUAL_WRITE=false to stop writing them; sv_legacy_cutover retires them for good.
+SV_LEGACY_DUAL_WRITE = os.getenv('SV_LEGACY_DUAL_WRITE', 'true').lower() == 'true'
+
+# Names the legacy tables are renamed to by the one-shot cutover
+LEGACY_TABLE_ARCHIVES = {
+    "winrates": "legacy_winrates_archive",
+    "matches": "legacy_matches_archive",
+}
+
+# Set by init_sv_db once the legacy tables have been archived
+_legacy_tables_retired = False
+
+def legacy_writes_enabled():
+    """
+    Whether match recording still writes the legacy winrates and matches tables.
+    """
+    return SV_LEGACY_DUAL_WRITE and not _legacy_tables_retired
 
 async def init_sv_db():
     """
     Initializes the Shadowverse database with tables for channel assignment and winrate tracking.
     Adds 'bricks' column if missing. Adds season tracking.
     Adds detailed match history table for individual match records.
+    The legacy winrates and matches tables are not recreated after the cutover.
     """
+    global _legacy_tables_retired
     async with aiosqlite.connect('shadowverse_data.db') as conn:
         await conn.execute('''
             CREATE TABLE IF NOT EXISTS channel_assignments (
@@ -425,18 +532,29 @@ async def init_sv_db():
                 channel_id TEXT
             )
         ''')
+        # Bot-wide settings (e.g. when the legacy tables were retired)
         await conn.execute('''
-            CREATE TABLE IF NOT EXISTS winrates (
-                user_id TEXT,
-                server_id TEXT,
-                played_craft TEXT,
-                opponent_craft TEXT,
-                wins INTEGER DEFAULT 0,
-                losses INTEGER DEFAULT 0,
-                bricks INTEGER DEFAULT 0,
-                PRIMARY KEY (user_id, server_id, played_craft, opponent_craft)
+            CREATE TABLE IF NOT EXISTS sv_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
             )
         ''')
+        async with conn.execute("SELECT value FROM sv_meta WHERE key='legacy_tables_retired'") as cursor:
+            _legacy_tables_retired = await cursor.fetchone() is not None
+
+        if not _legacy_tables_retired:
+            await conn.execute('''
+                CREATE TABLE IF NOT EXISTS winrates (
+                    user_id TEXT,
+                    server_id TEXT,
+                    played_craft TEXT,
+                    opponent_craft TEXT,
+                    wins INTEGER DEFAULT 0,
+                    losses INTEGER DEFAULT 0,
+                    bricks INTEGER DEFAULT 0,
+                    PRIMARY KEY (user_id, server_id, played_craft, opponent_craft)
+                )
+            ''')
         # Season configuration table
         await conn.execute('''
             CREATE TABLE IF NOT EXISTS season_config (
@@ -459,28 +577,29 @@ async def init_sv_db():
             )
         ''')
         # Detailed match history table (for individual matches with metadata)
-        # NOTE: This table will be deprecated after migration to 3-table system
-        await conn.execute('''
-            CREATE TABLE IF NOT EXISTS matches (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                server_id TEXT NOT NULL,
-                played_craft TEXT NOT NULL,
-                opponent_craft TEXT NOT NULL,
-                win INTEGER NOT NULL,
-                brick INTEGER DEFAULT 0,
-                timestamp TEXT,
-                player_points INTEGER,
-                player_point_type TEXT,
-                player_rank TEXT,
-                player_group TEXT,
-                opponent_points INTEGER,
-                opponent_point_type TEXT,
-                opponent_rank TEXT,
-                opponent_group TEXT,
-                created_at TEXT DEFAULT (datetime('now'))
-            )
-        ''')
+        # NOTE: Deprecated by the 3-table system; archived by sv_legacy_cutover
+        if not _legacy_tables_retired:
+            await conn.execute('''
+                CREATE TABLE IF NOT EXISTS matches (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    server_id TEXT NOT NULL,
+                    played_craft TEXT NOT NULL,
+                    opponent_craft TEXT NOT NULL,
+                    win INTEGER NOT NULL,
+                    brick INTEGER DEFAULT 0,
+                    timestamp TEXT,
+                    player_points INTEGER,
+                    player_point_type TEXT,
+                    player_rank TEXT,
+                    player_group TEXT,
+                    opponent_points INTEGER,
+                    opponent_point_type TEXT,
+                    opponent_rank TEXT,
+                    opponent_group TEXT,
+                    created_at TEXT DEFAULT (datetime('now'))
+                )
+            ''')
 
         # NEW: 3-Table Architecture for clean source separation
         # Discord-logged matches (simple, no metadata)
@@ -540,12 +659,115 @@ async def init_sv_db():
             )
         ''')
 
+        # Dashboard message per user (image_digest: the image currently attached
+        # to the message in channel_id)
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS dashboard_messages (
+                server_id TEXT,
+                user_id TEXT,
+                message_id TEXT,
+                image_digest TEXT,
+                channel_id TEXT,
+                PRIMARY KEY (server_id, user_id)
+            )
+        ''')
+        for column in ('image_digest', 'channel_id'):
+            try:
+                await conn.execute(f'ALTER TABLE dashboard_messages ADD COLUMN {column} TEXT')
+            except Exception:
+                pass  # Already exists
+
         # Try to add bricks column if missing (for upgrades)
-        try:
-            await conn.execute('ALTER TABLE winrates ADD COLUMN bricks INTEGER DEFAULT 0')
-        except Exception:
-            pass  # Already exists
+        if not _legacy_tables_retired:
+            try:
+                await conn.execute('ALTER TABLE winrates ADD COLUMN bricks INTEGER DEFAULT 0')
+            except Exception:
+                pass  # Already exists
+        await conn.commit()
+
+async def verify_combined_winrates(server_id=None):
+    """
+    Checks combined_winrates against aggregates recomputed from discord_matches and api_matches.
+
+    Matchups whose combined row is all zeros and that have no matches left (every match
+    was removed) count as consistent.
+
+    :param server_id: Only check this server (default: all servers)
+    :return: List of mismatch dicts with the matchup key, 'expected' and 'actual' counts as
+             (discord_wins, discord_losses, discord_bricks, api_wins, api_losses, api_bricks,
+             total_wins, total_losses, total_bricks); empty when everything matches
+    """
+    where, params = ("WHERE server_id=?", (str(server_id),)) if server_id is not None else ("", ())
+    expected = {}
+    async with aiosqlite.connect('shadowverse_data.db') as conn:
+        for offset, table in ((0, "discord_matches"), (3, "api_matches")):
+            async with conn.execute(f'''
+                SELECT user_id, server_id, played_craft, opponent_craft,
+                       SUM(win), SUM(1 - win), SUM(brick)
+                FROM {table} {where}
+                GROUP BY user_id, server_id, played_craft, opponent_craft
+            ''', params) as cursor:
+                async for row in cursor:
+                    counts = expected.setdefault(tuple(row[:4]), [0] * 9)
+                    for i, value in enumerate(row[4:]):
+                        counts[offset + i] += value or 0
+                        counts[6 + i] += value or 0
+
+        actual = {}
+        async with conn.execute(f'''
+            SELECT user_id, server_id, played_craft, opponent_craft,
+                   discord_wins, discord_losses, discord_bricks,
+                   api_wins, api_losses, api_bricks,
+                   total_wins, total_losses, total_bricks
+            FROM combined_winrates {where}
+        ''', params) as cursor:
+            async for row in cursor:
+                actual[tuple(row[:4])] = tuple(value or 0 for value in row[4:])
+
+    mismatches = []
+    for key in sorted(set(expected) | set(actual)):
+        want = tuple(expected.get(key, (0,) * 9))
+        have = actual.get(key, (0,) * 9)
+        if want != have:
+            user_id, server, played_craft, opponent_craft = key
+            mismatches.append({
+                "user_id": user_id, "server_id": server,
+                "played_craft": played_craft, "opponent_craft": opponent_craft,
+                "expected": want, "actual": have,
+            })
+    return mismatches
+
+async def retire_legacy_tables():
+    """
+    One-shot cutover from the legacy winrates and matches tables.
+
+    Verifies combined_winrates first and does nothing if it disagrees with the match
+    tables. Otherwise the legacy tables are renamed to their archive names (see
+    LEGACY_TABLE_ARCHIVES) and the cutover is recorded in sv_meta, so legacy writes
+    stop for good and init_sv_db no longer recreates them.
+
+    :return: Tuple (retired, mismatches); retired is False if verification failed or
+             the tables were already retired
+    """
+    global _legacy_tables_retired
+    await init_sv_db()
+    if _legacy_tables_retired:
+        return False, []
+
+    mismatches = await verify_combined_winrates()
+    if mismatches:
+        return False, mismatches
+
+    async with aiosqlite.connect('shadowverse_data.db') as conn:
+        for table, archive in LEGACY_TABLE_ARCHIVES.items():
+            await conn.execute(f'ALTER TABLE {table} RENAME TO {archive}')
+        await conn.execute(
+            "INSERT OR REPLACE INTO sv_meta (key, value) VALUES ('legacy_tables_retired', datetime('now'))"
+        )
         await conn.commit()
+    _legacy_tables_retired = True
+    logging.info("[SV] Legacy winrates/matches tables archived; dual-write retired")
+    return True, []
 
 BRICK_EMOJI = "<a:golden_brick:1397960479971741747>"
 
@@ -590,9 +812,9 @@ async def archive_current_season(server_id):
         await conn.execute('DELETE FROM api_matches WHERE server_id=?', (str(server_id),))
         await conn.execute('DELETE FROM combined_winrates WHERE server_id=?', (str(server_id),))
 
-        # LEGACY: Also clear old tables for backward compatibility
-        # TODO: Remove after migration is complete and verified
-        await conn.execute('DELETE FROM winrates WHERE server_id=?', (str(server_id),))
+        # LEGACY: Also clear the old winrates table while it is still written
+        if legacy_writes_enabled():
+            await conn.execute('DELETE FROM winrates WHERE server_id=?', (str(server_id),))
 
         # Increment season
         new_season = current_season + 1
@@ -640,12 +862,70 @@ async def get_available_seasons(server_id):
             seasons = [row[0] async for row in cursor]
     return seasons
 
-async def _update_combined_winrates(conn, user_id, server_id, played_craft, opponent_craft,
-                                     win, brick, source, increment=True):
+def _winrate_deltas(win, brick, increment=True):
+    """
+    Column deltas (wins, losses, bricks) for adding or removing one match.
+
+    :param win: True if win, False if loss
+    :param brick: True if bricked
+    :param increment: True to add the match, False to remove it
+    :return: Tuple of signed deltas
+    """
+    delta = 1 if increment else -1
+    return (delta if win else 0, 0 if win else delta, delta if brick else 0)
+
+async def _apply_winrate_deltas(conn, user_id, server_id, source, deltas):
+    """
+    Applies per-matchup deltas to combined_winrates (and the legacy winrates table
+    while legacy_writes_enabled()).
+
+    Each matchup costs one INSERT ... ON CONFLICT DO UPDATE per table: the row is
+    created with the (non-negative) deltas, or the deltas are added to it. Counts
+    never go below zero, so removals are the same statement with negative deltas.
+
+    :param conn: Active aiosqlite connection
+    :param user_id: Discord user ID
+    :param server_id: Discord server ID
+    :param source: 'discord' or 'api' (selects the source-specific columns)
+    :param deltas: {(played_craft, opponent_craft): (wins, losses, bricks)}, signed
     """
-    Helper function to update combined_winrates table.
+    if source not in ("discord", "api"):
+        raise ValueError(f"Invalid source: {source}. Must be 'discord' or 'api'.")
 
-    Updates the appropriate source-specific columns (discord_* or api_*) and total columns.
+    rows = [
+        (user_id, server_id, played_craft, opponent_craft, wins, losses, bricks)
+        for (played_craft, opponent_craft), (wins, losses, bricks) in deltas.items()
+    ]
+    await conn.executemany(f'''
+        INSERT INTO combined_winrates (
+            user_id, server_id, played_craft, opponent_craft,
+            {source}_wins, {source}_losses, {source}_bricks,
+            total_wins, total_losses, total_bricks
+        ) VALUES (?1, ?2, ?3, ?4, MAX(0, ?5), MAX(0, ?6), MAX(0, ?7), MAX(0, ?5), MAX(0, ?6), MAX(0, ?7))
+        ON CONFLICT(user_id, server_id, played_craft, opponent_craft) DO UPDATE SET
+            {source}_wins = MAX(0, {source}_wins + ?5),
+            {source}_losses = MAX(0, {source}_losses + ?6),
+            {source}_bricks = MAX(0, {source}_bricks + ?7),
+            total_wins = MAX(0, total_wins + ?5),
+            total_losses = MAX(0, total_losses + ?6),
+            total_bricks = MAX(0, total_bricks + ?7)
+    ''', rows)
+
+    # LEGACY: Keep the old winrates table in step until the cutover
+    if legacy_writes_enabled():
+        await conn.executemany('''
+            INSERT INTO winrates (user_id, server_id, played_craft, opponent_craft, wins, losses, bricks)
+            VALUES (?1, ?2, ?3, ?4, MAX(0, ?5), MAX(0, ?6), MAX(0, ?7))
+            ON CONFLICT(user_id, server_id, played_craft, opponent_craft) DO UPDATE SET
+                wins = MAX(0, wins + ?5),
+                losses = MAX(0, losses + ?6),
+                bricks = MAX(0, bricks + ?7)
+        ''', rows)
+
+async def _update_winrates(conn, user_id, server_id, played_craft, opponent_craft,
+                           win, brick, source, increment=True):
+    """
+    Adds or removes one match in combined_winrates (and the legacy winrates table).
 
     :param conn: Active aiosqlite connection
     :param user_id: Discord user ID
@@ -657,51 +937,9 @@ async def _update_combined_winrates(conn, user_id, server_id, played_craft, oppo
     :param source: 'discord' or 'api'
     :param increment: True to add (+1), False to subtract (-1)
     """
-    # Ensure row exists
-    await conn.execute('''
-        INSERT OR IGNORE INTO combined_winrates (
-            user_id, server_id, played_craft, opponent_craft,
-            discord_wins, discord_losses, discord_bricks,
-            api_wins, api_losses, api_bricks,
-            total_wins, total_losses, total_bricks
-        ) VALUES (?, ?, ?, ?, 0, 0, 0, 0, 0, 0, 0, 0, 0)
-    ''', (user_id, server_id, played_craft, opponent_craft))
-
-    # Determine which columns to update based on source
-    if source == "discord":
-        win_col = "discord_wins"
-        loss_col = "discord_losses"
-        brick_col = "discord_bricks"
-    elif source == "api":
-        win_col = "api_wins"
-        loss_col = "api_losses"
-        brick_col = "api_bricks"
-    else:
-        raise ValueError(f"Invalid source: {source}. Must be 'discord' or 'api'.")
-
-    delta = 1 if increment else -1
-
-    # Update source-specific win/loss columns and totals
-    if win:
-        await conn.execute(f'''
-            UPDATE combined_winrates
-            SET {win_col} = MAX(0, {win_col} + ?), total_wins = MAX(0, total_wins + ?)
-            WHERE user_id=? AND server_id=? AND played_craft=? AND opponent_craft=?
-        ''', (delta, delta, user_id, server_id, played_craft, opponent_craft))
-    else:
-        await conn.execute(f'''
-            UPDATE combined_winrates
-            SET {loss_col} = MAX(0, {loss_col} + ?), total_losses = MAX(0, total_losses + ?)
-            WHERE user_id=? AND server_id=? AND played_craft=? AND opponent_craft=?
-        ''', (delta, delta, user_id, server_id, played_craft, opponent_craft))
-
-    # Update brick columns if bricked
-    if brick:
-        await conn.execute(f'''
-            UPDATE combined_winrates
-            SET {brick_col} = MAX(0, {brick_col} + ?), total_bricks = MAX(0, total_bricks + ?)
-            WHERE user_id=? AND server_id=? AND played_craft=? AND opponent_craft=?
-        ''', (delta, delta, user_id, server_id, played_craft, opponent_craft))
+    await _apply_winrate_deltas(conn, user_id, server_id, source, {
+        (played_craft, opponent_craft): _winrate_deltas(win, brick, increment)
+    })
 
 async def record_match(user_id: str, server_id: str, played_craft: str, opponent_craft: str, win: bool, brick: bool = False,
                        source: str = "discord",
@@ -759,47 +997,99 @@ async def record_match(user_id: str, server_id: str, played_craft: str, opponent
                   opponent_points, opponent_point_type, opponent_rank, opponent_group))
             match_id = cursor.lastrowid
 
-        # Update combined_winrates table
-        await _update_combined_winrates(conn, user_id, server_id, played_craft, opponent_craft,
-                                        win, brick, source, increment=True)
-
-        # LEGACY: Also update old tables for backward compatibility during migration
-        # TODO: Remove after migration is complete and verified
-        await conn.execute('''
-            INSERT OR IGNORE INTO winrates (user_id, server_id, played_craft, opponent_craft, wins, losses, bricks)
-            VALUES (?, ?, ?, ?, 0, 0, 0)
-        ''', (user_id, server_id, played_craft, opponent_craft))
+        # Update combined_winrates (and the legacy winrates table)
+        await _update_winrates(conn, user_id, server_id, played_craft, opponent_craft,
+                               win, brick, source, increment=True)
 
-        if win:
-            await conn.execute('''
-                UPDATE winrates SET wins = wins + 1
-                WHERE user_id=? AND server_id=? AND played_craft=? AND opponent_craft=?
-            ''', (user_id, server_id, played_craft, opponent_craft))
-        else:
+        # LEGACY: Also insert into old matches table until the cutover
+        if legacy_writes_enabled():
             await conn.execute('''
-                UPDATE winrates SET losses = losses + 1
-                WHERE user_id=? AND server_id=? AND played_craft=? AND opponent_craft=?
-            ''', (user_id, server_id, played_craft, opponent_craft))
+                INSERT INTO matches (
+                    user_id, server_id, played_craft, opponent_craft, win, brick,
+                    timestamp, player_points, player_point_type, player_rank, player_group,
+                    opponent_points, opponent_point_type, opponent_rank, opponent_group
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (user_id, server_id, played_craft, opponent_craft, int(win), int(brick),
+                  timestamp, player_points, player_point_type, player_rank, player_group,
+                  opponent_points, opponent_point_type, opponent_rank, opponent_group))
 
-        if brick:
-            await conn.execute('''
-                UPDATE winrates SET bricks = bricks + 1
-                WHERE user_id=? AND server_id=? AND played_craft=? AND opponent_craft=?
-            ''', (user_id, server_id, played_craft, opponent_craft))
+        await conn.commit()
+        return match_id
 
-        # LEGACY: Also insert into old matches table
-        await conn.execute('''
-            INSERT INTO matches (
-                user_id, server_id, played_craft, opponent_craft, win, brick,
-                timestamp, player_points, player_point_type, player_rank, player_group,
-                opponent_points, opponent_point_type, opponent_rank, opponent_group
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (user_id, server_id, played_craft, opponent_craft, int(win), int(brick),
-              timestamp, player_points, player_point_type, player_rank, player_group,
-              opponent_points, opponent_point_type, opponent_rank, opponent_group))
+async def record_matches_bulk(user_id: str, server_id: str, matches, source: str = "api"):
+    """
+    Records a batch of matches for one user in a single transaction.
+
+    Rows are inserted with executemany, and the winrate aggregates are
+    pre-aggregated per (played_craft, opponent_craft) so each matchup costs one
+    UPSERT per table, however many matches it appears in. The whole batch is
+    one commit; nothing is recorded if any part fails.
+
+    :param user_id: Discord user ID
+    :param server_id: Discord server ID
+    :param matches: Dicts with played_craft, opponent_craft, win, brick and (for API
+                    matches) the optional metadata keys accepted by record_match
+    :param source: Match source - "discord" or "api" (default: "api")
+    :return: Match IDs from the appropriate table, in input order
+    """
+    matches = list(matches)
+    if not matches:
+        return []
+
+    if source not in ("discord", "api"):
+        raise ValueError(f"Invalid source: {source}. Must be 'discord' or 'api'.")
+
+    metadata_keys = ('timestamp', 'player_points', 'player_point_type', 'player_rank', 'player_group',
+                     'opponent_points', 'opponent_point_type', 'opponent_rank', 'opponent_group')
+    rows = []
+    deltas = {}
+    for match in matches:
+        played_craft, opponent_craft = match['played_craft'], match['opponent_craft']
+        if played_craft not in CRAFTS or opponent_craft not in CRAFTS:
+            raise ValueError("Invalid craft name.")
+        win, brick = bool(match['win']), bool(match.get('brick', False))
+        rows.append((user_id, server_id, played_craft, opponent_craft, int(win), int(brick),
+                     *(match.get(key) for key in metadata_keys)))
+
+        total = deltas.get((played_craft, opponent_craft), (0, 0, 0))
+        deltas[(played_craft, opponent_craft)] = tuple(
+            count + delta for count, delta in zip(total, _winrate_deltas(win, brick))
+        )
+
+    async with aiosqlite.connect('shadowverse_data.db') as conn:
+        if source == "discord":
+            await conn.executemany('''
+                INSERT INTO discord_matches (
+                    user_id, server_id, played_craft, opponent_craft, win, brick
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            ''', [row[:6] for row in rows])
+        else:
+            await conn.executemany('''
+                INSERT INTO api_matches (
+                    user_id, server_id, played_craft, opponent_craft, win, brick,
+                    timestamp, player_points, player_point_type, player_rank, player_group,
+                    opponent_points, opponent_point_type, opponent_rank, opponent_group
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+        # AUTOINCREMENT IDs within one write transaction are consecutive
+        async with conn.execute("SELECT last_insert_rowid()") as cursor:
+            last_id = (await cursor.fetchone())[0]
+        match_ids = list(range(last_id - len(rows) + 1, last_id + 1))
+
+        await _apply_winrate_deltas(conn, user_id, server_id, source, deltas)
+
+        # LEGACY: Also insert into old matches table until the cutover
+        if legacy_writes_enabled():
+            await conn.executemany('''
+                INSERT INTO matches (
+                    user_id, server_id, played_craft, opponent_craft, win, brick,
+                    timestamp, player_points, player_point_type, player_rank, player_group,
+                    opponent_points, opponent_point_type, opponent_rank, opponent_group
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
 
         await conn.commit()
-        return match_id
+    return match_ids
 
 def parse_sv_input(text):
     parts = text.strip().lower().split()
@@ -831,17 +1121,20 @@ async def get_sv_channel_id(server_id):
             row = await cursor.fetchone()
     return int(row[0]) if row else None
 
-async def set_dashboard_message_id(server_id, user_id, message_id):
+async def set_dashboard_message_id(server_id, user_id, message_id, image_digest=None, channel_id=None):
     """
     Sets or removes the dashboard message ID for a user in a server.
     If message_id is None, removes the entry.
+    image_digest records which dashboard image the message carries, and
+    channel_id the channel it was posted in.
     """
     async with aiosqlite.connect('shadowverse_data.db') as conn:
         if message_id is not None:
             await conn.execute('''
-                INSERT OR REPLACE INTO dashboard_messages (server_id, user_id, message_id)
-                VALUES (?, ?, ?)
-            ''', (str(server_id), str(user_id), str(message_id)))
+                INSERT OR REPLACE INTO dashboard_messages (server_id, user_id, message_id, image_digest, channel_id)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (str(server_id), str(user_id), str(message_id), image_digest,
+                  str(channel_id) if channel_id is not None else None))
         else:
             await conn.execute('DELETE FROM dashboard_messages WHERE server_id=? AND user_id=?', (str(server_id), str(user_id)))
         await conn.commit()
@@ -856,6 +1149,8 @@ async def get_dashboard_message_id(server_id, user_id):
                 server_id TEXT,
                 user_id TEXT,
                 message_id TEXT,
+                image_digest TEXT,
+                channel_id TEXT,
                 PRIMARY KEY (server_id, user_id)
             )
         ''')
@@ -865,6 +1160,33 @@ async def get_dashboard_message_id(server_id, user_id):
         return int(row[0])
     return None
 
+async def get_dashboard_image_digest(server_id, user_id, channel_id):
+    """
+    Returns the digest of the image on a user's dashboard message in channel_id,
+    or None if unknown or the message was posted in another channel.
+    """
+    async with aiosqlite.connect('shadowverse_data.db') as conn:
+        async with conn.execute(
+            'SELECT image_digest FROM dashboard_messages WHERE server_id=? AND user_id=? AND channel_id=?',
+            (str(server_id), str(user_id), str(channel_id))
+        ) as cursor:
+            row = await cursor.fetchone()
+    return row[0] if row else None
+
+async def set_dashboard_image_digest(server_id, user_id, message_id, image_digest, channel_id=None):
+    """
+    Records the image now attached to a dashboard message in channel_id.
+    Pass image_digest=None to forget it. No-op if message_id is not the
+    user's current dashboard message.
+    """
+    async with aiosqlite.connect('shadowverse_data.db') as conn:
+        await conn.execute('''
+            UPDATE dashboard_messages SET image_digest=?, channel_id=?
+            WHERE server_id=? AND user_id=? AND message_id=?
+        ''', (image_digest, str(channel_id) if channel_id is not None else None,
+              str(server_id), str(user_id), str(message_id)))
+        await conn.commit()
+
 async def refresh_all_dashboards():
     """
     Refresh all Shadowverse dashboards across all servers.
@@ -908,21 +1230,30 @@ async def update_dashboard_message(member, channel):
     msg_id = await get_dashboard_message_id(channel.guild.id, member.id)
 
     # Try to generate image, fall back to embed if PIL is not available
-    image_buffer = generate_dashboard_image(member.display_name, craft, winrate_dict)
+    season = await get_current_season(channel.guild.id)
+    rendered = await render_dashboard_image(member.display_name, craft, winrate_dict, season)
 
-    if image_buffer:
+    if rendered:
         # Use image-based dashboard
-        file = discord.File(fp=image_buffer, filename="dashboard.png")
-
+        image_bytes, digest, filename = rendered
         if msg_id:
             try:
-                msg = await channel.fetch_message(msg_id)
-                await msg.edit(attachments=[file], view=view)
+                if digest == await get_dashboard_image_digest(channel.guild.id, member.id, channel.id):
+                    # The message already shows this exact image; only the view
+                    # (craft buttons, 180 s timeout) needs replacing
+                    await discord_rest.edit(channel, msg_id, view=view)
+                else:
+                    await discord_rest.edit(channel, msg_id, attachments=[discord.File(fp=BytesIO(image_bytes), filename=filename)], view=view)
+                    await set_dashboard_image_digest(channel.guild.id, member.id, msg_id, digest, channel_id=channel.id)
                 return
+            except discord.NotFound:
+                # Deleted or posted elsewhere; don't let a stale digest skip the next refresh
+                await set_dashboard_image_digest(channel.guild.id, member.id, msg_id, None)
             except Exception:
                 pass
-        msg = await channel.send(file=file, view=view)
-        await set_dashboard_message_id(channel.guild.id, member.id, msg.id)
+        file = discord.File(fp=BytesIO(image_bytes), filename=filename)
+        msg = await discord_rest.send(channel, file=file, view=view, priority=RestPriority.DASHBOARD)
+        await set_dashboard_message_id(channel.guild.id, member.id, msg.id, image_digest=digest, channel_id=channel.id)
     else:
         # Fall back to embed-based dashboard
         title, desc = craft_winrate_summary(member, craft, winrate_dict)
@@ -930,12 +1261,11 @@ async def update_dashboard_message(member, channel):
 
         if msg_id:
             try:
-                msg = await channel.fetch_message(msg_id)
-                await msg.edit(embed=embed, view=view)
+                await discord_rest.edit(channel, msg_id, embed=embed, view=view)
                 return
             except Exception:
                 pass
-        msg = await channel.send(embed=embed, view=view)
+        msg = await discord_rest.send(channel, embed=embed, view=view, priority=RestPriority.DASHBOARD)
         await set_dashboard_message_id(channel.guild.id, member.id, msg.id)
 
 async def get_user_played_crafts(user_id, server_id):
@@ -1046,13 +1376,12 @@ async def update_streak_dashboard(member, channel, streak_data):
         )
     embed = Embed(title=f"{member.display_name}'s Streak", description=desc, color=0xf1c40f)
     # Send or update streak dashboard message
-    msg = await channel.send(embed=embed)
+    msg = await discord_rest.send(channel, embed=embed, priority=RestPriority.DASHBOARD)
     return msg.id
 
 async def delete_streak_dashboard(channel, message_id):
     try:
-        msg = await channel.fetch_message(message_id)
-        await msg.delete()
+        await discord_rest.delete(channel, message_id)
     except Exception:
         pass
 
@@ -1079,8 +1408,14 @@ async def export_sv_db_command(message):
                 async for row in cursor:
                     output.write(f"{row[0]}\t{row[1]}\n")
             # Export winrates
-            output.write("\n# winrates\n")
-            async with conn.execute('SELECT user_id, server_id, played_craft, opponent_craft, wins, losses, bricks FROM winrates') as cursor:
+            output.write("\n# combined_winrates\n")
+            async with conn.execute('''
+                SELECT user_id, server_id, played_craft, opponent_craft,
+                       discord_wins, discord_losses, discord_bricks,
+                       api_wins, api_losses, api_bricks,
+                       total_wins, total_losses, total_bricks
+                FROM combined_winrates
+            ''') as cursor:
                 async for row in cursor:
                     output.write("\t".join(map(str, row)) + "\n")
             # Export dashboard messages
@@ -1157,22 +1492,27 @@ class CraftDashboardView(ui.View):
                 logging.info(f"[CraftCallback:{craft}] FETCHING DATA | Craft: {craft} | Season: {self.season}")
                 if self.season is None:
                     winrate_dict = await get_winrate(str(self.user.id), str(self.server_id), craft)
-                    current_season = await get_current_season(self.server_id)
-                    season_text = f" (Season {current_season})"
+                    season = await get_current_season(self.server_id)
+                    season_text = f" (Season {season})"
                 else:
                     winrate_dict = await get_archived_winrate(str(self.user.id), str(self.server_id), craft, self.season)
+                    season = self.season
                     season_text = f" (Season {self.season} - Archived)"
                 logging.info(f"[CraftCallback:{craft}] DATA FETCHED | Interaction: {interaction.id}")
 
                 logging.info(f"[CraftCallback:{craft}] GENERATING IMAGE | Craft: {craft}")
                 user_name = self.user.display_name + season_text
-                image_buffer = generate_dashboard_image(user_name, craft, winrate_dict)
-                logging.info(f"[CraftCallback:{craft}] IMAGE GENERATED | Has buffer: {image_buffer is not None} | Interaction: {interaction.id}")
+                rendered = await render_dashboard_image(user_name, craft, winrate_dict, season)
+                logging.info(f"[CraftCallback:{craft}] IMAGE GENERATED | Has image: {rendered is not None} | Interaction: {interaction.id}")
 
-                logging.info(f"[CraftCallback:{craft}] SENDING RESPONSE | Has image: {image_buffer is not None} | Interaction: {interaction.id}")
-                if image_buffer:
-                    file = discord.File(fp=image_buffer, filename="dashboard.png")
+                logging.info(f"[CraftCallback:{craft}] SENDING RESPONSE | Has image: {rendered is not None} | Interaction: {interaction.id}")
+                if rendered:
+                    image_bytes, digest, filename = rendered
+                    file = discord.File(fp=BytesIO(image_bytes), filename=filename)
                     await interaction.edit_original_response(attachments=[file], view=CraftDashboardView(self.user, self.server_id, self.crafts, self.page, self.season))
+                    if interaction.message:
+                        # Keep update_dashboard_message from skipping an edit this one made stale
+                        await set_dashboard_image_digest(self.server_id, self.user.id, interaction.message.id, digest, channel_id=interaction.channel_id)
                 else:
                     title, desc = craft_winrate_summary(self.user, craft, winrate_dict)
                     title += season_text
@@ -1300,38 +1640,12 @@ async def remove_match(user_id: str, server_id: str, played_craft: str, opponent
         # Delete from discord_matches
         await conn.execute('DELETE FROM discord_matches WHERE id=?', (match_id,))
 
-        # Update combined_winrates (decrement Discord stats)
-        await _update_combined_winrates(
+        # Update combined_winrates and legacy winrates (decrement Discord stats)
+        await _update_winrates(
             conn, user_id, server_id, played_craft, opponent_craft,
             win, bool(match_brick), source="discord", increment=False
         )
 
-        # LEGACY: Also update old winrates table for backward compatibility
-        # TODO: Remove after migration is complete and verified
-        async with conn.execute('''
-            SELECT wins, losses, bricks FROM winrates
-            WHERE user_id=? AND server_id=? AND played_craft=? AND opponent_craft=?
-        ''', (user_id, server_id, played_craft, opponent_craft)) as cursor:
-            legacy_row = await cursor.fetchone()
-
-        if legacy_row:
-            wins, losses, bricks_count = legacy_row
-            if win and wins > 0:
-                await conn.execute('''
-                    UPDATE winrates SET wins = wins - 1
-                    WHERE user_id=? AND server_id=? AND played_craft=? AND opponent_craft=?
-                ''', (user_id, server_id, played_craft, opponent_craft))
-            elif not win and losses > 0:
-                await conn.execute('''
-                    UPDATE winrates SET losses = losses - 1
-                    WHERE user_id=? AND server_id=? AND played_craft=? AND opponent_craft=?
-                ''', (user_id, server_id, played_craft, opponent_craft))
-            if match_brick and bricks_count > 0:
-                await conn.execute('''
-                    UPDATE winrates SET bricks = bricks - 1
-                    WHERE user_id=? AND server_id=? AND played_craft=? AND opponent_craft=?
-                ''', (user_id, server_id, played_craft, opponent_craft))
-
         await conn.commit()
         return True
 
@@ -1372,31 +1686,12 @@ async def remove_match_by_id(match_id: int, user_id: str):
         # Delete from api_matches
         await conn.execute('DELETE FROM api_matches WHERE id = ?', (match_id,))
 
-        # Update combined_winrates (decrement API stats)
-        await _update_combined_winrates(
+        # Update combined_winrates and legacy winrates (decrement API stats)
+        await _update_winrates(
             conn, match_user_id, server_id, played_craft, opponent_craft,
             bool(win), bool(brick), source="api", increment=False
         )
 
-        # LEGACY: Also update old winrates table for backward compatibility
-        # TODO: Remove after migration is complete and verified
-        if win:
-            await conn.execute('''
-                UPDATE winrates SET wins = wins - 1
-                WHERE user_id=? AND server_id=? AND played_craft=? AND opponent_craft=? AND wins > 0
-            ''', (match_user_id, server_id, played_craft, opponent_craft))
-        else:
-            await conn.execute('''
-                UPDATE winrates SET losses = losses - 1
-                WHERE user_id=? AND server_id=? AND played_craft=? AND opponent_craft=? AND losses > 0
-            ''', (match_user_id, server_id, played_craft, opponent_craft))
-
-        if brick:
-            await conn.execute('''
-                UPDATE winrates SET bricks = bricks - 1
-                WHERE user_id=? AND server_id=? AND played_craft=? AND opponent_craft=? AND bricks > 0
-            ''', (match_user_id, server_id, played_craft, opponent_craft))
-
         await conn.commit()
 
         match_data = {
@@ -2199,4 +2494,47 @@ async def sv_recreate_archive(ctx, season: int):
         f"📁 Channel: {archive_channel.mention}\n"
         f"📦 Season {season}: {archived_count} records\n"
         f"👥 Users: {user_count}"
-    )
\ No newline at end of file
+    )
+
+
+@bot.command(name="sv_legacy_cutover")
+async def sv_legacy_cutover(ctx, action: str = None):
+    """
+    Owner command to retire the legacy winrates/matches tables.
+    Usage: Kanami sv_legacy_cutover          (verify combined_winrates only)
+           Kanami sv_legacy_cutover confirm  (verify, then archive the legacy tables)
+    """
+    if ctx.author.id != OWNER_USER_ID:
+        await ctx.send("Only the owner can use this command.")
+        return
+
+    await init_sv_db()
+    if _legacy_tables_retired:
+        await ctx.send("✅ Legacy tables are already archived; only the 3-table architecture is written.")
+        return
+
+    if action != "confirm":
+        mismatches = await verify_combined_winrates()
+        if not mismatches:
+            await ctx.send(
+                "✅ combined_winrates matches discord_matches + api_matches.\n"
+                "Run `Kanami sv_legacy_cutover confirm` to archive the legacy tables."
+            )
+            return
+    else:
+        retired, mismatches = await retire_legacy_tables()
+        if retired:
+            await ctx.send(
+                "✅ **Legacy cutover complete**\n"
+                + "\n".join(f"• `{table}` → `{archive}`" for table, archive in LEGACY_TABLE_ARCHIVES.items())
+            )
+            return
+
+    lines = [
+        f"{m['user_id']} {m['played_craft']} vs {m['opponent_craft']}: expected {m['expected']}, found {m['actual']}"
+        for m in mismatches[:10]
+    ]
+    await ctx.send(
+        f"❌ {len(mismatches)} matchup(s) in combined_winrates disagree with the match tables; nothing was changed.\n"
+        f"```\n" + "\n".join(lines) + "\n```"
+    )
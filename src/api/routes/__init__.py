@@ -408,6 +408,7 @@ class NotificationRoutes:
     Route handlers for managing pending notifications.
 
     GET    /api/notifications           List all unsent notifications (?profile=UMA)
+    GET    /api/notifications/history   Page through delivered notifications
     PATCH  /api/notifications/{id}      Edit custom_message and/or notify_unix
     DELETE /api/notifications/{id}      Delete a single notification row
     """
@@ -435,19 +436,51 @@ class NotificationRoutes:
                 status=500,
             )
 
+    async def handle_history(self, request: web.Request) -> web.Response:
+        """
+        Page through delivered notifications, newest first.
+
+        GET /api/notifications/history?profile=UMA&limit=50&before_id=123
+
+        Returns:
+            {"success": true, "history": [...], "next_before_id": 73}
+        """
+        from notification_handler import get_notification_history
+
+        try:
+            limit = int(request.query.get("limit", 50))
+            before_id = request.query.get("before_id")
+            before_id = int(before_id) if before_id else None
+        except ValueError:
+            return web.json_response(
+                APIResponse(success=False, error="limit and before_id must be integers").to_dict(),
+                status=400,
+            )
+
+        try:
+            page = await get_notification_history(request.query.get("profile"), limit, before_id)
+            return web.json_response({"success": True, **page})
+        except Exception as e:
+            logger.error(f"Failed to list notification history: {e}")
+            return web.json_response(
+                APIResponse(success=False, error=str(e)).to_dict(),
+                status=500,
+            )
+
     async def handle_patch(self, request: web.Request) -> web.Response:
         """
-        Edit a pending notification's custom_message and/or notify_unix.
+        Edit a pending notification's custom_message, message_template and/or notify_unix.
+        Text edits re-render the stored rendered_message.
 
         PATCH /api/notifications/{id}
-        Body: {"custom_message": "...", "notify_unix": 1234567890}
+        Body: {"custom_message": "...", "message_template": "...", "notify_unix": 1234567890}
 
         Returns:
             {"success": true, "message": "Notification updated"}
         """
-        from event_manager import update_notification_message
+        from event_manager import update_notification_message, update_notification_template
         import aiosqlite
-        from notification_handler import NOTIF_DB_PATH
+        from notification_handler import NOTIF_DB_PATH, wake_notification_scheduler
 
         notif_id_str = request.match_info.get("id", "")
         try:
@@ -467,6 +500,8 @@ class NotificationRoutes:
             )
 
         try:
+            if "message_template" in data:
+                await update_notification_template(notif_id, data["message_template"] or None)
             if "custom_message" in data:
                 await update_notification_message(notif_id, data["custom_message"])
             if "notify_unix" in data:
@@ -476,9 +511,15 @@ class NotificationRoutes:
                         (int(data["notify_unix"]), notif_id),
                     )
                     await conn.commit()
+            wake_notification_scheduler()
             return web.json_response(
                 APIResponse(success=True, message="Notification updated").to_dict()
             )
+        except ValueError as e:
+            return web.json_response(
+                APIResponse(success=False, error=str(e)).to_dict(),
+                status=400,
+            )
         except Exception as e:
             logger.error(f"Failed to update notification {notif_id}: {e}")
             return web.json_response(
@@ -496,6 +537,7 @@ class NotificationRoutes:
             {"success": true, "message": "Notification deleted"}
         """
         from event_manager import remove_pending_notification
+        from notification_handler import wake_notification_scheduler
 
         notif_id_str = request.match_info.get("id", "")
         try:
@@ -508,6 +550,7 @@ class NotificationRoutes:
 
         try:
             await remove_pending_notification(notif_id)
+            wake_notification_scheduler()
             return web.json_response(
                 APIResponse(success=True, message=f"Notification {notif_id} deleted").to_dict()
             )
@@ -581,6 +624,7 @@ def setup_routes(
     # Notification routes (always registered)
     notif = notification_routes or NotificationRoutes()
     app.router.add_get('/api/notifications', notif.handle_list)
+    app.router.add_get('/api/notifications/history', notif.handle_history)
     app.router.add_patch('/api/notifications/{id}', notif.handle_patch)
     app.router.add_delete('/api/notifications/{id}', notif.handle_delete)
 
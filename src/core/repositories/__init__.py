@@ -10,6 +10,8 @@ from .event_repository import SQLiteEventRepository, ProfileEventRepository
 from .notification_repository import SQLiteNotificationRepository
 from .config_repository import SQLiteConfigRepository
 from .channel_repository import ChannelRepository
+from .event_db_registry import EventDatabaseRegistry, event_databases, register_event_database
+from .migrations import migrate_event_time_columns, EVENT_TIME_SCHEMA_VERSION
 
 __all__ = [
     # Base
@@ -24,4 +26,11 @@ __all__ = [
     'SQLiteConfigRepository',
     # Channel repository
     'ChannelRepository',
+    # Event database registry
+    'EventDatabaseRegistry',
+    'event_databases',
+    'register_event_database',
+    # Migrations
+    'migrate_event_time_columns',
+    'EVENT_TIME_SCHEMA_VERSION',
 ]
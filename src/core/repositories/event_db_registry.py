@@ -0,0 +1,112 @@
+"""
+Registry of per-game event databases.
+
+Every game module that keeps its own ``events`` table (AK, UMA, HSR and the
+generic ZZZ/STRI/WUWA modules) registers its database here. Cross-database
+maintenance such as ghost-notification cleanup attaches every registered
+database to one connection instead of keeping a hard-coded list.
+"""
+
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, List, Tuple
+
+import aiosqlite
+
+
+# SQLite refuses more than 10 attached databases by default
+MAX_ATTACHED_DATABASES = 10
+
+
+class EventDatabaseRegistry:
+    """
+    Maps a module name to the path of its events database.
+
+    Registration is idempotent, so modules can register at import time or
+    from their constructors.
+    """
+
+    def __init__(self):
+        self._databases: Dict[str, str] = {}
+
+    def register(self, name: str, db_path: str) -> None:
+        """
+        Register (or re-point) an events database.
+
+        Args:
+            name: Module/profile name (e.g. "AK", "UMA")
+            db_path: Path to the SQLite database holding an ``events`` table
+        """
+        self._databases[name.upper()] = db_path
+
+    def unregister(self, name: str) -> None:
+        """Remove a database from the registry."""
+        self._databases.pop(name.upper(), None)
+
+    def items(self) -> List[Tuple[str, str]]:
+        """Registered (name, db_path) pairs, sorted by name."""
+        return sorted(self._databases.items())
+
+    def __len__(self) -> int:
+        return len(self._databases)
+
+    def __contains__(self, name: str) -> bool:
+        return name.upper() in self._databases
+
+    @asynccontextmanager
+    async def attached(self, conn: aiosqlite.Connection):
+        """
+        ATTACH every registered database that exists and has an events table.
+
+        Usage:
+            async with registry.attached(conn) as schemas:
+                # schemas: {"AK": "evdb_0", "UMA": "evdb_1", ...}
+
+        Args:
+            conn: Open connection (typically the notification DB)
+
+        Yields:
+            Dict mapping registry name to attached schema name
+        """
+        schemas: Dict[str, str] = {}
+        try:
+            for name, db_path in self.items():
+                if len(schemas) >= MAX_ATTACHED_DATABASES:
+                    raise RuntimeError(
+                        f"More than {MAX_ATTACHED_DATABASES} event databases registered"
+                    )
+                if not os.path.exists(db_path):
+                    continue
+                schema = f"evdb_{len(schemas)}"
+                await conn.execute("ATTACH DATABASE ? AS " + schema, (db_path,))
+                async with conn.execute(
+                    f"SELECT 1 FROM {schema}.sqlite_master WHERE type='table' AND name='events'"
+                ) as cursor:
+                    has_events = await cursor.fetchone() is not None
+                if not has_events:
+                    await conn.execute(f"DETACH DATABASE {schema}")
+                    continue
+                schemas[name] = schema
+            yield schemas
+        finally:
+            for schema in schemas.values():
+                try:
+                    await conn.execute(f"DETACH DATABASE {schema}")
+                except Exception:
+                    pass
+
+
+# Process-wide registry used by the bot
+event_databases = EventDatabaseRegistry()
+
+
+def register_event_database(name: str, db_path: str) -> None:
+    """Register an events database with the process-wide registry."""
+    event_databases.register(name, db_path)
+
+
+__all__ = [
+    'EventDatabaseRegistry',
+    'event_databases',
+    'register_event_database',
+]
@@ -5,12 +5,14 @@ This module provides concrete implementation of the EventRepository interface
 for SQLite databases.
 """
 
+import asyncio
 import time
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from src.core.interfaces import EventRepository
 from src.core.models import Event
 from .base import BaseRepository, safe_int
+from .migrations import migrate_event_time_columns
 
 
 class SQLiteEventRepository(BaseRepository, EventRepository):
@@ -39,17 +41,17 @@ class SQLiteEventRepository(BaseRepository, EventRepository):
                     user_id TEXT,
                     server_id TEXT,
                     title TEXT,
-                    start_date TEXT,
-                    end_date TEXT,
+                    start_date INTEGER,
+                    end_date INTEGER,
                     image TEXT,
                     category TEXT,
                     is_hyv INTEGER DEFAULT 0,
-                    asia_start TEXT,
-                    asia_end TEXT,
-                    america_start TEXT,
-                    america_end TEXT,
-                    europe_start TEXT,
-                    europe_end TEXT,
+                    asia_start INTEGER,
+                    asia_end INTEGER,
+                    america_start INTEGER,
+                    america_end INTEGER,
+                    europe_start INTEGER,
+                    europe_end INTEGER,
                     profile TEXT
                 )
             ''')
@@ -84,6 +86,33 @@ class SQLiteEventRepository(BaseRepository, EventRepository):
             ["end_date"]
         )
 
+        # INTEGER time columns and the (server_id, profile, start/end) range indexes
+        await asyncio.to_thread(
+            migrate_event_time_columns, self.db_path, "user_data", scope=("server_id", "profile")
+        )
+
+    @staticmethod
+    def _range_scope(server_id: Optional[str], profile: Optional[str]) -> Tuple[str, list]:
+        """
+        WHERE clause pinning the (server_id, profile) prefix of the time indexes.
+
+        Time-range queries start with this clause so SQLite can serve them
+        with a range scan of ``idx_user_data_profile_start``/``_end`` for
+        every matching (server_id, profile) pair.
+
+        Returns:
+            (clause, params)
+        """
+        filters, params = [], []
+        if server_id:
+            filters.append("server_id = ?")
+            params.append(server_id)
+        if profile:
+            filters.append("profile = ?")
+            params.append(profile)
+        where = f" WHERE {' AND '.join(filters)}" if filters else ""
+        return f"(server_id, profile) IN (SELECT DISTINCT server_id, profile FROM user_data{where})", params
+
     async def create(self, event: Event) -> int:
         """
         Create a new event in the database.
@@ -197,25 +226,19 @@ class SQLiteEventRepository(BaseRepository, EventRepository):
             List of ongoing Event entities
         """
         now = int(time.time())
-        query = '''
+        scope, params = self._range_scope(server_id, profile)
+        query = f'''
             SELECT id, user_id, server_id, title, start_date, end_date, image,
                    category, is_hyv, asia_start, asia_end, america_start,
                    america_end, europe_start, europe_end, profile
             FROM user_data
-            WHERE CAST(start_date AS INTEGER) <= ?
-              AND CAST(end_date AS INTEGER) > ?
+            WHERE {scope}
+              AND end_date > ?
+              AND start_date <= ?
               AND category != 'Ended'
+            ORDER BY end_date ASC
         '''
-        params = [now, now]
-
-        if server_id:
-            query += " AND server_id = ?"
-            params.append(server_id)
-        if profile:
-            query += " AND profile = ?"
-            params.append(profile)
-
-        query += " ORDER BY CAST(end_date AS INTEGER) ASC"
+        params += [now, now]
 
         rows = await self.fetch_all(query, tuple(params))
         return [self._row_to_event(row) for row in rows]
@@ -236,24 +259,18 @@ class SQLiteEventRepository(BaseRepository, EventRepository):
             List of upcoming Event entities
         """
         now = int(time.time())
-        query = '''
+        scope, params = self._range_scope(server_id, profile)
+        query = f'''
             SELECT id, user_id, server_id, title, start_date, end_date, image,
                    category, is_hyv, asia_start, asia_end, america_start,
                    america_end, europe_start, europe_end, profile
             FROM user_data
-            WHERE CAST(start_date AS INTEGER) > ?
+            WHERE {scope}
+              AND start_date > ?
               AND category != 'Ended'
+            ORDER BY start_date ASC
         '''
-        params = [now]
-
-        if server_id:
-            query += " AND server_id = ?"
-            params.append(server_id)
-        if profile:
-            query += " AND profile = ?"
-            params.append(profile)
-
-        query += " ORDER BY CAST(start_date AS INTEGER) ASC"
+        params += [now]
 
         rows = await self.fetch_all(query, tuple(params))
         return [self._row_to_event(row) for row in rows]
@@ -339,9 +356,10 @@ class SQLiteEventRepository(BaseRepository, EventRepository):
         """
         async with self.get_connection() as conn:
             # Get IDs of expired events
+            scope, params = self._range_scope(None, None)
             async with conn.execute(
-                "SELECT id FROM user_data WHERE CAST(end_date AS INTEGER) < ?",
-                (before_timestamp,)
+                f"SELECT id FROM user_data WHERE {scope} AND end_date < ?",
+                (*params, before_timestamp)
             ) as cursor:
                 expired_ids = [row[0] async for row in cursor]
 
@@ -363,23 +381,24 @@ class SQLiteEventRepository(BaseRepository, EventRepository):
             await conn.commit()
             return cursor.rowcount
 
-    async def mark_ended(self, server_id: str) -> int:
+    async def mark_ended(self, server_id: str, current_time: Optional[int] = None) -> int:
         """
         Mark expired events as 'Ended'.
 
         Args:
             server_id: Discord server ID
+            current_time: Override current time (defaults to now)
 
         Returns:
             Number of events marked as ended
         """
-        now = int(time.time())
+        now = int(time.time()) if current_time is None else current_time
+        scope, params = self._range_scope(server_id, None)
         async with self.get_connection() as conn:
             cursor = await conn.execute(
-                '''UPDATE user_data SET category='Ended'
-                   WHERE server_id=? AND category != 'Ended'
-                   AND end_date != '' AND CAST(end_date AS INTEGER) < ?''',
-                (server_id, now)
+                f'''UPDATE user_data SET category='Ended'
+                    WHERE {scope} AND end_date < ? AND category != 'Ended' ''',
+                (*params, now)
             )
             await conn.commit()
             return cursor.rowcount
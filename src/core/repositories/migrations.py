@@ -0,0 +1,180 @@
+"""
+Versioned schema migrations for the event databases.
+
+Event times used to be declared TEXT, so range filters had to be written as
+``CAST(end_date AS INTEGER) < ?`` and no index could serve them. The
+``event_time_columns`` migration rebuilds an events table with its time
+columns declared INTEGER and adds (profile, start_date) and
+(profile, end_date) indexes, so readers can issue plain range queries.
+
+SQLite can't change a column's type in place: the table is recreated from
+its own CREATE statement with the types swapped, the rows are copied over
+and the old indexes are restored, all in one transaction. Numeric text is
+converted by the INTEGER column affinity during the copy; anything else
+(e.g. the empty strings HSR stores in unused columns) is kept as it was.
+
+Applied migrations are recorded per table in a ``schema_migrations``
+table, so running a migration again is a no-op.
+"""
+
+import logging
+import re
+import sqlite3
+import time
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger("migrations")
+
+# Bump when the event time schema changes again
+EVENT_TIME_SCHEMA_VERSION = 1
+
+# Every column that holds a UNIX timestamp in an events table
+EVENT_TIME_COLUMNS = (
+    "start_date", "end_date",
+    "asia_start", "asia_end",
+    "america_start", "america_end",
+    "europe_start", "europe_end",
+)
+
+_MIGRATIONS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        table_name TEXT NOT NULL,
+        name TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        applied_unix INTEGER,
+        PRIMARY KEY (table_name, name)
+    )
+"""
+
+
+def event_time_index_names(table: str) -> Dict[str, str]:
+    """Names of the range indexes created on ``table``, by time column."""
+    return {
+        "start_date": f"idx_{table}_profile_start",
+        "end_date": f"idx_{table}_profile_end",
+    }
+
+
+def migrate_event_time_columns(
+    db_path: str,
+    table: str,
+    *,
+    scope: Sequence[str] = ("profile",),
+    default_profile: Optional[str] = None,
+) -> bool:
+    """
+    Apply the ``event_time_columns`` migration to one table.
+
+    Blocking; call it through ``asyncio.to_thread`` from async code.
+
+    Args:
+        db_path: SQLite database file
+        table: Events table to migrate
+        scope: Leading index columns ahead of the time column; tables shared
+            by several guilds pass ("server_id", "profile")
+        default_profile: Fills empty ``profile`` values (per-game databases
+            where readers filter on their own profile)
+
+    Returns:
+        True if the migration ran, False if it was already applied or the
+        table doesn't exist yet
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            applied = _migrate_event_time_columns(conn, table, tuple(scope), default_profile)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    if applied:
+        logger.info(f"[{db_path}] {table}: event time columns are INTEGER (v{EVENT_TIME_SCHEMA_VERSION})")
+    return applied
+
+
+def _migrate_event_time_columns(conn: sqlite3.Connection, table: str, scope, default_profile) -> bool:
+    conn.execute(_MIGRATIONS_SCHEMA)
+    row = conn.execute(
+        "SELECT version FROM schema_migrations WHERE table_name=? AND name='event_time_columns'", (table,)
+    ).fetchone()
+    if row and row[0] >= EVENT_TIME_SCHEMA_VERSION:
+        return False
+
+    table_row = conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+    if table_row is None:
+        return False
+
+    columns = {info[1]: (info[2] or "").upper() for info in conn.execute(f'PRAGMA table_info("{table}")')}
+    stale = [column for column in EVENT_TIME_COLUMNS if column in columns and columns[column] != "INTEGER"]
+    if stale:
+        _rebuild_with_integer_columns(conn, table, table_row[0], list(columns), stale)
+
+    if default_profile and "profile" in columns:
+        conn.execute(
+            f"UPDATE \"{table}\" SET profile=? WHERE profile IS NULL OR profile=''", (default_profile,)
+        )
+    if all(column in columns for column in scope):
+        for column, index_name in event_time_index_names(table).items():
+            if column in columns:
+                conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS {index_name} ON "{table}" ({", ".join(scope)}, {column})'
+                )
+
+    conn.execute(
+        "INSERT OR REPLACE INTO schema_migrations (table_name, name, version, applied_unix) VALUES (?, 'event_time_columns', ?, ?)",
+        (table, EVENT_TIME_SCHEMA_VERSION, int(time.time()))
+    )
+    return True
+
+
+def _rebuild_with_integer_columns(
+    conn: sqlite3.Connection, table: str, create_sql: str, columns: List[str], stale: List[str]
+) -> None:
+    for column in stale:
+        create_sql, count = re.subn(rf"(\b{column}\s+)TEXT\b", r"\1INTEGER", create_sql, count=1, flags=re.I)
+        if not count:
+            raise RuntimeError(f"Cannot retype {table}.{column}: unexpected column declaration")
+
+    rebuilt = f"{table}__rebuild"
+    create_sql, count = re.subn(
+        rf'^\s*CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?["`\[]?{table}["`\]]?',
+        f'CREATE TABLE "{rebuilt}"',
+        create_sql,
+        count=1,
+        flags=re.I,
+    )
+    if not count:
+        raise RuntimeError(f"Cannot parse the CREATE statement of {table}")
+
+    index_sql = [
+        row[0] for row in conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL", (table,)
+        )
+    ]
+    sequence = None
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_sequence'").fetchone():
+        sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name=?", (table,)).fetchone()
+
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    conn.execute(f'DROP TABLE IF EXISTS "{rebuilt}"')
+    conn.execute(create_sql)
+    conn.execute(f'INSERT INTO "{rebuilt}" ({column_list}) SELECT {column_list} FROM "{table}"')
+    conn.execute(f'DROP TABLE "{table}"')
+    conn.execute(f'ALTER TABLE "{rebuilt}" RENAME TO "{table}"')
+    for statement in index_sql:
+        conn.execute(statement)
+    if sequence:
+        # Keep AUTOINCREMENT from reusing IDs of rows deleted before the rebuild
+        conn.execute("UPDATE sqlite_sequence SET seq=MAX(seq, ?) WHERE name=?", (sequence[0], table))
+    logger.info(f"Rebuilt {table} with INTEGER columns: {', '.join(stale)}")
+
+
+__all__ = [
+    'migrate_event_time_columns',
+    'event_time_index_names',
+    'EVENT_TIME_COLUMNS',
+    'EVENT_TIME_SCHEMA_VERSION',
+]
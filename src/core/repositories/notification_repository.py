@@ -13,6 +13,33 @@ from src.core.interfaces import NotificationRepository
 from src.core.models import Notification
 from .base import BaseRepository, safe_int
 
+# Columns copied verbatim from pending_notifications into notification_history
+NOTIFICATION_HISTORY_COLUMNS = (
+    ("category", "TEXT"), ("profile", "TEXT"), ("title", "TEXT"), ("timing_type", "TEXT"),
+    ("notify_unix", "INTEGER"), ("event_time_unix", "INTEGER"), ("region", "TEXT"),
+    ("message_template", "TEXT"), ("custom_message", "TEXT"), ("phase", "TEXT"),
+    ("character_name", "TEXT"), ("rendered_message", "TEXT"),
+)
+
+# Delivered (or given-up) notifications; pending_notifications only holds
+# future (sent=0) and in-flight (sent=2) rows
+NOTIFICATION_HISTORY_SCHEMA = (
+    f"""CREATE TABLE IF NOT EXISTS notification_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        notification_id INTEGER,
+        {', '.join(f"{column} {kind}" for column, kind in NOTIFICATION_HISTORY_COLUMNS)},
+        status TEXT,
+        delivery TEXT,
+        sent_unix INTEGER,
+        lateness REAL,
+        archived_unix INTEGER NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_notif_history_archived ON notification_history (archived_unix)",
+    "CREATE INDEX IF NOT EXISTS idx_notif_history_profile ON notification_history (profile, id)",
+    # Keeps notifications that were already sent from being scheduled again
+    "CREATE INDEX IF NOT EXISTS idx_notif_history_event ON notification_history (title, notify_unix)",
+)
+
 
 class SQLiteNotificationRepository(BaseRepository, NotificationRepository):
     """
@@ -72,6 +99,9 @@ class SQLiteNotificationRepository(BaseRepository, NotificationRepository):
                 )
             ''')
 
+            for statement in NOTIFICATION_HISTORY_SCHEMA:
+                await conn.execute(statement)
+
             await conn.commit()
 
         # Add columns if they don't exist (for schema migration)
@@ -107,6 +137,8 @@ class SQLiteNotificationRepository(BaseRepository, NotificationRepository):
             ("custom_message", "TEXT"),
             ("phase", "TEXT"),
             ("character_name", "TEXT"),
+            ("rendered_message", "TEXT"),
+            ("claimed_unix", "INTEGER"),
         ]
 
         for column_name, column_type in columns_to_add:
@@ -282,7 +314,7 @@ class SQLiteNotificationRepository(BaseRepository, NotificationRepository):
 
     async def mark_sent(self, notification_id: int) -> bool:
         """
-        Mark a notification as sent.
+        Mark a notification as sent by moving it to notification_history.
 
         Args:
             notification_id: Notification ID
@@ -290,9 +322,18 @@ class SQLiteNotificationRepository(BaseRepository, NotificationRepository):
         Returns:
             True if marked successfully, False otherwise
         """
+        columns = ", ".join(column for column, _ in NOTIFICATION_HISTORY_COLUMNS)
+        now = time.time()
         async with self.get_connection() as conn:
+            await conn.execute(
+                f"""INSERT INTO notification_history
+                        (notification_id, {columns}, status, delivery, sent_unix, lateness, archived_unix)
+                    SELECT id, {columns}, 'sent', 'service', ?, ? - notify_unix, ?
+                    FROM pending_notifications WHERE id = ?""",
+                (int(now), now, int(now), notification_id)
+            )
             cursor = await conn.execute(
-                "UPDATE pending_notifications SET sent = 1 WHERE id = ?",
+                "DELETE FROM pending_notifications WHERE id = ?",
                 (notification_id,)
             )
             await conn.commit()
@@ -8,6 +8,13 @@ This package contains the business logic layer following SOLID principles:
 - event_service: High-level event operations
 - notification_service: Notification processing and cleanup
 - validation_service: Data validation and normalization
+- deadline_scheduler: Min-heap scheduler that sleeps until the next deadline
+- notification_dispatcher: Rate-limited, coalescing delivery of due notifications
+- rest_scheduler: Priority queue and rate-limit buckets for Discord REST calls
+- orphan_sweep: Watermarked, rate-limited history sweeps for untracked messages
+- timer_wheel: Persisted, coalescing schedule of dashboard refreshes
+- refresh_coordinator: Debounced, single-flight dashboard refresh requests
+- attachment_cache: Upload-once registry of local images on Discord's CDN
 """
 
 from .timezone_service import (
@@ -43,6 +50,43 @@ from .validation_service import (
     ValidationResult,
 )
 
+from .deadline_scheduler import DeadlineScheduler
+
+from .notification_dispatcher import (
+    NotificationDispatcher,
+    OutgoingNotification,
+    DispatchResult,
+    TokenBucket,
+    coalesce_messages,
+)
+
+from .rest_scheduler import (
+    RestScheduler,
+    RestPriority,
+    RateLimitBucket,
+    discord_rest,
+    rate_limit_trace_config,
+)
+
+from .orphan_sweep import (
+    OrphanSweeper,
+    orphan_sweeper,
+    load_tracked_message_ids,
+)
+
+from .timer_wheel import (
+    TimerWheel,
+    timer_wheel,
+)
+
+from .refresh_coordinator import RefreshCoordinator
+
+from .attachment_cache import (
+    AttachmentCache,
+    PreparedImage,
+    attachment_cache,
+)
+
 
 __all__ = [
     # Timezone
@@ -66,4 +110,30 @@ __all__ = [
     'ValidationService',
     'ValidationError',
     'ValidationResult',
+    # Scheduling primitives
+    'DeadlineScheduler',
+    # Dispatch
+    'NotificationDispatcher',
+    'OutgoingNotification',
+    'DispatchResult',
+    'TokenBucket',
+    'coalesce_messages',
+    # Discord REST
+    'RestScheduler',
+    'RestPriority',
+    'RateLimitBucket',
+    'discord_rest',
+    'rate_limit_trace_config',
+    # Orphan sweeps
+    'OrphanSweeper',
+    'orphan_sweeper',
+    'load_tracked_message_ids',
+    # Dashboard refresh timers
+    'TimerWheel',
+    'timer_wheel',
+    'RefreshCoordinator',
+    # Uploaded images
+    'AttachmentCache',
+    'PreparedImage',
+    'attachment_cache',
 ]
@@ -0,0 +1,269 @@
+"""
+Attachment Cache for Gacha Timer Bot.
+
+Content-addressed registry of locally generated images already on Discord's CDN.
+
+The first time a local file is shown in an embed it is uploaded as an
+attachment, and the CDN URL Discord assigns to it is stored under the
+file's SHA-256. Later embeds of the same content reference that URL and
+upload nothing; a file is uploaded again only when its content changes.
+
+URLs are stored without their query string: the ``ex``/``is``/``hm``
+signature Discord appends expires, while the bare URL is re-signed when
+an embed references it.
+
+An attachment lives only as long as the message that carries it, so each
+entry remembers its owner message. Deleting that message, or editing it
+with new attachments, must drop the entry (``forget_message``). Messages
+can also disappear without the bot noticing, so ``prepare`` re-checks the
+owner on cache hits when given an ``owner_exists`` callback; if the owner
+is gone the file is uploaded again, and embeds still pointing at the dead
+URL pick up the new one on their next refresh.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+import aiosqlite
+import discord
+
+logger = logging.getLogger("attachment_cache")
+
+ATTACHMENT_CACHE_DB_PATH = os.path.join("data", "attachment_cache.db")
+
+# How long a confirmed owner message is trusted before it is checked again
+OWNER_CHECK_TTL = 600.0
+
+# Async callback (channel_id, message_id) -> whether the message still exists
+OwnerCheck = Callable[[str, str], Awaitable[bool]]
+
+_CACHE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS attachment_cache (
+        digest TEXT PRIMARY KEY,
+        url TEXT NOT NULL,
+        channel_id TEXT,
+        message_id TEXT,
+        uploaded_unix INTEGER
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_attachment_cache_message ON attachment_cache (message_id)",
+)
+
+
+def same_image_url(a: Optional[str], b: Optional[str]) -> bool:
+    """
+    Compare two image URLs, ignoring the query string.
+
+    Discord refreshes the signature parameters of CDN URLs, so the same
+    attachment can come back with a different query.
+    """
+    if not a or not b:
+        return a == b
+    split_a, split_b = urlsplit(a), urlsplit(b)
+    return (split_a.scheme, split_a.netloc, split_a.path) == (split_b.scheme, split_b.netloc, split_b.path)
+
+
+def unsigned_url(url: str) -> str:
+    """Strip the query string (CDN signature) and fragment from a URL."""
+    split = urlsplit(url)
+    return urlunsplit((split.scheme, split.netloc, split.path, "", ""))
+
+
+@dataclass
+class PreparedImage:
+    """
+    How to show a local image in an embed.
+
+    Attributes:
+        url: URL for ``embed.set_image`` (cached CDN URL, or ``attachment://``)
+        file: File to upload with the message, or None if the URL is cached
+        digest: SHA-256 of the file content
+    """
+    url: str
+    file: Optional[discord.File]
+    digest: str
+
+    @property
+    def cached(self) -> bool:
+        """True when no upload is needed."""
+        return self.file is None
+
+
+class AttachmentCache:
+    """
+    SHA-256 -> CDN URL registry for uploaded images.
+
+    File digests are memoized by (path, size, mtime) so a refresh doesn't
+    re-read unchanged files; hashing runs in a worker thread. Owner messages
+    confirmed by ``prepare`` are trusted for OWNER_CHECK_TTL seconds.
+    """
+
+    def __init__(self, db_path: str = ATTACHMENT_CACHE_DB_PATH):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path: SQLite database holding the ``attachment_cache`` table
+        """
+        self.db_path = db_path
+        self._digests: Dict[str, Tuple[int, int, str]] = {}
+        self._owners_checked: Dict[str, float] = {}
+        self._schema_ready = False
+
+    @asynccontextmanager
+    async def _connect(self):
+        if not self._schema_ready:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        async with aiosqlite.connect(self.db_path) as conn:
+            if not self._schema_ready:
+                for statement in _CACHE_SCHEMA:
+                    await conn.execute(statement)
+                await conn.commit()
+                self._schema_ready = True
+            yield conn
+
+    async def digest(self, path: str) -> str:
+        """SHA-256 of a file's content (memoized while the file is unchanged)."""
+        stat = os.stat(path)
+        memo = self._digests.get(path)
+        if memo and memo[:2] == (stat.st_size, stat.st_mtime_ns):
+            return memo[2]
+        digest = await asyncio.to_thread(_hash_file, path)
+        self._digests[path] = (stat.st_size, stat.st_mtime_ns, digest)
+        return digest
+
+    async def lookup(self, digest: str) -> Optional[str]:
+        """CDN URL of an uploaded file with this digest, if any."""
+        async with self._connect() as conn:
+            async with conn.execute("SELECT url FROM attachment_cache WHERE digest=?", (digest,)) as cursor:
+                row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def owner(self, digest: str) -> Optional[str]:
+        """ID of the message carrying the cached upload with this digest, if any."""
+        async with self._connect() as conn:
+            async with conn.execute("SELECT message_id FROM attachment_cache WHERE digest=?", (digest,)) as cursor:
+                row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def _entry(self, digest: str) -> Optional[Tuple[str, str, str]]:
+        async with self._connect() as conn:
+            async with conn.execute(
+                "SELECT url, channel_id, message_id FROM attachment_cache WHERE digest=?", (digest,)
+            ) as cursor:
+                return await cursor.fetchone()
+
+    async def _owner_alive(self, channel_id: str, message_id: str, owner_exists: OwnerCheck) -> bool:
+        checked = self._owners_checked.get(message_id)
+        if checked is not None and time.monotonic() - checked < OWNER_CHECK_TTL:
+            return True
+        if not await owner_exists(channel_id, message_id):
+            return False
+        self._owners_checked[message_id] = time.monotonic()
+        return True
+
+    async def prepare(self, path: str, *, owner_exists: Optional[OwnerCheck] = None) -> PreparedImage:
+        """
+        Decide whether a local image needs uploading.
+
+        Args:
+            path: Local image file
+            owner_exists: Optional async callback (channel_id, message_id)
+                confirming the message carrying a cached upload still
+                exists; if it doesn't, the entry is dropped and the file
+                is uploaded again
+
+        Returns:
+            PreparedImage; upload ``file`` with the message when it is set
+        """
+        digest = await self.digest(path)
+        entry = await self._entry(digest)
+        if entry:
+            url, channel_id, message_id = entry
+            if owner_exists is None or await self._owner_alive(channel_id, message_id, owner_exists):
+                return PreparedImage(url, None, digest)
+            logger.info(f"Owner message {message_id} of upload {digest[:12]} is gone; uploading again")
+            await self.forget_message(message_id)
+        filename = f"{digest[:16]}{os.path.splitext(path)[1] or '.png'}"
+        return PreparedImage(f"attachment://{filename}", discord.File(path, filename=filename), digest)
+
+    async def record(self, image: PreparedImage, message: Any) -> Optional[str]:
+        """
+        Store the (unsigned) CDN URL of an image uploaded with ``message``.
+
+        Entries previously owned by the message are dropped first, since
+        uploading new attachments replaced them.
+
+        Args:
+            image: The PreparedImage that was uploaded
+            message: Message returned by the send or edit
+
+        Returns:
+            The stored URL, or None if the message carried no image
+        """
+        url = None
+        embeds = getattr(message, "embeds", None) or []
+        if embeds and embeds[0].image and embeds[0].image.url and not embeds[0].image.url.startswith("attachment://"):
+            url = embeds[0].image.url
+        elif getattr(message, "attachments", None):
+            url = message.attachments[0].url
+        if url:
+            url = unsigned_url(url)
+
+        async with self._connect() as conn:
+            await conn.execute("DELETE FROM attachment_cache WHERE message_id=?", (str(message.id),))
+            if url:
+                await conn.execute(
+                    """INSERT OR REPLACE INTO attachment_cache (digest, url, channel_id, message_id, uploaded_unix)
+                       VALUES (?, ?, ?, ?, ?)""",
+                    (image.digest, url, str(getattr(message.channel, "id", "")), str(message.id), int(time.time()))
+                )
+            await conn.commit()
+        if url:
+            logger.info(f"Cached upload {image.digest[:12]} from message {message.id}")
+        return url
+
+    async def forget_message(self, message_id: Any) -> int:
+        """
+        Drop entries whose attachment lived on a message that is gone.
+
+        Returns:
+            Number of entries dropped
+        """
+        self._owners_checked.pop(str(message_id), None)
+        async with self._connect() as conn:
+            cursor = await conn.execute("DELETE FROM attachment_cache WHERE message_id=?", (str(message_id),))
+            await conn.commit()
+            return cursor.rowcount
+
+
+def _hash_file(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+# Process-wide cache for dashboard images
+attachment_cache = AttachmentCache()
+
+
+__all__ = [
+    'AttachmentCache',
+    'PreparedImage',
+    'attachment_cache',
+    'same_image_url',
+    'unsigned_url',
+    'ATTACHMENT_CACHE_DB_PATH',
+]
@@ -0,0 +1,251 @@
+"""
+Deadline Scheduler for Gacha Timer Bot.
+
+Keeps upcoming deadlines in a min-heap and sleeps until the earliest one,
+instead of polling the database on a fixed interval.
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger("deadline_scheduler")
+
+
+class DeadlineScheduler:
+    """
+    Min-heap scheduler keyed on UNIX deadlines.
+
+    The scheduler loads (deadline, key) pairs through ``load_deadlines`` and
+    sleeps until the earliest deadline. When it passes, every due key is
+    handed to ``fire`` in one call. Callers that change the underlying data
+    call ``wake()`` so the heap is rebuilt before the next sleep.
+
+    A slow periodic resync picks up changes made by other processes that
+    cannot call ``wake()`` (e.g. the standalone scraper).
+
+    If ``fire`` raises, the keys it was given are pushed back with an
+    exponential backoff (``retry_delay`` doubling up to ``max_retry_delay``)
+    until they succeed or ``max_retries`` is reached; after that they wait
+    for the backing store to list them again on resync. ``retry()`` does the
+    same for keys a ``fire`` implementation handled only partially.
+    """
+
+    def __init__(
+        self,
+        load_deadlines: Callable[[], Awaitable[Iterable[Tuple[int, Any]]]],
+        fire: Callable[[List[Any]], Awaitable[None]],
+        *,
+        resync_interval: float = 900,
+        retry_delay: float = 15,
+        max_retry_delay: float = 300,
+        max_retries: int = 8,
+        clock: Callable[[], float] = time.time,
+        name: str = "deadline_scheduler",
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            load_deadlines: Coroutine returning (deadline_unix, key) pairs
+            fire: Coroutine called with the list of keys that became due
+            resync_interval: Seconds between unconditional heap reloads
+            retry_delay: Seconds before the first retry of a failed key
+            max_retry_delay: Upper bound of the retry backoff
+            max_retries: Failed fires of a key before it is left to resync
+            clock: Time source (overridable for tests)
+            name: Name used in log messages
+        """
+        self._load_deadlines = load_deadlines
+        self._fire = fire
+        self._resync_interval = resync_interval
+        self._retry_delay = retry_delay
+        self._max_retry_delay = max_retry_delay
+        self._max_retries = max_retries
+        self._clock = clock
+        self._name = name
+
+        self._heap: List[Tuple[int, Any]] = []
+        self._keys: Set[Any] = set()
+        # key -> (retry_unix, failed attempts)
+        self._retries: Dict[Any, Tuple[float, int]] = {}
+        self._wake_event: Optional[asyncio.Event] = None
+        self._dirty = True
+        self._next_resync = 0.0
+        self._last_reload: Optional[float] = None
+        self._fired_count = 0
+        self._task: Optional[asyncio.Task] = None
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    def start(self) -> asyncio.Task:
+        """Start the scheduler loop (idempotent)."""
+        if self._task is None or self._task.done():
+            self._wake_event = asyncio.Event()
+            self._dirty = True
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"[{self._name}] started")
+        return self._task
+
+    async def stop(self) -> None:
+        """Stop the scheduler loop."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        logger.info(f"[{self._name}] stopped")
+
+    @property
+    def running(self) -> bool:
+        """True while the scheduler loop is alive."""
+        return self._task is not None and not self._task.done()
+
+    def wake(self) -> None:
+        """
+        Mark the heap stale and wake the loop.
+
+        Safe to call when the scheduler is not running (no-op apart from
+        flagging the next start to reload).
+        """
+        self._dirty = True
+        if self._wake_event is not None:
+            self._wake_event.set()
+
+    # -------------------------------------------------------------------------
+    # Introspection
+    # -------------------------------------------------------------------------
+
+    @property
+    def heap_size(self) -> int:
+        """Number of deadlines currently held in the heap."""
+        return len(self._heap)
+
+    @property
+    def next_fire_unix(self) -> Optional[int]:
+        """Earliest deadline in the heap, or None if empty."""
+        return self._heap[0][0] if self._heap else None
+
+    def status(self) -> Dict[str, Any]:
+        """Return a snapshot of the scheduler state."""
+        return {
+            "running": self.running,
+            "heap_size": self.heap_size,
+            "next_fire_unix": self.next_fire_unix,
+            "last_reload_unix": int(self._last_reload) if self._last_reload else None,
+            "fired_count": self._fired_count,
+            "retrying": len(self._retries),
+        }
+
+    def retry(self, keys: Iterable[Any]) -> None:
+        """
+        Fire ``keys`` again after a backoff.
+
+        Each call counts as one failed attempt per key; a key that has
+        failed ``max_retries`` times is dropped from the retry set and
+        only comes back when ``load_deadlines`` lists it again.
+        """
+        now = self._clock()
+        for key in keys:
+            _, attempts = self._retries.get(key, (0.0, 0))
+            attempts += 1
+            if attempts > self._max_retries:
+                self._retries.pop(key, None)
+                logger.warning(f"[{self._name}] giving up retrying {key!r} after {attempts - 1} attempt(s)")
+                continue
+            retry_at = now + min(self._retry_delay * 2 ** (attempts - 1), self._max_retry_delay)
+            self._retries[key] = (retry_at, attempts)
+            self._push(math.ceil(retry_at), key)
+
+    def _push(self, deadline: int, key: Any) -> None:
+        if key in self._keys:
+            self._heap = [(d, k) for d, k in self._heap if k != key]
+            heapq.heapify(self._heap)
+        heapq.heappush(self._heap, (deadline, key))
+        self._keys.add(key)
+
+    # -------------------------------------------------------------------------
+    # Internals
+    # -------------------------------------------------------------------------
+
+    async def reload(self) -> None:
+        """Rebuild the heap from ``load_deadlines``."""
+        entries = []
+        keys = set()
+        for deadline, key in await self._load_deadlines():
+            if key in keys:
+                continue
+            keys.add(key)
+            retry = self._retries.get(key)
+            entries.append((max(int(deadline), math.ceil(retry[0])) if retry else int(deadline), key))
+        # Failed keys are retried even if the store no longer lists them
+        for key, (retry_at, _) in self._retries.items():
+            if key not in keys:
+                keys.add(key)
+                entries.append((math.ceil(retry_at), key))
+        heapq.heapify(entries)
+
+        self._heap = entries
+        self._keys = keys
+        self._dirty = False
+        self._last_reload = self._clock()
+        self._next_resync = self._last_reload + self._resync_interval
+
+    def pop_due(self, now: Optional[float] = None) -> List[Any]:
+        """Pop and return every key whose deadline is <= now."""
+        if now is None:
+            now = self._clock()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, key = heapq.heappop(self._heap)
+            self._keys.discard(key)
+            due.append(key)
+        return due
+
+    async def _run(self) -> None:
+        while True:
+            self._wake_event.clear()
+            try:
+                if self._dirty or self._clock() >= self._next_resync:
+                    await self.reload()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[{self._name}] reload failed: {e}", exc_info=True)
+                self._next_resync = self._clock() + 60
+
+            due = self.pop_due()
+            if due:
+                fired_at = self._clock()
+                try:
+                    await self._fire(due)
+                    self._fired_count += len(due)
+                    # Keys the fire handed to retry() themselves keep their new entry
+                    for key in due:
+                        if key in self._retries and self._retries[key][0] <= fired_at:
+                            del self._retries[key]
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"[{self._name}] fire failed for {len(due)} key(s), retrying: {e}", exc_info=True)
+                    self.retry(due)
+                continue
+
+            timeout = self._next_resync - self._clock()
+            if self._heap:
+                timeout = min(timeout, self._heap[0][0] - self._clock())
+            try:
+                await asyncio.wait_for(self._wake_event.wait(), timeout=max(0.0, timeout))
+            except asyncio.TimeoutError:
+                pass
+
+
+__all__ = ['DeadlineScheduler']
@@ -0,0 +1,249 @@
+"""
+Notification Dispatcher for Gacha Timer Bot.
+
+Sends a batch of due notifications as fast as Discord allows:
+- Messages are grouped by target channel
+- Messages for the same channel and role are coalesced into as few
+  messages as fit under Discord's 2000-character limit
+- Different channels are sent concurrently, each behind its own
+  token-bucket rate limiter
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger("notification_dispatcher")
+
+# Discord message content limit
+DISCORD_MESSAGE_LIMIT = 2000
+
+# Discord allows 5 messages per 5 seconds per channel
+CHANNEL_RATE_CAPACITY = 5
+CHANNEL_RATE_PERIOD = 5.0
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter.
+
+    Holds up to ``capacity`` tokens and refills ``capacity`` tokens every
+    ``period`` seconds. ``acquire()`` waits until a token is available.
+    """
+
+    def __init__(
+        self,
+        capacity: int = CHANNEL_RATE_CAPACITY,
+        period: float = CHANNEL_RATE_PERIOD,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        """Tokens currently available."""
+        self._refill()
+        return self._tokens
+
+    async def acquire(self) -> None:
+        """Take one token, sleeping until one is available."""
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+@dataclass
+class OutgoingNotification:
+    """A rendered notification ready to be delivered."""
+    channel_key: Hashable
+    role_mention: str
+    content: str
+    notify_unix: Optional[int] = None
+    ref: Any = None
+
+
+@dataclass
+class DispatchResult:
+    """Summary of one dispatch batch."""
+    notifications: int = 0
+    messages_sent: int = 0
+    failures: int = 0
+    lateness: List[float] = field(default_factory=list)
+    sent_at: Dict[Any, float] = field(default_factory=dict)
+    failed_refs: List[Any] = field(default_factory=list)
+
+    @property
+    def max_lateness(self) -> float:
+        return max(self.lateness) if self.lateness else 0.0
+
+    @property
+    def avg_lateness(self) -> float:
+        return sum(self.lateness) / len(self.lateness) if self.lateness else 0.0
+
+
+def coalesce_messages(
+    role_mention: str,
+    contents: List[str],
+    limit: int = DISCORD_MESSAGE_LIMIT,
+) -> List[Tuple[str, List[int]]]:
+    """
+    Merge messages that ping the same role into as few messages as possible.
+
+    The role mention is kept once at the top of each merged message and
+    stripped from the individual lines. A single message is returned as-is.
+
+    Args:
+        role_mention: Role mention shared by all contents (may be empty)
+        contents: Rendered messages in send order
+        limit: Maximum characters per message
+
+    Returns:
+        List of (message, indexes of contents included in it)
+    """
+    if len(contents) == 1:
+        return [(contents[0][:limit], [0])]
+
+    header = f"{role_mention}\n" if role_mention else ""
+    bodies = []
+    for content in contents:
+        body = content
+        if role_mention and body.startswith(role_mention):
+            body = body[len(role_mention):].lstrip(" ,")
+            body = body[:1].upper() + body[1:]
+        bodies.append(body[:limit - len(header)])
+
+    chunks: List[Tuple[str, List[int]]] = []
+    current: List[str] = []
+    indexes: List[int] = []
+    size = len(header)
+    for idx, body in enumerate(bodies):
+        extra = len(body) + (1 if current else 0)
+        if current and size + extra > limit:
+            chunks.append((header + "\n".join(current), indexes))
+            current, indexes, size = [], [], len(header)
+            extra = len(body)
+        current.append(body)
+        indexes.append(idx)
+        size += extra
+    if current:
+        chunks.append((header + "\n".join(current), indexes))
+
+    # Collapse a lone line back to its original form
+    return [
+        (contents[idx[0]][:limit] if len(idx) == 1 else text, idx)
+        for text, idx in chunks
+    ]
+
+
+class NotificationDispatcher:
+    """
+    Delivers batches of notifications concurrently per channel.
+
+    ``send`` is called as ``await send(channel_key, content)`` and should
+    raise on failure. Rate limiters persist across batches so bursts that
+    span several scheduler wake-ups still respect per-channel limits.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[Hashable, str], Awaitable[Any]],
+        *,
+        capacity: int = CHANNEL_RATE_CAPACITY,
+        period: float = CHANNEL_RATE_PERIOD,
+        limit: int = DISCORD_MESSAGE_LIMIT,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._send = send
+        self._capacity = capacity
+        self._period = period
+        self._limit = limit
+        self._clock = clock
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+
+    def _bucket(self, channel_key: Hashable) -> TokenBucket:
+        bucket = self._buckets.get(channel_key)
+        if bucket is None:
+            bucket = TokenBucket(self._capacity, self._period)
+            self._buckets[channel_key] = bucket
+        return bucket
+
+    async def _send_channel(
+        self,
+        channel_key: Hashable,
+        items: List[OutgoingNotification],
+        result: DispatchResult,
+    ) -> None:
+        # Group by role, preserving first-seen order
+        by_role: Dict[str, List[OutgoingNotification]] = {}
+        for item in items:
+            by_role.setdefault(item.role_mention, []).append(item)
+
+        bucket = self._bucket(channel_key)
+        for role_mention, role_items in by_role.items():
+            merged = coalesce_messages(role_mention, [i.content for i in role_items], self._limit)
+            for text, indexes in merged:
+                await bucket.acquire()
+                try:
+                    await self._send(channel_key, text)
+                except Exception as e:
+                    result.failures += len(indexes)
+                    result.failed_refs.extend(
+                        role_items[idx].ref for idx in indexes if role_items[idx].ref is not None
+                    )
+                    logger.error(f"Failed to send to channel {channel_key}: {e}")
+                    continue
+                sent_at = self._clock()
+                result.messages_sent += 1
+                for idx in indexes:
+                    item = role_items[idx]
+                    if item.notify_unix is not None:
+                        result.lateness.append(max(0.0, sent_at - item.notify_unix))
+                    if item.ref is not None:
+                        result.sent_at[item.ref] = sent_at
+
+    async def dispatch(self, notifications: List[OutgoingNotification]) -> DispatchResult:
+        """
+        Deliver a batch of notifications.
+
+        Args:
+            notifications: Rendered notifications, in send order
+
+        Returns:
+            DispatchResult with message counts, per-notification lateness and
+            the send time of every delivered ``ref``
+        """
+        result = DispatchResult(notifications=len(notifications))
+        by_channel: Dict[Hashable, List[OutgoingNotification]] = {}
+        for item in notifications:
+            by_channel.setdefault(item.channel_key, []).append(item)
+
+        await asyncio.gather(*(
+            self._send_channel(channel_key, items, result)
+            for channel_key, items in by_channel.items()
+        ))
+        return result
+
+
+__all__ = [
+    'TokenBucket',
+    'OutgoingNotification',
+    'DispatchResult',
+    'NotificationDispatcher',
+    'coalesce_messages',
+    'DISCORD_MESSAGE_LIMIT',
+]
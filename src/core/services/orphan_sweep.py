@@ -0,0 +1,168 @@
+"""
+Orphan Sweep for Gacha Timer Bot.
+
+Finds bot messages in dashboard channels that no tracked event owns.
+
+Routine refreshes work from one preloaded set of tracked message IDs and
+make no history calls. Reading channel history is reserved for a slow
+schedule, or for a channel without a sweep record (a new or reset
+database). Each sweep stores the newest message ID it verified; the next
+sweep only reads messages after it.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Collection, List, Set
+
+import aiosqlite
+
+logger = logging.getLogger("orphan_sweep")
+
+# Seconds between history sweeps of one channel
+ORPHAN_SWEEP_INTERVAL = 6 * 60 * 60
+
+# Messages read by a sweep that has no watermark to resume from
+FULL_SWEEP_LIMIT = 500
+
+_SWEEP_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS channel_sweeps (
+        channel_id TEXT PRIMARY KEY,
+        last_verified_id TEXT,
+        swept_unix INTEGER
+    )
+"""
+
+
+async def load_tracked_message_ids(conn: aiosqlite.Connection, channel_id: Any) -> Set[str]:
+    """
+    Message IDs tracked in ``event_messages`` for a channel, in one query.
+
+    Args:
+        conn: Open connection to the database owning the channel's messages
+        channel_id: Discord channel ID
+
+    Returns:
+        Set of message IDs as strings
+    """
+    async with conn.execute(
+        "SELECT message_id FROM event_messages WHERE channel_id=? AND message_id IS NOT NULL",
+        (str(channel_id),)
+    ) as cursor:
+        return {str(row[0]) async for row in cursor}
+
+
+class OrphanSweeper:
+    """
+    Rate-limits channel history sweeps and remembers how far each one got.
+
+    Sweep state lives in a ``channel_sweeps`` table inside the same database
+    as ``event_messages``, so a wiped database also loses its watermarks and
+    the next sweep reads the channel from the top.
+    """
+
+    def __init__(
+        self,
+        *,
+        interval: float = ORPHAN_SWEEP_INTERVAL,
+        full_limit: int = FULL_SWEEP_LIMIT,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize the sweeper.
+
+        Args:
+            interval: Minimum seconds between sweeps of one channel
+            full_limit: Messages read when there is no watermark
+            clock: Time source (overridable for tests)
+        """
+        self._interval = interval
+        self._full_limit = full_limit
+        self._clock = clock
+
+    async def find_orphans(
+        self,
+        conn: aiosqlite.Connection,
+        channel,
+        tracked_ids: Collection[str],
+        is_ours: Callable[[Any], bool],
+        *,
+        force: bool = False,
+    ) -> List[Any]:
+        """
+        Sweep the channel's history if a sweep is due and return untracked messages.
+
+        Args:
+            conn: Connection to the database holding ``event_messages``
+            channel: Discord channel (anything with ``id`` and ``history()``)
+            tracked_ids: Message IDs (strings) the database tracks for the channel
+            is_ours: Predicate selecting messages the sweep may treat as orphans
+            force: Sweep even if the interval has not elapsed
+
+        Returns:
+            Messages that satisfy ``is_ours`` and are not in ``tracked_ids``;
+            empty when no sweep was due
+        """
+        await conn.execute(_SWEEP_SCHEMA)
+        async with conn.execute(
+            "SELECT last_verified_id, swept_unix FROM channel_sweeps WHERE channel_id=?",
+            (str(channel.id),)
+        ) as cursor:
+            row = await cursor.fetchone()
+
+        now = int(self._clock())
+        if row and not force and now - (row[1] or 0) < self._interval:
+            return []
+
+        watermark = int(row[0]) if row and row[0] else None
+        if watermark is None:
+            history = channel.history(limit=self._full_limit)
+        else:
+            from discord import Object
+            history = channel.history(limit=None, after=Object(watermark), oldest_first=True)
+
+        orphans = []
+        newest = watermark or 0
+        async for message in history:
+            newest = max(newest, message.id)
+            if str(message.id) not in tracked_ids and is_ours(message):
+                orphans.append(message)
+
+        await conn.execute(
+            """INSERT INTO channel_sweeps (channel_id, last_verified_id, swept_unix) VALUES (?, ?, ?)
+               ON CONFLICT(channel_id) DO UPDATE SET
+                   last_verified_id=excluded.last_verified_id, swept_unix=excluded.swept_unix""",
+            (str(channel.id), str(newest) if newest else None, now)
+        )
+        await conn.commit()
+        logger.info(
+            f"Swept channel {channel.id} ({'from ' + str(watermark) if watermark else 'full'}): "
+            f"{len(orphans)} orphan(s)"
+        )
+        return orphans
+
+    async def rewind(self, conn: aiosqlite.Connection, channel_id: Any, message_id: Any) -> None:
+        """
+        Move a channel's watermark back so the next sweep re-reads ``message_id``.
+
+        Call this when deleting a message fails after its tracking row is gone,
+        so the message is picked up as an orphan later.
+        """
+        await conn.execute(_SWEEP_SCHEMA)
+        await conn.execute(
+            """UPDATE channel_sweeps SET last_verified_id=?
+               WHERE channel_id=? AND CAST(last_verified_id AS INTEGER) >= ?""",
+            (str(int(message_id) - 1), str(channel_id), int(message_id))
+        )
+        await conn.commit()
+
+
+# Process-wide sweeper used by the dashboards
+orphan_sweeper = OrphanSweeper()
+
+
+__all__ = [
+    'OrphanSweeper',
+    'orphan_sweeper',
+    'load_tracked_message_ids',
+    'ORPHAN_SWEEP_INTERVAL',
+]
@@ -0,0 +1,142 @@
+"""
+Refresh Coordinator for Gacha Timer Bot.
+
+Debounced, single-flight dashboard refreshes.
+
+A dashboard refresh rebuilds a whole channel, so running it once per edit is
+wasted work when edits arrive in bursts (API calls, scraper runs, commands).
+A coordinator owns one refresh function:
+
+- Requests that arrive while a refresh is queued join it. Requests that
+  arrive while a refresh is running join the single trailing refresh that
+  runs after it; at most one refresh is ever waiting.
+- ``await request()`` returns when a refresh that started after the request
+  has finished, so the caller's change is on screen. It re-raises that
+  refresh's error.
+- ``request(force=True)`` upgrades the waiting refresh to a forced one.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger("refresh_coordinator")
+
+# Seconds a queued refresh waits for more requests before it starts
+DEFAULT_DEBOUNCE = 0.5
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    # Every waiter may have gone away; don't warn about an unretrieved error
+    if not future.cancelled():
+        future.exception()
+
+
+class RefreshCoordinator:
+    """
+    Runs one refresh function with request merging.
+
+    The refresh function is called with a single ``force`` argument, which is
+    True if any request it covers asked for a forced refresh.
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[[bool], Awaitable[Any]],
+        *,
+        debounce: float = DEFAULT_DEBOUNCE,
+        name: str = "refresh",
+    ):
+        """
+        Initialize the coordinator.
+
+        Args:
+            refresh: Coroutine function taking ``force``
+            debounce: Seconds a queued refresh waits for more requests
+            name: Name used in log messages
+        """
+        self._refresh = refresh
+        self._debounce = debounce
+        self._name = name
+
+        self._queued: Optional[asyncio.Future] = None
+        self._queued_force = False
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._request_count = 0
+        self._run_count = 0
+
+    async def request(self, force: bool = False) -> Any:
+        """
+        Ask for a refresh and wait for one that covers this request.
+
+        Args:
+            force: Run the covering refresh in forced mode
+
+        Returns:
+            Whatever the refresh function returned
+        """
+        if self._queued is None:
+            self._queued = asyncio.get_running_loop().create_future()
+            self._queued.add_done_callback(_retrieve_exception)
+        self._queued_force = self._queued_force or force
+        self._request_count += 1
+        future = self._queued
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+        return await asyncio.shield(future)
+
+    @property
+    def running(self) -> bool:
+        """True while the refresh function is executing."""
+        return self._running
+
+    @property
+    def queued(self) -> bool:
+        """True if a refresh is waiting to start."""
+        return self._queued is not None
+
+    def status(self) -> Dict[str, Any]:
+        """Return a snapshot of the coordinator state."""
+        return {
+            "running": self._running,
+            "queued": self.queued,
+            "queued_force": self._queued_force,
+            "request_count": self._request_count,
+            "run_count": self._run_count,
+        }
+
+    async def _drain(self) -> None:
+        try:
+            while self._queued is not None:
+                if self._debounce > 0:
+                    await asyncio.sleep(self._debounce)
+                future, force = self._queued, self._queued_force
+                self._queued, self._queued_force = None, False
+
+                self._running = True
+                try:
+                    result = await self._refresh(force)
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except Exception as e:
+                    logger.error(f"[{self._name}] refresh failed: {e}", exc_info=True)
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+                finally:
+                    self._running = False
+                    self._run_count += 1
+        except asyncio.CancelledError:
+            if self._queued is not None:
+                self._queued.cancel()
+                self._queued, self._queued_force = None, False
+            raise
+
+
+__all__ = [
+    'RefreshCoordinator',
+    'DEFAULT_DEBOUNCE',
+]
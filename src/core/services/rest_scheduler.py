@@ -0,0 +1,417 @@
+"""
+Discord REST Scheduler for Gacha Timer Bot.
+
+One outbound queue for every message send, edit and delete the bot makes
+outside of command replies:
+- Requests run in priority order: notifications, then dashboard edits,
+  then cleanup
+- Each Discord rate-limit bucket (route + channel) is paced from the
+  X-RateLimit-* headers of its previous responses, so work runs as fast
+  as the limits allow instead of at a hard-coded pace
+- A queued edit of a message that is edited again before it starts is
+  replaced by the newer one; every caller gets the result of the edit
+  that actually ran
+"""
+
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Mapping, Optional, Set, Tuple
+
+from .notification_dispatcher import TokenBucket
+
+logger = logging.getLogger("rest_scheduler")
+
+# Discord's global limit is 50 requests per second per bot
+GLOBAL_RATE_CAPACITY = 50
+GLOBAL_RATE_PERIOD = 1.0
+
+# Requests allowed in flight at once (at most one per bucket)
+DEFAULT_MAX_CONCURRENCY = 8
+
+_MESSAGE_ROUTE = re.compile(r"/channels/(\d+)/messages(?:/\d+)?/?$")
+
+
+class RestPriority(IntEnum):
+    """Queue priority; lower values run first."""
+    NOTIFICATION = 0
+    DASHBOARD = 1
+    CLEANUP = 2
+
+
+def message_bucket(method: str, channel_id: int) -> Tuple[str, int]:
+    """Bucket key for a message route (Discord buckets these per channel)."""
+    return (method.upper(), int(channel_id))
+
+
+def route_bucket(method: str, path: str) -> Optional[Tuple[str, int]]:
+    """
+    Map a request path to its bucket key.
+
+    Args:
+        method: HTTP method
+        path: URL path, e.g. ``/api/v10/channels/123/messages/456``
+
+    Returns:
+        Bucket key, or None for routes the scheduler does not pace
+    """
+    match = _MESSAGE_ROUTE.search(path)
+    if match is None:
+        return None
+    return message_bucket(method, int(match.group(1)))
+
+
+class RateLimitBucket:
+    """
+    Rate-limit state of one bucket, learned from response headers.
+
+    Until the first response arrives the limit is unknown and requests are
+    not delayed. After that, ``remaining`` is decremented for every request
+    started and refilled to ``limit`` once the reset time passes.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+
+    def _maybe_reset(self, now: float) -> None:
+        if self.remaining is not None and now >= self.reset_at:
+            self.remaining = self.limit
+
+    def delay(self) -> float:
+        """Seconds until a request may start in this bucket (0 if it may start now)."""
+        now = self._clock()
+        self._maybe_reset(now)
+        if self.remaining is not None and self.remaining <= 0:
+            return max(0.0, self.reset_at - now)
+        return 0.0
+
+    def consume(self) -> None:
+        """Account for a request being started."""
+        self._maybe_reset(self._clock())
+        if self.remaining is not None:
+            self.remaining -= 1
+
+    def update(self, headers: Mapping[str, str], status: int = 200) -> None:
+        """
+        Update the bucket from a response.
+
+        Args:
+            headers: Response headers
+            status: HTTP status; a 429 empties the bucket until Retry-After passes
+        """
+        now = self._clock()
+        limit = _header_number(headers, "X-RateLimit-Limit")
+        remaining = _header_number(headers, "X-RateLimit-Remaining")
+        reset_after = _header_number(headers, "X-RateLimit-Reset-After")
+        if limit is not None:
+            self.limit = int(limit)
+        if remaining is not None:
+            self.remaining = int(remaining)
+        if reset_after is not None:
+            self.reset_at = now + reset_after
+        if status == 429:
+            retry_after = _header_number(headers, "Retry-After") or reset_after or 1.0
+            self.remaining = 0
+            self.reset_at = max(self.reset_at, now + retry_after)
+        if self.limit is None and self.remaining is not None:
+            self.limit = self.remaining + 1
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class _Job:
+    priority: int
+    bucket: Hashable
+    factory: Callable[[], Awaitable[Any]]
+    coalesce_key: Optional[Hashable] = None
+    futures: List[asyncio.Future] = field(default_factory=list)
+
+
+class RestScheduler:
+    """
+    Priority queue in front of rate-limited REST calls.
+
+    Callers ``await`` a scheduled call and get its result (or exception) as
+    if they had made it directly. One worker task starts requests: the
+    highest-priority queued request whose bucket is idle and not exhausted
+    runs next, under a global token bucket and a concurrency cap. The worker
+    exits when the queue is empty and is restarted by the next request.
+    """
+
+    def __init__(
+        self,
+        *,
+        global_capacity: int = GLOBAL_RATE_CAPACITY,
+        global_period: float = GLOBAL_RATE_PERIOD,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            global_capacity: Requests allowed per ``global_period`` across all buckets
+            global_period: Global rate-limit window in seconds
+            max_concurrency: Requests allowed in flight at once
+            clock: Monotonic time source (overridable for tests)
+        """
+        self._global_capacity = global_capacity
+        self._global_period = global_period
+        self._max_concurrency = max_concurrency
+        self._clock = clock
+
+        self._queues: Dict[int, List[_Job]] = {p: [] for p in RestPriority}
+        self._coalescible: Dict[Hashable, _Job] = {}
+        self._buckets: Dict[Hashable, RateLimitBucket] = {}
+        self._busy: Set[Hashable] = set()
+        # Running _execute tasks; the loop only keeps weak references
+        self._tasks: Set[asyncio.Task] = set()
+        self._global_until = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._global_bucket: Optional[TokenBucket] = None
+        self.stats: Dict[str, int] = {"started": 0, "coalesced": 0, "rate_limited": 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @property
+    def pending(self) -> int:
+        """Requests queued and not yet started."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    def bucket(self, key: Hashable) -> RateLimitBucket:
+        """Get (or create) the rate-limit state for a bucket key."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = RateLimitBucket(self._clock)
+            self._buckets[key] = bucket
+        return bucket
+
+    async def submit(
+        self,
+        factory: Callable[[], Awaitable[Any]],
+        *,
+        bucket: Hashable,
+        priority: int = RestPriority.DASHBOARD,
+        coalesce_key: Optional[Hashable] = None,
+    ) -> Any:
+        """
+        Queue a REST call and wait for its result.
+
+        Args:
+            factory: Zero-argument callable returning the request coroutine;
+                only called when the request starts
+            bucket: Rate-limit bucket key (see message_bucket)
+            priority: RestPriority of the call
+            coalesce_key: Calls sharing a key replace each other while queued
+
+        Returns:
+            Whatever the request coroutine returns
+        """
+        self._bind_loop()
+        future = self._loop.create_future()
+
+        job = self._coalescible.get(coalesce_key) if coalesce_key is not None else None
+        if job is not None:
+            job.factory = factory
+            job.futures.append(future)
+            if priority < job.priority:
+                self._queues[job.priority].remove(job)
+                job.priority = priority
+                self._queues[priority].append(job)
+            self.stats["coalesced"] += 1
+        else:
+            job = _Job(int(priority), bucket, factory, coalesce_key, [future])
+            self._queues[job.priority].append(job)
+            if coalesce_key is not None:
+                self._coalescible[coalesce_key] = job
+
+        self._ensure_worker()
+        self._wakeup.set()
+        return await future
+
+    async def send(self, channel, *, priority: int = RestPriority.NOTIFICATION, **kwargs) -> Any:
+        """``channel.send(**kwargs)`` through the queue."""
+        return await self.submit(
+            lambda: channel.send(**kwargs),
+            bucket=message_bucket("POST", channel.id),
+            priority=priority,
+        )
+
+    async def edit(self, channel, message_id: int, *, priority: int = RestPriority.DASHBOARD, **kwargs) -> Any:
+        """
+        Edit a message by ID (no fetch) through the queue.
+
+        Queued edits of the same message collapse into the latest one.
+        """
+        message_id = int(message_id)
+        return await self.submit(
+            lambda: channel.get_partial_message(message_id).edit(**kwargs),
+            bucket=message_bucket("PATCH", channel.id),
+            priority=priority,
+            coalesce_key=("edit", message_id),
+        )
+
+    async def delete(self, channel, message_id: int, *, priority: int = RestPriority.CLEANUP) -> Any:
+        """Delete a message by ID (no fetch) through the queue."""
+        message_id = int(message_id)
+        return await self.submit(
+            lambda: channel.get_partial_message(message_id).delete(),
+            bucket=message_bucket("DELETE", channel.id),
+            priority=priority,
+            coalesce_key=("delete", message_id),
+        )
+
+    def observe(self, method: str, path: str, status: int, headers: Mapping[str, str]) -> None:
+        """
+        Feed a response's rate-limit headers back into the scheduler.
+
+        Called by the aiohttp trace hook (see rate_limit_trace_config) for
+        every request the bot makes, including ones not made through the queue.
+        """
+        if status == 429:
+            self.stats["rate_limited"] += 1
+            if headers.get("X-RateLimit-Global", "").lower() == "true":
+                retry_after = _header_number(headers, "Retry-After") or 1.0
+                self._global_until = max(self._global_until, self._clock() + retry_after)
+                logger.warning(f"Global rate limit hit, pausing for {retry_after:.2f}s")
+        key = route_bucket(method, path)
+        if key is not None:
+            self.bucket(key).update(headers, status)
+        if self._wakeup is not None and self._loop is not None and not self._loop.is_closed():
+            self._wakeup.set()
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        # First use, or the previous loop is gone: start over on this one
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._global_bucket = TokenBucket(self._global_capacity, self._global_period, self._clock)
+        self._worker = None
+        self._queues = {p: [] for p in RestPriority}
+        self._coalescible.clear()
+        self._busy.clear()
+        self._tasks = set()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = self._loop.create_task(self._run())
+
+    def _next_ready(self) -> Tuple[Optional[_Job], Optional[float]]:
+        """Highest-priority startable job, else the seconds until one may become startable."""
+        now = self._clock()
+        if now < self._global_until:
+            return None, self._global_until - now
+        wait: Optional[float] = None
+        for priority in RestPriority:
+            for job in self._queues[priority]:
+                if job.bucket in self._busy:
+                    continue
+                delay = self.bucket(job.bucket).delay()
+                if delay > 0:
+                    wait = delay if wait is None else min(wait, delay)
+                    continue
+                return job, None
+        return None, wait
+
+    async def _run(self) -> None:
+        while self.pending:
+            job, wait = (None, None)
+            if len(self._busy) < self._max_concurrency:
+                job, wait = self._next_ready()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._global_bucket.acquire()
+            self._queues[job.priority].remove(job)
+            if job.coalesce_key is not None and self._coalescible.get(job.coalesce_key) is job:
+                del self._coalescible[job.coalesce_key]
+            self._busy.add(job.bucket)
+            self.bucket(job.bucket).consume()
+            self.stats["started"] += 1
+            task = self._loop.create_task(self._execute(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, job: _Job) -> None:
+        try:
+            result = await job.factory()
+        except Exception as e:
+            for future in job.futures:
+                if not future.done():
+                    future.set_exception(e)
+        except BaseException:
+            # Cancelled (e.g. at shutdown): don't leave callers awaiting forever
+            for future in job.futures:
+                if not future.done():
+                    future.cancel()
+            raise
+        else:
+            for future in job.futures:
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._busy.discard(job.bucket)
+            self._wakeup.set()
+
+
+def rate_limit_trace_config(scheduler: "RestScheduler"):
+    """
+    Build an aiohttp TraceConfig that reports every response to ``scheduler``.
+
+    Pass it to the bot as ``commands.Bot(..., http_trace=...)`` so the
+    scheduler sees the rate-limit headers discord.py receives.
+    """
+    import aiohttp
+
+    async def on_request_end(session, context, params):
+        response = params.response
+        scheduler.observe(params.method, params.url.path, response.status, response.headers)
+
+    trace = aiohttp.TraceConfig()
+    trace.on_request_end.append(on_request_end)
+    return trace
+
+
+# Process-wide scheduler used by the bot
+discord_rest = RestScheduler()
+
+
+__all__ = [
+    'RestScheduler',
+    'RestPriority',
+    'RateLimitBucket',
+    'discord_rest',
+    'message_bucket',
+    'route_bucket',
+    'rate_limit_trace_config',
+]
@@ -0,0 +1,271 @@
+"""
+Timer Wheel for Gacha Timer Bot.
+
+One persisted schedule for the dashboard refreshes that run at event start
+and end times, shared by every game module.
+
+Modules register a refresh handler under a name, then schedule
+(deadline, handler, arg) entries. Each deadline is rounded up to the end of
+its ``tick``-wide slot, so every deadline in one slot for the same handler
+and argument becomes a single refresh. A slot fires at its boundary, never
+before any deadline it covers. Slots are stored in a ``timer_wheel`` table
+and the whole wheel runs on one DeadlineScheduler task, instead of one
+sleeping task per timestamp.
+
+Slots that are already due when the wheel starts (the bot was down) fire
+once per handler and argument, however many of them piled up.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import aiosqlite
+
+from .deadline_scheduler import DeadlineScheduler
+
+logger = logging.getLogger("timer_wheel")
+
+TIMER_WHEEL_DB_PATH = os.path.join("data", "timer_wheel.db")
+
+# Seconds per slot: deadlines this close together share one refresh
+DEFAULT_TICK = 60
+
+TimerHandler = Callable[[Optional[str]], Awaitable[None]]
+
+_WHEEL_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS timer_wheel (
+        fire_unix INTEGER NOT NULL,
+        handler TEXT NOT NULL,
+        arg TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (fire_unix, handler, arg)
+    )
+"""
+
+
+class TimerWheel:
+    """
+    Coalescing, persisted timer wheel for dashboard refreshes.
+
+    Handlers are coroutines taking the scheduled argument (e.g. a region),
+    or None when the entry has no argument. A slot's row is deleted only
+    after its handler succeeds. If the handler fails or is not registered
+    yet, the row stays and is retried on the next resync, or as soon as
+    the handler is registered.
+    """
+
+    def __init__(
+        self,
+        db_path: str = TIMER_WHEEL_DB_PATH,
+        *,
+        tick: int = DEFAULT_TICK,
+        resync_interval: float = 900,
+        clock: Callable[[], float] = time.time,
+        name: str = "timer_wheel",
+    ):
+        """
+        Initialize the wheel.
+
+        Args:
+            db_path: SQLite database holding the ``timer_wheel`` table
+            tick: Slot width in seconds (the coalescing window)
+            resync_interval: Seconds between reloads of the table
+            clock: Time source (overridable for tests)
+            name: Name used in log messages
+        """
+        self.db_path = db_path
+        self.tick = max(1, int(tick))
+        self._clock = clock
+        self._name = name
+        self._handlers: Dict[str, TimerHandler] = {}
+        self._schema_ready = False
+        self._refresh_count = 0
+        self._scheduler = DeadlineScheduler(
+            self._load_slots,
+            self._fire,
+            resync_interval=resync_interval,
+            clock=clock,
+            name=name,
+        )
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    def start(self) -> asyncio.Task:
+        """Start the wheel (idempotent)."""
+        return self._scheduler.start()
+
+    async def stop(self) -> None:
+        """Stop the wheel; pending slots stay in the database."""
+        await self._scheduler.stop()
+
+    @property
+    def running(self) -> bool:
+        """True while the wheel is running."""
+        return self._scheduler.running
+
+    def register(self, handler_name: str, handler: TimerHandler) -> None:
+        """
+        Register (or replace) the handler behind ``handler_name``.
+
+        Wakes the wheel so slots that were waiting for this handler fire
+        without waiting for the next resync.
+        """
+        if handler_name in self._handlers and self._handlers[handler_name] is not handler:
+            logger.info(f"[{self._name}] replacing handler {handler_name!r}")
+        self._handlers[handler_name] = handler
+        self._scheduler.wake()
+
+    # -------------------------------------------------------------------------
+    # Scheduling
+    # -------------------------------------------------------------------------
+
+    def slot_for(self, deadline: int) -> int:
+        """Slot boundary (UNIX seconds) a deadline fires at."""
+        return -(-int(deadline) // self.tick) * self.tick
+
+    async def schedule(self, handler_name: str, deadline: int, arg: Optional[str] = None) -> Optional[int]:
+        """
+        Schedule one refresh.
+
+        Deadlines that have already passed are ignored.
+
+        Args:
+            handler_name: Registered handler to run
+            deadline: UNIX timestamp the refresh is for
+            arg: Argument passed to the handler (e.g. a region)
+
+        Returns:
+            The slot the refresh fires at, or None if the deadline has passed
+        """
+        slots = await self.schedule_many(handler_name, [(deadline, arg)])
+        return slots[0] if slots else None
+
+    async def schedule_many(
+        self,
+        handler_name: str,
+        entries: Iterable[Tuple[int, Optional[str]]],
+        *,
+        catch_up: bool = False,
+    ) -> List[int]:
+        """
+        Schedule several refreshes in one transaction.
+
+        Args:
+            handler_name: Registered handler to run
+            entries: (deadline, arg) pairs
+            catch_up: Keep deadlines that have already passed, so they fire
+                once as soon as the wheel runs (used to import old schedules)
+
+        Returns:
+            Slot of every entry that was kept, in input order
+        """
+        now = self._clock()
+        slots = []
+        rows = []
+        for deadline, arg in entries:
+            if int(deadline) <= now and not catch_up:
+                continue
+            slot = self.slot_for(deadline)
+            slots.append(slot)
+            rows.append((slot, handler_name, arg or ""))
+        if not rows:
+            return slots
+
+        async with self._connect() as conn:
+            before = conn.total_changes
+            await conn.executemany(
+                "INSERT OR IGNORE INTO timer_wheel (fire_unix, handler, arg) VALUES (?, ?, ?)",
+                rows
+            )
+            await conn.commit()
+            added = conn.total_changes - before
+
+        if added:
+            self._scheduler.wake()
+        logger.debug(f"[{self._name}] {handler_name}: {added} new slot(s) from {len(rows)} deadline(s)")
+        return slots
+
+    async def pending(self) -> List[Tuple[int, str, Optional[str]]]:
+        """Every stored slot as (fire_unix, handler, arg), earliest first."""
+        return sorted((key for _, key in await self._load_slots()), key=lambda k: (k[0], k[1], k[2] or ""))
+
+    def status(self) -> Dict[str, Any]:
+        """Return a snapshot of the wheel state."""
+        return {
+            **self._scheduler.status(),
+            "tick": self.tick,
+            "handlers": sorted(self._handlers),
+            "refresh_count": self._refresh_count,
+        }
+
+    # -------------------------------------------------------------------------
+    # Internals
+    # -------------------------------------------------------------------------
+
+    @asynccontextmanager
+    async def _connect(self):
+        if not self._schema_ready:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        async with aiosqlite.connect(self.db_path) as conn:
+            if not self._schema_ready:
+                await conn.execute(_WHEEL_SCHEMA)
+                await conn.commit()
+                self._schema_ready = True
+            yield conn
+
+    async def _load_slots(self) -> List[Tuple[int, Tuple[int, str, Optional[str]]]]:
+        async with self._connect() as conn:
+            async with conn.execute("SELECT fire_unix, handler, arg FROM timer_wheel") as cursor:
+                return [(row[0], (row[0], row[1], row[2] or None)) async for row in cursor]
+
+    async def _fire(self, keys: List[Tuple[int, str, Optional[str]]]) -> None:
+        # One refresh per handler and argument, however many slots are due
+        groups: Dict[Tuple[str, Optional[str]], int] = {}
+        for fire_unix, handler_name, arg in keys:
+            group = (handler_name, arg)
+            groups[group] = max(groups.get(group, fire_unix), fire_unix)
+        failed = []
+
+        for (handler_name, arg), latest in groups.items():
+            handler = self._handlers.get(handler_name)
+            if handler is None:
+                logger.warning(f"[{self._name}] no handler registered for {handler_name!r}; slot kept")
+                continue
+            try:
+                await handler(arg)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[{self._name}] {handler_name}({arg}) failed, retrying: {e}", exc_info=True)
+                failed.extend(key for key in keys if (key[1], key[2]) == (handler_name, arg))
+                continue
+
+            async with self._connect() as conn:
+                await conn.execute(
+                    "DELETE FROM timer_wheel WHERE handler=? AND arg=? AND fire_unix<=?",
+                    (handler_name, arg or "", latest)
+                )
+                await conn.commit()
+            self._refresh_count += 1
+            logger.info(f"[{self._name}] refreshed {handler_name}{f' ({arg})' if arg else ''} for slot {latest}")
+        if failed:
+            self._scheduler.retry(failed)
+
+
+# Process-wide wheel shared by the game modules
+timer_wheel = TimerWheel()
+
+
+__all__ = [
+    'TimerWheel',
+    'timer_wheel',
+    'TIMER_WHEEL_DB_PATH',
+    'DEFAULT_TICK',
+]
@@ -14,7 +14,8 @@ from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, Any, List
 import dateparser
 
-from src.games.base import GameConfig, GameModule
+from src.core.services.timer_wheel import timer_wheel
+from src.games.base import GameConfig, GameModule, DesiredMessage
 from .database import ArknightsEventRepository
 
 
@@ -60,9 +61,6 @@ class ArknightsModule(GameModule):
         self.upcoming_channel_id = upcoming_channel_id
         self.main_server_id = main_server_id
 
-        # In-memory task tracking
-        self._scheduled_tasks: Dict[int, asyncio.Task] = {}
-
     async def initialize(self):
         """Initialize the module."""
         await self.repository.initialize()
@@ -79,13 +77,12 @@ class ArknightsModule(GameModule):
         """
         self.logger.info("Refreshing Arknights events")
 
-    async def update_dashboard(self, guild, region: Optional[str] = None):
+    async def rebuild_dashboard(self, guild):
         """
         Update the Arknights event dashboard.
 
         Args:
             guild: Discord guild object
-            region: Ignored for Arknights (single timezone)
         """
         if not guild:
             return
@@ -96,40 +93,25 @@ class ArknightsModule(GameModule):
 
         events = await self.repository.get_all_events()
 
+        # Desired state of each channel, in start-date order
+        ongoing = []
+        upcoming = []
         for event in events:
             start = event["start_date"]
             end = event["end_date"]
 
-            # Determine event status
             if end < now:
-                # Delete ended event messages
-                if self.ongoing_channel_id:
-                    await self._delete_event_message(guild, self.ongoing_channel_id, event["id"])
-                if self.upcoming_channel_id:
-                    await self._delete_event_message(guild, self.upcoming_channel_id, event["id"])
-                # Delete from database
+                # Ended: drop it; the reconcile below removes its message
                 await self.repository.delete_event(event["id"])
                 continue
 
-            elif start <= now < end:
-                # Ongoing
-                target_channel = ongoing_channel
-                other_channel_id = self.upcoming_channel_id
-            else:
-                # Upcoming
-                target_channel = upcoming_channel
-                other_channel_id = self.ongoing_channel_id
-
-            # Create embed
-            embed = self._create_event_embed(event)
+            target = ongoing if start <= now < end else upcoming
+            target.append(DesiredMessage.build(event["id"], embed=self._create_event_embed(event)))
 
-            # Post or update
-            if target_channel:
-                await self._upsert_event_message(guild, target_channel, event["id"], embed)
-
-            # Remove from other channel
-            if other_channel_id:
-                await self._delete_event_message(guild, other_channel_id, event["id"])
+        if ongoing_channel:
+            await self.dashboard.reconcile(ongoing_channel, ongoing)
+        if upcoming_channel:
+            await self.dashboard.reconcile(upcoming_channel, upcoming)
 
         self.logger.info("Dashboard updated")
 
@@ -148,8 +130,8 @@ class ArknightsModule(GameModule):
         await self._schedule_event_notifications(event_data)
 
         # Schedule dashboard updates
-        await self.repository.schedule_update_task(event_data["start_date"])
-        await self.repository.schedule_update_task(event_data["end_date"])
+        await self.schedule_update_task(event_data["start_date"])
+        await self.schedule_update_task(event_data["end_date"])
 
         await ctx.send(
             f"Added `{event_data['title']}` as **{event_data['category']}** for Arknights!\n"
@@ -172,15 +154,9 @@ class ArknightsModule(GameModule):
             await ctx.send(f"No event found with title '{title}'.")
             return False
 
-        # Delete messages
-        guild = ctx.guild
-        if self.ongoing_channel_id:
-            await self._delete_event_message(guild, self.ongoing_channel_id, event["id"])
-        if self.upcoming_channel_id:
-            await self._delete_event_message(guild, self.upcoming_channel_id, event["id"])
-
-        # Delete from database
+        # Delete from database; the dashboard refresh removes its message
         await self.repository.delete_event(event["id"])
+        await self.update_dashboard(ctx.guild)
 
         await ctx.send(f"Deleted Arknights event '{event['title']}'.")
         return True
@@ -266,82 +242,21 @@ class ArknightsModule(GameModule):
 
         return embed
 
-    async def _upsert_event_message(
-        self,
-        guild,
-        channel,
-        event_id: int,
-        embed: discord.Embed
-    ):
-        """Update existing message or create new one."""
-        msg_id = await self.repository.get_message_id(event_id, str(channel.id))
-
-        if msg_id:
-            try:
-                msg = await channel.fetch_message(int(msg_id))
-                await msg.edit(embed=embed)
-                return
-            except Exception:
-                pass
-
-        # Send new message
-        msg = await channel.send(embed=embed)
-        await self.repository.set_message_id(event_id, str(channel.id), str(msg.id))
-
-    async def _delete_event_message(self, guild, channel_id: int, event_id: int):
-        """Delete an event message from a channel."""
-        if not channel_id:
-            return
-
-        msg_id = await self.repository.get_message_id(event_id, str(channel_id))
-        if msg_id:
-            channel = guild.get_channel(channel_id)
-            if channel:
-                try:
-                    msg = await channel.fetch_message(int(msg_id))
-                    await msg.delete()
-                except Exception:
-                    pass
-
-        await self.repository.delete_message_record(event_id, str(channel_id))
-
     async def _schedule_event_notifications(self, event_data: Dict):
         """Schedule notifications for the event."""
         self.logger.info(f"Scheduling notifications for event: {event_data['title']}")
 
     async def _load_scheduled_tasks(self, bot):
-        """Load scheduled tasks from database on startup."""
-        tasks = await self.repository.get_pending_update_tasks()
-        now = int(datetime.now(timezone.utc).timestamp())
+        """Register the dashboard timer and move pending database tasks onto it."""
+        self.register_dashboard_timer(bot)
 
-        overdue = [t for t in tasks if t <= now]
-        future = [t for t in tasks if t > now]
-
-        # Execute one update for overdue tasks
-        if overdue:
-            self.logger.info(f"Found {len(overdue)} overdue tasks. Executing update...")
-            main_guild = bot.get_guild(self.main_server_id)
-            if main_guild:
-                await self.update_dashboard(main_guild)
-
-            for update_unix in overdue:
+        tasks = await self.repository.get_pending_update_tasks()
+        if tasks:
+            # Overdue tasks are kept: the wheel runs one catch-up update for all of them
+            await timer_wheel.schedule_many(self.dashboard_timer_name, [(t, None) for t in tasks], catch_up=True)
+            for update_unix in tasks:
                 await self.repository.mark_task_done(update_unix)
-
-        # Schedule future tasks
-        for update_unix in future:
-            delay = update_unix - now
-            if update_unix not in self._scheduled_tasks:
-                self._scheduled_tasks[update_unix] = asyncio.create_task(
-                    self._run_scheduled_update(bot, update_unix, delay)
-                )
-
-    async def _run_scheduled_update(self, bot, update_unix: int, delay: int):
-        """Run a scheduled dashboard update after delay."""
-        await asyncio.sleep(delay)
-        guild = bot.get_guild(self.main_server_id)
-        if guild:
-            await self.update_dashboard(guild)
-        await self.repository.mark_task_done(update_unix)
+            self.logger.info(f"Moved {len(tasks)} pending update tasks onto the timer wheel")
 
     async def _periodic_cleanup(self):
         """Periodically clean up old completed tasks."""
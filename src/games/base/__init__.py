@@ -13,10 +13,30 @@ from .game_module import (
 from .special_event_module import (
     SpecialEventGameModule,
 )
+from .channel_order import (
+    ChannelOrderPlan,
+    plan_channel_order,
+)
+from .reconciler import (
+    DesiredMessage,
+    TrackedMessage,
+    ReconcilePlan,
+    plan_reconcile,
+    DashboardStateStore,
+    DashboardReconciler,
+)
 
 __all__ = [
     'GameConfig',
     'GameModule',
     'HoyoverseGameModule',
     'SpecialEventGameModule',
+    'ChannelOrderPlan',
+    'plan_channel_order',
+    'DesiredMessage',
+    'TrackedMessage',
+    'ReconcilePlan',
+    'plan_reconcile',
+    'DashboardStateStore',
+    'DashboardReconciler',
 ]
@@ -0,0 +1,110 @@
+"""
+Minimal-move ordering for dashboard channels.
+
+A dashboard channel shows one message per event, ordered by start date.
+Messages can't be moved: a new message always lands at the bottom. So the
+only ways to fix the order are to edit a message in place to show another
+event, or to delete it and post the event again at the end.
+
+``plan_channel_order`` finds the cheapest mix of those operations. Messages
+that stay untouched form the longest run that is already in the right
+relative order *and* lines up with the top of the desired list. A plain
+longest increasing subsequence isn't enough here: an event that belongs
+near the top can't be reposted there, so its slot has to be reused.
+"""
+
+from dataclasses import dataclass, field
+from typing import Hashable, List, Sequence, Tuple
+
+
+@dataclass
+class ChannelOrderPlan:
+    """
+    Operations that bring a channel into the desired order.
+
+    Slot indexes refer to the channel's current messages, oldest first.
+    Apply edits and deletes first, then post ``sends`` in order.
+    """
+    keep: List[Tuple[int, Hashable]] = field(default_factory=list)
+    edits: List[Tuple[int, Hashable]] = field(default_factory=list)
+    deletes: List[int] = field(default_factory=list)
+    sends: List[Hashable] = field(default_factory=list)
+
+    @property
+    def calls(self) -> int:
+        """Discord API calls the plan costs."""
+        return len(self.edits) + len(self.deletes) + len(self.sends)
+
+    @property
+    def noop(self) -> bool:
+        """True when the channel is already in order."""
+        return self.calls == 0
+
+
+def plan_channel_order(actual: Sequence[Hashable], desired: Sequence[Hashable]) -> ChannelOrderPlan:
+    """
+    Plan the fewest edits, deletes and sends that put ``desired`` on screen.
+
+    Each current message either stays, is edited to show a different key, or
+    is deleted. Surviving messages show the first keys of ``desired`` in
+    order, and the remaining keys are posted at the bottom. Edits cost one
+    call; a delete costs one, plus one send for whatever ends up reposted.
+    The search is an O(len(actual) * len(desired)) alignment.
+
+    Args:
+        actual: Key shown by each current message, oldest message first
+        desired: Keys in the order they should appear, top to bottom
+
+    Returns:
+        ChannelOrderPlan (``plan.calls`` is the total API cost)
+    """
+    n, m = len(actual), len(desired)
+    if list(actual) == list(desired):
+        return ChannelOrderPlan(keep=list(enumerate(actual)))
+
+    inf = float("inf")
+    # cost[i][t]: best cost after deciding the first i messages, t of them kept
+    cost = [[inf] * (m + 1) for _ in range(n + 1)]
+    step = [[None] * (m + 1) for _ in range(n + 1)]
+    cost[0][0] = 0
+    for i in range(n):
+        for t in range(min(i, m) + 1):
+            base = cost[i][t]
+            if base == inf:
+                continue
+            # Keep message i as desired[t] (edit it if it shows something else)
+            if t < m:
+                kept = base + (actual[i] != desired[t])
+                if kept < cost[i + 1][t + 1]:
+                    cost[i + 1][t + 1] = kept
+                    step[i + 1][t + 1] = "keep"
+            # Delete message i
+            if base + 1 < cost[i + 1][t]:
+                cost[i + 1][t] = base + 1
+                step[i + 1][t] = "delete"
+
+    # Everything not shown by a surviving message is posted at the bottom
+    best_t = min(range(min(n, m) + 1), key=lambda t: (cost[n][t] + (m - t), -t))
+
+    plan = ChannelOrderPlan(sends=list(desired[best_t:]))
+    i, t = n, best_t
+    while i > 0:
+        if step[i][t] == "keep":
+            i, t = i - 1, t - 1
+            if actual[i] == desired[t]:
+                plan.keep.append((i, desired[t]))
+            else:
+                plan.edits.append((i, desired[t]))
+        else:
+            i -= 1
+            plan.deletes.append(i)
+    plan.keep.reverse()
+    plan.edits.reverse()
+    plan.deletes.reverse()
+    return plan
+
+
+__all__ = [
+    'ChannelOrderPlan',
+    'plan_channel_order',
+]
@@ -12,6 +12,11 @@ from dataclasses import dataclass
 import os
 import logging
 
+from src.core.repositories.event_db_registry import register_event_database
+from src.core.services.refresh_coordinator import RefreshCoordinator
+from src.core.services.timer_wheel import timer_wheel
+from .reconciler import DashboardReconciler, DashboardStateStore
+
 
 @dataclass
 class GameConfig:
@@ -58,6 +63,13 @@ class GameModule(ABC):
         self.db_path = config.db_path
         self.logger = self._setup_logger()
 
+        # Make this module's events visible to cross-database maintenance
+        register_event_database(self.profile, self.db_path)
+
+        # Dashboard channel state lives next to the events
+        self.dashboard = DashboardReconciler(DashboardStateStore(self.db_path))
+        self._dashboard_refreshes: Dict[int, RefreshCoordinator] = {}
+
     def _setup_logger(self) -> logging.Logger:
         """Set up a logger for this game module."""
         logger = logging.getLogger(self.config.log_name)
@@ -112,14 +124,38 @@ class GameModule(ABC):
         """
         pass
 
-    @abstractmethod
     async def update_dashboard(self, guild, region: Optional[str] = None):
         """
         Update the timer channel dashboard for this game.
 
+        Calls for the same guild made while a refresh is queued or running
+        are merged into one debounced refresh (see RefreshCoordinator).
+        A refresh rebuilds every channel for every region, so requests for
+        different regions share it rather than racing on the same channels.
+
+        Args:
+            guild: Discord guild object
+            region: Optional region whose times triggered the update
+        """
+        if not guild:
+            return
+        coordinator = self._dashboard_refreshes.get(guild.id)
+        if coordinator is None:
+            async def refresh(force, guild=guild):
+                await self.rebuild_dashboard(guild)
+            coordinator = RefreshCoordinator(refresh, name=f"{self.profile} dashboard ({guild.id})")
+            self._dashboard_refreshes[guild.id] = coordinator
+        await coordinator.request()
+
+    @abstractmethod
+    async def rebuild_dashboard(self, guild):
+        """
+        Bring the timer channel dashboard for this game up to date.
+
+        Called by update_dashboard, one refresh at a time per guild.
+
         Args:
             guild: Discord guild object
-            region: Optional region to update (for regional games)
         """
         pass
 
@@ -178,15 +214,49 @@ class GameModule(ABC):
         """
         pass
 
+    @property
+    def dashboard_timer_name(self) -> str:
+        """
+        Timer wheel handler name of this module's dashboard refresh.
+
+        Namespaced so it doesn't replace the handler the legacy module of
+        the same game registers under the bare profile code.
+        """
+        return f"games:{self.profile}"
+
     async def schedule_update_task(self, update_unix: int, region: Optional[str] = None):
         """
         Schedule a dashboard update at a specific time.
 
+        The update goes on the shared timer wheel under dashboard_timer_name;
+        the module registers the matching handler (see register_dashboard_timer).
+
         Args:
             update_unix: Unix timestamp for when to update
             region: Optional region (for regional games)
         """
-        pass
+        await timer_wheel.schedule(self.dashboard_timer_name, update_unix, region)
+
+    def register_dashboard_timer(self, bot):
+        """
+        Register this module's dashboard refresh on the shared timer wheel and start it.
+
+        The handler refreshes the main server's dashboard, passing the
+        scheduled region through for regional games.
+
+        Args:
+            bot: Discord bot instance
+        """
+        async def refresh(region: Optional[str] = None):
+            server_id = getattr(self, "main_server_id", None)
+            guild = bot.get_guild(server_id)
+            if guild is None:
+                self.logger.error(f"Could not find main guild {server_id}")
+                return
+            await self.update_dashboard(guild, region)
+
+        timer_wheel.register(self.dashboard_timer_name, refresh)
+        timer_wheel.start()
 
 
 class HoyoverseGameModule(GameModule):
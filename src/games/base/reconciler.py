@@ -0,0 +1,353 @@
+"""
+Desired-state reconciliation for dashboard channels.
+
+A module describes what a channel should show as an ordered list of
+``DesiredMessage`` (key, content hash, send/edit kwargs). The reconciler
+compares it with the persisted state of the channel (which message shows
+which key, with which content hash) and applies the cheapest plan of
+deletes, edits and sends. A refresh where nothing changed makes no Discord
+calls at all.
+
+Planning reuses ``plan_channel_order`` on (key, content hash) pairs, so a
+message is left alone only when it already shows the right key with the
+right content in the right place.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import aiosqlite
+import discord
+
+from src.core.services.rest_scheduler import RestPriority, discord_rest
+from .channel_order import ChannelOrderPlan, plan_channel_order
+
+logger = logging.getLogger("dashboard_reconciler")
+
+# Messages read when adopting a channel that has no persisted state yet
+ADOPT_HISTORY_LIMIT = 50
+
+_STATE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS dashboard_messages (
+        channel_id TEXT NOT NULL,
+        message_id TEXT NOT NULL,
+        slot_key TEXT,
+        content_hash TEXT,
+        PRIMARY KEY (channel_id, message_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dashboard_channels (
+        channel_id TEXT PRIMARY KEY,
+        reconciled_unix INTEGER
+    )
+    """,
+)
+
+
+def payload_hash(payload: Dict[str, Any]) -> str:
+    """
+    Stable hash of send/edit kwargs.
+
+    Embeds are hashed through ``to_dict()``; other values through ``str``.
+    """
+    normalized = {
+        name: value.to_dict() if hasattr(value, "to_dict") else value
+        for name, value in payload.items()
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class DesiredMessage:
+    """One message a channel should show, top to bottom."""
+    key: str
+    content_hash: str
+    payload: Dict[str, Any] = field(default_factory=dict, compare=False, hash=False)
+
+    @classmethod
+    def build(cls, key: Any, **payload) -> "DesiredMessage":
+        """Create a DesiredMessage, hashing ``payload`` (e.g. ``embed=...``)."""
+        return cls(str(key), payload_hash(payload), payload)
+
+
+@dataclass(frozen=True)
+class TrackedMessage:
+    """A message currently in a channel, as last recorded."""
+    message_id: int
+    key: Optional[str] = None
+    content_hash: Optional[str] = None
+
+
+@dataclass
+class ReconcilePlan:
+    """
+    Operations that turn the tracked state into the desired state.
+
+    Apply deletes and edits first, then post ``sends`` in order.
+    """
+    keep: List[TrackedMessage] = field(default_factory=list)
+    edits: List[Tuple[TrackedMessage, DesiredMessage]] = field(default_factory=list)
+    deletes: List[TrackedMessage] = field(default_factory=list)
+    sends: List[DesiredMessage] = field(default_factory=list)
+
+    @property
+    def calls(self) -> int:
+        """Discord API calls the plan costs."""
+        return len(self.edits) + len(self.deletes) + len(self.sends)
+
+    @property
+    def noop(self) -> bool:
+        """True when the channel already shows the desired state."""
+        return self.calls == 0
+
+
+def plan_reconcile(actual: Sequence[TrackedMessage], desired: Sequence[DesiredMessage]) -> ReconcilePlan:
+    """
+    Plan the fewest calls that make ``actual`` show ``desired``.
+
+    Args:
+        actual: Tracked messages, oldest first
+        desired: Messages in display order; keys must be unique
+
+    Returns:
+        ReconcilePlan (``plan.calls`` is the total API cost)
+
+    Raises:
+        ValueError: If two desired messages share a key
+    """
+    by_key = {message.key: message for message in desired}
+    if len(by_key) != len(desired):
+        raise ValueError("Desired dashboard messages must have unique keys")
+
+    order: ChannelOrderPlan = plan_channel_order(
+        [(message.key, message.content_hash) for message in actual],
+        [(message.key, message.content_hash) for message in desired],
+    )
+    return ReconcilePlan(
+        keep=[actual[slot] for slot, _ in order.keep],
+        edits=[(actual[slot], by_key[key]) for slot, (key, _) in order.edits],
+        deletes=[actual[slot] for slot in order.deletes],
+        sends=[by_key[key] for key, _ in order.sends],
+    )
+
+
+class DashboardStateStore:
+    """
+    Persisted state of dashboard channels.
+
+    Kept in a ``dashboard_messages`` table in the module's own database; a
+    ``dashboard_channels`` row marks channels that have been reconciled at
+    least once, so an empty channel is told apart from an unknown one.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the store.
+
+        Args:
+            db_path: Path to the module's SQLite database
+        """
+        self.db_path = db_path
+
+    async def _ensure_schema(self, conn: aiosqlite.Connection) -> None:
+        for statement in _STATE_SCHEMA:
+            await conn.execute(statement)
+
+    async def load(self, channel_id: Any) -> Optional[List[TrackedMessage]]:
+        """
+        Load a channel's tracked messages, oldest first.
+
+        Returns:
+            Tracked messages, or None if the channel was never reconciled
+        """
+        async with aiosqlite.connect(self.db_path) as conn:
+            await self._ensure_schema(conn)
+            async with conn.execute(
+                "SELECT 1 FROM dashboard_channels WHERE channel_id=?", (str(channel_id),)
+            ) as cursor:
+                if await cursor.fetchone() is None:
+                    return None
+            async with conn.execute(
+                """SELECT message_id, slot_key, content_hash FROM dashboard_messages
+                   WHERE channel_id=? ORDER BY CAST(message_id AS INTEGER)""",
+                (str(channel_id),)
+            ) as cursor:
+                return [TrackedMessage(int(row[0]), row[1], row[2]) async for row in cursor]
+
+    async def save(self, channel_id: Any, messages: Sequence[TrackedMessage]) -> None:
+        """Replace a channel's tracked messages in one transaction."""
+        async with aiosqlite.connect(self.db_path) as conn:
+            await self._ensure_schema(conn)
+            await conn.execute("DELETE FROM dashboard_messages WHERE channel_id=?", (str(channel_id),))
+            await conn.executemany(
+                "INSERT INTO dashboard_messages (channel_id, message_id, slot_key, content_hash) VALUES (?, ?, ?, ?)",
+                [(str(channel_id), str(m.message_id), m.key, m.content_hash) for m in messages]
+            )
+            await conn.execute(
+                "INSERT OR REPLACE INTO dashboard_channels (channel_id, reconciled_unix) VALUES (?, ?)",
+                (str(channel_id), int(time.time()))
+            )
+            await conn.commit()
+
+
+def _sent_by_us(message) -> bool:
+    me = getattr(getattr(message, "guild", None), "me", None)
+    return me is not None and message.author.id == me.id
+
+
+class DashboardReconciler:
+    """
+    Brings dashboard channels to a desired state with minimal Discord calls.
+
+    Deletes and edits are independent of each other, so they are queued on
+    the REST scheduler together and run as its rate limits allow. Sends run
+    one at a time afterwards, because their order is what the channel shows.
+    Reconciles of the same channel run one at a time, each planning from the
+    state the previous one saved.
+    """
+
+    def __init__(
+        self,
+        store: DashboardStateStore,
+        *,
+        rest=discord_rest,
+        priority: int = RestPriority.DASHBOARD,
+        is_ours: Callable[[Any], bool] = _sent_by_us,
+    ):
+        """
+        Initialize the reconciler.
+
+        Args:
+            store: Where channel state is persisted
+            rest: REST executor with send/edit/delete (the shared RestScheduler)
+            priority: RestPriority used for every call
+            is_ours: Selects messages that may be adopted from channel history
+        """
+        self.store = store
+        self._rest = rest
+        self._priority = priority
+        self._is_ours = is_ours
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    async def reconcile(self, channel, desired: Sequence[DesiredMessage]) -> ReconcilePlan:
+        """
+        Make ``channel`` show ``desired``.
+
+        A channel without persisted state adopts its recent bot messages,
+        which are then edited or deleted like any other tracked message.
+
+        Args:
+            channel: Discord text channel
+            desired: Messages in display order
+
+        Returns:
+            The plan that was applied
+        """
+        lock = self._locks.setdefault(channel.id, asyncio.Lock())
+        async with lock:
+            return await self._reconcile(channel, desired)
+
+    async def _reconcile(self, channel, desired: Sequence[DesiredMessage]) -> ReconcilePlan:
+        actual = await self.store.load(channel.id)
+        adopted = actual is None
+        if adopted:
+            actual = await self._adopt(channel)
+
+        plan = plan_reconcile(actual, desired)
+        if plan.noop:
+            if adopted:
+                await self.store.save(channel.id, actual)
+            return plan
+
+        state: Dict[int, TrackedMessage] = {}
+        try:
+            while not await self._apply(channel, plan, state):
+                # A message we meant to edit is gone; plan again from what is left
+                plan = plan_reconcile([state[message_id] for message_id in sorted(state)], desired)
+        finally:
+            # Whatever was applied before a failure is recorded
+            await self.store.save(channel.id, [state[message_id] for message_id in sorted(state)])
+        logger.info(
+            f"Reconciled #{getattr(channel, 'name', channel.id)}: {len(plan.edits)} edit(s), "
+            f"{len(plan.deletes)} delete(s), {len(plan.sends)} send(s)"
+        )
+        return plan
+
+    async def _apply(self, channel, plan: ReconcilePlan, state: Dict[int, TrackedMessage]) -> bool:
+        """
+        Apply a plan, keeping ``state`` (message ID -> TrackedMessage) current.
+
+        Every message starts out tracked as it was; an operation updates its
+        entry only once Discord accepted it. Failed deletes and edits are
+        therefore retried by the next reconcile.
+
+        Returns:
+            False if an edit found its message deleted. The sends are skipped
+            then, since posting them after the surviving messages could put
+            the channel out of order; the caller plans again from ``state``.
+        """
+        state.update((m.message_id, m) for m in plan.keep)
+        state.update((m.message_id, m) for m in plan.deletes)
+        state.update((m.message_id, m) for m, _ in plan.edits)
+        vanished = False
+
+        async def delete(message: TrackedMessage):
+            try:
+                await self._rest.delete(channel, message.message_id, priority=self._priority)
+            except discord.NotFound:
+                pass
+            except discord.HTTPException as e:
+                logger.warning(f"Failed to delete dashboard message {message.message_id}: {e}")
+                return
+            state.pop(message.message_id, None)
+
+        async def edit(message: TrackedMessage, target: DesiredMessage):
+            nonlocal vanished
+            try:
+                await self._rest.edit(channel, message.message_id, priority=self._priority, **target.payload)
+            except discord.NotFound:
+                state.pop(message.message_id, None)
+                vanished = True
+                return
+            except discord.HTTPException as e:
+                logger.warning(f"Failed to edit dashboard message {message.message_id}: {e}")
+                return
+            state[message.message_id] = TrackedMessage(message.message_id, target.key, target.content_hash)
+
+        await asyncio.gather(
+            *(delete(message) for message in plan.deletes),
+            *(edit(message, target) for message, target in plan.edits),
+        )
+        if vanished:
+            return False
+        for target in plan.sends:
+            sent = await self._rest.send(channel, priority=self._priority, **target.payload)
+            state[sent.id] = TrackedMessage(sent.id, target.key, target.content_hash)
+        return True
+
+    async def _adopt(self, channel) -> List[TrackedMessage]:
+        adopted = [
+            TrackedMessage(message.id)
+            async for message in channel.history(limit=ADOPT_HISTORY_LIMIT)
+            if self._is_ours(message)
+        ]
+        adopted.sort(key=lambda m: m.message_id)
+        return adopted
+
+
+__all__ = [
+    'DesiredMessage',
+    'TrackedMessage',
+    'ReconcilePlan',
+    'plan_reconcile',
+    'payload_hash',
+    'DashboardStateStore',
+    'DashboardReconciler',
+]
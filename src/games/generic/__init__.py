@@ -12,14 +12,13 @@ as the core system.
 """
 
 import discord
-import asyncio
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, Any, List
 import pytz
 import dateparser
 import aiosqlite
 
-from src.games.base import GameConfig, GameModule, HoyoverseGameModule
+from src.games.base import GameConfig, GameModule, HoyoverseGameModule, DesiredMessage
 
 
 # =============================================================================
@@ -289,7 +288,7 @@ class GenericGameModule(GameModule):
         """Refresh events (no-op for generic module)."""
         self.logger.info(f"Refreshing {self.profile} events")
 
-    async def update_dashboard(self, guild, region: Optional[str] = None):
+    async def rebuild_dashboard(self, guild):
         """Update the event dashboard."""
         if not guild:
             return
@@ -330,32 +329,22 @@ class GenericGameModule(GameModule):
         events: List[Dict[str, Any]],
         event_type: str,
     ):
-        """Update embeds in a channel."""
-        try:
-            # Clear existing bot messages
-            async for message in channel.history(limit=50):
-                if message.author.bot:
-                    try:
-                        await message.delete()
-                    except discord.HTTPException:
-                        pass
-                    await asyncio.sleep(0.5)
-
-            if not events:
-                embed = discord.Embed(
-                    title=f"No {event_type.title()} Events",
-                    description=f"There are no {event_type} events at this time.",
-                    color=discord.Color.greyple(),
-                )
-                await channel.send(embed=embed)
-                return
-
-            # Send embeds for each event
-            for event in events:
-                embed = self._create_event_embed(event, event_type)
-                await channel.send(embed=embed)
-                await asyncio.sleep(0.5)
+        """Reconcile a channel's embeds with the given events."""
+        if events:
+            desired = [
+                DesiredMessage.build(event.get('id', event.get('title')), embed=self._create_event_embed(event, event_type))
+                for event in events
+            ]
+        else:
+            embed = discord.Embed(
+                title=f"No {event_type.title()} Events",
+                description=f"There are no {event_type} events at this time.",
+                color=discord.Color.greyple(),
+            )
+            desired = [DesiredMessage.build("empty", embed=embed)]
 
+        try:
+            await self.dashboard.reconcile(channel, desired)
         except discord.HTTPException as e:
             self.logger.error(f"Failed to update {event_type} channel: {e}")
 
@@ -516,7 +505,7 @@ class GenericHoyoverseModule(HoyoverseGameModule):
         """Refresh events (no-op for generic module)."""
         self.logger.info(f"Refreshing {self.profile} events")
 
-    async def update_dashboard(self, guild, region: Optional[str] = None):
+    async def rebuild_dashboard(self, guild):
         """Update the event dashboard with regional support."""
         if not guild:
             return
@@ -526,9 +515,12 @@ class GenericHoyoverseModule(HoyoverseGameModule):
         upcoming_channel = guild.get_channel(self.upcoming_channel_id) if self.upcoming_channel_id else None
 
         events = await self.repository.get_all_events()
-        regions_to_update = [region] if region else ["ASIA", "NA", "EU"]
 
-        for reg in regions_to_update:
+        # Every region is rebuilt: the channels hold all regions' embeds, and
+        # unchanged messages cost nothing
+        ongoing_by_region = {}
+        upcoming_by_region = {}
+        for reg in ["ASIA", "NA", "EU"]:
             reg_key = self.REGION_DISPLAY.get(reg, reg).lower()
             start_key = f"{reg_key}_start" if reg_key != "america" else "america_start"
             end_key = f"{reg_key}_end" if reg_key != "america" else "america_end"
@@ -547,42 +539,34 @@ class GenericHoyoverseModule(HoyoverseGameModule):
 
             ongoing_events.sort(key=lambda x: x[2])
             upcoming_events.sort(key=lambda x: x[1])
+            ongoing_by_region[reg] = ongoing_events
+            upcoming_by_region[reg] = upcoming_events
 
-            if ongoing_channel:
-                await self._update_regional_embeds(
-                    ongoing_channel,
-                    [(e, s, end) for e, s, end in ongoing_events],
-                    "ongoing",
-                    reg
-                )
+        if ongoing_channel:
+            await self._update_regional_embeds(ongoing_channel, ongoing_by_region, "ongoing")
 
-            if upcoming_channel:
-                await self._update_regional_embeds(
-                    upcoming_channel,
-                    [(e, s, end) for e, s, end in upcoming_events],
-                    "upcoming",
-                    reg
-                )
+        if upcoming_channel:
+            await self._update_regional_embeds(upcoming_channel, upcoming_by_region, "upcoming")
 
     async def _update_regional_embeds(
         self,
         channel: discord.TextChannel,
-        events: List[tuple],
+        events_by_region: Dict[str, List[tuple]],
         event_type: str,
-        region: str,
     ):
-        """Update embeds in a channel for a specific region."""
+        """Reconcile a channel's embeds with every region's events, region by region."""
+        desired = [
+            DesiredMessage.build(
+                f"{event.get('id', event.get('title'))}:{region}",
+                embed=self._create_regional_embed(event, event_type, region, start_ts, end_ts),
+            )
+            for region, events in events_by_region.items()
+            for event, start_ts, end_ts in events
+        ]
         try:
-            if not events:
-                return
-
-            for event, start_ts, end_ts in events:
-                embed = self._create_regional_embed(event, event_type, region, start_ts, end_ts)
-                await channel.send(embed=embed)
-                await asyncio.sleep(0.5)
-
+            await self.dashboard.reconcile(channel, desired)
         except discord.HTTPException as e:
-            self.logger.error(f"Failed to update {event_type} channel for {region}: {e}")
+            self.logger.error(f"Failed to update {event_type} channel: {e}")
 
     def _create_regional_embed(
         self,
@@ -15,7 +15,8 @@ from typing import Optional, Dict, Any, List
 import pytz
 import dateparser
 
-from src.games.base import GameConfig, HoyoverseGameModule
+from src.core.services.timer_wheel import timer_wheel
+from src.games.base import GameConfig, HoyoverseGameModule, DesiredMessage
 from .database import HSREventRepository
 
 
@@ -63,9 +64,6 @@ class HSRModule(HoyoverseGameModule):
         self.upcoming_channel_id = upcoming_channel_id
         self.main_server_id = main_server_id
 
-        # In-memory task tracking
-        self._scheduled_tasks: Dict[tuple, asyncio.Task] = {}
-
     async def initialize(self):
         """Initialize the module."""
         await self.repository.initialize()
@@ -81,13 +79,15 @@ class HSRModule(HoyoverseGameModule):
         # For now, just update the dashboard
         self.logger.info("Refreshing HSR events")
 
-    async def update_dashboard(self, guild, region: Optional[str] = None):
+    async def rebuild_dashboard(self, guild):
         """
         Update the HSR event dashboard.
 
+        Both channels are reconciled in full for every region; messages
+        that did not change cost no API calls.
+
         Args:
             guild: Discord guild object
-            region: Optional specific region to update (or all if None)
         """
         if not guild:
             return
@@ -96,57 +96,31 @@ class HSRModule(HoyoverseGameModule):
         ongoing_channel = guild.get_channel(self.ongoing_channel_id) if self.ongoing_channel_id else None
         upcoming_channel = guild.get_channel(self.upcoming_channel_id) if self.upcoming_channel_id else None
 
-        regions_to_update = [region] if region else ["ASIA", "NA", "EU"]
         events = await self.repository.get_all_events()
 
+        # Both channels are rebuilt for every region: unchanged messages cost nothing
+        ongoing = []
+        upcoming = []
         for event in events:
-            # Group regions by their start/end times
-            time_groups = self._group_regions_by_time(event)
-
-            for (start, end), grouped_regions in time_groups.items():
-                # Only process if this group contains a region we're updating
-                if not any(r in regions_to_update for r in grouped_regions):
-                    continue
+            if await self.repository.is_event_ended(event, now):
+                await self.repository.delete_event(event["id"])
+                continue
 
-                # Determine event status
+            # Regions with identical start/end times share one embed
+            for (start, end), grouped_regions in self._group_regions_by_time(event).items():
                 if end < now:
-                    # Delete ended events
-                    for reg in grouped_regions:
-                        await self._delete_event_message(
-                            guild, self.ongoing_channel_id, event["id"], reg
-                        )
-                        await self._delete_event_message(
-                            guild, self.upcoming_channel_id, event["id"], reg
-                        )
-
-                    # Delete from DB if ended in ALL regions
-                    if await self.repository.is_event_ended(event, now):
-                        await self.repository.delete_event(event["id"])
                     continue
-
-                elif start <= now < end:
-                    event_status = "ongoing"
-                else:
-                    event_status = "upcoming"
-
-                # Create embed
+                target = ongoing if start <= now < end else upcoming
                 embed = self._create_event_embed(event, grouped_regions, start, end)
+                key = f"{event['id']}:{'/'.join(grouped_regions)}"
+                target.append((start, DesiredMessage.build(key, embed=embed)))
 
-                # Post or update the embed
-                target_channel = ongoing_channel if event_status == "ongoing" else upcoming_channel
-                other_channel_id = self.upcoming_channel_id if event_status == "ongoing" else self.ongoing_channel_id
-
-                if target_channel:
-                    primary_region = grouped_regions[0]
-                    await self._upsert_event_message(
-                        guild, target_channel, event, event["id"], primary_region, embed
-                    )
-
-                    # Delete from the other channel
-                    for reg in grouped_regions:
-                        await self._delete_event_message(guild, other_channel_id, event["id"], reg)
+        for channel, entries in ((ongoing_channel, ongoing), (upcoming_channel, upcoming)):
+            if channel:
+                entries.sort(key=lambda entry: entry[0])
+                await self.dashboard.reconcile(channel, [message for _, message in entries])
 
-        self.logger.info(f"Dashboard updated for regions: {regions_to_update}")
+        self.logger.info("Dashboard updated")
 
     async def add_event(self, ctx, event_data: Dict[str, Any]):
         """
@@ -187,18 +161,9 @@ class HSRModule(HoyoverseGameModule):
             await ctx.send(f"No event found with title '{title}'.")
             return False
 
-        # Delete messages for all regions
-        guild = ctx.guild
-        for region in ["ASIA", "NA", "EU"]:
-            await self._delete_event_message(
-                guild, self.ongoing_channel_id, event["id"], region
-            )
-            await self._delete_event_message(
-                guild, self.upcoming_channel_id, event["id"], region
-            )
-
-        # Delete from database
+        # Delete from database; the dashboard refresh removes its messages
         await self.repository.delete_event(event["id"])
+        await self.update_dashboard(ctx.guild)
 
         await ctx.send(f"Deleted HSR event '{event['title']}' and its notifications.")
         return True
@@ -349,59 +314,6 @@ class HSRModule(HoyoverseGameModule):
 
         return embed
 
-    async def _upsert_event_message(
-        self,
-        guild,
-        channel,
-        event: Dict,
-        event_id: int,
-        region: str,
-        embed: discord.Embed
-    ):
-        """Update existing message or create new one."""
-        msg_id = await self.repository.get_message_id(
-            event_id, str(channel.id), region
-        )
-
-        if msg_id:
-            try:
-                msg = await channel.fetch_message(int(msg_id))
-                await msg.edit(embed=embed)
-                return
-            except Exception:
-                pass
-
-        # Send new message
-        msg = await channel.send(embed=embed)
-        await self.repository.set_message_id(
-            event_id, str(channel.id), str(msg.id), region
-        )
-
-    async def _delete_event_message(
-        self,
-        guild,
-        channel_id: int,
-        event_id: int,
-        region: str
-    ):
-        """Delete an event message from a channel."""
-        if not channel_id:
-            return
-
-        msg_id = await self.repository.get_message_id(
-            event_id, str(channel_id), region
-        )
-        if msg_id:
-            channel = guild.get_channel(channel_id)
-            if channel:
-                try:
-                    msg = await channel.fetch_message(int(msg_id))
-                    await msg.delete()
-                except Exception:
-                    pass
-
-        await self.repository.delete_message_record(event_id, str(channel_id), region)
-
     async def _schedule_event_notifications(self, event_data: Dict):
         """Schedule notifications for each region."""
         # This would integrate with the notification service
@@ -413,52 +325,20 @@ class HSRModule(HoyoverseGameModule):
         for region, tz_key in [("NA", "america"), ("EU", "europe"), ("ASIA", "asia")]:
             start = int(event_data[f'{tz_key}_start'])
             end = int(event_data[f'{tz_key}_end'])
-            await self.repository.schedule_update_task(start, region.upper())
-            await self.repository.schedule_update_task(end, region.upper())
+            await self.schedule_update_task(start, region.upper())
+            await self.schedule_update_task(end, region.upper())
 
     async def _load_scheduled_tasks(self, bot):
-        """Load scheduled tasks from database on startup."""
-        tasks = await self.repository.get_pending_update_tasks()
-        now = int(datetime.now(timezone.utc).timestamp())
+        """Register the dashboard timer and move pending database tasks onto it."""
+        self.register_dashboard_timer(bot)
 
-        # Group by region
-        from collections import defaultdict
-        region_tasks = defaultdict(list)
-        for update_unix, region in tasks:
-            region_tasks[region].append(update_unix)
-
-        for region, task_times in region_tasks.items():
-            overdue = [t for t in task_times if t <= now]
-            future = [t for t in task_times if t > now]
-
-            # Execute one update for overdue tasks
-            if overdue:
-                self.logger.info(
-                    f"Found {len(overdue)} overdue tasks for region {region}. Executing update..."
-                )
-                main_guild = bot.get_guild(self.main_server_id)
-                if main_guild:
-                    await self.update_dashboard(main_guild, region)
-
-                for update_unix in overdue:
-                    await self.repository.mark_task_done(update_unix, region)
-
-            # Schedule future tasks
-            for update_unix in future:
-                delay = update_unix - now
-                task_key = (update_unix, region)
-                if task_key not in self._scheduled_tasks:
-                    self._scheduled_tasks[task_key] = asyncio.create_task(
-                        self._run_scheduled_update(bot, update_unix, region, delay)
-                    )
-
-    async def _run_scheduled_update(self, bot, update_unix: int, region: str, delay: int):
-        """Run a scheduled dashboard update after delay."""
-        await asyncio.sleep(delay)
-        guild = bot.get_guild(self.main_server_id)
-        if guild:
-            await self.update_dashboard(guild, region)
-        await self.repository.mark_task_done(update_unix, region)
+        tasks = await self.repository.get_pending_update_tasks()
+        if tasks:
+            # Overdue tasks are kept: the wheel runs one catch-up update per region
+            await timer_wheel.schedule_many(self.dashboard_timer_name, tasks, catch_up=True)
+            for update_unix, region in tasks:
+                await self.repository.mark_task_done(update_unix, region)
+            self.logger.info(f"Moved {len(tasks)} pending update tasks onto the timer wheel")
 
     async def _periodic_cleanup(self):
         """Periodically clean up old completed tasks."""
@@ -5,15 +5,20 @@ This package provides web scraping utilities:
 - Generic web scraper base class
 - Game-specific scrapers for event pages
 - HTML parsing utilities
+- Pooled async Discord webhook sender
 
 Note: Full implementation to be migrated from hsr_scraper.py and similar files.
 """
 
+from .webhook_sender import WebhookSender, WebhookResult
+
 # Placeholder - to be implemented
 # from .scraper import WebScraper
 # from .parsers import EventParser
 
 __all__ = [
+    'WebhookSender',
+    'WebhookResult',
     # 'WebScraper',
     # 'EventParser',
 ]
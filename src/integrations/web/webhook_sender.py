@@ -0,0 +1,201 @@
+"""
+Pooled async Discord webhook sender.
+
+Posts webhook payloads through one shared aiohttp session with:
+- Concurrency bounded per webhook URL
+- Discord 429 handling (honours ``retry_after`` and pauses the whole URL)
+- Exponential backoff on 5xx / connection errors
+- Latency and throughput statistics for run summaries
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+logger = logging.getLogger("webhook_sender")
+
+
+@dataclass
+class WebhookResult:
+    """Outcome of posting one payload."""
+    ok: bool
+    status: Optional[int]
+    attempts: int
+    latency: float
+    error: Optional[str] = None
+
+
+class WebhookSender:
+    """
+    Async webhook client shared by every POST in a notifier run.
+
+    Use as an async context manager so the pooled session is closed:
+
+        async with WebhookSender() as sender:
+            result = await sender.post(url, {"content": "hi"})
+    """
+
+    def __init__(
+        self,
+        *,
+        per_url_concurrency: int = 2,
+        max_retries: int = 3,
+        timeout: float = 10.0,
+        backoff_base: float = 0.5,
+        max_retry_after: float = 60.0,
+        user_agent: str = "KanamiBot/1.0",
+    ):
+        """
+        Initialize the sender.
+
+        Args:
+            per_url_concurrency: Maximum in-flight POSTs per webhook URL
+            max_retries: Retries after the first attempt (429, 5xx, network)
+            timeout: Total timeout per request in seconds
+            backoff_base: First backoff delay for 5xx / network errors
+            max_retry_after: Cap on a single 429 wait
+            user_agent: User-Agent header sent with every request
+        """
+        self.per_url_concurrency = per_url_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.max_retry_after = max_retry_after
+        self.user_agent = user_agent
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._blocked_until: Dict[str, float] = {}
+        self._latencies: List[float] = []
+        self._sent = 0
+        self._failed = 0
+        self._retries = 0
+        self._rate_limited = 0
+        self._started = time.monotonic()
+
+    async def __aenter__(self) -> "WebhookSender":
+        self._session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"User-Agent": self.user_agent},
+        )
+        self._started = time.monotonic()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _semaphore(self, url: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(url)
+        if sem is None:
+            sem = asyncio.Semaphore(self.per_url_concurrency)
+            self._semaphores[url] = sem
+        return sem
+
+    async def _wait_if_blocked(self, url: str) -> None:
+        delay = self._blocked_until.get(url, 0) - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _retry_after(resp: aiohttp.ClientResponse) -> float:
+        try:
+            data = await resp.json(content_type=None)
+            if isinstance(data, dict) and data.get("retry_after") is not None:
+                return float(data["retry_after"])
+        except Exception:
+            pass
+        try:
+            return float(resp.headers.get("Retry-After", 1))
+        except ValueError:
+            return 1.0
+
+    async def post(self, url: str, payload: Dict[str, Any]) -> WebhookResult:
+        """
+        POST a JSON payload to a webhook URL.
+
+        Args:
+            url: Discord webhook URL
+            payload: JSON body (e.g. {"content": "..."})
+
+        Returns:
+            WebhookResult describing the final attempt
+        """
+        if self._session is None:
+            raise RuntimeError("WebhookSender must be used as an async context manager")
+
+        start = time.monotonic()
+        status = None
+        error = None
+        attempts = 0
+        async with self._semaphore(url):
+            while attempts <= self.max_retries:
+                attempts += 1
+                backoff = False
+                await self._wait_if_blocked(url)
+                try:
+                    async with self._session.post(url, json=payload) as resp:
+                        status = resp.status
+                        if status in (200, 204):
+                            latency = time.monotonic() - start
+                            self._latencies.append(latency)
+                            self._sent += 1
+                            return WebhookResult(True, status, attempts, latency)
+                        if status == 429:
+                            retry_after = min(await self._retry_after(resp), self.max_retry_after)
+                            self._rate_limited += 1
+                            self._blocked_until[url] = time.monotonic() + retry_after
+                            error = f"rate limited (retry_after={retry_after:.2f}s)"
+                        elif status >= 500:
+                            error = f"HTTP {status}"
+                            backoff = True
+                        else:
+                            body = await resp.text()
+                            error = f"HTTP {status}: {body[:200]}"
+                            break
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = f"{type(e).__name__}: {e}"
+                    backoff = True
+                if attempts > self.max_retries:
+                    break
+                self._retries += 1
+                if backoff:
+                    # Only back off when another attempt follows
+                    await asyncio.sleep(self.backoff_base * (2 ** (attempts - 1)))
+
+        latency = time.monotonic() - start
+        self._failed += 1
+        logger.warning(f"Webhook POST failed after {attempts} attempt(s): {error}")
+        return WebhookResult(False, status, attempts, latency, error)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return latency/throughput statistics for every POST so far."""
+        elapsed = time.monotonic() - self._started
+        latencies = sorted(self._latencies)
+        total = self._sent + self._failed
+
+        def pct(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            "total": total,
+            "sent": self._sent,
+            "failed": self._failed,
+            "retries": self._retries,
+            "rate_limited": self._rate_limited,
+            "elapsed": elapsed,
+            "throughput": total / elapsed if elapsed > 0 else 0.0,
+            "latency_p50": pct(0.5),
+            "latency_p95": pct(0.95),
+            "latency_max": latencies[-1] if latencies else 0.0,
+        }
+
+
+__all__ = ['WebhookSender', 'WebhookResult']
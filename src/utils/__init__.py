@@ -138,6 +138,13 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(f'gacha_timer_bot.{name}')
 
 
+# Queue-based, non-blocking file logging (see log_pipeline.py)
+from .log_pipeline import LogPipeline, get_log_pipeline, get_pipeline_logger, shutdown_log_pipelines
+
+# Hash of an embed's rendered content (see embed_hash.py)
+from .embed_hash import embed_content_hash
+
+
 # =============================================================================
 # Date/Time Utilities
 # =============================================================================
@@ -451,6 +458,12 @@ __all__ = [
     # Logging
     'setup_logging',
     'get_logger',
+    'LogPipeline',
+    'get_log_pipeline',
+    'get_pipeline_logger',
+    'shutdown_log_pipelines',
+    # Embeds
+    'embed_content_hash',
     # Date/Time
     'TIMEZONES',
     'parse_datetime',
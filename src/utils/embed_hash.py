@@ -0,0 +1,20 @@
+"""
+Embed content hashing.
+
+Dashboards and notification pages store a hash of the embed they last
+rendered next to the message ID, and skip the edit when a refresh renders
+the same content again.
+"""
+
+import hashlib
+import json
+
+import discord
+
+
+def embed_content_hash(embed: discord.Embed) -> str:
+    """Stable hash of an embed's rendered content, used to skip no-op edits."""
+    return hashlib.sha256(json.dumps(embed.to_dict(), sort_keys=True).encode("utf-8")).hexdigest()
+
+
+__all__ = ['embed_content_hash']
@@ -0,0 +1,270 @@
+"""
+Non-blocking log pipeline.
+
+Log calls made on the event loop only put a LogRecord on a queue. A background
+writer thread drains the queue in batches, writes every record to its handlers
+and flushes once per batch. Log files rotate by size.
+
+Usage:
+    logger = get_pipeline_logger("kanami.notifications", "discord.log")
+    logger.info("Scheduled %s notification(s)", count)
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from typing import Dict, List, Optional, TextIO
+
+DEFAULT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+DEFAULT_BATCH_SIZE = 256
+
+# Arguments that can be formatted later on the writer thread without racing the caller
+_IMMUTABLE_ARGS = (str, int, float, bool, type(None))
+_exception_formatter = logging.Formatter()
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves message formatting to the writer thread.
+
+    Records whose args are all immutable are enqueued untouched, so the caller
+    never pays for ``%`` formatting, timestamps or the Formatter. Anything
+    else (mutable args, non-string messages, tracebacks) is rendered
+    immediately so later changes by the caller can't leak into the log.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if not isinstance(record.msg, str) or (
+            args and not (isinstance(args, tuple) and all(isinstance(a, _IMMUTABLE_ARGS) for a in args))
+        ):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class BatchedStreamHandler(logging.StreamHandler):
+    """StreamHandler that writes without flushing; the writer flushes per batch."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+class BatchedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Size-rotated file handler that writes without flushing.
+
+    The formatted line is reused for the rollover check, so each record is
+    formatted once.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self.stream.tell() + len(line) >= self.maxBytes:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(line)
+        except Exception:
+            self.handleError(record)
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that drains up to ``batch_size`` records per wake-up and flushes once."""
+
+    def __init__(self, log_queue, *handlers: logging.Handler, batch_size: int = DEFAULT_BATCH_SIZE):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+
+    def _monitor(self) -> None:
+        log_queue = self.queue
+        while True:
+            batch = [log_queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(log_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                    continue
+                self.handle(record)
+            for handler in self.handlers:
+                try:
+                    handler.flush()
+                except Exception:
+                    pass
+            if stop:
+                return
+
+
+class LogPipeline:
+    """
+    One queue, one writer thread and the handlers it owns.
+
+    Attach ``pipeline.handler`` to any number of loggers; every record they
+    emit is written by the same thread, so one file never has two writers.
+    """
+
+    def __init__(self, handlers: List[logging.Handler], *, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Initialize the pipeline.
+
+        Args:
+            handlers: Handlers run on the writer thread (use the Batched* handlers)
+            batch_size: Maximum records written between flushes
+        """
+        self.queue = queue.SimpleQueue()
+        self.handler = DeferredQueueHandler(self.queue)
+        self.handlers = list(handlers)
+        self._listener = BatchingQueueListener(self.queue, *self.handlers, batch_size=batch_size)
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        """True while the writer thread is alive."""
+        return self._running
+
+    def start(self) -> None:
+        """Start the writer thread (idempotent)."""
+        if not self._running:
+            self._listener.start()
+            self._running = True
+
+    def stop(self) -> None:
+        """Flush everything queued so far and stop the writer thread."""
+        if self._running:
+            self._running = False
+            self._listener.stop()
+            for handler in self.handlers:
+                handler.close()
+
+    def attach(self, logger: logging.Logger) -> logging.Logger:
+        """Route a logger's records through this pipeline."""
+        if self.handler not in logger.handlers:
+            logger.addHandler(self.handler)
+        return logger
+
+
+# One pipeline per log file, shared by every logger that writes to it
+_pipelines: Dict[str, LogPipeline] = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_log_pipeline(
+    path: str,
+    *,
+    console: bool = True,
+    stream: Optional[TextIO] = None,
+    fmt: str = DEFAULT_FORMAT,
+    datefmt: Optional[str] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
+) -> LogPipeline:
+    """
+    Get (or create and start) the pipeline that owns a log file.
+
+    Options only apply when the pipeline is first created.
+
+    Args:
+        path: Log file path
+        console: Also echo records to ``stream`` (stdout by default)
+        stream: Console stream override
+        fmt: Format string for every handler
+        datefmt: Date format for %(asctime)s
+        max_bytes: Rotate the file once it reaches this size (0 disables rotation)
+        backup_count: Rotated files kept (path.1 .. path.N)
+
+    Returns:
+        The running LogPipeline for ``path``
+    """
+    with _pipelines_lock:
+        pipeline = _pipelines.get(path)
+        if pipeline is None:
+            formatter = logging.Formatter(fmt, datefmt=datefmt)
+            handlers: List[logging.Handler] = [BatchedRotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+            )]
+            if console:
+                handlers.append(BatchedStreamHandler(stream or sys.stdout))
+            for handler in handlers:
+                handler.setFormatter(formatter)
+            pipeline = LogPipeline(handlers)
+            _pipelines[path] = pipeline
+        pipeline.start()
+        return pipeline
+
+
+def _no_caller(*args, **kwargs):
+    return "(unknown file)", 0, "(unknown function)", None
+
+
+def get_pipeline_logger(
+    name: str,
+    path: str,
+    *,
+    level: int = logging.INFO,
+    record_caller: bool = False,
+    **pipeline_options,
+) -> logging.Logger:
+    """
+    Get a logger whose records go only to the pipeline for ``path``.
+
+    Args:
+        name: Logger name
+        path: Log file path (see get_log_pipeline)
+        level: Records below this level are dropped before any formatting
+        record_caller: Walk the stack for %(pathname)s/%(lineno)d; off by
+            default since it is the most expensive part of a log call
+        **pipeline_options: Passed to get_log_pipeline on first use
+
+    Returns:
+        Configured logger (propagation to the root logger is disabled)
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    logger.propagate = False
+    if not record_caller:
+        logger.findCaller = _no_caller
+    return get_log_pipeline(path, **pipeline_options).attach(logger)
+
+
+def shutdown_log_pipelines() -> None:
+    """Flush and stop every pipeline (registered with atexit)."""
+    with _pipelines_lock:
+        pipelines = list(_pipelines.values())
+        _pipelines.clear()
+    for pipeline in pipelines:
+        pipeline.stop()
+
+
+atexit.register(shutdown_log_pipelines)
+
+
+__all__ = [
+    'DeferredQueueHandler',
+    'BatchedStreamHandler',
+    'BatchedRotatingFileHandler',
+    'BatchingQueueListener',
+    'LogPipeline',
+    'get_log_pipeline',
+    'get_pipeline_logger',
+    'shutdown_log_pipelines',
+]
@@ -0,0 +1,297 @@
+"""
+Tests for shared game-module helpers in src/games/base.
+"""
+
+import asyncio
+import itertools
+import random
+from types import SimpleNamespace
+
+import discord
+
+from src.games.base import (
+    GameConfig,
+    GameModule,
+    ChannelOrderPlan,
+    plan_channel_order,
+    DesiredMessage,
+    TrackedMessage,
+    plan_reconcile,
+    DashboardStateStore,
+    DashboardReconciler,
+)
+
+
+def apply_plan(actual, plan):
+    """Simulate a plan on a channel: edit/delete in place, then append sends."""
+    shown = list(actual)
+    for slot, key in plan.edits:
+        shown[slot] = key
+    deleted = set(plan.deletes)
+    return [key for slot, key in enumerate(shown) if slot not in deleted] + plan.sends
+
+
+class TestChannelOrder:
+    """Tests for minimal-move channel ordering."""
+
+    def test_in_order_is_noop(self):
+        """Test that an ordered channel needs no calls."""
+        plan = plan_channel_order(["a", "b", "c"], ["a", "b", "c"])
+        assert plan.noop
+        assert plan.calls == 0
+
+    def test_new_event_near_top_reuses_slots(self):
+        """Test that a new event posted at the bottom is moved up with edits, not reposts."""
+        actual = ["a", "b", "c", "d", "e", "x"]
+        desired = ["a", "x", "b", "c", "d", "e"]
+        plan = plan_channel_order(actual, desired)
+
+        assert apply_plan(actual, plan) == desired
+        assert plan.deletes == [] and plan.sends == []
+        assert plan.keep == [(0, "a")]
+        assert plan.calls == 5  # the old tail repost took 10 (5 deletes + 5 sends)
+
+    def test_stale_message_is_deleted(self):
+        """Test that one extra message in the middle costs a single delete."""
+        plan = plan_channel_order(["a", "b", "z", "c"], ["a", "b", "c"])
+        assert plan.deletes == [2]
+        assert plan.calls == 1
+
+    def test_trailing_new_events_are_sent(self):
+        """Test that events beyond the existing messages are posted at the bottom."""
+        plan = plan_channel_order(["a", "b"], ["a", "b", "c", "d"])
+        assert plan.sends == ["c", "d"]
+        assert plan.calls == 2
+
+    def test_plans_are_correct_and_minimal(self):
+        """Test every plan on small channels against a brute-force optimum."""
+        rng = random.Random(7)
+        for _ in range(200):
+            desired = list(range(rng.randint(0, 6)))
+            actual = rng.sample(desired, len(desired)) + [f"stale{i}" for i in range(rng.randint(0, 2))]
+            rng.shuffle(actual)
+            plan = plan_channel_order(actual, desired)
+            assert isinstance(plan, ChannelOrderPlan)
+            assert apply_plan(actual, plan) == desired
+
+            # Brute force: choose surviving slots, they show desired's prefix
+            best = None
+            for kept in range(min(len(actual), len(desired)) + 1):
+                for slots in itertools.combinations(range(len(actual)), kept):
+                    edits = sum(actual[s] != desired[t] for t, s in enumerate(slots))
+                    cost = edits + (len(actual) - kept) + (len(desired) - kept)
+                    best = cost if best is None else min(best, cost)
+            assert plan.calls == best
+
+
+class _FakeSent:
+    def __init__(self, message_id):
+        self.id = message_id
+
+
+class _FakeHistoryMessage:
+    def __init__(self, message_id, mine=True):
+        self.id = message_id
+        self.mine = mine
+
+
+class _FakeChannel:
+    def __init__(self, history=()):
+        self.id = 42
+        self.name = "ongoing"
+        self._history = list(history)
+
+    async def history(self, limit=None):
+        for message in reversed(self._history):
+            yield message
+
+
+class _FakeRest:
+    """Records calls instead of talking to Discord."""
+
+    def __init__(self, missing=()):
+        self.calls = []
+        self.missing = set(missing)
+        self._next_id = 1000
+
+    async def send(self, channel, *, priority, **payload):
+        self._next_id += 1
+        self.calls.append(("send", payload["embed"].title))
+        return _FakeSent(self._next_id)
+
+    async def edit(self, channel, message_id, *, priority, **payload):
+        if message_id in self.missing:
+            raise discord.NotFound(_FakeResponse(), "Unknown Message")
+        self.calls.append(("edit", message_id, payload["embed"].title))
+
+    async def delete(self, channel, message_id, *, priority):
+        self.calls.append(("delete", message_id))
+
+
+class _FakeResponse:
+    status = 404
+    reason = "Not Found"
+
+
+def _desired(*titles):
+    return [DesiredMessage.build(title, embed=discord.Embed(title=title)) for title in titles]
+
+
+class TestReconciler:
+    """Tests for desired-state reconciliation of dashboard channels."""
+
+    def test_unchanged_state_is_noop(self):
+        """Test that matching keys and hashes need no calls."""
+        desired = _desired("a", "b")
+        actual = [TrackedMessage(1, m.key, m.content_hash) for m in desired]
+        assert plan_reconcile(actual, desired).noop
+
+    def test_changed_content_is_edited_in_place(self):
+        """Test that a new hash for the same key costs one edit."""
+        old = _desired("a", "b")
+        actual = [TrackedMessage(i + 1, m.key, m.content_hash) for i, m in enumerate(old)]
+        desired = [old[0], DesiredMessage.build("b", embed=discord.Embed(title="b", description="extended"))]
+
+        plan = plan_reconcile(actual, desired)
+        assert plan.calls == 1
+        assert [(m.message_id, d.key) for m, d in plan.edits] == [(2, "b")]
+
+    async def test_reconcile_persists_state(self, tmp_path):
+        """Test that a second reconcile of the same state makes no calls."""
+        rest = _FakeRest()
+        reconciler = DashboardReconciler(DashboardStateStore(str(tmp_path / "dash.db")), rest=rest)
+        channel = _FakeChannel()
+
+        await reconciler.reconcile(channel, _desired("a", "b"))
+        assert rest.calls == [("send", "a"), ("send", "b")]
+
+        rest.calls.clear()
+        plan = await reconciler.reconcile(channel, _desired("a", "b"))
+        assert plan.noop and rest.calls == []
+
+        # Removing the top event reuses its slot rather than reposting
+        await reconciler.reconcile(channel, _desired("b"))
+        assert rest.calls == [("delete", 1001)]
+
+    async def test_adopts_existing_messages(self, tmp_path):
+        """Test that an untracked channel's own messages are edited, not left behind."""
+        rest = _FakeRest()
+        reconciler = DashboardReconciler(
+            DashboardStateStore(str(tmp_path / "dash.db")), rest=rest, is_ours=lambda m: m.mine
+        )
+        channel = _FakeChannel([_FakeHistoryMessage(5), _FakeHistoryMessage(6, mine=False), _FakeHistoryMessage(7)])
+
+        await reconciler.reconcile(channel, _desired("a"))
+
+        # One adopted message is reused, the other removed; the foreign one is untouched
+        assert sorted(call[0] for call in rest.calls) == ["delete", "edit"]
+        assert 6 not in {call[1] for call in rest.calls}
+        state = await reconciler.store.load(channel.id)
+        assert [m.key for m in state] == ["a"]
+
+    async def test_edit_of_missing_message_becomes_send(self, tmp_path):
+        """Test that a message deleted by hand is posted again."""
+        store = DashboardStateStore(str(tmp_path / "dash.db"))
+        await store.save(42, [TrackedMessage(5, "a", "stale")])
+        rest = _FakeRest(missing={5})
+
+        await DashboardReconciler(store, rest=rest).reconcile(_FakeChannel(), _desired("a"))
+
+        assert rest.calls == [("send", "a")]
+        assert [(m.message_id, m.key) for m in await store.load(42)] == [(1001, "a")]
+
+    async def test_concurrent_reconciles_do_not_double_send(self, tmp_path):
+        """Test that overlapping refreshes of one channel post each message once."""
+        store = DashboardStateStore(str(tmp_path / "dash.db"))
+        await store.save(42, [])
+        rest = _FakeRest()
+        reconciler = DashboardReconciler(store, rest=rest)
+
+        await asyncio.gather(
+            reconciler.reconcile(_FakeChannel(), _desired("a")),
+            reconciler.reconcile(_FakeChannel(), _desired("a")),
+        )
+
+        assert rest.calls == [("send", "a")]
+        assert [(m.message_id, m.key) for m in await store.load(42)] == [(1001, "a")]
+
+    async def test_missing_middle_message_keeps_display_order(self, tmp_path):
+        """Test that a message deleted by hand is not re-posted after later ones."""
+        a, b, c = _desired("a", "b", "c")
+        store = DashboardStateStore(str(tmp_path / "dash.db"))
+        await store.save(42, [
+            TrackedMessage(5, "a", a.content_hash),
+            TrackedMessage(6, "b", "stale"),
+            TrackedMessage(7, "c", c.content_hash),
+        ])
+        rest = _FakeRest(missing={6})
+
+        await DashboardReconciler(store, rest=rest).reconcile(_FakeChannel(), [a, b, c])
+
+        assert [m.key for m in await store.load(42)] == ["a", "b", "c"]
+
+
+class _CountingModule(GameModule):
+    """GameModule whose dashboard rebuild only counts calls."""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.rebuilds = 0
+
+    async def initialize(self):
+        pass
+
+    async def refresh_events(self):
+        pass
+
+    async def rebuild_dashboard(self, guild):
+        self.rebuilds += 1
+        await asyncio.sleep(0)
+
+    async def add_event(self, ctx, event_data):
+        pass
+
+    async def remove_event(self, ctx, title):
+        pass
+
+    def get_notification_timings(self, category):
+        return {"start": [], "end": []}
+
+
+class TestGameModuleDashboard:
+    """Tests for coordinated dashboard refreshes of src/games modules."""
+
+    async def test_concurrent_updates_share_one_rebuild(self, tmp_path, monkeypatch):
+        """Test that a burst of updates, for any region, runs a single rebuild."""
+        monkeypatch.chdir(tmp_path)  # the module logger writes to logs/
+        monkeypatch.setattr("src.games.base.game_module.register_event_database", lambda *args: None)
+        module = _CountingModule(GameConfig("TEST", str(tmp_path / "events.db"), "test_module", "Test"))
+        guild = SimpleNamespace(id=7)
+
+        await asyncio.gather(
+            module.update_dashboard(guild),
+            module.update_dashboard(guild, "ASIA"),
+            module.update_dashboard(guild, "NA"),
+        )
+        await module.update_dashboard(None)
+
+        assert module.rebuilds == 1
+
+    async def test_dashboard_timer_does_not_replace_legacy_handler(self, tmp_path, monkeypatch):
+        """Test that a module's timer-wheel handler lives beside the legacy one for the same game."""
+        from src.core.services.timer_wheel import TimerWheel
+
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("src.games.base.game_module.register_event_database", lambda *args: None)
+        wheel = TimerWheel(str(tmp_path / "wheel.db"))
+        monkeypatch.setattr("src.games.base.game_module.timer_wheel", wheel)
+        module = _CountingModule(GameConfig("TEST", str(tmp_path / "events.db"), "test_module", "Test"))
+
+        async def legacy(arg):
+            pass
+
+        wheel.register("TEST", legacy)
+        module.register_dashboard_timer(SimpleNamespace(get_guild=lambda _id: None))
+        await wheel.stop()
+
+        assert wheel.status()["handlers"] == ["TEST", module.dashboard_timer_name]
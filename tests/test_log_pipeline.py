@@ -0,0 +1,80 @@
+"""
+Tests for the queue-based log pipeline (src/utils/log_pipeline.py).
+"""
+
+import io
+import logging
+import os
+
+import pytest
+
+from src.utils.log_pipeline import get_log_pipeline, get_pipeline_logger
+
+
+@pytest.fixture
+def pipeline_logger(tmp_path):
+    """A logger writing through its own pipeline into tmp_path/test.log."""
+    path = str(tmp_path / "test.log")
+    console = io.StringIO()
+    logger = get_pipeline_logger(
+        f"test.pipeline.{tmp_path.name}", path, level=logging.INFO,
+        stream=console, fmt="%(levelname)s %(message)s", max_bytes=400, backup_count=2,
+    )
+    pipeline = get_log_pipeline(path)
+    yield logger, pipeline, path, console
+    pipeline.stop()
+
+
+class TestLogPipeline:
+    """Tests for LogPipeline and get_pipeline_logger."""
+
+    def test_writes_file_and_console(self, pipeline_logger):
+        """Test that records reach both handlers once the writer drains."""
+        logger, pipeline, path, console = pipeline_logger
+        logger.info("Scheduled %s notification(s) for %s", 3, "Banner")
+        pipeline.stop()
+
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == "INFO Scheduled 3 notification(s) for Banner\n"
+        assert console.getvalue() == "INFO Scheduled 3 notification(s) for Banner\n"
+
+    def test_level_filtering_skips_queue(self, pipeline_logger):
+        """Test that disabled levels never reach the queue."""
+        logger, pipeline, path, _ = pipeline_logger
+        pipeline.stop()  # Nothing drains the queue now
+        logger.debug("dropped %s", "early")
+        assert pipeline.queue.empty()
+
+    def test_mutable_args_rendered_at_call_time(self, pipeline_logger):
+        """Test that mutable args are formatted before the caller can change them."""
+        logger, pipeline, path, _ = pipeline_logger
+        data = {"count": 1}
+        logger.info("state %s", data)
+        data["count"] = 2
+        pipeline.stop()
+
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == "INFO state {'count': 1}\n"
+
+    def test_size_rotation(self, pipeline_logger):
+        """Test that the file rotates once it reaches max_bytes."""
+        logger, pipeline, path, _ = pipeline_logger
+        for i in range(40):
+            logger.info("line %s %s", i, "x" * 40)
+        pipeline.stop()
+
+        assert os.path.exists(path + ".1")
+        assert os.path.getsize(path) < 400
+        assert not os.path.exists(path + ".3")
+
+    def test_restart_after_stop(self, pipeline_logger):
+        """Test that a stopped pipeline picks up again through get_log_pipeline."""
+        logger, pipeline, path, _ = pipeline_logger
+        pipeline.stop()
+        assert get_log_pipeline(path) is pipeline
+        assert pipeline.running
+        logger.info("after restart")
+        pipeline.stop()
+
+        with open(path, encoding="utf-8") as f:
+            assert f.read().endswith("INFO after restart\n")
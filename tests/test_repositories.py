@@ -25,7 +25,9 @@ from src.core.repositories import (
     SQLiteNotificationRepository,
     SQLiteConfigRepository,
     ChannelRepository,
+    EventDatabaseRegistry,
 )
+from src.core.repositories.migrations import migrate_event_time_columns
 
 
 # =============================================================================
@@ -504,9 +506,14 @@ class TestNotificationRepository:
         success = await repo.mark_sent(notif_id)
         assert success
 
-        # Should not appear in pending
+        # Should not appear in pending; moved to notification_history
         pending = await repo.get_pending()
         assert len(pending) == 0
+        assert await repo.fetch_one("SELECT COUNT(*) FROM pending_notifications") == (0,)
+        assert await repo.fetch_one(
+            "SELECT notification_id, status, title FROM notification_history"
+        ) == (notif_id, "sent", "Test")
+        assert not await repo.mark_sent(notif_id)
 
     @pytest.mark.asyncio
     async def test_champions_meeting_notification(self, old_style_notification_db):
@@ -697,6 +704,137 @@ class TestChannelRepository:
         assert messages[3] == "msg3"
 
 
+# =============================================================================
+# Event Database Registry Tests
+# =============================================================================
+
+class TestEventDatabaseRegistry:
+    """Tests for EventDatabaseRegistry."""
+
+    @pytest.mark.asyncio
+    async def test_attached_anti_join(self, old_style_notification_db, tmp_path):
+        """Orphaned notifications are found with one anti-join across attached DBs."""
+        import sqlite3
+        game_db = str(tmp_path / "arknights_data.db")
+        conn = sqlite3.connect(game_db)
+        conn.execute('''CREATE TABLE events (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        title TEXT,
+                        start_date TEXT,
+                        end_date TEXT,
+                        image TEXT,
+                        category TEXT,
+                        profile TEXT
+                    )''')
+        conn.execute(
+            "INSERT INTO events (title, start_date, end_date, image, category, profile) VALUES (?, ?, ?, ?, ?, ?)",
+            ("Live Event", "1", "2", "", "Event", "AK")
+        )
+        conn.commit()
+        conn.close()
+
+        conn = sqlite3.connect(old_style_notification_db)
+        for title in ("Live Event", "Deleted Event"):
+            conn.execute(
+                "INSERT INTO pending_notifications (category, profile, title, timing_type, notify_unix, event_time_unix, sent) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                ("Event", "AK", title, "start", 100, 200)
+            )
+        conn.commit()
+        conn.close()
+
+        registry = EventDatabaseRegistry()
+        registry.register("ak", game_db)
+        registry.register("missing", str(tmp_path / "missing.db"))
+        assert "AK" in registry
+        assert len(registry) == 2
+
+        async with aiosqlite.connect(old_style_notification_db) as conn:
+            async with registry.attached(conn) as schemas:
+                assert list(schemas) == ["AK"]
+                async with conn.execute(
+                    f"SELECT DISTINCT title FROM pending_notifications p WHERE NOT EXISTS ("
+                    f"SELECT 1 FROM {schemas['AK']}.events e "
+                    f"WHERE e.profile=p.profile AND e.title=p.title AND e.category=p.category)"
+                ) as cursor:
+                    orphans = [row[0] for row in await cursor.fetchall()]
+            assert orphans == ["Deleted Event"]
+
+            # Databases are detached on exit
+            async with conn.execute("PRAGMA database_list") as cursor:
+                names = [row[1] for row in await cursor.fetchall()]
+            assert names == ["main"]
+
+
+# =============================================================================
+# Event Time Migration Tests
+# =============================================================================
+
+class TestEventTimeMigration:
+    """Tests for the INTEGER time column migration."""
+
+    def _insert_text_rows(self, db_path):
+        import sqlite3
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE INDEX idx_events_server_profile ON user_data (server_id, profile)")
+        conn.executemany(
+            "INSERT INTO user_data (server_id, title, start_date, end_date, category, asia_start, profile) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                ("123", "Nine Digits", "999999000", "999999999", "Event", "", "AK"),
+                ("123", "Ten Digits", "1000000000", "4000000000", "Event", "", "AK"),
+                ("123", "Deleted", "1", "2", "Event", "", "AK"),
+            ]
+        )
+        conn.execute("DELETE FROM user_data WHERE title='Deleted'")
+        conn.commit()
+        conn.close()
+
+    @pytest.mark.asyncio
+    async def test_rebuilds_text_columns_once(self, old_style_event_db):
+        """Test that TEXT times become INTEGER, other values and indexes survive, and reruns are no-ops."""
+        import sqlite3
+        self._insert_text_rows(old_style_event_db)
+
+        assert migrate_event_time_columns(old_style_event_db, "user_data", scope=("server_id", "profile"))
+        assert not migrate_event_time_columns(old_style_event_db, "user_data", scope=("server_id", "profile"))
+
+        conn = sqlite3.connect(old_style_event_db)
+        types = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(user_data)")}
+        rows = conn.execute(
+            "SELECT title, typeof(start_date), typeof(end_date), asia_start FROM user_data ORDER BY id"
+        ).fetchall()
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name='user_data'").fetchone()[0]
+        conn.close()
+
+        assert types["start_date"] == types["europe_end"] == "INTEGER"
+        assert rows == [("Nine Digits", "integer", "integer", ""), ("Ten Digits", "integer", "integer", "")]
+        assert {"idx_events_server_profile", "idx_user_data_profile_start", "idx_user_data_profile_end"} <= indexes
+        assert sequence == 3
+
+    @pytest.mark.asyncio
+    async def test_range_queries_use_time_indexes(self, old_style_event_db):
+        """Test that repository range queries compare numerically and are served by the new indexes."""
+        self._insert_text_rows(old_style_event_db)
+        repo = SQLiteEventRepository(old_style_event_db)
+        await repo.initialize()
+
+        # "999999999" < "1000000000" as text; only an INTEGER comparison ends the right event
+        assert await repo.mark_ended("123", current_time=1_500_000_000) == 1
+        ongoing = await repo.get_ongoing(server_id="123", profile="AK")
+        assert [event.title for event in ongoing] == ["Ten Digits"]
+
+        scope, params = repo._range_scope("123", None)
+        async with repo.get_connection() as conn:
+            for column, index in (("end_date", "idx_user_data_profile_end"), ("start_date", "idx_user_data_profile_start")):
+                async with conn.execute(
+                    f"EXPLAIN QUERY PLAN SELECT id FROM user_data WHERE {scope} AND {column} > ?", (*params, 0)
+                ) as cursor:
+                    plan = " ".join(row[3] for row in await cursor.fetchall())
+                assert f"INDEX {index} (server_id=? AND profile=? AND {column}>?)" in plan
+
+
 # =============================================================================
 # Run tests
 # =============================================================================
@@ -5,6 +5,7 @@ These tests verify that the business logic services work correctly,
 matching the behavior of the old code.
 """
 
+import asyncio
 import pytest
 import time
 from datetime import datetime
@@ -21,7 +22,20 @@ from src.core.services import (
     ValidationResult,
     NOTIFICATION_TIMINGS,
     UMA_NOTIFICATION_TIMINGS,
+    DeadlineScheduler,
+    NotificationDispatcher,
+    OutgoingNotification,
+    TokenBucket,
+    coalesce_messages,
+    RestScheduler,
+    RestPriority,
+    OrphanSweeper,
+    TimerWheel,
+    RefreshCoordinator,
+    AttachmentCache,
+    load_tracked_message_ids,
 )
+from src.core.services.rest_scheduler import route_bucket
 from src.core.models import Event, Notification
 
 
@@ -523,6 +537,610 @@ class TestValidationService:
         assert "Character Banner" in uma_cats
 
 
+# =============================================================================
+# Deadline Scheduler Tests
+# =============================================================================
+
+class TestDeadlineScheduler:
+    """Tests for DeadlineScheduler."""
+
+    async def test_reload_orders_by_deadline(self):
+        """Test that the heap exposes the earliest deadline first."""
+        async def load():
+            return [(300, "c"), (100, "a"), (200, "b"), (100, "a")]
+
+        async def fire(keys):
+            pass
+
+        scheduler = DeadlineScheduler(load, fire, clock=lambda: 0)
+        await scheduler.reload()
+
+        assert scheduler.heap_size == 3
+        assert scheduler.next_fire_unix == 100
+        assert scheduler.pop_due(now=200) == ["a", "b"]
+        assert scheduler.next_fire_unix == 300
+
+    async def test_fires_due_keys_at_deadline(self):
+        """Test that due keys are fired without waiting for a resync."""
+        now = time.time()
+        fired = []
+
+        async def load():
+            return [(int(now) - 1, 1), (int(now) + 3600, 2)]
+
+        async def fire(keys):
+            fired.extend(keys)
+
+        scheduler = DeadlineScheduler(load, fire)
+        scheduler.start()
+        await asyncio.sleep(0.05)
+
+        status = scheduler.status()
+        await scheduler.stop()
+
+        assert fired == [1]
+        assert status["heap_size"] == 1
+        assert status["next_fire_unix"] == int(now) + 3600
+        assert status["fired_count"] == 1
+
+    async def test_wake_reloads_heap(self):
+        """Test that wake() rebuilds the heap from the backing store."""
+        rows = [(int(time.time()) + 3600, 1)]
+
+        async def load():
+            return list(rows)
+
+        async def fire(keys):
+            pass
+
+        scheduler = DeadlineScheduler(load, fire)
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        assert scheduler.heap_size == 1
+
+        rows.append((int(time.time()) + 60, 2))
+        scheduler.wake()
+        await asyncio.sleep(0.05)
+
+        assert scheduler.heap_size == 2
+        assert scheduler.next_fire_unix == rows[1][0]
+        await scheduler.stop()
+        assert scheduler.running is False
+
+    async def test_failed_fire_is_retried_with_backoff(self):
+        """Test that keys whose fire raised are fired again without a resync."""
+        now = time.time()
+        attempts = []
+
+        async def load():
+            return [(int(now) - 1, 1)]
+
+        async def fire(keys):
+            attempts.append(list(keys))
+            if len(attempts) < 3:
+                raise RuntimeError("guild not ready")
+
+        scheduler = DeadlineScheduler(load, fire, retry_delay=0.01, max_retry_delay=0.02)
+        scheduler.start()
+        await asyncio.sleep(2.5)
+        status = scheduler.status()
+        await scheduler.stop()
+
+        assert attempts == [[1], [1], [1]]
+        assert status["retrying"] == 0
+        assert status["fired_count"] == 1
+
+    def test_retry_gives_up_after_max_retries(self):
+        """Test that a key stops being retried once it hits max_retries."""
+        async def load():
+            return []
+
+        async def fire(keys):
+            pass
+
+        scheduler = DeadlineScheduler(load, fire, max_retries=2, clock=lambda: 100)
+        scheduler.retry(["a"])
+        scheduler.retry(["a"])
+        assert scheduler.status()["retrying"] == 1
+        scheduler.retry(["a"])
+        assert scheduler.status()["retrying"] == 0
+
+
+# =============================================================================
+# Notification Dispatcher Tests
+# =============================================================================
+
+class TestNotificationDispatcher:
+    """Tests for coalescing, rate limiting and concurrent dispatch."""
+
+    def test_coalesce_single_message_unchanged(self):
+        """Test that a lone message is sent as-is."""
+        merged = coalesce_messages("<@&1>", ["<@&1>, The X is starting!"])
+        assert merged == [("<@&1>, The X is starting!", [0])]
+
+    def test_coalesce_same_role(self):
+        """Test that messages for one role share a single mention."""
+        merged = coalesce_messages("<@&1>", [
+            "<@&1>, The A is starting!",
+            "<@&1>, the B is ending!",
+        ])
+        assert len(merged) == 1
+        text, indexes = merged[0]
+        assert text == "<@&1>\nThe A is starting!\nThe B is ending!"
+        assert indexes == [0, 1]
+
+    def test_coalesce_respects_limit(self):
+        """Test that merged messages never exceed the character limit."""
+        contents = [f"<@&1>, {'x' * 90} {i}" for i in range(50)]
+        merged = coalesce_messages("<@&1>", contents, limit=500)
+
+        assert len(merged) > 1
+        assert all(len(text) <= 500 for text, _ in merged)
+        assert sorted(i for _, idx in merged for i in idx) == list(range(50))
+
+    async def test_token_bucket_limits_burst(self):
+        """Test that acquiring beyond capacity waits for a refill."""
+        bucket = TokenBucket(capacity=2, period=0.2)
+        start = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        assert time.monotonic() - start >= 0.09
+
+    async def test_dispatch_groups_by_channel_and_role(self):
+        """Test that each (channel, role) pair becomes one message."""
+        sent = []
+
+        async def send(channel_key, content):
+            sent.append((channel_key, content))
+
+        now = int(time.time())
+        batch = [
+            OutgoingNotification(1, "<@&10>", "<@&10>, A!", now),
+            OutgoingNotification(2, "<@&20>", "<@&20>, B!", now),
+            OutgoingNotification(1, "<@&10>", "<@&10>, C!", now),
+            OutgoingNotification(1, "<@&11>", "<@&11>, D!", now),
+        ]
+        result = await NotificationDispatcher(send).dispatch(batch)
+
+        assert result.notifications == 4
+        assert result.messages_sent == 3
+        assert result.failures == 0
+        assert len(result.lateness) == 4
+        assert (1, "<@&10>\nA!\nC!") in sent
+        assert (1, "<@&11>, D!") in sent
+        assert (2, "<@&20>, B!") in sent
+
+    async def test_dispatch_counts_failures(self):
+        """Test that a failing channel doesn't block the others."""
+        async def send(channel_key, content):
+            if channel_key == 1:
+                raise RuntimeError("boom")
+
+        batch = [
+            OutgoingNotification(1, "", "A", ref="a"),
+            OutgoingNotification(2, "", "B", ref="b"),
+        ]
+        result = await NotificationDispatcher(send).dispatch(batch)
+
+        assert result.messages_sent == 1
+        assert result.failures == 1
+        assert result.failed_refs == ["a"]
+        assert list(result.sent_at) == ["b"]
+
+
+# =============================================================================
+# REST Scheduler Tests
+# =============================================================================
+
+class TestRestScheduler:
+    """Tests for priority order, edit coalescing and header-driven pacing."""
+
+    def test_route_bucket(self):
+        """Test that message routes map to per-channel buckets."""
+        assert route_bucket("PATCH", "/api/v10/channels/12/messages/34") == ("PATCH", 12)
+        assert route_bucket("post", "/api/v10/channels/12/messages") == ("POST", 12)
+        assert route_bucket("GET", "/api/v10/users/@me") is None
+
+    async def test_priority_order(self):
+        """Test that notifications run before dashboard edits and cleanup."""
+        scheduler = RestScheduler(max_concurrency=1)
+        gate = asyncio.Event()
+        order = []
+
+        async def blocker():
+            await gate.wait()
+
+        def call(name):
+            async def run():
+                order.append(name)
+            return run
+
+        first = asyncio.ensure_future(scheduler.submit(blocker, bucket="a"))
+        await asyncio.sleep(0)
+        queued = [
+            asyncio.ensure_future(scheduler.submit(call("cleanup"), bucket="b", priority=RestPriority.CLEANUP)),
+            asyncio.ensure_future(scheduler.submit(call("dashboard"), bucket="c", priority=RestPriority.DASHBOARD)),
+            asyncio.ensure_future(scheduler.submit(call("notify"), bucket="d", priority=RestPriority.NOTIFICATION)),
+        ]
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(first, *queued)
+
+        assert order == ["notify", "dashboard", "cleanup"]
+
+    async def test_queued_edits_collapse(self):
+        """Test that repeated edits of one message only run the latest."""
+        scheduler = RestScheduler()
+        edits = []
+
+        class Message:
+            def __init__(self, message_id):
+                self.id = message_id
+
+            async def edit(self, **kwargs):
+                edits.append(kwargs["content"])
+                return kwargs["content"]
+
+        class Channel:
+            id = 5
+
+            def get_partial_message(self, message_id):
+                return Message(message_id)
+
+        channel = Channel()
+        results = await asyncio.gather(*(
+            scheduler.edit(channel, 42, content=f"v{i}") for i in range(5)
+        ))
+
+        assert edits == ["v4"]
+        assert results == ["v4"] * 5
+        assert scheduler.stats["coalesced"] == 4
+
+    async def test_exhausted_bucket_waits_for_reset(self):
+        """Test that a bucket with no remaining requests waits for Reset-After."""
+        scheduler = RestScheduler()
+        scheduler.observe("POST", "/api/v10/channels/7/messages", 200, {
+            "X-RateLimit-Limit": "5",
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset-After": "0.1",
+        })
+
+        async def call():
+            return "sent"
+
+        start = time.monotonic()
+        assert await scheduler.submit(call, bucket=("POST", 7)) == "sent"
+        assert time.monotonic() - start >= 0.09
+        assert scheduler.bucket(("POST", 7)).remaining == 4
+
+    async def test_errors_reach_the_caller(self):
+        """Test that a failing request raises in the awaiting caller."""
+        scheduler = RestScheduler()
+
+        async def call():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await scheduler.submit(call, bucket="x")
+
+    async def test_cancelled_request_settles_callers(self):
+        """Test that a cancelled request cancels the awaiting caller instead of hanging it."""
+        scheduler = RestScheduler()
+        started = asyncio.Event()
+
+        async def call():
+            started.set()
+            await asyncio.sleep(3600)
+
+        caller = asyncio.ensure_future(scheduler.submit(call, bucket="x"))
+        await started.wait()
+        assert len(scheduler._tasks) == 1
+        for task in list(scheduler._tasks):
+            task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(caller, timeout=1)
+        await asyncio.sleep(0)
+        assert not scheduler._tasks
+
+
+# =============================================================================
+# Orphan Sweep Tests
+# =============================================================================
+
+class _FakeMessage:
+    def __init__(self, message_id, mine=True):
+        self.id = message_id
+        self.mine = mine
+
+
+class _FakeChannel:
+    """Channel whose history() records each call and honours ``after``."""
+
+    id = 99
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.calls = []
+
+    def history(self, limit=100, after=None, oldest_first=None):
+        self.calls.append(after.id if after else None)
+        messages = [m for m in self.messages if after is None or m.id > after.id]
+
+        async def iterate():
+            for message in messages:
+                yield message
+        return iterate()
+
+
+class TestOrphanSweeper:
+    """Tests for sweep scheduling, watermarks and tracked-ID loading."""
+
+    @pytest.fixture
+    async def conn(self, tmp_path):
+        import aiosqlite
+        async with aiosqlite.connect(tmp_path / "sweep.db") as conn:
+            await conn.execute(
+                "CREATE TABLE event_messages (event_id INTEGER, channel_id TEXT, message_id TEXT)"
+            )
+            await conn.executemany(
+                "INSERT INTO event_messages VALUES (?, ?, ?)",
+                [(1, "99", "10"), (2, "99", "20"), (3, "7", "30")]
+            )
+            await conn.commit()
+            yield conn
+
+    async def test_load_tracked_message_ids(self, conn):
+        """Test that tracked IDs come from one query per channel."""
+        assert await load_tracked_message_ids(conn, 99) == {"10", "20"}
+
+    async def test_sweep_only_when_due(self, conn):
+        """Test that history is read once per interval and resumes after the watermark."""
+        now = [1000.0]
+        sweeper = OrphanSweeper(interval=60, clock=lambda: now[0])
+        channel = _FakeChannel([_FakeMessage(10), _FakeMessage(15), _FakeMessage(17, mine=False), _FakeMessage(20)])
+        tracked = await load_tracked_message_ids(conn, channel.id)
+        is_ours = lambda message: message.mine
+
+        orphans = await sweeper.find_orphans(conn, channel, tracked, is_ours)
+        assert [m.id for m in orphans] == [15]
+
+        # Within the interval: no history call at all
+        assert await sweeper.find_orphans(conn, channel, tracked, is_ours) == []
+        assert channel.calls == [None]
+
+        # Next sweep only reads messages after the newest one already verified
+        channel.messages.append(_FakeMessage(25))
+        now[0] += 61
+        orphans = await sweeper.find_orphans(conn, channel, tracked, is_ours)
+        assert [m.id for m in orphans] == [25]
+        assert channel.calls == [None, 20]
+
+    async def test_rewind_rereads_failed_delete(self, conn):
+        """Test that rewinding the watermark makes the next sweep see the message again."""
+        sweeper = OrphanSweeper(interval=0)
+        channel = _FakeChannel([_FakeMessage(10), _FakeMessage(15), _FakeMessage(20)])
+        tracked = await load_tracked_message_ids(conn, channel.id)
+
+        await sweeper.find_orphans(conn, channel, tracked, lambda m: True)
+        await sweeper.rewind(conn, channel.id, 15)
+        orphans = await sweeper.find_orphans(conn, channel, tracked, lambda m: True)
+
+        assert channel.calls == [None, 14]
+        assert [m.id for m in orphans] == [15]
+
+
+class TestTimerWheel:
+    """Tests for slot coalescing, catch-up and retries of the timer wheel."""
+
+    async def test_deadlines_in_one_slot_share_a_refresh(self, tmp_path):
+        """Test that deadlines round up to one stored slot per handler and argument."""
+        wheel = TimerWheel(str(tmp_path / "wheel.db"), tick=60, clock=lambda: 1000)
+
+        assert await wheel.schedule("AK", 1125) == 1140
+        assert await wheel.schedule("AK", 1135) == 1140
+        assert await wheel.schedule("AK", 1140) == 1140
+        assert await wheel.schedule("HSR", 1135, "ASIA") == 1140
+        assert await wheel.schedule("AK", 990) is None
+
+        assert await wheel.pending() == [(1140, "AK", None), (1140, "HSR", "ASIA")]
+
+    async def test_overdue_slots_fire_once(self, tmp_path):
+        """Test that slots piled up while offline cause one refresh each per handler and argument."""
+        now = int(time.time())
+        calls = []
+
+        async def ak(arg):
+            calls.append(("AK", arg))
+
+        async def hsr(region):
+            calls.append(("HSR", region))
+
+        wheel = TimerWheel(str(tmp_path / "wheel.db"), tick=60)
+        await wheel.schedule_many("AK", [(now - 7200, None), (now - 3600, None), (now + 3600, None)], catch_up=True)
+        await wheel.schedule_many("HSR", [(now - 7200, "ASIA"), (now - 600, "ASIA")], catch_up=True)
+        wheel.register("AK", ak)
+        wheel.register("HSR", hsr)
+        wheel.start()
+        await asyncio.sleep(0.1)
+        await wheel.stop()
+
+        assert sorted(calls) == [("AK", None), ("HSR", "ASIA")]
+        assert await wheel.pending() == [(wheel.slot_for(now + 3600), "AK", None)]
+        assert wheel.status()["refresh_count"] == 2
+
+    async def test_failed_slots_are_kept(self, tmp_path):
+        """Test that a failing or missing handler leaves its slot for a later retry."""
+        now = int(time.time())
+        calls = []
+
+        async def broken(arg):
+            raise RuntimeError("discord down")
+
+        async def hsr(region):
+            calls.append(region)
+
+        wheel = TimerWheel(str(tmp_path / "wheel.db"), tick=60)
+        await wheel.schedule_many("AK", [(now - 60, None)], catch_up=True)
+        await wheel.schedule_many("HSR", [(now - 60, "EU")], catch_up=True)
+        wheel.register("AK", broken)
+        wheel.start()
+        await asyncio.sleep(0.1)
+        assert len(await wheel.pending()) == 2
+        assert wheel.status()["retrying"] == 1
+
+        # Registering the missing handler retries its slot right away
+        wheel.register("HSR", hsr)
+        await asyncio.sleep(0.1)
+        await wheel.stop()
+
+        assert calls == ["EU"]
+        assert [key[1] for key in await wheel.pending()] == ["AK"]
+
+
+class TestRefreshCoordinator:
+    """Tests for merged, single-flight dashboard refreshes."""
+
+    async def test_burst_runs_once(self):
+        """Test that requests arriving together share one refresh."""
+        runs = []
+
+        async def refresh(force):
+            runs.append(force)
+            return len(runs)
+
+        coordinator = RefreshCoordinator(refresh, debounce=0.01)
+        results = await asyncio.gather(*(coordinator.request() for _ in range(5)))
+
+        assert runs == [False]
+        assert results == [1] * 5
+        assert coordinator.status()["request_count"] == 5
+
+    async def test_requests_during_run_share_one_trailing_refresh(self):
+        """Test that a running refresh is followed by at most one more."""
+        started = asyncio.Event()
+        release = asyncio.Event()
+        runs = []
+
+        async def refresh(force):
+            runs.append(force)
+            started.set()
+            await release.wait()
+            return len(runs)
+
+        coordinator = RefreshCoordinator(refresh, debounce=0)
+        first = asyncio.create_task(coordinator.request())
+        await started.wait()
+        assert coordinator.running
+
+        later = [asyncio.create_task(coordinator.request(force=(i == 1))) for i in range(3)]
+        await asyncio.sleep(0)
+        assert coordinator.queued
+        release.set()
+
+        assert await first == 1
+        # Later callers wait for the refresh that started after them
+        assert await asyncio.gather(*later) == [2, 2, 2]
+        assert runs == [False, True]
+
+    async def test_errors_reach_every_waiter(self):
+        """Test that a failed refresh fails all requests it covered."""
+        async def refresh(force):
+            raise RuntimeError("channel missing")
+
+        coordinator = RefreshCoordinator(refresh, debounce=0)
+        results = await asyncio.gather(coordinator.request(), coordinator.request(), return_exceptions=True)
+
+        assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+        assert coordinator.status()["run_count"] == 1
+
+
+class _FakeUploadMessage:
+    def __init__(self, message_id, url):
+        from types import SimpleNamespace
+        self.id = message_id
+        self.channel = SimpleNamespace(id=7)
+        self.embeds = [SimpleNamespace(image=SimpleNamespace(url=url))]
+        self.attachments = []
+
+
+class TestAttachmentCache:
+    """Tests for the upload-once image registry."""
+
+    async def test_upload_once_until_content_changes(self, tmp_path):
+        """Test that a cached file is referenced by URL and re-uploaded only after it changes."""
+        image_path = tmp_path / "combined.png"
+        image_path.write_bytes(b"first image")
+        cache = AttachmentCache(str(tmp_path / "cache.db"))
+
+        first = await cache.prepare(str(image_path))
+        assert not first.cached and first.url.startswith("attachment://")
+        url = "https://cdn.discordapp.com/attachments/7/1/a.png"
+        assert await cache.record(first, _FakeUploadMessage(1, url + "?ex=1&is=2&hm=ab")) == url
+
+        again = await cache.prepare(str(image_path))
+        assert again.cached and again.url == url
+
+        image_path.write_bytes(b"second image, different size")
+        changed = await cache.prepare(str(image_path))
+        assert not changed.cached and changed.digest != first.digest
+
+    async def test_deleted_owner_drops_entry(self, tmp_path):
+        """Test that deleting the uploading message forces a new upload."""
+        image_path = tmp_path / "combined.png"
+        image_path.write_bytes(b"image")
+        cache = AttachmentCache(str(tmp_path / "cache.db"))
+
+        image = await cache.prepare(str(image_path))
+        await cache.record(image, _FakeUploadMessage(1, "https://cdn.discordapp.com/attachments/7/1/a.png"))
+        assert await cache.forget_message(1) == 1
+        assert not (await cache.prepare(str(image_path))).cached
+
+    async def test_gone_owner_uploads_again(self, tmp_path):
+        """Test that a cache hit whose owner message is gone is uploaded again."""
+        image_path = tmp_path / "combined.png"
+        image_path.write_bytes(b"image")
+        cache = AttachmentCache(str(tmp_path / "cache.db"))
+        checks = []
+
+        async def owner_exists(channel_id, message_id):
+            checks.append((channel_id, message_id))
+            return alive
+
+        image = await cache.prepare(str(image_path))
+        await cache.record(image, _FakeUploadMessage(1, "https://cdn.discordapp.com/attachments/7/1/a.png"))
+
+        alive = True
+        assert (await cache.prepare(str(image_path), owner_exists=owner_exists)).cached
+        assert (await cache.prepare(str(image_path), owner_exists=owner_exists)).cached
+        assert checks == [("7", "1")]
+
+        await cache.forget_message(1)
+        await cache.record(image, _FakeUploadMessage(2, "https://cdn.discordapp.com/attachments/7/2/a.png"))
+        alive = False
+        reupload = await cache.prepare(str(image_path), owner_exists=owner_exists)
+        assert not reupload.cached and reupload.url.startswith("attachment://")
+        assert await cache.owner(image.digest) is None
+
+    async def test_owner(self, tmp_path):
+        """Test that an entry reports the message carrying its upload."""
+        image_path = tmp_path / "combined.png"
+        image_path.write_bytes(b"image")
+        cache = AttachmentCache(str(tmp_path / "cache.db"))
+
+        image = await cache.prepare(str(image_path))
+        assert await cache.owner(image.digest) is None
+        await cache.record(image, _FakeUploadMessage(1, "https://cdn.discordapp.com/attachments/7/1/a.png"))
+        assert await cache.owner(image.digest) == "1"
+
+    def test_same_image_url_ignores_signature(self):
+        """Test that refreshed CDN signatures still compare equal."""
+        from src.core.services.attachment_cache import same_image_url
+        base = "https://cdn.discordapp.com/attachments/7/1/a.png"
+        assert same_image_url(base + "?ex=1&hm=aa", base + "?ex=2&hm=bb")
+        assert not same_image_url(base, "attachment://a.png")
+        assert not same_image_url(base, None)
+
+
 # =============================================================================
 # Integration Tests
 # =============================================================================
@@ -0,0 +1,349 @@
+"""
+Tests for the Shadowverse match recording paths in shadowverse_handler.py.
+
+Each test runs against a fresh shadowverse_data.db in a temporary working
+directory, created with the handler's own init_sv_db().
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+from types import SimpleNamespace
+
+import aiosqlite
+import discord
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.fixture
+async def sv(tmp_path, monkeypatch):
+    """shadowverse_handler with shadowverse_data.db in a temporary directory."""
+    monkeypatch.chdir(tmp_path)  # bot.py opens discord.log in the working directory
+    shadowverse_handler = pytest.importorskip("shadowverse_handler")
+    await shadowverse_handler.init_sv_db()
+    return shadowverse_handler
+
+
+def _batch():
+    return [
+        {"played_craft": "Dragoncraft", "opponent_craft": "Forestcraft", "win": True, "brick": False},
+        {"played_craft": "Dragoncraft", "opponent_craft": "Forestcraft", "win": False, "brick": True},
+        {"played_craft": "Dragoncraft", "opponent_craft": "Runecraft", "win": True, "brick": True,
+         "timestamp": "2025-12-18T10:30:00Z", "player_points": 45000, "player_point_type": "RP",
+         "player_rank": "A1", "player_group": "Topaz", "opponent_points": 46000},
+        {"played_craft": "Swordcraft", "opponent_craft": "Forestcraft", "win": False, "brick": False},
+    ]
+
+
+def _snapshot():
+    conn = sqlite3.connect("shadowverse_data.db")
+    try:
+        return {
+            table: conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2, 3, 4").fetchall()
+            for table in ("combined_winrates", "winrates")
+        } | {
+            table: conn.execute(
+                f"SELECT user_id, played_craft, opponent_craft, win, brick, timestamp, player_points, "
+                f"player_rank, opponent_points FROM {table} ORDER BY id"
+            ).fetchall()
+            for table in ("api_matches", "matches")
+        }
+    finally:
+        conn.close()
+
+
+class TestRecordMatchesBulk:
+    """Tests for record_matches_bulk."""
+
+    async def test_matches_sequential_record_match(self, sv):
+        """Test that a bulk batch leaves the same rows and aggregates as recording one by one."""
+        await sv.record_match("1", "9", "Havencraft", "Abysscraft", True, source="api")
+        for match in _batch():
+            await sv.record_match(
+                "1", "9", match["played_craft"], match["opponent_craft"], match["win"], match["brick"],
+                source="api",
+                **{key: value for key, value in match.items()
+                   if key not in ("played_craft", "opponent_craft", "win", "brick")}
+            )
+        expected = _snapshot()
+
+        os.remove("shadowverse_data.db")
+        await sv.init_sv_db()
+        await sv.record_match("1", "9", "Havencraft", "Abysscraft", True, source="api")
+        match_ids = await sv.record_matches_bulk("1", "9", _batch(), source="api")
+
+        assert match_ids == [2, 3, 4, 5]
+        assert _snapshot() == expected
+
+    async def test_invalid_craft_records_nothing(self, sv):
+        """Test that one invalid match rejects the whole batch."""
+        batch = _batch() + [{"played_craft": "Dragoncraft", "opponent_craft": "Nope", "win": True}]
+        with pytest.raises(ValueError):
+            await sv.record_matches_bulk("1", "9", batch)
+        assert all(not rows for rows in _snapshot().values())
+        assert await sv.record_matches_bulk("1", "9", []) == []
+
+
+class TestWinrateUpsert:
+    """Tests for the shared UPSERT path behind recording and removal."""
+
+    async def test_removal_reverses_recording(self, sv):
+        """Test that removing matches takes both aggregate tables back, never below zero."""
+        discord_id = await sv.record_match("1", "9", "Dragoncraft", "Forestcraft", True, True)
+        api_id = await sv.record_match("1", "9", "Dragoncraft", "Forestcraft", False, source="api")
+        assert discord_id == 1 and api_id == 1
+
+        assert await sv.remove_match("1", "9", "Dragoncraft", "Forestcraft", True)
+        success, _, match_data = await sv.remove_match_by_id(api_id, "1")
+        assert success and match_data["win"] is False
+
+        # Removing again from an all-zero row must not go negative
+        async with aiosqlite.connect("shadowverse_data.db") as conn:
+            await sv._update_winrates(conn, "1", "9", "Dragoncraft", "Forestcraft",
+                                      True, True, "api", increment=False)
+            await conn.commit()
+            async with conn.execute(
+                "SELECT discord_wins, discord_losses, discord_bricks, api_wins, api_losses, api_bricks, "
+                "total_wins, total_losses, total_bricks FROM combined_winrates"
+            ) as cursor:
+                combined = await cursor.fetchall()
+            async with conn.execute("SELECT wins, losses, bricks FROM winrates") as cursor:
+                legacy = await cursor.fetchall()
+        assert combined == [(0,) * 9]
+        assert legacy == [(0, 0, 0)]
+
+    def test_winrate_deltas(self, sv):
+        """Test the column deltas computed per match."""
+        assert sv._winrate_deltas(True, False) == (1, 0, 0)
+        assert sv._winrate_deltas(False, True) == (0, 1, 1)
+        assert sv._winrate_deltas(True, True, increment=False) == (-1, 0, -1)
+
+
+
+class TestLegacyCutover:
+    """Tests for verifying combined_winrates and retiring the legacy tables."""
+
+    async def test_verify_combined_winrates(self, sv):
+        """Test that verification passes after normal recording and reports drifted rows."""
+        await sv.record_matches_bulk("1", "9", _batch(), source="api")
+        match_id = await sv.record_match("1", "9", "Dragoncraft", "Forestcraft", True, True)
+        await sv.remove_match_by_id(match_id, "1")
+        assert await sv.verify_combined_winrates() == []
+
+        conn = sqlite3.connect("shadowverse_data.db")
+        conn.execute("UPDATE combined_winrates SET api_wins = api_wins + 1 "
+                     "WHERE played_craft='Swordcraft' AND opponent_craft='Forestcraft'")
+        conn.commit()
+        conn.close()
+
+        mismatches = await sv.verify_combined_winrates(server_id="9")
+        assert [(m["played_craft"], m["opponent_craft"]) for m in mismatches] == [("Swordcraft", "Forestcraft")]
+        assert mismatches[0]["expected"] == (0, 0, 0, 0, 1, 0, 0, 1, 0)
+        assert mismatches[0]["actual"] == (0, 0, 0, 1, 1, 0, 0, 1, 0)
+        assert await sv.verify_combined_winrates(server_id="8") == []
+
+        retired, reported = await sv.retire_legacy_tables()
+        assert not retired and reported == mismatches
+        assert sv.legacy_writes_enabled()
+
+    async def test_dual_write_flag(self, sv, monkeypatch):
+        """Test that turning the config flag off stops legacy writes only."""
+        monkeypatch.setattr(sv, "SV_LEGACY_DUAL_WRITE", False)
+        await sv.record_match("1", "9", "Dragoncraft", "Forestcraft", True)
+        await sv.record_matches_bulk("1", "9", _batch())
+        snapshot = _snapshot()
+        assert not snapshot["winrates"] and not snapshot["matches"]
+        assert len(snapshot["combined_winrates"]) == 3
+        assert await sv.verify_combined_winrates() == []
+
+    async def test_retire_legacy_tables(self, sv):
+        """Test that the cutover archives the legacy tables and stops writing them."""
+        await sv.record_matches_bulk("1", "9", _batch())
+        legacy = _snapshot()
+
+        assert await sv.retire_legacy_tables() == (True, [])
+        assert not sv.legacy_writes_enabled()
+        assert await sv.retire_legacy_tables() == (False, [])
+
+        await sv.init_sv_db()
+        await sv.record_match("1", "9", "Havencraft", "Abysscraft", False, True)
+        await sv.archive_current_season("9")
+
+        conn = sqlite3.connect("shadowverse_data.db")
+        try:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+            assert {"winrates", "matches"}.isdisjoint(tables)
+            assert conn.execute("SELECT * FROM legacy_winrates_archive ORDER BY 1, 2, 3, 4").fetchall() \
+                == legacy["winrates"]
+            assert conn.execute("SELECT COUNT(*) FROM legacy_matches_archive").fetchone()[0] == len(_batch())
+            assert conn.execute("SELECT COUNT(*) FROM archived_winrates").fetchone()[0] == 4
+        finally:
+            conn.close()
+
+
+class TestDashboardRenderer:
+    """Tests for the template-based dashboard renderer."""
+
+    def test_render_leaves_template_untouched(self, sv):
+        """Test that renders match a cold renderer and never draw into the shared template."""
+        pytest.importorskip("PIL")
+        renderer = sv.DashboardRenderer()
+        template = renderer.template.tobytes()
+        stats = {"Forestcraft": {"wins": 12, "losses": 3, "bricks": 1},
+                 "Portalcraft": {"wins": 0, "losses": 7, "bricks": 0}}
+
+        first = renderer.render("Kanami", "Dragoncraft", stats)
+        second = renderer.render("Someone else", "Havencraft", {})
+        assert renderer.template.tobytes() == template
+        assert first.size == (1600, 900) and first.tobytes() != second.tobytes()
+        assert sv.DashboardRenderer().render("Kanami", "Dragoncraft", stats).tobytes() == first.tobytes()
+
+    def test_encoding_is_configurable(self, sv, monkeypatch):
+        """Test the PNG and lossless WebP output settings."""
+        pytest.importorskip("PIL")
+        from PIL import Image, features
+
+        monkeypatch.setattr(sv, "SV_DASHBOARD_FORMAT", "png")
+        monkeypatch.setattr(sv, "SV_DASHBOARD_PNG_COMPRESS_LEVEL", 1)
+        png = sv.generate_dashboard_image("Kanami", "Dragoncraft", {})
+        assert png.getvalue().startswith(b"\x89PNG")
+        if features.check("webp"):
+            monkeypatch.setattr(sv, "SV_DASHBOARD_FORMAT", "webp")
+            webp = sv.generate_dashboard_image("Kanami", "Dragoncraft", {})
+            assert Image.open(webp).format == "WEBP"
+            assert Image.open(webp).convert("RGB").tobytes() == Image.open(png).convert("RGB").tobytes()
+
+
+class _FakeResponse:
+    status = 404
+    reason = "Not Found"
+
+
+class _FakeRest:
+    """Records dashboard sends and edits instead of calling Discord."""
+
+    def __init__(self):
+        self.calls = []
+        self.channels = {}  # message ID -> channel ID
+        self._next_id = 554
+
+    async def send(self, channel, **kwargs):
+        self._next_id += 1
+        self.calls.append(("send", kwargs["file"].filename))
+        self.channels[self._next_id] = channel.id
+        return SimpleNamespace(id=self._next_id)
+
+    async def edit(self, channel, message_id, **kwargs):
+        self.calls.append(("edit", message_id, "attachments" in kwargs))
+        self.last_view = kwargs.get("view")
+        if self.channels.get(message_id) != channel.id:
+            raise discord.NotFound(_FakeResponse(), "Unknown Message")
+
+
+class TestDashboardImageCache:
+    """Tests for off-loop rendering and skipping unchanged dashboard edits."""
+
+    def test_digest(self, sv):
+        """Test that the digest covers name, craft, stats and season, not dict order."""
+        stats = {"Forestcraft": {"wins": 1, "losses": 2, "bricks": 0},
+                 "Runecraft": {"wins": 0, "losses": 0, "bricks": 0}}
+        digest = sv.dashboard_image_digest("Kanami", "Dragoncraft", stats, 3)
+        assert digest == sv.dashboard_image_digest("Kanami", "Dragoncraft", dict(reversed(stats.items())), 3)
+        assert digest != sv.dashboard_image_digest("Kanami", "Dragoncraft", stats, 4)
+        assert digest != sv.dashboard_image_digest("Kanami ", "Dragoncraft", stats, 3)
+        assert digest != sv.dashboard_image_digest("Kanami", "Dragoncraft",
+                                                   {**stats, "Runecraft": {"wins": 1, "losses": 0, "bricks": 0}}, 3)
+
+    async def test_renders_on_worker_thread_once(self, sv, monkeypatch):
+        """Test that rendering leaves the event loop and identical inputs are encoded once."""
+        pytest.importorskip("PIL")
+        threads = []
+        generate = sv.generate_dashboard_image
+
+        def recording_generate(*args):
+            threads.append(threading.current_thread().name)
+            return generate(*args)
+
+        monkeypatch.setattr(sv, "generate_dashboard_image", recording_generate)
+        first = await sv.render_dashboard_image("Cache test", "Swordcraft", {}, 3)
+        second = await sv.render_dashboard_image("Cache test", "Swordcraft", {}, 3)
+        assert first == second and first[2].startswith("dashboard.")
+        assert len(threads) == 1 and threads[0].startswith("sv-dashboard")
+
+    async def test_unchanged_dashboard_is_not_reuploaded(self, sv, monkeypatch):
+        """Test that update_dashboard_message only uploads when the image changes."""
+        pytest.importorskip("PIL")
+        rest = _FakeRest()
+        monkeypatch.setattr(sv, "discord_rest", rest)
+        member = SimpleNamespace(id=1, display_name="Kanami")
+        channel = SimpleNamespace(id=77, guild=SimpleNamespace(id=9))
+
+        await sv.record_match("1", "9", "Dragoncraft", "Forestcraft", True)
+        await sv.update_dashboard_message(member, channel)
+        await sv.update_dashboard_message(member, channel)
+        await sv.record_match("1", "9", "Dragoncraft", "Forestcraft", False)
+        await sv.update_dashboard_message(member, channel)
+        await sv.update_dashboard_message(member, channel)
+
+        # Unchanged images still get a fresh view
+        assert rest.calls[1:] == [("edit", 555, False), ("edit", 555, True), ("edit", 555, False)]
+        assert await sv.get_dashboard_image_digest(9, 1, 77) == sv.dashboard_image_digest(
+            "Kanami", "Dragoncraft", await sv.get_winrate("1", "9", "Dragoncraft"), 3
+        )
+
+    async def test_new_craft_button_appears_without_reupload(self, sv, monkeypatch):
+        """Test that a new craft that doesn't change the shown image still reaches the view."""
+        pytest.importorskip("PIL")
+        rest = _FakeRest()
+        monkeypatch.setattr(sv, "discord_rest", rest)
+        member = SimpleNamespace(id=1, display_name="Kanami")
+        channel = SimpleNamespace(id=77, guild=SimpleNamespace(id=9))
+
+        await sv.record_match("1", "9", "Dragoncraft", "Forestcraft", True)
+        await sv.update_dashboard_message(member, channel)
+        await sv.record_match("1", "9", "Swordcraft", "Forestcraft", True)
+        await sv.update_dashboard_message(member, channel)
+
+        assert rest.calls[1:] == [("edit", 555, False)]
+        assert rest.last_view.crafts == ["Dragoncraft", "Swordcraft"]
+
+    async def test_dashboard_in_other_channel_is_resent(self, sv, monkeypatch):
+        """Test that a matching digest only skips the refresh in the channel it was posted in."""
+        pytest.importorskip("PIL")
+        rest = _FakeRest()
+        monkeypatch.setattr(sv, "discord_rest", rest)
+        member = SimpleNamespace(id=1, display_name="Kanami")
+        guild = SimpleNamespace(id=9)
+
+        await sv.record_match("1", "9", "Dragoncraft", "Forestcraft", True)
+        await sv.update_dashboard_message(member, SimpleNamespace(id=77, guild=guild))
+        await sv.update_dashboard_message(member, SimpleNamespace(id=78, guild=guild))
+        await sv.update_dashboard_message(member, SimpleNamespace(id=78, guild=guild))
+
+        assert [call[0] for call in rest.calls] == ["send", "edit", "send", "edit"]
+        assert rest.calls[1] == ("edit", 555, True) and rest.calls[3] == ("edit", 556, False)
+        assert await sv.get_dashboard_message_id(9, 1) == 556
+        assert await sv.get_dashboard_image_digest(9, 1, 77) is None
+        assert await sv.get_dashboard_image_digest(9, 1, 78) is not None
+
+    async def test_missing_dashboard_forgets_digest(self, sv, monkeypatch):
+        """Test that an edit hitting a deleted message clears the digest before re-sending."""
+        pytest.importorskip("PIL")
+        rest = _FakeRest()
+        monkeypatch.setattr(sv, "discord_rest", rest)
+        await sv.set_dashboard_message_id(9, 1, 500, image_digest="old", channel_id=77)
+
+        async def failing_send(channel, **kwargs):
+            raise RuntimeError("send failed")
+
+        monkeypatch.setattr(rest, "send", failing_send)
+        await sv.record_match("1", "9", "Dragoncraft", "Forestcraft", True)
+        with pytest.raises(RuntimeError):
+            await sv.update_dashboard_message(SimpleNamespace(id=1, display_name="Kanami"),
+                                              SimpleNamespace(id=77, guild=SimpleNamespace(id=9)))
+
+        assert rest.calls == [("edit", 500, True)]
+        assert await sv.get_dashboard_image_digest(9, 1, 77) is None
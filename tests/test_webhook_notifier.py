@@ -0,0 +1,563 @@
+"""
+Tests for the async webhook notifier.
+
+Webhook POSTs go to a local aiohttp stub server standing in for Discord.
+"""
+
+import asyncio
+import sqlite3
+import time
+
+import pytest
+from aiohttp import web
+
+from src.integrations.web import WebhookSender
+
+
+class StubWebhookServer:
+    """Local HTTP server that records POSTs and can answer with scripted statuses."""
+
+    def __init__(self):
+        self.requests = []
+        self.responses = []  # list of (status, json_body) consumed in order
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._runner = None
+        self.base_url = None
+
+    async def handle(self, request):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            self.requests.append((request.path, await request.json(), time.monotonic()))
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if self.responses:
+                status, body = self.responses.pop(0)
+                return web.json_response(body, status=status)
+            return web.Response(status=204)
+        finally:
+            self.in_flight -= 1
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post('/{hook}', self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+
+@pytest.fixture
+async def stub_server():
+    server = StubWebhookServer()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+# =============================================================================
+# WebhookSender Tests
+# =============================================================================
+
+class TestWebhookSender:
+    """Tests for the pooled webhook sender."""
+
+    async def test_post_success(self, stub_server):
+        """Test a plain successful POST."""
+        async with WebhookSender() as sender:
+            result = await sender.post(f"{stub_server.base_url}/uma", {"content": "hello"})
+            summary = sender.summary()
+
+        assert result.ok is True
+        assert result.status == 204
+        assert result.attempts == 1
+        assert stub_server.requests[0][1] == {"content": "hello"}
+        assert summary["sent"] == 1
+        assert summary["failed"] == 0
+
+    async def test_honours_retry_after(self, stub_server):
+        """Test that a 429 waits retry_after before retrying."""
+        stub_server.responses = [(429, {"message": "rate limited", "retry_after": 0.2, "global": False})]
+
+        async with WebhookSender() as sender:
+            result = await sender.post(f"{stub_server.base_url}/uma", {"content": "x"})
+            summary = sender.summary()
+
+        assert result.ok is True
+        assert result.attempts == 2
+        assert stub_server.requests[1][2] - stub_server.requests[0][2] >= 0.19
+        assert summary["rate_limited"] == 1
+        assert summary["retries"] == 1
+
+    async def test_client_error_not_retried(self, stub_server):
+        """Test that 4xx errors other than 429 fail immediately."""
+        stub_server.responses = [(400, {"message": "Invalid Form Body"})]
+
+        async with WebhookSender() as sender:
+            result = await sender.post(f"{stub_server.base_url}/uma", {"content": ""})
+
+        assert result.ok is False
+        assert result.status == 400
+        assert result.attempts == 1
+        assert len(stub_server.requests) == 1
+
+    async def test_server_error_retried(self, stub_server):
+        """Test that 5xx responses are retried with backoff."""
+        stub_server.responses = [(502, {}), (502, {})]
+
+        async with WebhookSender(backoff_base=0.01) as sender:
+            result = await sender.post(f"{stub_server.base_url}/uma", {"content": "x"})
+
+        assert result.ok is True
+        assert result.attempts == 3
+
+    async def test_no_backoff_after_last_attempt(self, stub_server):
+        """Test that a POST that keeps failing returns without a final backoff sleep."""
+        stub_server.responses = [(502, {}), (502, {})]
+
+        async with WebhookSender(max_retries=1, backoff_base=0.3) as sender:
+            start = time.monotonic()
+            result = await sender.post(f"{stub_server.base_url}/uma", {"content": "x"})
+            elapsed = time.monotonic() - start
+
+        assert result.ok is False
+        assert result.attempts == 2
+        # One 0.3s backoff between the attempts, not a 0.6s one after the last
+        assert elapsed < 0.6
+
+    async def test_concurrency_bounded_per_url(self, stub_server):
+        """Test that in-flight POSTs per URL never exceed the bound."""
+        stub_server.delay = 0.05
+
+        async with WebhookSender(per_url_concurrency=2) as sender:
+            results = await asyncio.gather(*(
+                sender.post(f"{stub_server.base_url}/{hook}", {"content": str(i)})
+                for i in range(6)
+                for hook in ("uma", "ak")
+            ))
+
+        assert all(r.ok for r in results)
+        assert len(stub_server.requests) == 12
+        # Two URLs x two slots each
+        assert stub_server.max_in_flight <= 4
+
+    async def test_requires_context_manager(self):
+        """Test that post() outside the context manager raises."""
+        with pytest.raises(RuntimeError):
+            await WebhookSender().post("http://127.0.0.1:1/x", {})
+
+
+# =============================================================================
+# Cron Notifier Tests
+# =============================================================================
+
+@pytest.fixture
+def notifier(tmp_path, monkeypatch):
+    """notification_handler pointed at a temporary notification DB."""
+    monkeypatch.chdir(tmp_path)  # bot.py opens discord.log in the working directory
+    notification_handler = pytest.importorskip("notification_handler")
+
+    db_path = tmp_path / "notification_data.db"
+    monkeypatch.setattr(notification_handler, "NOTIF_DB_PATH", str(db_path))
+    monkeypatch.setenv("WEBHOOK_UMA", "http://127.0.0.1:1/uma")
+    conn = sqlite3.connect(db_path)
+    conn.execute('''CREATE TABLE pending_notifications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, category TEXT, profile TEXT, title TEXT,
+        timing_type TEXT, notify_unix INTEGER, event_time_unix INTEGER, sent INTEGER DEFAULT 0,
+        region TEXT, send_time TEXT, message_template TEXT, custom_message TEXT,
+        phase TEXT, character_name TEXT
+    )''')
+    now = int(time.time())
+    for i in range(5):
+        conn.execute(
+            "INSERT INTO pending_notifications (category, profile, title, timing_type, notify_unix, event_time_unix) "
+            "VALUES ('Banner', 'UMA', ?, 'start', ?, ?)",
+            (f"Banner {i}", now - 5, now + 3600),
+        )
+    conn.execute(
+        "INSERT INTO pending_notifications (category, profile, title, timing_type, notify_unix, event_time_unix) "
+        "VALUES ('Banner', 'UMA', 'Future', 'start', ?, ?)",
+        (now + 3600, now + 7200),
+    )
+    conn.commit()
+    conn.close()
+    return notification_handler, db_path
+
+
+class TestCronNotifier:
+    """Tests for row claiming and the asyncio notifier run."""
+
+    def test_claim_is_exclusive(self, notifier):
+        """Test that a second overlapping run claims nothing."""
+        notification_handler, db_path = notifier
+        now = int(time.time())
+
+        first = sqlite3.connect(db_path, isolation_level=None)
+        second = sqlite3.connect(db_path, isolation_level=None)
+        claimed = notification_handler.claim_due_notifications(first, now)
+        overlapping = notification_handler.claim_due_notifications(second, now)
+
+        assert len(claimed) == 5
+        assert overlapping == []
+        states = {r[0] for r in first.execute("SELECT sent FROM pending_notifications WHERE title != 'Future'")}
+        assert states == {2}
+        first.close()
+        second.close()
+
+    def test_stale_claims_released(self, notifier):
+        """Test that claims from a crashed run are picked up again."""
+        notification_handler, db_path = notifier
+        now = int(time.time())
+        conn = sqlite3.connect(db_path, isolation_level=None)
+
+        notification_handler.claim_due_notifications(conn, now)
+        later = now + notification_handler.NOTIFIER_CLAIM_TIMEOUT + 1
+        assert len(notification_handler.claim_due_notifications(conn, later)) == 5
+        conn.close()
+
+    def test_rows_without_webhook_stay_unclaimed(self, notifier, monkeypatch):
+        """Test that rows the cron run can't deliver are not claimed (and so never retried by it)."""
+        notification_handler, db_path = notifier
+        monkeypatch.delenv("WEBHOOK_UMA")
+        import global_config
+        monkeypatch.setitem(global_config.NOTIFICATION_WEBHOOK_URLS, "UMA", "")
+        conn = sqlite3.connect(db_path, isolation_level=None)
+
+        assert notification_handler.claim_due_notifications(conn, int(time.time())) == []
+        states = {r[0] for r in conn.execute("SELECT sent FROM pending_notifications")}
+        conn.close()
+        assert states == {0}
+
+    async def test_run_async_marks_results(self, notifier, stub_server, monkeypatch):
+        """Test a full run: sent rows -> notification_history, failed rows released to 0."""
+        notification_handler, db_path = notifier
+        monkeypatch.setenv("WEBHOOK_UMA", f"{stub_server.base_url}/uma")
+        stub_server.responses = [(400, {"message": "bad"})]
+
+        summary = await notification_handler.run_async()
+
+        assert summary["claimed"] == 5
+        assert summary["sent"] == 4
+        assert summary["failed"] == 1
+        assert len(stub_server.requests) == 5
+
+        conn = sqlite3.connect(db_path)
+        counts = dict(conn.execute("SELECT sent, COUNT(*) FROM pending_notifications GROUP BY sent"))
+        history = conn.execute("SELECT status, delivery, sent_unix, lateness FROM notification_history").fetchall()
+        conn.close()
+        assert counts == {0: 2}  # 1 failed + 1 future
+        assert len(history) == 4
+        assert all(status == "sent" and delivery == "webhook" for status, delivery, _, _ in history)
+        assert all(sent_unix is not None and lateness >= 5 for _, _, sent_unix, lateness in history)
+
+
+class _RecordingDispatcher:
+    """Stands in for notification_dispatcher; every notification is delivered."""
+
+    def __init__(self):
+        self.refs = []
+
+    async def dispatch(self, outgoing):
+        from src.core.services.notification_dispatcher import DispatchResult
+        self.refs.extend(item.ref for item in outgoing)
+        return DispatchResult(notifications=len(outgoing), messages_sent=len(outgoing),
+                              sent_at={item.ref: time.time() for item in outgoing})
+
+
+class TestBotSendPath:
+    """Tests for claiming rows on the bot scheduler path."""
+
+    async def test_only_own_claims_are_sent(self, notifier, monkeypatch):
+        """Test that rows claimed by the cron notifier are neither sent nor archived by the bot."""
+        notification_handler, db_path = notifier
+        await notification_handler.init_notification_db()
+        dispatcher = _RecordingDispatcher()
+        monkeypatch.setattr(notification_handler, "notification_dispatcher", dispatcher)
+
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        cron_claimed = notification_handler.claim_due_notifications(conn, int(time.time()))
+        conn.execute("UPDATE pending_notifications SET sent=0, claimed_unix=NULL WHERE title='Banner 4'")
+        conn.close()
+
+        result = await notification_handler.load_and_schedule_pending_notifications(None, lookahead=0)
+
+        conn = sqlite3.connect(db_path)
+        archived = [row[0] for row in conn.execute("SELECT title FROM notification_history")]
+        in_flight = conn.execute("SELECT COUNT(*) FROM pending_notifications WHERE sent=2").fetchone()[0]
+        conn.close()
+        assert len(cron_claimed) == 5
+        assert result.notifications == 1 and len(dispatcher.refs) == 1
+        assert archived == ["Banner 4"]
+        assert in_flight == 4
+
+    async def test_stale_claims_released_on_load(self, notifier):
+        """Test that loading the scheduler releases claims stranded by a crashed send."""
+        notification_handler, db_path = notifier
+        await notification_handler.init_notification_db()
+        stale = int(time.time()) - notification_handler.NOTIFIER_CLAIM_TIMEOUT - 1
+
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        notification_handler.claim_due_notifications(conn, stale)
+        conn.execute("UPDATE pending_notifications SET sent=2, claimed_unix=? WHERE title='Banner 0'",
+                     (int(time.time()),))
+        conn.close()
+
+        deadlines = await notification_handler._load_pending_deadlines()
+        assert len(deadlines) == 1 + 4  # the future row + four released claims
+
+
+# =============================================================================
+# Pre-rendered Message Tests
+# =============================================================================
+
+class TestRenderedMessages:
+    """Tests for schedule-time rendering and the rendered_message column."""
+
+    def test_rows_carry_rendered_text(self, notifier):
+        """Test that scheduled rows are rendered with the same text as fire-time rendering."""
+        notification_handler, _ = notifier
+        now = int(time.time())
+        event = {"category": "Banner", "profile": "UMA", "title": "New Banner",
+                 "start_date": str(now + 7200), "end_date": str(now + 86400)}
+
+        rows = notification_handler.build_notification_rows(event, now=now)
+        columns = notification_handler._PENDING_INSERT_COLUMNS
+        assert rows
+        for row in rows:
+            values = dict(zip(columns, row))
+            assert values["rendered_message"] == notification_handler.render_notification_message(values)
+            assert "**New Banner**" in values["rendered_message"]
+
+    def test_template_fallbacks(self, notifier):
+        """Test custom_message > template > default, and malformed custom messages sent raw."""
+        notification_handler, _ = notifier
+        row = {"profile": "UMA", "title": "Legend Race", "category": "Legend Race",
+               "timing_type": "start", "event_time_unix": 1700000000,
+               "message_template": "uma_legend_race_character_start", "character_name": "Oguri Cap"}
+        render = notification_handler.render_notification_message
+
+        assert render(row, "@uma").startswith("@uma, Oguri Cap's Legend Race")
+        assert "is starting <t:1700000000:R>" in render(dict(row, character_name=None), "@uma")
+        assert render(dict(row, custom_message="{name} {time}"), "@uma") == "@uma, Legend Race <t:1700000000:R>"
+        assert render(dict(row, custom_message="Broken {"), "@uma") == "@uma, Broken {"
+        assert notification_handler.compile_message_template("{0} {name.x}") is None
+
+    def test_default_wording_and_regional_roles(self, notifier):
+        """Test that only start rows say "starting" and NA/EU rows find their combined roles."""
+        notification_handler, _ = notifier
+        row = {"profile": "HSR", "title": "Patch", "category": "Banner",
+               "timing_type": "reminder", "event_time_unix": 1700000000, "region": "NA"}
+        render = notification_handler.render_notification_message
+        roles = notification_handler.COMBINED_REGIONAL_ROLE_IDS
+
+        assert "is ending <t:1700000000:R>" in render(row)
+        assert "is starting <t:1700000000:R>" in render(dict(row, timing_type="start"))
+        assert render(row).startswith(f"<@&{roles[('HSR', 'AMERICA')]}>, ")
+        assert notification_handler.resolve_role_mention("HSR", "EU") == f"<@&{roles[('HSR', 'EUROPE')]}>"
+        assert notification_handler.resolve_role_mention("HSR", "MARS") == ""
+
+    async def test_rerender_and_webhook_use_stored_text(self, notifier, stub_server, monkeypatch):
+        """Test that the notifier posts rendered_message as-is and re-rendering updates it."""
+        notification_handler, db_path = notifier
+        monkeypatch.setenv("WEBHOOK_UMA", f"{stub_server.base_url}/uma")
+        await notification_handler.init_notification_db()
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM pending_notifications WHERE rendered_message IS NULL").fetchone()[0] == 0
+        conn.execute("UPDATE pending_notifications SET custom_message='{name} moved!' WHERE title='Banner 0'")
+        conn.execute("UPDATE pending_notifications SET rendered_message='stored text' WHERE title='Banner 1'")
+        notif_id = conn.execute("SELECT id FROM pending_notifications WHERE title='Banner 0'").fetchone()[0]
+        conn.commit()
+        conn.close()
+
+        import aiosqlite
+        async with aiosqlite.connect(db_path) as aconn:
+            assert await notification_handler.rerender_notifications(aconn, [notif_id]) == 1
+            await aconn.commit()
+
+        await notification_handler.run_async()
+        contents = {body["content"] for _, body, _ in stub_server.requests}
+        assert "stored text" in contents
+        assert any(c.endswith("Banner 0 moved!") for c in contents)
+
+
+# =============================================================================
+# Notification History Tests
+# =============================================================================
+
+class TestNotificationHistory:
+    """Tests for notification_history archiving, paging and compaction."""
+
+    async def test_init_moves_sent_rows_and_enables_incremental_vacuum(self, notifier):
+        """Test that legacy sent=1 rows are moved out of the live table on init."""
+        notification_handler, db_path = notifier
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE pending_notifications SET sent=1 WHERE title IN ('Banner 0', 'Banner 1')")
+        conn.commit()
+        conn.close()
+
+        await notification_handler.init_notification_db()
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM pending_notifications WHERE sent=1").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM notification_history").fetchone()[0] == 2
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        conn.close()
+
+    async def test_sent_rows_are_not_rescheduled(self, notifier):
+        """Test that a notification fired early is not inserted again by a reschedule."""
+        notification_handler, db_path = notifier
+        await notification_handler.init_notification_db()
+
+        import aiosqlite
+        async with aiosqlite.connect(db_path) as conn:
+            async with conn.execute("SELECT id, notify_unix, event_time_unix FROM pending_notifications "
+                                    "WHERE title='Future'") as cursor:
+                notif_id, notify_unix, event_time_unix = await cursor.fetchone()
+            await notification_handler.archive_notifications(conn, [(notif_id, time.time())], "manual")
+            await conn.commit()
+
+        row = ("Banner", "UMA", "Future", "start", notify_unix, event_time_unix, None, None, None, None, "text")
+        later = row[:4] + (notify_unix + 60,) + row[5:]
+        assert await notification_handler.insert_notification_rows([row, later]) == (1, 1)
+
+        conn = sqlite3.connect(db_path)
+        pending = conn.execute("SELECT notify_unix FROM pending_notifications WHERE title='Future'").fetchall()
+        conn.close()
+        assert pending == [(notify_unix + 60,)]
+
+    async def test_history_pages_and_retention(self, notifier):
+        """Test keyset paging and that compaction purges rows past retention."""
+        notification_handler, db_path = notifier
+        await notification_handler.init_notification_db()
+
+        import aiosqlite
+        async with aiosqlite.connect(db_path) as conn:
+            async with conn.execute("SELECT id FROM pending_notifications WHERE title LIKE 'Banner %'") as cursor:
+                ids = [row[0] async for row in cursor]
+            await notification_handler.archive_notifications(
+                conn, [(i, time.time()) for i in ids[:-1]] + [(ids[-1], None)], "bot"
+            )
+            await conn.commit()
+
+        first = await notification_handler.get_notification_history(limit=3)
+        second = await notification_handler.get_notification_history(limit=3, before_id=first["next_before_id"])
+        assert len(first["history"]) == 3
+        assert len(second["history"]) == 2
+        assert second["next_before_id"] is None
+        assert first["history"][0]["status"] == "failed"
+        assert {row["title"] for row in first["history"] + second["history"]} == {f"Banner {i}" for i in range(5)}
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE notification_history SET archived_unix = archived_unix - 400 * 86400 WHERE id <= 2")
+        conn.commit()
+        assert conn.execute("SELECT COUNT(*) FROM pending_notifications").fetchone()[0] == 1
+        conn.close()
+
+        stats = await notification_handler.compact_notification_db(retention_days=365)
+        assert stats["purged"] == 2
+        assert stats["analyzed"] is True
+        page = await notification_handler.get_notification_history()
+        assert len(page["history"]) == 3
+
+
+# =============================================================================
+# Pending Notifications Embed Tests
+# =============================================================================
+
+class _FakeResponse:
+    status = 500
+    reason = "Internal Server Error"
+
+
+class _PageRest:
+    """Records pending-notifications page calls; edits of ``broken`` IDs fail."""
+
+    def __init__(self, broken=()):
+        self.calls = []
+        self.broken = set(broken)
+        self._next_id = 900
+
+    async def send(self, channel, *, embed, priority=None):
+        from types import SimpleNamespace
+        self._next_id += 1
+        self.calls.append(("send", self._next_id))
+        return SimpleNamespace(id=self._next_id)
+
+    async def edit(self, channel, message_id, *, embed):
+        import discord
+        self.calls.append(("edit", int(message_id)))
+        if int(message_id) in self.broken:
+            raise discord.HTTPException(_FakeResponse(), "edit failed")
+
+    async def delete(self, channel, message_id):
+        self.calls.append(("delete", int(message_id)))
+
+
+class _FakeGuild:
+    def get_channel(self, channel_id):
+        return channel_id
+
+
+def _tracked_pages(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT message_id, page FROM pending_notifications_messages").fetchall()
+    conn.close()
+    return rows
+
+
+class TestPendingNotificationsEmbed:
+    """Tests for the per-profile pending-notifications pages."""
+
+    @pytest.fixture
+    def pages(self, notifier, monkeypatch):
+        notification_handler, db_path = notifier
+        monkeypatch.setattr(notification_handler, "PENDING_NOTIFICATIONS_CHANNELS", {"UMA": 77})
+        return notification_handler, db_path
+
+    async def test_unchanged_page_is_not_edited(self, pages, monkeypatch):
+        """Test that the page is sent once, skipped while unchanged and edited after a change."""
+        notification_handler, db_path = pages
+        await notification_handler.init_notification_db()
+        rest = _PageRest()
+        monkeypatch.setattr(notification_handler, "discord_rest", rest)
+
+        await notification_handler.update_pending_notifications_embed_for_profile(_FakeGuild(), "UMA")
+        await notification_handler.update_pending_notifications_embed_for_profile(_FakeGuild(), "UMA")
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE pending_notifications SET notify_unix = notify_unix + 60 WHERE title='Future'")
+        conn.commit()
+        conn.close()
+        await notification_handler.update_pending_notifications_embed_for_profile(_FakeGuild(), "UMA")
+
+        assert rest.calls == [("send", 901), ("edit", 901)]
+        assert _tracked_pages(db_path) == [("901", 0)]
+
+    async def test_failed_edit_replaces_page(self, pages, monkeypatch):
+        """Test that a page whose edit fails is deleted before its replacement is sent."""
+        notification_handler, db_path = pages
+        await notification_handler.init_notification_db()
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO pending_notifications_messages (profile, message_id, page, content_hash) "
+                     "VALUES ('UMA', '500', 0, 'stale')")
+        conn.commit()
+        conn.close()
+        rest = _PageRest(broken={500})
+        monkeypatch.setattr(notification_handler, "discord_rest", rest)
+
+        await notification_handler.update_pending_notifications_embed_for_profile(_FakeGuild(), "UMA")
+
+        assert rest.calls == [("edit", 500), ("delete", 500), ("send", 901)]
+        assert _tracked_pages(db_path) == [("901", 0)]
+
+    def test_refresh_needs_a_channel(self, pages):
+        """Test that profiles without a configured channel arm no debounce timer."""
+        notification_handler, _ = pages
+        assert notification_handler.request_pending_notifications_embed_refresh(_FakeGuild(), "AK") is None
@@ -1486,8 +1486,8 @@ async def add_uma_event(event_data, user_id="0"):
                 id TEXT PRIMARY KEY,
                 user_id TEXT,
                 title TEXT,
-                start_date TEXT,
-                end_date TEXT,
+                start_date INTEGER,
+                end_date INTEGER,
                 image TEXT,
                 category TEXT,
                 profile TEXT,
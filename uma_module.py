@@ -9,6 +9,14 @@ from discord.ext import commands
 from bot import bot
 from datetime import datetime, timezone, timedelta
 from global_config import ONGOING_EVENTS_CHANNELS, UPCOMING_EVENTS_CHANNELS, OWNER_USER_ID, MAIN_SERVER_ID
+from src.core.repositories.event_db_registry import register_event_database
+from src.core.repositories.migrations import migrate_event_time_columns
+from src.core.services.rest_scheduler import discord_rest, RestPriority
+from src.core.services.orphan_sweep import orphan_sweeper
+from src.games.base.channel_order import plan_channel_order
+from src.core.services.deadline_scheduler import DeadlineScheduler
+from src.core.services.refresh_coordinator import RefreshCoordinator
+from src.core.services.attachment_cache import attachment_cache, same_image_url
 import logging
 
 # Create logger for Uma Musume
@@ -50,12 +58,13 @@ except Exception as e:
 
 # Path to Uma Musume database
 UMA_DB_PATH = os.path.join("data", "uma_musume_data.db")
+register_event_database("UMA", UMA_DB_PATH)
 print(f"[INIT] Database path set to: {UMA_DB_PATH}")
 
 # Background task for periodic updates
 UMA_UPDATE_TASK = None
 
-# Prevent concurrent uma_update_timers() calls from interleaving
+# Keeps full refreshes and event transitions from interleaving
 _update_timers_lock = asyncio.Lock()
 print("[INIT] Global variables initialized")
 print("[INIT] Defining async functions...")
@@ -111,8 +120,8 @@ async def init_uma_db():
                 id TEXT PRIMARY KEY,
                 user_id TEXT,
                 title TEXT,
-                start_date TEXT,
-                end_date TEXT,
+                start_date INTEGER,
+                end_date INTEGER,
                 image TEXT,
                 category TEXT,
                 profile TEXT,
@@ -128,7 +137,9 @@ async def init_uma_db():
             )
         ''')
         await conn.commit()
-        uma_logger.info(f"[DB Init] Database initialized successfully at: {UMA_DB_PATH}")
+    # Older databases declared the time columns TEXT; rebuild them once as INTEGER
+    await asyncio.to_thread(migrate_event_time_columns, UMA_DB_PATH, "events", default_profile="UMA")
+    uma_logger.info(f"[DB Init] Database initialized successfully at: {UMA_DB_PATH}")
 
 async def post_event_embed(channel, event):
     """Posts an embed for the Uma Musume event."""
@@ -149,12 +160,46 @@ async def post_event_embed(channel, event):
         if event["image"].startswith("http"):
             embed.set_image(url=event["image"])
         else:
-            # Local file
-            file = discord.File(event["image"], filename="image.png")
-            embed.set_image(url=f"attachment://image.png")
-            return await channel.send(embed=embed, file=file)
+            # Local file: uploaded once, then referenced by its CDN URL
+            image = await attachment_cache.prepare(event["image"], owner_exists=_attachment_owner_exists)
+            embed.set_image(url=image.url)
+            if not image.cached:
+                msg = await discord_rest.send(channel, embed=embed, file=image.file, priority=RestPriority.DASHBOARD)
+                await attachment_cache.record(image, msg)
+                return msg
     
-    return await channel.send(embed=embed)
+    return await discord_rest.send(channel, embed=embed, priority=RestPriority.DASHBOARD)
+
+async def _attachment_owner_exists(channel_id, message_id):
+    """Whether the message carrying a cached upload still exists.
+    Only a definite NotFound (or a channel the bot can no longer see) counts as gone."""
+    channel = bot.get_channel(int(channel_id)) if channel_id else None
+    if channel is None:
+        return False
+    try:
+        await channel.fetch_message(int(message_id))
+    except discord.NotFound:
+        return False
+    except discord.HTTPException as e:
+        print(f"[UMA] Could not check attachment owner {message_id}: {e}")
+    return True
+
+async def _delete_untracked_message(conn, channel, message_id):
+    """Deletes a message whose event_messages row is being dropped.
+    A message that is already gone counts as deleted. If the delete fails, the
+    channel's sweep watermark is moved back so the next orphan sweep finds the
+    message; nothing else would track it once the row is gone.
+    Returns True if the message is gone."""
+    try:
+        await discord_rest.delete(channel, message_id)
+    except discord.NotFound:
+        pass
+    except Exception as e:
+        print(f"[UMA] Failed to delete message {message_id}: {e}")
+        await orphan_sweeper.rewind(conn, channel.id, message_id)
+        return False
+    await attachment_cache.forget_message(message_id)
+    return True
 
 async def delete_event_message(guild, channel_id, event_id):
     """Deletes the event message from the channel."""
@@ -167,19 +212,16 @@ async def delete_event_message(guild, channel_id, event_id):
         if row and row[0]:
             channel = guild.get_channel(int(channel_id))
             if channel:
-                try:
-                    msg = await channel.fetch_message(int(row[0]))
-                    await msg.delete()
-                except Exception:
-                    pass
+                await _delete_untracked_message(conn, channel, row[0])
         await conn.execute(
             "DELETE FROM event_messages WHERE event_id=? AND channel_id=?",
             (event_id, str(channel_id))
         )
         await conn.commit()
 
-async def upsert_event_message(guild, channel, event, event_id):
-    """Edits the event message if it exists and changed, otherwise sends a new one."""
+async def upsert_event_message(guild, channel, event, event_id, force_edit=False):
+    """Edits the event message if it exists and changed, otherwise sends a new one.
+    force_edit skips the fetch-and-compare and edits by ID (the caller knows it changed)."""
     async with aiosqlite.connect(UMA_DB_PATH) as conn:
         async with conn.execute(
             "SELECT message_id FROM event_messages WHERE event_id=? AND channel_id=?",
@@ -203,44 +245,44 @@ async def upsert_event_message(guild, channel, event, event_id):
             color=color
         )
         
+        # Local images are uploaded once; later embeds reuse the cached CDN URL
+        image = None
+        if event.get("image") and not event["image"].startswith("http"):
+            image = await attachment_cache.prepare(event["image"], owner_exists=_attachment_owner_exists)
+
         msg = None
         if row and row[0]:
             try:
-                msg = await channel.fetch_message(int(row[0]))
+                msg = None if force_edit else await channel.fetch_message(int(row[0]))
                 
                 # Check if embed actually changed to avoid unnecessary edits
                 needs_update = False
-                if msg.embeds:
+                if msg is not None and msg.embeds:
                     old_embed = msg.embeds[0]
                     
                     # Get old and new image URLs for comparison
                     old_image_url = old_embed.image.url if old_embed.image else None
                     # For new image, extract URL whether it's HTTP or attachment
+                    # A local image matches only if its current content is cached at that URL
                     new_image_url = None
-                    if event.get("image"):
-                        if event["image"].startswith("http"):
-                            new_image_url = event["image"]
-                        else:
-                            # Local file path — uploaded with its basename as the attachment filename.
-                            # Discord stores it as a CDN URL ending in that basename.
-                            # Check if the old embed's CDN URL already refers to the same file.
-                            basename = os.path.basename(event["image"])
-                            if old_image_url and (old_image_url.endswith(basename) or
-                                                  old_image_url.startswith("attachment://")):
-                                new_image_url = old_image_url
+                    if image is not None:
+                        new_image_url = image.url
+                    elif event.get("image"):
+                        new_image_url = event["image"]
+                    image_changed = not same_image_url(old_image_url, new_image_url)
                     
                     # For Champions Meeting, ignore description changes (detail lines vary)
                     if "Champions Meeting" in event['title'] or "champions meeting" in event['title'].lower():
                         if (old_embed.title != embed.title or
                             old_embed.color != embed.color or
-                            old_image_url != new_image_url):
+                            image_changed):
                             needs_update = True
                     else:
                         # For other events, check description too
                         if (old_embed.title != embed.title or 
                             old_embed.description != embed.description or
                             old_embed.color != embed.color or
-                            old_image_url != new_image_url):
+                            image_changed):
                             needs_update = True
                 else:
                     needs_update = True
@@ -250,37 +292,38 @@ async def upsert_event_message(guild, channel, event, event_id):
                     return
                 
                 # Update message
-                if event.get("image"):
-                    if event["image"].startswith("http"):
-                        embed.set_image(url=event["image"])
-                        await msg.edit(embed=embed)
-                    else:
-                        basename = os.path.basename(event["image"])
-                        file = discord.File(event["image"], filename=basename)
-                        embed.set_image(url=f"attachment://{basename}")
-                        await msg.edit(embed=embed, attachments=[file])
+                if image is not None and not image.cached:
+                    embed.set_image(url=image.url)
+                    edited = await discord_rest.edit(channel, row[0], embed=embed, attachments=[image.file])
+                    await attachment_cache.record(image, edited)
                 else:
-                    await msg.edit(embed=embed)
+                    if event.get("image"):
+                        embed.set_image(url=image.url if image is not None else event["image"])
+                    if image is not None and await attachment_cache.owner(image.digest) == str(row[0]):
+                        # The cached URL is this message's own attachment; keep it
+                        await discord_rest.edit(channel, row[0], embed=embed)
+                    else:
+                        # Drop any upload this message still carries, or it
+                        # shows below an embed that points elsewhere
+                        await discord_rest.edit(channel, row[0], embed=embed, attachments=[])
+                        await attachment_cache.forget_message(row[0])
                 return
             except Exception as e:
                 print(f"[UMA] Failed to edit/fetch message {row[0]}: {e}")
-                try:
-                    await channel.get_partial_message(int(row[0])).delete()
-                except Exception:
-                    pass
+                await _delete_untracked_message(conn, channel, row[0])
+                if image is not None:
+                    # The failed edit may have consumed the file, and the cached URL may have died with the message
+                    image = await attachment_cache.prepare(event["image"], owner_exists=_attachment_owner_exists)
         
         # Send new message
-        if event.get("image"):
-            if event["image"].startswith("http"):
-                embed.set_image(url=event["image"])
-                msg = await channel.send(embed=embed)
-            else:
-                basename = os.path.basename(event["image"])
-                file = discord.File(event["image"], filename=basename)
-                embed.set_image(url=f"attachment://{basename}")
-                msg = await channel.send(embed=embed, file=file)
+        if image is not None and not image.cached:
+            embed.set_image(url=image.url)
+            msg = await discord_rest.send(channel, embed=embed, file=image.file, priority=RestPriority.DASHBOARD)
+            await attachment_cache.record(image, msg)
         else:
-            msg = await channel.send(embed=embed)
+            if event.get("image"):
+                embed.set_image(url=image.url if image is not None else event["image"])
+            msg = await discord_rest.send(channel, embed=embed, priority=RestPriority.DASHBOARD)
         
         await conn.execute(
             "REPLACE INTO event_messages (event_id, channel_id, message_id) VALUES (?, ?, ?)",
@@ -288,60 +331,63 @@ async def upsert_event_message(guild, channel, event, event_id):
         )
         await conn.commit()
 
-async def clear_channel_messages(channel, event_ids_to_keep):
+async def clear_channel_messages(channel, event_ids_to_keep, force_sweep=False):
     """Clears messages in channel that don't correspond to events in the database.
     
+    Tracked messages of dropped events are found from event_messages alone. Untracked
+    bot messages (e.g. after a database reset) need a history read, which only happens
+    when the orphan sweep for the channel is due.
+    
     Args:
         channel: Discord channel to clean
         event_ids_to_keep: Set of event IDs that should have messages
+        force_sweep: Read the channel history even if no sweep is due
     """
     try:
         deleted_count = 0
-        async for message in channel.history(limit=100):
-            if message.author.id != bot.user.id:
-                continue
+        async with aiosqlite.connect(UMA_DB_PATH) as conn:
+            async with conn.execute(
+                "SELECT message_id, event_id FROM event_messages WHERE channel_id=?",
+                (str(channel.id),)
+            ) as cursor:
+                tracked = {str(row[0]): row[1] async for row in cursor if row[0]}
             
-            should_delete = False
-            event_id = None
+            # Tracked messages whose event no longer exists or is expired
+            for message_id, event_id in tracked.items():
+                if event_id in event_ids_to_keep:
+                    continue
+                try:
+                    await discord_rest.delete(channel, message_id)
+                    deleted_count += 1
+                    print(f"[UMA] Deleted orphaned message for event ID {event_id}")
+                except discord.NotFound:
+                    print(f"[UMA] Message already deleted (ID: {message_id})")
+                except Exception as del_err:
+                    print(f"[UMA] Failed to delete message {message_id}: {del_err}")
+                    continue
+                await attachment_cache.forget_message(message_id)
+                await conn.execute("DELETE FROM event_messages WHERE message_id=?", (message_id,))
+            await conn.commit()
             
-            # Check if this message is in our database
-            async with aiosqlite.connect(UMA_DB_PATH) as conn:
-                async with conn.execute(
-                    "SELECT event_id FROM event_messages WHERE message_id=?",
-                    (str(message.id),)
-                ) as cursor:
-                    row = await cursor.fetchone()
-                    
-                    if row:
-                        # Message is tracked in database
-                        event_id = row[0]
-                        if event_id not in event_ids_to_keep:
-                            # Event no longer exists or is expired
-                            should_delete = True
-                    else:
-                        # Message is NOT in database at all (orphaned after DB reset)
-                        # Check if it looks like an event embed (has embeds)
-                        if message.embeds:
-                            should_delete = True
-                            print(f"[UMA] Found untracked bot message with embed (ID: {message.id})")
-                
-                if should_delete:
-                    try:
-                        await message.delete()
-                        deleted_count += 1
-                        if event_id:
-                            await conn.execute(
-                                "DELETE FROM event_messages WHERE message_id=?",
-                                (str(message.id),)
-                            )
-                            await conn.commit()
-                            print(f"[UMA] Deleted orphaned message for event ID {event_id}")
-                        else:
-                            print(f"[UMA] Deleted untracked orphan message (ID: {message.id})")
-                    except discord.NotFound:
-                        print(f"[UMA] Message already deleted (ID: {message.id})")
-                    except Exception as del_err:
-                        print(f"[UMA] Failed to delete message {message.id}: {del_err}")
+            # Untracked bot messages with an embed (orphaned after a DB reset)
+            orphans = await orphan_sweeper.find_orphans(
+                conn, channel, tracked.keys(),
+                lambda message: message.author.id == bot.user.id and bool(message.embeds),
+                force=force_sweep,
+            )
+            for message in orphans:
+                print(f"[UMA] Found untracked bot message with embed (ID: {message.id})")
+                try:
+                    await discord_rest.delete(channel, message.id)
+                    deleted_count += 1
+                    print(f"[UMA] Deleted untracked orphan message (ID: {message.id})")
+                except discord.NotFound:
+                    print(f"[UMA] Message already deleted (ID: {message.id})")
+                except Exception as del_err:
+                    print(f"[UMA] Failed to delete message {message.id}: {del_err}")
+                    await orphan_sweeper.rewind(conn, channel.id, message.id)
+                    continue
+                await attachment_cache.forget_message(message.id)
         
         if deleted_count > 0:
             print(f"[UMA] Cleared {deleted_count} orphaned messages from {channel.name}")
@@ -353,8 +399,11 @@ async def clear_channel_messages(channel, event_ids_to_keep):
 async def ensure_channel_order(guild, channel, events_for_channel, db_path):
     """
     Checks that tracked event messages appear in start_date ascending order.
-    If any are out of order, deletes all and reposts in the correct order.
+    If not, applies the cheapest plan (see plan_channel_order): messages already
+    in place are left alone, others are edited in place to show the event that
+    belongs there, and only what can't be reused is deleted and reposted.
     events_for_channel: list of event dicts for this channel, sorted by start ASC.
+    Returns the number of Discord calls made.
     """
     async with aiosqlite.connect(db_path) as conn:
         async with conn.execute(
@@ -365,48 +414,45 @@ async def ensure_channel_order(guild, channel, events_for_channel, db_path):
             actual = [(r[0], r[1]) async for r in cursor]
 
     if not actual:
-        return
+        return 0
 
     actual_order  = [row[0] for row in actual]
     tracked_ids   = set(actual_order)
     desired_order = [e["id"] for e in events_for_channel if e["id"] in tracked_ids]
 
-    if actual_order == desired_order:
-        return  # Already in correct order
+    plan = plan_channel_order(actual_order, desired_order)
+    if plan.noop:
+        return 0  # Already in correct order
 
-    # Find the prefix that is already in the correct position.
-    # Only delete+repost messages from the first mismatch onward ("tail repost"),
-    # rather than nuking and reposting every message in the channel.
-    prefix_len = 0
-    for a_id, d_id in zip(actual_order, desired_order):
-        if a_id == d_id:
-            prefix_len += 1
-        else:
-            break
-
-    to_delete = actual[prefix_len:]         # (event_id, message_id) tuples to remove
-    to_repost = desired_order[prefix_len:]  # event_ids to repost in correct order
-
-    print(f"[UMA] #{channel.name} out of order — reposting {len(to_delete)} of {len(actual)} messages")
+    print(f"[UMA] #{channel.name} out of order — {len(plan.edits)} edit(s), {len(plan.deletes)} delete(s), "
+          f"{len(plan.sends)} repost(s) for {len(actual)} messages")
 
     async with aiosqlite.connect(db_path) as conn:
-        for ev_id, msg_id in to_delete:
-            try:
-                await channel.get_partial_message(int(msg_id)).delete()
-            except Exception:
-                pass
-        if to_delete:
-            placeholders = ",".join("?" * len(to_delete))
+        for slot in plan.deletes:
+            await _delete_untracked_message(conn, channel, actual[slot][1])
+        # Retarget tracking rows: deleted and edited slots lose their old event,
+        # edited slots are then pointed at the event they will show
+        stale = [actual[slot][0] for slot in plan.deletes] + [actual[slot][0] for slot, _ in plan.edits]
+        if stale:
+            placeholders = ",".join("?" * len(stale))
             await conn.execute(
                 f"DELETE FROM event_messages WHERE channel_id=? AND event_id IN ({placeholders})",
-                (str(channel.id),) + tuple(ev_id for ev_id, _ in to_delete)
+                (str(channel.id),) + tuple(stale)
             )
-            await conn.commit()
+        await conn.executemany(
+            "REPLACE INTO event_messages (event_id, channel_id, message_id) VALUES (?, ?, ?)",
+            [(ev_id, str(channel.id), actual[slot][1]) for slot, ev_id in plan.edits]
+        )
+        await conn.commit()
 
     event_map = {e["id"]: e for e in events_for_channel}
-    for ev_id in to_repost:
-        if ev_id in event_map:
-            await upsert_event_message(guild, channel, event_map[ev_id], ev_id)
+    for _, ev_id in plan.edits:
+        await upsert_event_message(guild, channel, event_map[ev_id], ev_id, force_edit=True)
+    for ev_id in plan.sends:
+        await upsert_event_message(guild, channel, event_map[ev_id], ev_id)
+
+    uma_logger.info(f"[Channel Order] #{channel.name} reordered with {plan.calls} Discord call(s)")
+    return plan.calls
 
 
 async def uma_update_timers(_guild=None, force_update=False):
@@ -417,9 +463,21 @@ async def uma_update_timers(_guild=None, force_update=False):
     Args:
         _guild: Guild to update (unused, kept for compatibility)
         force_update: If True, forces update of all event embeds even if unchanged
+
+    Calls made while a refresh is queued or running are merged into one
+    refresh (forced if any caller forced it). Returns once a refresh that
+    started after this call has finished.
     """
+    await uma_dashboard_refresh.request(force=force_update)
+
+
+async def _run_uma_dashboard_refresh(force):
     async with _update_timers_lock:
-        await _uma_update_timers_impl(_guild=_guild, force_update=force_update)
+        await _uma_update_timers_impl(force_update=force)
+
+
+# Merges overlapping refresh requests (scraper watcher, API, event_manager, commands)
+uma_dashboard_refresh = RefreshCoordinator(_run_uma_dashboard_refresh, name="UMA dashboard")
 
 
 async def _uma_update_timers_impl(_guild=None, force_update=False):
@@ -500,9 +558,11 @@ async def _uma_update_timers_impl(_guild=None, force_update=False):
         # 1. Haven't ended yet (ongoing or upcoming)
         # 2. Started within the past month (to catch recently started events)
         # This ensures we show events that started in the past but are still running
+        # Both kinds end after one_month_earlier, which bounds the index range
         async with conn.execute(
-            "SELECT id, title, start_date, end_date, image, category, description FROM events WHERE end_date >= ? OR start_date >= ? ORDER BY start_date ASC",
-            (now, one_month_earlier)
+            "SELECT id, title, start_date, end_date, image, category, description FROM events "
+            "WHERE profile='UMA' AND end_date >= ? AND (end_date >= ? OR start_date >= ?) ORDER BY start_date ASC",
+            (one_month_earlier, now, one_month_earlier)
         ) as cursor:
             events = [dict(
                 id=row[0], title=row[1], start=int(row[2]), end=int(row[3]), 
@@ -512,12 +572,12 @@ async def _uma_update_timers_impl(_guild=None, force_update=False):
         uma_logger.info(f"[Update Timers] Fetched {len(events)} events from database")
         print(f"[UMA] Fetched {len(events)} events from database")
         
-        # Clear orphaned messages (handles database resets)
+        # Clear orphaned messages (a reset database has no sweep watermark, so it gets a full sweep)
         event_ids_to_keep = {event["id"] for event in events}
         if ongoing_channel:
-            await clear_channel_messages(ongoing_channel, event_ids_to_keep)
+            await clear_channel_messages(ongoing_channel, event_ids_to_keep, force_sweep=force_update)
         if upcoming_channel:
-            await clear_channel_messages(upcoming_channel, event_ids_to_keep)
+            await clear_channel_messages(upcoming_channel, event_ids_to_keep, force_sweep=force_update)
         
         if len(events) == 0:
             print("[UMA] No events in database!")
@@ -528,6 +588,18 @@ async def _uma_update_timers_impl(_guild=None, force_update=False):
         upcoming_count = 0
         deleted_count = 0
         skipped_count = 0
+        ended_ids = []
+        
+        # Which events have a message in which channel, so events without one
+        # never pay for a delete_event_message lookup
+        tracked = {}
+        async with conn.execute("SELECT channel_id, event_id FROM event_messages") as cursor:
+            async for channel_id, event_id in cursor:
+                tracked.setdefault(channel_id, set()).add(event_id)
+        
+        async def drop_message(channel_id, event_id):
+            if event_id in tracked.get(str(channel_id), ()):
+                await delete_event_message(main_guild, channel_id, event_id)
         
         for event in events:
             # Debug: Show event details
@@ -538,10 +610,9 @@ async def _uma_update_timers_impl(_guild=None, force_update=False):
             
             # Delete ended events
             if event["end"] < now:
-                await delete_event_message(main_guild, ONGOING_EVENTS_CHANNELS["UMA"], event["id"])
-                await delete_event_message(main_guild, UPCOMING_EVENTS_CHANNELS["UMA"], event["id"])
-                await conn.execute("DELETE FROM events WHERE id=?", (event["id"],))
-                await conn.commit()
+                await drop_message(ONGOING_EVENTS_CHANNELS["UMA"], event["id"])
+                await drop_message(UPCOMING_EVENTS_CHANNELS["UMA"], event["id"])
+                ended_ids.append(event["id"])
                 deleted_count += 1
                 uma_logger.info(f"[Update Timers] Deleted ended event: {event['title']}")
                 continue
@@ -555,7 +626,7 @@ async def _uma_update_timers_impl(_guild=None, force_update=False):
             # Ongoing events (includes events that started in the past but haven't ended)
             if event["start"] <= now < event["end"]:
                 print(f"[UMA] Event '{event['title']}' is ONGOING (start: {event['start']}, end: {event['end']}, now: {now})")
-                await delete_event_message(main_guild, UPCOMING_EVENTS_CHANNELS["UMA"], event["id"])
+                await drop_message(UPCOMING_EVENTS_CHANNELS["UMA"], event["id"])
                 if ongoing_channel:
                     if force_update:
                         # Force message update by deleting and recreating
@@ -576,20 +647,149 @@ async def _uma_update_timers_impl(_guild=None, force_update=False):
                     upcoming_count += 1
                     uma_logger.info(f"[Update Timers] Posted upcoming event: {event['title']}")
                     print(f"[UMA] Posted to upcoming channel: {event['title']}")
-                await delete_event_message(main_guild, ONGOING_EVENTS_CHANNELS["UMA"], event["id"])
+                await drop_message(ONGOING_EVENTS_CHANNELS["UMA"], event["id"])
+        
+        if ended_ids:
+            placeholders = ",".join("?" * len(ended_ids))
+            await conn.execute(f"DELETE FROM events WHERE id IN ({placeholders})", ended_ids)
+            await conn.commit()
         
         # Ensure events appear in start_date order in each channel
-        ongoing_events_shown  = [e for e in events
-                                  if e["start"] <= now < e["end"]
-                                  and not (e["start"] > one_month_later and e["end"] > one_month_later)]
-        upcoming_events_shown = [e for e in events
-                                  if e["start"] > now and e["start"] <= one_month_later]
+        ongoing_events_shown, upcoming_events_shown = split_shown_events(events, now)
         if ongoing_channel:
             await ensure_channel_order(main_guild, ongoing_channel, ongoing_events_shown, UMA_DB_PATH)
         if upcoming_channel:
             await ensure_channel_order(main_guild, upcoming_channel, upcoming_events_shown, UMA_DB_PATH)
 
         uma_logger.info(f"[Update Timers] Summary - Ongoing: {ongoing_count}, Upcoming: {upcoming_count}, Deleted: {deleted_count}, Skipped (>1mo): {skipped_count}")
+
+    # Every boundary up to now has been reconciled; schedule the ones after it
+    mark_transitions_applied(now)
+
+
+# ==================== TRANSITION SCHEDULE ====================
+# Every displayed event moves hidden → upcoming → ongoing → ended at fixed
+# instants. Those instants are kept in a DeadlineScheduler so each event is
+# moved exactly at its boundary, touching only its own messages. The full
+# refresh above is only needed for reconciliation (scraper runs, edits, startup).
+
+UMA_UPCOMING_WINDOW = 30 * 24 * 60 * 60  # Upcoming events are shown from 1 month before start
+
+# Boundaries at or before this instant have been applied (by a transition or a full refresh)
+_transitions_applied_until = 0
+
+
+def split_shown_events(events, now):
+    """Splits events (sorted by start ASC) into (ongoing, upcoming) as the dashboards show them."""
+    one_month_later = now + UMA_UPCOMING_WINDOW
+    ongoing = [e for e in events
+               if e["start"] <= now < e["end"]
+               and not (e["start"] > one_month_later and e["end"] > one_month_later)]
+    upcoming = [e for e in events if now < e["start"] <= one_month_later]
+    return ongoing, upcoming
+
+
+def mark_transitions_applied(until):
+    """Records that every boundary up to `until` is reflected on the dashboards and reloads the schedule."""
+    global _transitions_applied_until
+    if until > _transitions_applied_until:
+        _transitions_applied_until = until
+    uma_transition_scheduler.wake()
+
+
+async def _load_uma_transitions():
+    """(instant, key) pairs for every boundary not applied yet; key = (event_id, kind, instant)."""
+    applied = _transitions_applied_until
+    async with aiosqlite.connect(UMA_DB_PATH) as conn:
+        async with conn.execute(
+            "SELECT id, start_date, end_date FROM events WHERE profile='UMA' AND end_date > ? AND id IS NOT NULL",
+            (applied,)
+        ) as cursor:
+            rows = await cursor.fetchall()
+    transitions = []
+    for event_id, start, end in rows:
+        start, end = int(start), int(end)
+        for kind, instant in (("show", start - UMA_UPCOMING_WINDOW), ("start", start), ("end", end)):
+            if instant > applied:
+                transitions.append((instant, (event_id, kind, instant)))
+    return transitions
+
+
+async def _apply_uma_transitions(keys):
+    """Moves the events whose boundaries just passed, and only those events."""
+    async with _update_timers_lock:
+        await _apply_uma_transitions_impl(keys)
+    mark_transitions_applied(max(instant for _, _, instant in keys))
+
+
+async def _apply_uma_transitions_impl(keys):
+    main_guild = bot.get_guild(MAIN_SERVER_ID) if bot.is_ready() else None
+    if not main_guild:
+        raise RuntimeError("Main guild not available, transitions will be retried")
+    ongoing_channel = main_guild.get_channel(ONGOING_EVENTS_CHANNELS["UMA"])
+    upcoming_channel = main_guild.get_channel(UPCOMING_EVENTS_CHANNELS["UMA"])
+
+    now = int(datetime.now(timezone.utc).timestamp())
+    event_ids = sorted({event_id for event_id, _, _ in keys})
+    placeholders = ",".join("?" * len(event_ids))
+    async with aiosqlite.connect(UMA_DB_PATH) as conn:
+        async with conn.execute(
+            f"SELECT id, title, start_date, end_date, image, category, description FROM events WHERE id IN ({placeholders})",
+            event_ids
+        ) as cursor:
+            events = [dict(
+                id=row[0], title=row[1], start=int(row[2]), end=int(row[3]),
+                image=row[4], category=row[5], description=row[6]
+            ) async for row in cursor]
+
+    touched = set()
+    ended_ids = []
+    for event in events:
+        if event["end"] <= now:
+            await delete_event_message(main_guild, ONGOING_EVENTS_CHANNELS["UMA"], event["id"])
+            await delete_event_message(main_guild, UPCOMING_EVENTS_CHANNELS["UMA"], event["id"])
+            ended_ids.append(event["id"])
+            uma_logger.info(f"[Transitions] '{event['title']}' ended")
+        elif event["start"] <= now:
+            await delete_event_message(main_guild, UPCOMING_EVENTS_CHANNELS["UMA"], event["id"])
+            if ongoing_channel:
+                await upsert_event_message(main_guild, ongoing_channel, event, event["id"])
+                touched.add(ongoing_channel)
+            uma_logger.info(f"[Transitions] '{event['title']}' is now ongoing")
+        elif event["start"] <= now + UMA_UPCOMING_WINDOW and upcoming_channel:
+            await upsert_event_message(main_guild, upcoming_channel, event, event["id"])
+            touched.add(upcoming_channel)
+            uma_logger.info(f"[Transitions] '{event['title']}' is now upcoming")
+
+    async with aiosqlite.connect(UMA_DB_PATH) as conn:
+        if ended_ids:
+            placeholders = ",".join("?" * len(ended_ids))
+            await conn.execute(f"DELETE FROM events WHERE id IN ({placeholders})", ended_ids)
+            await conn.commit()
+        if not touched:
+            return
+        # A moved event lands at the bottom; put it in its place with minimal moves
+        async with conn.execute(
+            "SELECT id, title, start_date, end_date, image, category, description FROM events "
+            "WHERE profile='UMA' AND end_date > ? ORDER BY start_date ASC",
+            (now,)
+        ) as cursor:
+            shown = [dict(
+                id=row[0], title=row[1], start=int(row[2]), end=int(row[3]),
+                image=row[4], category=row[5], description=row[6]
+            ) async for row in cursor]
+    ongoing_events_shown, upcoming_events_shown = split_shown_events(shown, now)
+    if ongoing_channel in touched:
+        await ensure_channel_order(main_guild, ongoing_channel, ongoing_events_shown, UMA_DB_PATH)
+    if upcoming_channel in touched:
+        await ensure_channel_order(main_guild, upcoming_channel, upcoming_events_shown, UMA_DB_PATH)
+
+
+uma_transition_scheduler = DeadlineScheduler(
+    _load_uma_transitions,
+    _apply_uma_transitions,
+    name="uma_transitions",
+)
     
 async def add_uma_event(ctx, event_data):
     """Adds or updates an Uma Musume event in the database (only if changed)."""
@@ -1212,6 +1412,10 @@ async def start_uma_background_tasks():
             uma_logger.error(traceback.format_exc())
             traceback.print_exc()
 
+        # Move events between the channels exactly at their start/end instants
+        uma_transition_scheduler.start()
+        uma_logger.info("[Startup] Event transition scheduler started.")
+
         # Start scraper file watcher (detects when uma_scraper.py has run)
         asyncio.create_task(scraper_file_watcher())
         uma_logger.info("[Startup] Scraper file watcher task started.")
@@ -1229,6 +1433,7 @@ async def stop_uma_background_tasks():
     """Stops Uma Musume background tasks."""
     global UMA_UPDATE_TASK
     
+    await uma_transition_scheduler.stop()
     if UMA_UPDATE_TASK and not UMA_UPDATE_TASK.done():
         UMA_UPDATE_TASK.cancel()
         try: